@@ -30,7 +30,6 @@ from agno.models.ollama import Ollama
 from backend.core.agno_config import get_agno_db
 from backend.core.config import settings
 from backend.models.llm_cost_tracking import calculate_cost
-from backend.models import LLMCostEntry
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -685,8 +684,10 @@ class AgnoSquadAgent(ABC):
             # Build enhanced message with context
             enhanced_message = self._build_message_with_context(message, context)
 
-            # Run Agno agent
-            agno_response = self.agent.run(enhanced_message)
+            # Run Agno agent (counted as in-flight work for load-aware delegation)
+            from backend.agents.orchestration.load_index import get_agent_load_index
+            with get_agent_load_index().track(self.agent_id, "llm_calls"):
+                agno_response = self.agent.run(enhanced_message)
 
             # Calculate response time
             response_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
@@ -697,7 +698,6 @@ class AgnoSquadAgent(ABC):
             # Track cost if requested and DB session provided
             if track_cost and db is not None:
                 await self._track_llm_cost(
-                    db=db,
                     prompt_tokens=prompt_tokens,
                     completion_tokens=completion_tokens,
                     response_time_ms=response_time_ms,
@@ -857,7 +857,6 @@ class AgnoSquadAgent(ABC):
 
     async def _track_llm_cost(
         self,
-        db: Any,  # AsyncSession
         prompt_tokens: int,
         completion_tokens: int,
         response_time_ms: int,
@@ -868,10 +867,13 @@ class AgnoSquadAgent(ABC):
         conversation_id: Optional[UUID] = None,
     ) -> None:
         """
-        Track LLM cost in database.
+        Track LLM cost.
+
+        The cost entry is handed to the buffered usage writer, which
+        bulk-inserts entries and updates squad member token counters in the
+        background, so no commit happens on the agent's hot path.
 
         Args:
-            db: Database session (AsyncSession)
             prompt_tokens: Number of input tokens
             completion_tokens: Number of output tokens
             response_time_ms: Response time in milliseconds
@@ -881,6 +883,9 @@ class AgnoSquadAgent(ABC):
             task_execution_id: Optional task execution ID
             conversation_id: Optional conversation ID
         """
+        # Lazy import: backend.services imports this module
+        from backend.services.usage_writer import get_usage_writer
+
         try:
             # Calculate cost
             total_tokens = prompt_tokens + completion_tokens
@@ -891,40 +896,35 @@ class AgnoSquadAgent(ABC):
                 completion_tokens=completion_tokens,
             )
 
-            # Create cost entry
-            cost_entry = LLMCostEntry(
-                id=uuid.uuid4(),
-                provider=self.config.llm_provider.value,
-                model=self.config.llm_model,
-                squad_id=squad_id,
-                agent_id=self.agent_id,
-                user_id=user_id,
-                organization_id=organization_id,
-                task_execution_id=task_execution_id,
-                conversation_id=conversation_id,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=total_tokens,
-                prompt_cost_usd=cost_data["prompt_cost_usd"],
-                completion_cost_usd=cost_data["completion_cost_usd"],
-                total_cost_usd=cost_data["total_cost_usd"],
-                prompt_price_per_1m=cost_data["prompt_price_per_1m"],
-                completion_price_per_1m=cost_data["completion_price_per_1m"],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens,
-                finish_reason=None,  # Could be extracted from response
-                response_time_ms=response_time_ms,
-                extra_metadata={
+            await get_usage_writer().record({
+                "id": uuid.uuid4(),
+                "provider": self.config.llm_provider.value,
+                "model": self.config.llm_model,
+                "squad_id": squad_id,
+                "agent_id": self.agent_id,
+                "user_id": user_id,
+                "organization_id": organization_id,
+                "task_execution_id": task_execution_id,
+                "conversation_id": conversation_id,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+                "prompt_cost_usd": cost_data["prompt_cost_usd"],
+                "completion_cost_usd": cost_data["completion_cost_usd"],
+                "total_cost_usd": cost_data["total_cost_usd"],
+                "prompt_price_per_1m": cost_data["prompt_price_per_1m"],
+                "completion_price_per_1m": cost_data["completion_price_per_1m"],
+                "temperature": self.config.temperature,
+                "max_tokens": self.config.max_tokens,
+                "finish_reason": None,  # Could be extracted from response
+                "response_time_ms": response_time_ms,
+                "extra_metadata": {
                     "role": self.config.role,
                     "specialization": self.config.specialization,
                     "session_id": self.agent.session_id,
                     "framework": "agno",
                 },
-            )
-
-            # Add to database
-            db.add(cost_entry)
-            await db.commit()
+            })
 
             logger.info(
                 f"Tracked LLM cost: {self.config.llm_provider.value}/{self.config.llm_model} "
@@ -934,10 +934,6 @@ class AgnoSquadAgent(ABC):
         except Exception as e:
             logger.error(f"Failed to track LLM cost: {e}", exc_info=True)
             # Don't raise - cost tracking failures shouldn't break agent execution
-            try:
-                await db.rollback()
-            except Exception as rollback_error:
-                logger.debug(f"Failed to rollback after cost tracking error: {rollback_error}")
 
     # ============================================================================
     # Message Bus Integration (Inter-Agent Communication)
@@ -0,0 +1,130 @@
+"""
+Reply Correlation
+
+Waits for the replies to a standup, question or code review without polling:
+the waiter subscribes to the requester's message bus queue and wakes up as
+soon as every expected responder has sent a reply carrying the correlation id.
+"""
+import asyncio
+from typing import Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.agents.communication.message_bus import MessageBus
+from backend.models.message import correlation_id_from_metadata
+from backend.services.task_execution_service import TaskExecutionService
+
+
+class ReplyWaiter:
+    """
+    Tracks which expected responders have replied to one request.
+
+    Usage:
+        async with ReplyWaiter(bus, pm_id, standup_id, "status_update", member_ids) as waiter:
+            await waiter.wait(timeout_seconds=60)
+    """
+
+    def __init__(
+        self,
+        message_bus: MessageBus,
+        recipient_id: UUID,
+        correlation_id: str,
+        message_type: str,
+        expected_responders: Iterable[UUID],
+    ):
+        """
+        Initialize reply waiter
+
+        Args:
+            message_bus: Message bus the replies are sent on
+            recipient_id: Agent the replies are addressed to
+            correlation_id: standup_id, question_id or review_id
+            message_type: Reply message type
+            expected_responders: Agents expected to reply
+        """
+        self.message_bus = message_bus
+        self.recipient_id = recipient_id
+        self.correlation_id = correlation_id
+        self.message_type = message_type
+        self.pending: Set[UUID] = set(expected_responders)
+        self._done = asyncio.Event()
+        if not self.pending:
+            self._done.set()
+
+    async def __aenter__(self) -> "ReplyWaiter":
+        await self.message_bus.subscribe(self.recipient_id, self._on_message)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.message_bus.unsubscribe(self.recipient_id, self._on_message)
+
+    def _on_message(self, message) -> None:
+        if message.message_type != self.message_type:
+            return
+        if correlation_id_from_metadata(message.message_metadata) != self.correlation_id:
+            return
+        self.mark_replied([message.sender_id])
+
+    def mark_replied(self, responder_ids: Iterable[UUID]) -> None:
+        """Record responders that have replied"""
+        self.pending.difference_update(responder_ids)
+        if not self.pending:
+            self._done.set()
+
+    async def wait(self, timeout_seconds: float) -> bool:
+        """
+        Wait until every expected responder replied.
+
+        Args:
+            timeout_seconds: Maximum time to wait
+
+        Returns:
+            True if all replied, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=timeout_seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+async def wait_for_replies(
+    db: AsyncSession,
+    message_bus: MessageBus,
+    recipient_id: UUID,
+    correlation_id: str,
+    message_type: str,
+    expected_responders: Iterable[UUID],
+    timeout_seconds: float,
+    task_execution_id: Optional[UUID] = None,
+) -> Set[UUID]:
+    """
+    Wait for the expected responders to reply, returning early when all did.
+
+    Subscribes before checking the database so replies stored between the
+    check and the wait are not missed.
+
+    Args:
+        db: Database session
+        message_bus: Message bus the replies are sent on
+        recipient_id: Agent the replies are addressed to
+        correlation_id: standup_id, question_id or review_id
+        message_type: Reply message type
+        expected_responders: Agents expected to reply
+        timeout_seconds: Maximum time to wait
+        task_execution_id: Optional execution to restrict to
+
+    Returns:
+        Responders that still had not replied when the wait ended
+    """
+    async with ReplyWaiter(
+        message_bus, recipient_id, correlation_id, message_type, expected_responders
+    ) as waiter:
+        stored = await TaskExecutionService.get_correlated_messages(
+            db, correlation_id, message_type, task_execution_id=task_execution_id
+        )
+        waiter.mark_replied(message.sender_id for message, _ in stored)
+        if waiter.pending and timeout_seconds > 0:
+            await waiter.wait(timeout_seconds)
+        return set(waiter.pending)
@@ -58,6 +58,7 @@ class CollaborationPatternManager:
         question: str,
         context: Dict[str, Any],
         relevant_roles: Optional[List[str]] = None,
+        timeout_seconds: int = 30,
     ) -> Dict[str, Any]:
         """
         Agent asks team for help with a problem.
@@ -71,6 +72,8 @@ class CollaborationPatternManager:
             question: Question text
             context: Context with issue_description, attempted_solutions, why_stuck
             relevant_roles: Optional list of relevant roles
+            timeout_seconds: Maximum time to wait for answers (returns as soon
+                as every recipient answered)
 
         Returns:
             Solution synthesized from team responses
@@ -82,6 +85,7 @@ class CollaborationPatternManager:
             question=question,
             context=context,
             relevant_roles=relevant_roles,
+            timeout_seconds=timeout_seconds,
         )
 
     async def broadcast_question(
@@ -308,6 +312,7 @@ class CollaborationPatternManager:
         pm_id: UUID,
         task_execution_id: UUID,
         standup_id: str,
+        timeout_seconds: float = 0,
     ) -> Dict[str, Any]:
         """
         Collect and analyze standup updates.
@@ -317,6 +322,7 @@ class CollaborationPatternManager:
             pm_id: PM agent ID
             task_execution_id: Task execution ID
             standup_id: Standup session ID
+            timeout_seconds: How long to wait for members who have not replied
 
         Returns:
             Analysis with blockers, at-risk members, action items
@@ -325,6 +331,7 @@ class CollaborationPatternManager:
             db=db,
             task_execution_id=task_execution_id,
             standup_id=standup_id,
+            timeout_seconds=timeout_seconds,
         )
 
         if not updates:
@@ -359,18 +366,13 @@ class CollaborationPatternManager:
         """
         from backend.services.task_execution_service import TaskExecutionService
 
-        messages = await TaskExecutionService.get_execution_messages(
+        # Count message types (GROUP BY, so the whole history is counted)
+        message_counts = await TaskExecutionService.count_execution_messages_by_type(
             db, task_execution_id
         )
 
-        # Count message types
-        message_counts = {}
-        for msg in messages:
-            msg_type = msg.message_type
-            message_counts[msg_type] = message_counts.get(msg_type, 0) + 1
-
         return {
-            "total_messages": len(messages),
+            "total_messages": sum(message_counts.values()),
             "message_types": message_counts,
             "questions_asked": message_counts.get("question", 0),
             "answers_provided": message_counts.get("answer", 0),
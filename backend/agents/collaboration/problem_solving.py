@@ -7,14 +7,14 @@ Enables agents to collaboratively solve problems by:
 3. Synthesizing the best solution
 4. Sharing learnings with the team
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
-import asyncio
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.agents.communication.message_bus import MessageBus
+from backend.agents.collaboration.correlation import wait_for_replies
 from backend.agents.context.context_manager import ContextManager
 from backend.services.agent_service import AgentService
 from backend.services.task_execution_service import TaskExecutionService
@@ -47,6 +47,9 @@ class ProblemSolvingPattern:
         self.message_bus = message_bus
         self.context_manager = context_manager
 
+        # question_id -> (asker ID, recipient IDs) for questions still collecting
+        self._expected_responders: Dict[str, Tuple[UUID, List[UUID]]] = {}
+
     async def broadcast_question(
         self,
         db: AsyncSession,
@@ -142,6 +145,10 @@ class ProblemSolvingPattern:
             },
         )
 
+        # Registered last so a failed broadcast leaves nothing behind;
+        # collect_answers removes it
+        self._expected_responders[question_id] = (asker_id, [r.id for r in recipients])
+
         return question_id
 
     async def collect_answers(
@@ -149,43 +156,50 @@ class ProblemSolvingPattern:
         db: AsyncSession,
         task_execution_id: UUID,
         question_id: str,
-        timeout_seconds: int = 300,
+        timeout_seconds: int = 30,
     ) -> List[Dict[str, Any]]:
         """
         Collect answers to a question from team members.
 
+        For questions broadcast by this pattern, waits until every recipient
+        has answered or the timeout expires, then collects all answers with a
+        single indexed query.
+
         Args:
             db: Database session
             task_execution_id: Task execution ID
             question_id: Question ID to track
-            timeout_seconds: Timeout for collecting answers (default 5 minutes)
+            timeout_seconds: Maximum time to wait for missing answers (returns
+                as soon as every recipient answered)
 
         Returns:
             List of answers with agent details
         """
-        # Get all messages for this execution
-        messages = await TaskExecutionService.get_execution_messages(
-            db, task_execution_id
+        expected = self._expected_responders.get(question_id)
+        try:
+            if expected and timeout_seconds > 0:
+                asker_id, recipient_ids = expected
+                await wait_for_replies(
+                    db, self.message_bus, asker_id, question_id, "answer",
+                    recipient_ids, timeout_seconds, task_execution_id=task_execution_id,
+                )
+        finally:
+            self._expected_responders.pop(question_id, None)
+
+        messages = await TaskExecutionService.get_correlated_messages(
+            db, question_id, "answer", task_execution_id=task_execution_id
         )
 
-        # Filter answers to this specific question
-        answers = []
-        for msg in messages:
-            if msg.message_type == "answer":
-                metadata = msg.message_metadata or {}
-                if metadata.get("question_id") == question_id:
-                    # Get responder details
-                    responder = await AgentService.get_squad_member(db, msg.sender_id)
-
-                    answers.append({
-                        "responder_id": str(msg.sender_id),
-                        "responder_role": responder.role if responder else "unknown",
-                        "answer": msg.content,
-                        "timestamp": msg.created_at.isoformat(),
-                        "metadata": metadata,
-                    })
-
-        return answers
+        return [
+            {
+                "responder_id": str(msg.sender_id),
+                "responder_role": role or "unknown",
+                "answer": msg.content,
+                "timestamp": msg.created_at.isoformat(),
+                "metadata": msg.message_metadata or {},
+            }
+            for msg, role in messages
+        ]
 
     async def synthesize_solution(
         self,
@@ -333,7 +347,7 @@ Be specific and actionable. Choose the best path forward.
         question: str,
         context: Dict[str, Any],
         relevant_roles: Optional[List[str]] = None,
-        timeout_seconds: int = 300,
+        timeout_seconds: int = 30,
     ) -> Dict[str, Any]:
         """
         Complete problem-solving flow: ask → collect → synthesize → share.
@@ -347,7 +361,8 @@ Be specific and actionable. Choose the best path forward.
             question: Question text
             context: Question context with issue_description, attempted_solutions, why_stuck
             relevant_roles: Optional list of relevant roles to ask
-            timeout_seconds: Timeout for collecting answers
+            timeout_seconds: Maximum time to wait for answers from recipients
+                who have not answered (returns as soon as all did)
 
         Returns:
             Complete solution with synthesis and next steps
@@ -363,11 +378,7 @@ Be specific and actionable. Choose the best path forward.
             urgency=context.get("urgency", "normal"),
         )
 
-        # Step 2: Wait for answers (in production, this would be event-driven)
-        # For Phase 3, we simulate the wait
-        await asyncio.sleep(1)  # Simulated wait for responses
-
-        # Step 3: Collect answers
+        # Step 2: Wait for answers (returns as soon as all recipients answered) and collect them
         answers = await self.collect_answers(
             db=db,
             task_execution_id=task_execution_id,
@@ -8,13 +8,14 @@ Implements async daily standup for agent squads:
 4. PM broadcasts insights and action items
 5. Store insights for team visibility
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.agents.communication.message_bus import MessageBus
+from backend.agents.collaboration.correlation import wait_for_replies
 from backend.services.agent_service import AgentService
 from backend.services.task_execution_service import TaskExecutionService
 
@@ -40,6 +41,9 @@ class StandupPattern:
         """
         self.message_bus = message_bus
 
+        # standup_id -> (PM ID, team member IDs) for standups still collecting
+        self._expected_responders: Dict[str, Tuple[UUID, List[UUID]]] = {}
+
     async def request_updates(
         self,
         db: AsyncSession,
@@ -123,6 +127,10 @@ Please be specific and concise.
                 },
             )
 
+        # Registered last so a failed request leaves nothing behind;
+        # collect_updates removes it
+        self._expected_responders[standup_id] = (pm_id, [m.id for m in team_members])
+
         return standup_id
 
     async def collect_updates(
@@ -130,41 +138,48 @@ Please be specific and concise.
         db: AsyncSession,
         task_execution_id: UUID,
         standup_id: str,
+        timeout_seconds: float = 0,
     ) -> List[Dict[str, Any]]:
         """
         Collect standup updates from team members.
 
+        With a timeout, waits until every member asked by request_updates has
+        replied (or the timeout expires) before collecting.
+
         Args:
             db: Database session
             task_execution_id: Task execution ID
             standup_id: Standup session ID
+            timeout_seconds: Maximum time to wait for missing updates
 
         Returns:
             List of updates from team members
         """
-        # Get all messages for this execution
-        messages = await TaskExecutionService.get_execution_messages(
-            db, task_execution_id
+        expected = self._expected_responders.get(standup_id)
+        try:
+            if expected and timeout_seconds > 0:
+                pm_id, member_ids = expected
+                await wait_for_replies(
+                    db, self.message_bus, pm_id, standup_id, "status_update",
+                    member_ids, timeout_seconds, task_execution_id=task_execution_id,
+                )
+        finally:
+            self._expected_responders.pop(standup_id, None)
+
+        messages = await TaskExecutionService.get_correlated_messages(
+            db, standup_id, "status_update", task_execution_id=task_execution_id
         )
 
-        # Filter status updates for this standup
-        updates = []
-        for msg in messages:
-            if msg.message_type == "status_update":
-                metadata = msg.message_metadata or {}
-                if metadata.get("standup_id") == standup_id:
-                    # Get agent details
-                    agent = await AgentService.get_squad_member(db, msg.sender_id)
-
-                    updates.append({
-                        "agent_id": str(msg.sender_id),
-                        "agent_role": agent.role if agent else "unknown",
-                        "update": msg.content,
-                        "timestamp": msg.created_at.isoformat(),
-                        "metadata": metadata,
-                    })
-
-        return updates
+        return [
+            {
+                "agent_id": str(msg.sender_id),
+                "agent_role": role or "unknown",
+                "update": msg.content,
+                "timestamp": msg.created_at.isoformat(),
+                "metadata": msg.message_metadata or {},
+            }
+            for msg, role in messages
+        ]
 
     async def analyze_updates(
         self,
@@ -333,6 +348,7 @@ Let's stay coordinated and help each other! 🚀
         pm_id: UUID,
         squad_id: UUID,
         task_execution_id: Optional[UUID] = None,
+        timeout_seconds: float = 0,
     ) -> Dict[str, Any]:
         """
         Complete standup flow: request → collect → analyze → broadcast.
@@ -344,6 +360,8 @@ Let's stay coordinated and help each other! 🚀
             pm_id: PM agent ID
             squad_id: Squad ID
             task_execution_id: Optional task execution ID
+            timeout_seconds: How long to wait for updates (0 = collect what
+                has already arrived and return "waiting_for_updates" if none)
 
         Returns:
             Complete standup results with analysis and insights
@@ -356,15 +374,17 @@ Let's stay coordinated and help each other! 🚀
             task_execution_id=task_execution_id,
         )
 
-        # Step 2: Collect updates (in production, wait for responses)
-        # For Phase 3, we'll need to wait or make this async
+        # Step 2: Collect updates (returns as soon as every member replied)
         if task_execution_id:
             updates = await self.collect_updates(
                 db=db,
                 task_execution_id=task_execution_id,
                 standup_id=standup_id,
+                timeout_seconds=timeout_seconds,
             )
         else:
+            # Nothing to collect replies for without an execution
+            self._expected_responders.pop(standup_id, None)
             updates = []
 
         # If no updates yet, return early status
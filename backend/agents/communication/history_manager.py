@@ -4,15 +4,19 @@ Conversation History Manager
 Manages storage and retrieval of agent conversation history from the database.
 Provides summarization for long conversations to fit within context windows.
 """
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime, timedelta
 from sqlalchemy import select, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.pagination import after_cursor
 from backend.models.message import AgentMessage
 from backend.schemas.agent_message import AgentMessageResponse
 from backend.agents.agno_base import ConversationMessage
+from backend.agents.guardian.workflow_metrics import apply_agent_deltas
+from backend.agents.guardian.workflow_snapshot import invalidate_workflow_snapshot
+from backend.services.summary_service import SummaryService
 
 
 class HistoryManager:
@@ -63,42 +67,61 @@ class HistoryManager:
 
         self.db.add(message)
         await self.db.flush()
+        invalidate_workflow_snapshot(task_execution_id)
         await self.db.refresh(message)
 
         return message
 
+    def _history_query(
+        self,
+        task_execution_id: UUID,
+        since: Optional[datetime] = None,
+    ):
+        """Execution history in (created_at, id) order, served by the keyset index"""
+        query = select(AgentMessage).where(
+            AgentMessage.task_execution_id == task_execution_id
+        )
+
+        # Filter by time if provided
+        if since:
+            query = query.where(AgentMessage.created_at > since)
+
+        return query.order_by(AgentMessage.created_at, AgentMessage.id)
+
     async def get_conversation_history(
         self,
         task_execution_id: UUID,
         limit: Optional[int] = 50,
         offset: int = 0,
         since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
     ) -> List[AgentMessage]:
         """
         Get conversation history for a task execution.
 
+        For deep pages pass `cursor` (core.pagination.next_cursor of the
+        previous page) instead of an offset: the keyset lookup costs the same
+        on every page while OFFSET scans all skipped rows.
+
         Args:
             task_execution_id: Task execution ID
             limit: Maximum number of messages
-            offset: Number of messages to skip
+            offset: Number of messages to skip (ignored when cursor is given)
             since: Only get messages after this time
+            cursor: Keyset cursor of the last message already seen
 
         Returns:
             List of messages in chronological order
-        """
-        query = select(AgentMessage).where(
-            AgentMessage.task_execution_id == task_execution_id
-        )
-
-        # Filter by time if provided
-        if since:
-            query = query.where(AgentMessage.created_at > since)
 
-        # Order by creation time
-        query = query.order_by(AgentMessage.created_at)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._history_query(task_execution_id, since)
 
         # Apply pagination
-        if offset:
+        if cursor:
+            query = query.where(after_cursor(AgentMessage.created_at, AgentMessage.id, cursor))
+        elif offset:
             query = query.offset(offset)
         if limit:
             query = query.limit(limit)
@@ -108,6 +131,31 @@ class HistoryManager:
 
         return list(messages)
 
+    async def iter_conversation_history(
+        self,
+        task_execution_id: UUID,
+        since: Optional[datetime] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[AgentMessage]:
+        """
+        Stream the full history of a task execution.
+
+        Rows are fetched `batch_size` at a time (yield_per), so memory stays
+        flat however long the history is.
+
+        Args:
+            task_execution_id: Task execution ID
+            since: Only get messages after this time
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            Messages in chronological order
+        """
+        query = self._history_query(task_execution_id, since).execution_options(yield_per=batch_size)
+        result = await self.db.stream(query)
+        async for message in result.scalars():
+            yield message
+
     async def get_agent_messages(
         self,
         agent_id: UUID,
@@ -201,6 +249,14 @@ class HistoryManager:
         This is useful when conversation history is too long for context window.
         Keeps recent messages in full, summarizes older messages.
 
+        Read-only: older messages come from the execution's persisted rolling
+        summary (SummaryService), and only messages after its high-water mark
+        are read. Old messages the background fold (SummaryService.fold_due)
+        has not reached yet are added to the returned summary text without
+        storing it. Messages created within the last summarize_older_than_hours
+        are always returned in full; if a background fold already moved the
+        summary past the cutoff, they are also part of the summary text.
+
         Args:
             task_execution_id: Task execution ID
             summarize_older_than_hours: Summarize messages older than this
@@ -210,80 +266,59 @@ class HistoryManager:
         """
         cutoff_time = datetime.utcnow() - timedelta(hours=summarize_older_than_hours)
 
-        # Get all messages
-        all_messages = await self.get_conversation_history(
-            task_execution_id=task_execution_id,
-            limit=None  # Get all
+        rolling = await SummaryService.get_summary(self.db, task_execution_id=task_execution_id)
+        summary, tail = await SummaryService.get_summary_with_tail(
+            self.db, task_execution_id=task_execution_id, since=cutoff_time
         )
-
-        # Split into old and recent
-        old_messages = [m for m in all_messages if m.created_at < cutoff_time]
-        recent_messages = [m for m in all_messages if m.created_at >= cutoff_time]
+        unfolded_old = [m for m in tail if m.created_at < cutoff_time]
+        recent_messages = [m for m in tail if m.created_at >= cutoff_time]
+
+        old_message_count = len(unfolded_old)
+        if rolling is not None and rolling.last_message_at is not None:
+            # Recent messages a background fold already counted in the summary
+            mark = (rolling.last_message_at, rolling.last_message_id)
+            folded_recent = sum(1 for m in recent_messages if (m.created_at, m.id) <= mark)
+            old_message_count += rolling.message_count - folded_recent
+        total_messages = old_message_count + len(recent_messages)
+
+        if unfolded_old:
+            accumulator = SummaryService.new_accumulator(rolling)
+            for message in unfolded_old:
+                SummaryService.add_message(accumulator, message)
+            summary = accumulator.render()
 
         # If no old messages, no summary needed
-        if not old_messages:
+        if not old_message_count:
             return {
                 "summary": None,
                 "recent_messages": recent_messages,
-                "total_messages": len(all_messages)
+                "total_messages": total_messages
             }
 
-        # Create simple summary (in production, use LLM)
-        summary = self._create_simple_summary(old_messages)
-
         return {
             "summary": summary,
             "recent_messages": recent_messages,
-            "old_message_count": len(old_messages),
+            "old_message_count": old_message_count,
             "recent_message_count": len(recent_messages),
-            "total_messages": len(all_messages)
+            "total_messages": total_messages
         }
 
-    def _create_simple_summary(self, messages: List[AgentMessage]) -> str:
+    def _create_simple_summary(self, messages: Iterable[AgentMessage]) -> str:
         """
         Create a simple summary of messages.
 
         In production, this should use an LLM for better summarization.
 
         Args:
-            messages: List of messages to summarize
+            messages: Messages to summarize
 
         Returns:
             Summary text
         """
-        if not messages:
-            return "No messages to summarize."
-
-        # Count message types
-        type_counts: Dict[str, int] = {}
-        for msg in messages:
-            type_counts[msg.message_type] = type_counts.get(msg.message_type, 0) + 1
-
-        # Get unique agents
-        agent_ids = set()
+        summary = SummaryService.new_accumulator()
         for msg in messages:
-            agent_ids.add(msg.sender_id)
-            if msg.recipient_id:
-                agent_ids.add(msg.recipient_id)
-
-        summary_parts = [
-            f"Summary of {len(messages)} older messages:",
-            f"- {len(agent_ids)} agents participated",
-            f"- Message types: {', '.join(f'{t} ({c})' for t, c in type_counts.items())}",
-        ]
-
-        # Add key events
-        key_messages = [
-            m for m in messages
-            if m.message_type in ["task_assignment", "task_completion", "human_intervention_required"]
-        ]
-
-        if key_messages:
-            summary_parts.append("- Key events:")
-            for msg in key_messages[:5]:  # Max 5 key events
-                summary_parts.append(f"  • {msg.message_type}: {msg.content[:100]}")
-
-        return "\n".join(summary_parts)
+            SummaryService.add_message(summary, msg)
+        return summary.render()
 
     async def get_message_count(
         self,
@@ -327,15 +362,29 @@ class HistoryManager:
         Returns:
             Number of messages deleted
         """
-        from sqlalchemy import delete
+        from sqlalchemy import delete, func
 
         cutoff_time = datetime.utcnow() - timedelta(days=older_than_days)
+        old_messages = AgentMessage.created_at < cutoff_time
 
-        query = delete(AgentMessage).where(
-            AgentMessage.created_at < cutoff_time
+        # Bulk deletes bypass the ORM, so take the messages out of the workflow counters here
+        counts = await self.db.execute(
+            select(AgentMessage.task_execution_id, AgentMessage.sender_id, func.count())
+            .where(old_messages, AgentMessage.task_execution_id.isnot(None))
+            .group_by(AgentMessage.task_execution_id, AgentMessage.sender_id)
         )
+        deltas = {
+            (execution_id, sender_id): [-count, None, 0.0, 0]
+            for execution_id, sender_id, count in counts.all()
+        }
+
+        query = delete(AgentMessage).where(old_messages)
 
         result = await self.db.execute(query)
+        if deltas:
+            await apply_agent_deltas(self.db, deltas)
+            for execution_id, _ in deltas:
+                invalidate_workflow_snapshot(execution_id)
         await self.db.flush()
 
         return result.rowcount
@@ -19,6 +19,7 @@ from backend.agents.communication.message_utils import (
     get_agent_details,
     get_conversation_thread_id,
 )
+from backend.agents.guardian.workflow_snapshot import invalidate_workflow_snapshot
 from backend.models.agent_message import AgentMessage
 
 
@@ -57,6 +58,9 @@ class MessageBus:
         # Subscribers (for real-time notifications)
         self._subscribers: Dict[UUID, List[Callable]] = defaultdict(list)
 
+        # Stages (run on every sent message, e.g. discovery detection)
+        self._stages: List[Callable] = []
+
         # All messages (for persistence/history)
         self._all_messages: deque = deque(maxlen=max_history_per_agent * 10)
 
@@ -121,6 +125,7 @@ class MessageBus:
                     )
                     db.add(db_message)
                     await db.flush()
+                    invalidate_workflow_snapshot(task_execution_id)
                     # Update message with database timestamp
                     message.created_at = db_message.created_at
                 except Exception as e:
@@ -141,6 +146,9 @@ class MessageBus:
                 # Send to specific agent
                 self._queues[recipient_id].append(message)
 
+            # Run stages (e.g. discovery detection)
+            await self._run_stages(message)
+
             # Notify subscribers
             await self._notify_subscribers(recipient_id, message)
 
@@ -282,6 +290,31 @@ class MessageBus:
             subscription_id = f"{agent_id}_{len(self._subscribers[agent_id])}"
             return subscription_id
 
+    def add_stage(self, stage: Callable[[AgentMessageResponse], Any]) -> None:
+        """
+        Add a stage that sees every sent message before subscribers do.
+
+        Args:
+            stage: Function (or async function) called with each message
+        """
+        if stage not in self._stages:
+            self._stages.append(stage)
+
+    def remove_stage(self, stage: Callable) -> bool:
+        """
+        Remove a stage.
+
+        Args:
+            stage: Stage to remove
+
+        Returns:
+            True if removed, False if not found
+        """
+        if stage in self._stages:
+            self._stages.remove(stage)
+            return True
+        return False
+
     async def unsubscribe(self, agent_id: UUID, callback: Callable) -> bool:
         """
         Unsubscribe from messages.
@@ -376,6 +409,21 @@ class MessageBus:
             data=data
         )
 
+    async def _run_stages(self, message: AgentMessageResponse):
+        """
+        Run every stage on a sent message.
+
+        Args:
+            message: Message being sent
+        """
+        for stage in self._stages:
+            try:
+                result = stage(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Error in message stage: {e}")
+
     async def _notify_subscribers(
         self,
         recipient_id: Optional[UUID],
@@ -532,6 +580,11 @@ def get_message_bus():
         _message_bus = MessageBus()
         _message_bus_type = "memory"
 
+    from backend.core.config import settings
+    if settings.DISCOVERY_STREAM_ENABLED:
+        from backend.agents.discovery.discovery_stream import get_discovery_stream
+        get_discovery_stream().attach(_message_bus)
+
     return _message_bus
 
 
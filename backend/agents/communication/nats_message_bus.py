@@ -27,6 +27,7 @@ from backend.agents.communication.message_utils import (
     get_conversation_thread_id,
 )
 from backend.agents.communication.nats_config import NATSConfig, default_nats_config
+from backend.agents.guardian.workflow_snapshot import invalidate_workflow_snapshot
 from backend.models.agent_message import AgentMessage
 
 logger = logging.getLogger(__name__)
@@ -63,6 +64,7 @@ class NATSMessageBus:
         self._js: Optional[JetStreamContext] = None
         self._connected = False
         self._subscribers: Dict[UUID, List[Callable]] = {}
+        self._stages: List[Callable] = []  # Run on every sent message (e.g. discovery detection)
         self._consumer_tasks: List[asyncio.Task] = []
         self._lock = asyncio.Lock()
 
@@ -248,6 +250,7 @@ class NATSMessageBus:
                     )
                     db.add(db_message)
                     await db.flush()
+                    invalidate_workflow_snapshot(task_execution_id)
                     # Update message with database timestamp
                     message.created_at = db_message.created_at
                 except Exception as e:
@@ -287,6 +290,9 @@ class NATSMessageBus:
                 logger.error(f"Error publishing to NATS: {e}")
                 raise
 
+            # Run stages (e.g. discovery detection)
+            await self._run_stages(message)
+
             # Notify local subscribers (for real-time callbacks)
             await self._notify_subscribers(recipient_id, message)
 
@@ -420,6 +426,31 @@ class NATSMessageBus:
             subscription_id = f"{agent_id}_{len(self._subscribers[agent_id])}"
             return subscription_id
 
+    def add_stage(self, stage: Callable[[AgentMessageResponse], Any]) -> None:
+        """
+        Add a stage that sees every sent message before subscribers do.
+
+        Args:
+            stage: Function (or async function) called with each message
+        """
+        if stage not in self._stages:
+            self._stages.append(stage)
+
+    def remove_stage(self, stage: Callable) -> bool:
+        """
+        Remove a stage.
+
+        Args:
+            stage: Stage to remove
+
+        Returns:
+            True if removed, False if not found
+        """
+        if stage in self._stages:
+            self._stages.remove(stage)
+            return True
+        return False
+
     async def unsubscribe(self, agent_id: UUID, callback: Callable) -> bool:
         """
         Unsubscribe from messages.
@@ -513,6 +544,21 @@ class NATSMessageBus:
             data=data
         )
 
+    async def _run_stages(self, message: AgentMessageResponse):
+        """
+        Run every stage on a sent message.
+
+        Args:
+            message: Message being sent
+        """
+        for stage in self._stages:
+            try:
+                result = stage(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in message stage: {e}")
+
     async def _notify_subscribers(
         self,
         recipient_id: Optional[UUID],
@@ -69,6 +69,12 @@ class CeleryConfig:
     # Task name for timeout monitoring
     timeout_task_name: str = "agents.interaction.check_conversation_timeouts"
 
+    # How often to fold new LLM cost entries into cost summaries (in seconds)
+    cost_rollup_interval: int = 300
+
+    # How often to fold new messages into rolling conversation summaries (in seconds)
+    summary_fold_interval: int = 120
+
     # Task retry settings
     task_max_retries: int = 3
     task_retry_delay: int = 60  # seconds
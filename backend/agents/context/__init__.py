@@ -5,15 +5,35 @@ Provides context management, RAG services, and short-term memory for agents.
 
 Components:
 - ContextManager: Aggregates context from multiple sources
-- RAGService: Vector search with Pinecone
+- RAGService: Vector search with Pinecone or a local vector store
 - MemoryStore: Short-term memory with Redis
+- EmbeddingCache / EmbeddingBatcher: Cached, batched embedding generation
+- VectorStore: Pluggable vector backends (PineconeVectorStore, LocalVectorStore)
+- CodeIndexer: Chunked, incremental repository indexing
+- LexicalIndexStore: Per-namespace BM25 index for hybrid retrieval
 """
 from backend.agents.context.context_manager import ContextManager
 from backend.agents.context.rag_service import RAGService
 from backend.agents.context.memory_store import MemoryStore
+from backend.agents.context.embedding_cache import EmbeddingCache, EmbeddingBatcher
+from backend.agents.context.code_indexer import CodeIndexer, IndexManifest
+from backend.agents.context.lexical_index import LexicalIndexStore
+from backend.agents.context.vector_store import (
+    VectorStore,
+    PineconeVectorStore,
+    LocalVectorStore,
+)
 
 __all__ = [
     "ContextManager",
     "RAGService",
     "MemoryStore",
+    "EmbeddingCache",
+    "EmbeddingBatcher",
+    "VectorStore",
+    "PineconeVectorStore",
+    "LocalVectorStore",
+    "CodeIndexer",
+    "IndexManifest",
+    "LexicalIndexStore",
 ]
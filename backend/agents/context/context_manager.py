@@ -7,9 +7,12 @@ and squad metadata.
 
 This allows agents to make informed decisions with relevant background knowledge.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Awaitable
 from uuid import UUID
 from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
 
 from backend.agents.context.rag_service import RAGService
 from backend.agents.context.memory_store import MemoryStore
@@ -19,6 +22,13 @@ from backend.models.squad import Squad
 # Agent model doesn't exist - using SquadMember instead
 from sqlalchemy import select
 
+logger = logging.getLogger(__name__)
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text or "") // 4 + 1
+
 
 class ContextManager:
     """
@@ -70,10 +80,18 @@ class ContextManager:
         include_decisions: bool = True,
         conversation_history_limit: int = 20,
         max_results_per_source: int = 5,
+        latency_budget_seconds: Optional[float] = None,
+        max_context_tokens: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Build comprehensive context for an agent.
 
+        The query is embedded once and every source (squad/agent metadata,
+        RAG namespaces, memory, history) is loaded concurrently. Sources that
+        miss the latency budget or fail are returned empty and listed under
+        "partial_sources", so a slow backend degrades the context instead of
+        stalling the agent.
+
         Args:
             agent_id: Agent UUID
             squad_id: Squad UUID
@@ -86,9 +104,12 @@ class ContextManager:
             include_decisions: Include architecture decisions
             conversation_history_limit: Max conversation messages
             max_results_per_source: Max RAG results per namespace
+            latency_budget_seconds: Optional wall-clock budget for all sources
+            max_context_tokens: Optional token budget for RAG results and history
 
         Returns:
-            Dictionary with comprehensive context
+            Dictionary with comprehensive context, including per-source
+            "timings" in milliseconds
         """
         context = {
             "query": query,
@@ -97,81 +118,78 @@ class ContextManager:
             "agent_id": str(agent_id),
         }
 
-        # 1. Get squad metadata
-        context["squad"] = await self._get_squad_metadata(squad_id)
-
-        # 2. Get agent metadata
-        context["agent"] = await self._get_agent_metadata(agent_id)
-
-        # 3. RAG retrieval from various namespaces
-        rag_results = {}
-
-        if include_code:
-            rag_results["code"] = await self.rag.query(
-                squad_id=squad_id,
-                namespace="code",
-                query=query,
-                top_k=max_results_per_source,
+        namespaces = [
+            namespace
+            for namespace, enabled in (
+                ("code", include_code),
+                ("tickets", include_tickets),
+                ("docs", include_docs),
+                ("conversations", include_conversations),
+                ("decisions", include_decisions),
             )
+            if enabled
+        ]
+
+        timings: Dict[str, float] = {}
+        sources: Dict[str, Awaitable[Any]] = {
+            "squad": self._get_squad_metadata(squad_id),
+            "agent": self._get_agent_metadata(agent_id),
+            "memory": self.memory.get_context(
+                agent_id=agent_id,
+                task_execution_id=task_execution_id,
+            ),
+        }
 
-        if include_tickets:
-            rag_results["tickets"] = await self.rag.query(
-                squad_id=squad_id,
-                namespace="tickets",
-                query=query,
-                top_k=max_results_per_source,
+        # Embed the query once and share the vector across all namespaces
+        embedding_task: Optional[asyncio.Task] = None
+        if namespaces:
+            embedding_task = asyncio.ensure_future(
+                self._timed("embedding", self.rag.generate_embedding(query), timings)
             )
+            for namespace in namespaces:
+                sources[f"rag.{namespace}"] = self._query_namespace(
+                    squad_id=squad_id,
+                    namespace=namespace,
+                    query=query,
+                    top_k=max_results_per_source,
+                    embedding_task=embedding_task,
+                )
 
-        if include_docs:
-            rag_results["docs"] = await self.rag.query(
-                squad_id=squad_id,
-                namespace="docs",
-                query=query,
-                top_k=max_results_per_source,
+        if task_execution_id:
+            sources["conversation_history"] = self.history.get_conversation_history(
+                task_execution_id=task_execution_id,
+                limit=conversation_history_limit,
             )
 
-        if include_conversations:
-            rag_results["conversations"] = await self.rag.query(
-                squad_id=squad_id,
-                namespace="conversations",
-                query=query,
-                top_k=max_results_per_source,
-            )
+        results = await self._gather_sources(sources, timings, latency_budget_seconds)
 
-        if include_decisions:
-            rag_results["decisions"] = await self.rag.query(
-                squad_id=squad_id,
-                namespace="decisions",
-                query=query,
-                top_k=max_results_per_source,
-            )
+        if embedding_task is not None and not embedding_task.done():
+            embedding_task.cancel()
+            await asyncio.gather(embedding_task, return_exceptions=True)
 
-        context["rag"] = rag_results
+        context["squad"] = results.get("squad") or {}
+        context["agent"] = results.get("agent") or {}
+        context["rag"] = {
+            namespace: results.get(f"rag.{namespace}") or []
+            for namespace in namespaces
+        }
+        context["memory"] = results.get("memory") or {}
+        context["conversation_history"] = [
+            {
+                "timestamp": msg.created_at.isoformat(),
+                "sender_id": str(msg.sender_id),
+                "recipient_id": str(msg.recipient_id) if msg.recipient_id else None,
+                "message_type": msg.message_type,
+                "content": msg.content,
+            }
+            for msg in results.get("conversation_history") or []
+        ]
 
-        # 4. Get short-term memory
-        context["memory"] = await self.memory.get_context(
-            agent_id=agent_id,
-            task_execution_id=task_execution_id,
-        )
+        if max_context_tokens is not None:
+            context["token_usage"] = self._apply_token_budget(context, max_context_tokens)
 
-        # 5. Get conversation history (if task execution exists)
-        if task_execution_id:
-            history = await self.history.get_conversation_history(
-                task_execution_id=task_execution_id,
-                limit=conversation_history_limit,
-            )
-            context["conversation_history"] = [
-                {
-                    "timestamp": msg.created_at.isoformat(),
-                    "sender_id": str(msg.sender_id),
-                    "recipient_id": str(msg.recipient_id) if msg.recipient_id else None,
-                    "message_type": msg.message_type,
-                    "content": msg.content,
-                }
-                for msg in history
-            ]
-        else:
-            context["conversation_history"] = []
+        context["partial_sources"] = sorted(set(sources) - set(results))
+        context["timings"] = timings
 
         return context
 
@@ -375,6 +393,141 @@ class ContextManager:
 
     # Helper methods
 
+    async def _timed(
+        self,
+        name: str,
+        awaitable: Awaitable[Any],
+        timings: Dict[str, float],
+    ) -> Any:
+        """Await a source and record its wall-clock time in milliseconds"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _query_namespace(
+        self,
+        squad_id: UUID,
+        namespace: str,
+        query: str,
+        top_k: int,
+        embedding_task: "asyncio.Future[List[float]]",
+    ) -> List[Dict[str, Any]]:
+        """Query one RAG namespace using the shared query embedding"""
+        query_embedding = await embedding_task
+        return await self.rag.query(
+            squad_id=squad_id,
+            namespace=namespace,
+            query=query,
+            top_k=top_k,
+            query_embedding=query_embedding,
+        )
+
+    async def _gather_sources(
+        self,
+        sources: Dict[str, Awaitable[Any]],
+        timings: Dict[str, float],
+        latency_budget_seconds: Optional[float],
+    ) -> Dict[str, Any]:
+        """
+        Run all context sources concurrently within an optional latency budget.
+
+        Args:
+            sources: Mapping of source name to awaitable
+            timings: Dict receiving per-source timings (ms)
+            latency_budget_seconds: Optional budget; pending sources are cancelled
+
+        Returns:
+            Mapping of source name to result for sources that completed
+        """
+        tasks = {
+            asyncio.ensure_future(self._timed(name, awaitable, timings)): name
+            for name, awaitable in sources.items()
+        }
+
+        done, pending = await asyncio.wait(tasks.keys(), timeout=latency_budget_seconds)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                f"Context sources exceeded {latency_budget_seconds}s budget: "
+                f"{sorted(tasks[task] for task in pending)}"
+            )
+
+        results: Dict[str, Any] = {}
+        for task in done:
+            name = tasks[task]
+            if task.exception() is not None:
+                logger.error(f"Context source '{name}' failed: {task.exception()}")
+                continue
+            results[name] = task.result()
+
+        return results
+
+    def _apply_token_budget(
+        self,
+        context: Dict[str, Any],
+        max_context_tokens: int,
+    ) -> Dict[str, Any]:
+        """
+        Trim RAG results and conversation history to fit a token budget.
+
+        Recent conversation history is kept first (newest messages win, capped
+        at half the budget), then RAG documents from all namespaces are ranked
+        by score and admitted while they fit. Context is modified in place.
+
+        Args:
+            context: Context built by build_context
+            max_context_tokens: Token budget for RAG results and history
+
+        Returns:
+            Token usage summary
+        """
+        used = 0
+        history_budget = max_context_tokens // 2
+
+        kept_history: List[Dict[str, Any]] = []
+        for message in reversed(context["conversation_history"]):
+            tokens = _estimate_tokens(message["content"])
+            if used + tokens > history_budget:
+                break
+            kept_history.append(message)
+            used += tokens
+        kept_history.reverse()
+        dropped_history = len(context["conversation_history"]) - len(kept_history)
+        context["conversation_history"] = kept_history
+
+        ranked = sorted(
+            (
+                (document.get("score") or 0.0, namespace, document)
+                for namespace, documents in context["rag"].items()
+                for document in documents
+            ),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+
+        kept_rag: Dict[str, List[Dict[str, Any]]] = {namespace: [] for namespace in context["rag"]}
+        dropped_rag = 0
+        for _, namespace, document in ranked:
+            tokens = _estimate_tokens(document.get("text", ""))
+            if used + tokens > max_context_tokens:
+                dropped_rag += 1
+                continue
+            kept_rag[namespace].append(document)
+            used += tokens
+        context["rag"] = kept_rag
+
+        return {
+            "budget": max_context_tokens,
+            "used": used,
+            "dropped_rag_results": dropped_rag,
+            "dropped_history_messages": dropped_history,
+        }
+
     async def _get_squad_metadata(self, squad_id: UUID) -> Dict[str, Any]:
         """Get squad metadata from database"""
         async with AsyncSessionLocal() as session:
@@ -0,0 +1,284 @@
+"""
+Embedding Cache and Request Batching
+
+Embeddings are deterministic for a given (model, text) pair, so they are cached
+by content hash in two tiers:
+- L1: bounded in-process LRU (no I/O, per RAGService instance)
+- L2: Redis, shared across processes, stored as packed float32 bytes
+
+Cache misses go through the EmbeddingBatcher, which coalesces concurrent
+embedding requests into a single API call (up to the model's batch limit)
+and dedupes identical texts within a batch.
+"""
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from array import array
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Embedding Cache - Two-tier (local LRU + Redis) content-hash cache
+
+    Key Format:
+    - {key_prefix}:{model}:{sha256(text)}
+
+    Redis failures never fail an embedding request: the cache degrades to
+    L1-only and retries Redis after a short cooldown.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        redis_url: Optional[str] = None,
+        l1_max_entries: int = 10_000,
+        ttl_seconds: int = 7 * 24 * 3600,
+        key_prefix: str = "embedding",
+        redis_retry_seconds: float = 30.0,
+        use_redis: bool = True,
+    ):
+        """
+        Initialize Embedding Cache
+
+        Args:
+            model: Embedding model name (part of the cache key)
+            redis_url: Redis connection URL (default from env)
+            l1_max_entries: Max vectors kept in the in-process LRU
+            ttl_seconds: Redis TTL for cached vectors (default 7 days)
+            key_prefix: Redis key prefix
+            redis_retry_seconds: Cooldown before retrying Redis after an error
+            use_redis: Disable to run with the L1 cache only
+        """
+        self.model = model
+        self.l1_max_entries = l1_max_entries
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self._l1: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._redis_disabled_until = 0.0
+        self.redis: Optional[redis.Redis] = None
+
+        if use_redis:
+            url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            # Vectors are stored as raw bytes, so responses must not be decoded
+            self.redis = redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+
+        self.stats = {"l1_hits": 0, "redis_hits": 0, "misses": 0}
+
+    async def close(self) -> None:
+        """Close Redis connection"""
+        if self.redis is not None:
+            await self.redis.close()
+
+    def _hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _build_key(self, text: str) -> str:
+        """Build cache key for a text"""
+        return f"{self.key_prefix}:{self.model}:{self._hash(text)}"
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_disabled_until
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Embedding cache Redis unavailable, using L1 only: {error}")
+        self._redis_disabled_until = time.monotonic() + self.redis_retry_seconds
+
+    def _l1_put(self, key: str, vector: List[float]) -> None:
+        self._l1[key] = vector
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_max_entries:
+            self._l1.popitem(last=False)
+
+    @staticmethod
+    def _pack(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(data: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(data)
+        return vector.tolist()
+
+    async def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Texts to look up (duplicates allowed)
+
+        Returns:
+            Mapping of text to vector for cache hits only
+        """
+        found: Dict[str, List[float]] = {}
+        redis_keys: Dict[str, str] = {}
+
+        for text in dict.fromkeys(texts):
+            key = self._build_key(text)
+            vector = self._l1.get(key)
+            if vector is not None:
+                self._l1.move_to_end(key)
+                found[text] = vector
+                self.stats["l1_hits"] += 1
+            else:
+                redis_keys[text] = key
+
+        if redis_keys and self._redis_available():
+            try:
+                values = await self.redis.mget(list(redis_keys.values()))
+            except Exception as e:
+                self._redis_failed(e)
+                values = [None] * len(redis_keys)
+
+            for (text, key), value in zip(redis_keys.items(), values):
+                if value is None:
+                    continue
+                vector = self._unpack(value)
+                self._l1_put(key, vector)
+                found[text] = vector
+                self.stats["redis_hits"] += 1
+
+        self.stats["misses"] += sum(1 for text in redis_keys if text not in found)
+        return found
+
+    async def set_many(self, vectors: Dict[str, List[float]]) -> None:
+        """
+        Store embeddings in L1 and Redis.
+
+        Args:
+            vectors: Mapping of text to vector
+        """
+        if not vectors:
+            return
+
+        keyed = {self._build_key(text): vector for text, vector in vectors.items()}
+        for key, vector in keyed.items():
+            self._l1_put(key, vector)
+
+        if not self._redis_available():
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, vector in keyed.items():
+                pipe.setex(key, self.ttl_seconds, self._pack(vector))
+            await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+
+class EmbeddingBatcher:
+    """
+    Embedding Batcher - Coalesces concurrent embedding requests
+
+    Requests arriving within max_wait_seconds of each other are sent as one
+    API call. A batch is flushed early once it reaches max_batch_size unique
+    texts. Identical texts share one slot in the batch and one result.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch_size: int = 2048,
+        max_wait_seconds: float = 0.005,
+    ):
+        """
+        Initialize Embedding Batcher
+
+        Args:
+            embed_batch: Coroutine embedding a list of texts in one API call
+            max_batch_size: Max unique texts per API call (OpenAI limit: 2048)
+            max_wait_seconds: How long to wait for more requests before flushing
+        """
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+        self.stats = {"api_calls": 0, "texts_embedded": 0, "requests": 0}
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed one text, sharing an API call with concurrent requests.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        self.stats["requests"] += 1
+
+        future = self._pending.get(text)
+        if future is None:
+            future = loop.create_future()
+            self._pending[text] = future
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait_seconds, self._flush)
+
+        # Shield so one cancelled caller doesn't cancel the shared result
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts through the batcher.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in input order
+        """
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def _flush(self) -> None:
+        """Send all pending texts as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: Dict[str, asyncio.Future]) -> None:
+        texts = list(batch)
+        self.stats["api_calls"] += 1
+        self.stats["texts_embedded"] += len(texts)
+
+        try:
+            vectors = await self.embed_batch(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedding API returned {len(vectors)} vectors for {len(texts)} inputs"
+                )
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            future = batch[text]
+            if not future.done():
+                future.set_result(vector)
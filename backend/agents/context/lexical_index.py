@@ -0,0 +1,362 @@
+"""
+Lexical Index
+
+BM25 inverted index kept per namespace ({squad_id}:{knowledge_type}) next to
+the vectors, so exact identifiers (function names, ticket keys like PROJ-123,
+error strings) can be found even when cosine similarity ranks them poorly.
+
+The index holds postings and metadata only; document text stays in the
+vector store. It is derived data: RAGService rebuilds a namespace from the
+vector store when it is missing or out of step (see RAGService._get_lexical_index).
+
+Also provides the hybrid retrieval building blocks used by RAGService:
+- reciprocal_rank_fusion: merges vector and lexical rankings
+- ExactMatchReranker: cheap re-ranker boosting exact identifier matches
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import Counter, OrderedDict, defaultdict
+import json
+import logging
+import math
+import os
+import re
+
+from backend.agents.context.vector_store import matches_filter
+
+logger = logging.getLogger(__name__)
+
+# Ticket keys (PROJ-123), dotted/underscored identifiers and plain words
+_TOKEN_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9]*-\d+|[A-Za-z_][A-Za-z0-9_.]*|\d+")
+_CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers are indexed whole and by their parts, so "get_user_by_id",
+    "UserCacheService" and "auth.service" match both exactly and by word.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repeats, for term frequency)
+    """
+    terms: List[str] = []
+    for token in _TOKEN_PATTERN.findall(text):
+        terms.append(token.lower())
+
+        parts = [p for p in re.split(r"[_.]", token) if p]
+        if "-" in token:
+            parts = []
+        expanded = []
+        for part in parts:
+            camel = _CAMEL_PATTERN.findall(part)
+            expanded.extend(camel if len(camel) > 1 else [part])
+        if len(expanded) > 1:
+            terms.extend(part.lower() for part in expanded)
+
+    return terms
+
+
+class BM25Index:
+    """
+    BM25 Index - Inverted index for one namespace
+
+    Stores term frequencies and metadata per document, not the text; callers
+    fetch the text of hits from the vector store.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize BM25 Index
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}  # doc_id -> metadata
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Index a document, replacing any previous version"""
+        self.add_terms(doc_id, Counter(tokenize(text)), metadata)
+
+    def add_terms(self, doc_id: str, counts: Dict[str, int], metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Index a document from its term frequencies"""
+        self.remove(doc_id)
+
+        for term, tf in counts.items():
+            self.postings[term][doc_id] = tf
+
+        length = sum(counts.values())
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = tuple(counts)
+        self._total_length += length
+        self.documents[doc_id] = metadata or {}
+
+    def term_counts(self, doc_id: str) -> Dict[str, int]:
+        """Term frequencies of an indexed document"""
+        return {term: self.postings[term][doc_id] for term in self.doc_terms[doc_id]}
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index"""
+        if self.documents.pop(doc_id, None) is None:
+            return
+
+        for term in self.doc_terms.pop(doc_id):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+        self._total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents by BM25 score.
+
+        Args:
+            query: Query text
+            top_k: Max results
+            filter: Optional Pinecone-style metadata filter
+
+        Returns:
+            List of (doc_id, score), best first
+        """
+        n = len(self.documents)
+        if not n:
+            return []
+
+        avgdl = self._total_length / n
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avgdl)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if filter:
+            ranked = [
+                (doc_id, score) for doc_id, score in ranked
+                if matches_filter(self.documents[doc_id], filter)
+            ]
+        return ranked[:top_k]
+
+
+class LexicalIndexStore:
+    """
+    Lexical Index Store - One BM25Index per namespace
+
+    At most max_namespaces indexes are kept in memory; the least recently
+    used one is evicted (and flushed first when persisted). Optionally
+    persisted as {path}/{namespace}.json (term frequencies and metadata;
+    postings are rebuilt on load).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_namespaces: int = 64):
+        """
+        Initialize Lexical Index Store
+
+        Args:
+            path: Optional directory for persistence (in-memory if None)
+            max_namespaces: Namespaces kept in memory
+        """
+        self.path = path
+        self.max_namespaces = max_namespaces
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._dirty: set = set()
+
+    def _file(self, namespace: str) -> str:
+        return os.path.join(self.path, re.sub(r"[^A-Za-z0-9_.-]", "_", namespace) + ".json")
+
+    def _persisted(self, namespace: str) -> bool:
+        return bool(self.path) and os.path.exists(self._file(namespace))
+
+    def has(self, namespace: str) -> bool:
+        """Whether the namespace is indexed here (in memory or on disk)"""
+        return namespace in self._indexes or self._persisted(namespace)
+
+    def get(self, namespace: str) -> BM25Index:
+        """Get (loading if persisted) the index for a namespace"""
+        index = self._indexes.get(namespace)
+        if index is not None:
+            self._indexes.move_to_end(namespace)
+            return index
+
+        index = BM25Index()
+        if self._persisted(namespace):
+            with open(self._file(namespace), "r", encoding="utf-8") as f:
+                for doc_id, document in json.load(f).items():
+                    if "text" in document:  # Written before term frequencies were stored
+                        index.add(doc_id, document["text"], document["metadata"])
+                    else:
+                        index.add_terms(doc_id, document["tf"], document["metadata"])
+        self.set(namespace, index)
+        return index
+
+    def set(self, namespace: str, index: BM25Index, dirty: bool = False) -> None:
+        """Install an index for a namespace (e.g. one rebuilt from the vector store)"""
+        self._indexes[namespace] = index
+        if dirty:
+            self._dirty.add(namespace)
+        self._indexes.move_to_end(namespace)
+        while len(self._indexes) > self.max_namespaces:
+            evicted = next(iter(self._indexes))
+            self._write(evicted)
+            del self._indexes[evicted]
+
+    def add_documents(self, namespace: str, documents: Iterable[Dict[str, Any]]) -> None:
+        """Index documents ({"id", "text", "metadata"})"""
+        index = self.get(namespace)
+        for doc in documents:
+            index.add(doc["id"], doc["text"], doc.get("metadata"))
+        self._dirty.add(namespace)
+
+    def delete(self, namespace: str, doc_ids: Iterable[str]) -> None:
+        """Remove documents from a namespace"""
+        index = self.get(namespace)
+        for doc_id in doc_ids:
+            index.remove(doc_id)
+        self._dirty.add(namespace)
+
+    def delete_namespace(self, namespace: str) -> None:
+        """Drop a namespace and its persisted file"""
+        self._indexes.pop(namespace, None)
+        self._dirty.discard(namespace)
+        if self._persisted(namespace):
+            os.remove(self._file(namespace))
+
+    def _write(self, namespace: str) -> None:
+        if not self.path or namespace not in self._dirty:
+            self._dirty.discard(namespace)
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        index = self._indexes[namespace]
+        tmp = self._file(namespace) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    doc_id: {"tf": index.term_counts(doc_id), "metadata": metadata}
+                    for doc_id, metadata in index.documents.items()
+                },
+                f,
+                default=str,
+            )
+        os.replace(tmp, self._file(namespace))
+        self._dirty.discard(namespace)
+
+    def flush(self) -> None:
+        """Persist changed namespaces to disk"""
+        for namespace in list(self._dirty):
+            self._write(namespace)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Fuse several rankings with reciprocal-rank fusion.
+
+    score(d) = sum_i weight_i / (k + rank_i(d)), ranks starting at 1.
+
+    Args:
+        rankings: Ranked document id lists, best first
+        k: Rank damping constant (60 is the usual default)
+        weights: Optional per-ranking weights
+
+    Returns:
+        List of (doc_id, fused score), best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += weight / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class ExactMatchReranker:
+    """
+    Cheap re-ranker for identifier-heavy queries
+
+    Boosts documents that contain query identifiers verbatim (ticket keys,
+    snake_case/camelCase names, quoted strings), which embeddings and even
+    BM25 word splitting tend to blur.
+    """
+
+    _IDENTIFIER_PATTERN = re.compile(
+        r"\"([^\"]+)\"|'([^']+)'|([A-Za-z][A-Za-z0-9]*-\d+|[A-Za-z_]\w*[_.A-Z0-9]\w*)"
+    )
+
+    def __init__(self, boost: float = 1.0):
+        """
+        Initialize Exact Match Reranker
+
+        Args:
+            boost: Score added per exact identifier match
+        """
+        self.boost = boost
+
+    def _identifiers(self, query: str) -> List[str]:
+        identifiers = []
+        for quoted_double, quoted_single, identifier in self._IDENTIFIER_PATTERN.findall(query):
+            value = quoted_double or quoted_single or identifier
+            # Plain lowercase words are left to BM25
+            if quoted_double or quoted_single or not value.isalpha() or not value.islower():
+                identifiers.append(value)
+        return identifiers
+
+    def rerank(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Re-order documents by fused score plus exact-match boost.
+
+        Args:
+            query: Query text
+            documents: Candidate documents with "text" and "score"
+
+        Returns:
+            Documents sorted by new score (score field updated)
+        """
+        identifiers = self._identifiers(query)
+        if not identifiers:
+            return documents
+
+        # Whole-token matches only, so PROJ-1 does not match PROJ-10
+        patterns = [
+            re.compile(r"(?<![\w-])" + re.escape(identifier) + r"(?![\w-])")
+            for identifier in identifiers
+        ]
+        for doc in documents:
+            text = doc.get("text", "")
+            hits = sum(1 for pattern in patterns if pattern.search(text))
+            doc["score"] = doc["score"] + self.boost * hits / len(identifiers)
+
+        return sorted(documents, key=lambda doc: doc["score"], reverse=True)
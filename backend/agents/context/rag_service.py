@@ -1,7 +1,8 @@
 """
 RAG Service
 
-The RAG Service manages vector search and storage using Pinecone.
+The RAG Service manages vector search and storage using a pluggable vector
+store (Pinecone by default, or the local on-disk store for on-prem/tests).
 Uses a unified index with namespaces for different knowledge types:
 - {squad_id}:code - Code from Git repositories
 - {squad_id}:tickets - Jira tickets & resolutions
@@ -9,28 +10,55 @@ Uses a unified index with namespaces for different knowledge types:
 - {squad_id}:conversations - Past agent discussions
 - {squad_id}:decisions - Architecture Decision Records
 
+Each namespace also keeps a BM25 lexical index, so queries can run as
+vector, lexical or hybrid (reciprocal-rank fused) searches. The lexical index
+is derived from the vector store metadata and rebuilt from it when a process
+has no index for a namespace or its document count no longer matches.
+
 This provides squad-isolated knowledge bases with efficient retrieval.
 """
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 import os
 import asyncio
+import logging
+import time
 from functools import lru_cache
 
 from pinecone import Pinecone, ServerlessSpec
 import openai
 
+from backend.agents.context.code_indexer import CodeIndexer, IndexManifest
+from backend.agents.context.embedding_cache import EmbeddingBatcher, EmbeddingCache
+from backend.agents.context.lexical_index import (
+    BM25Index,
+    ExactMatchReranker,
+    LexicalIndexStore,
+    reciprocal_rank_fusion,
+)
+from backend.agents.context.vector_store import (
+    LocalVectorStore,
+    PineconeVectorStore,
+    VectorStore,
+)
+
+logger = logging.getLogger(__name__)
+
 
 class RAGService:
     """
-    RAG Service - Vector Search with Pinecone
+    RAG Service - Vector Search with Pinecone or a local vector store
 
     Responsibilities:
-    - Store documents in Pinecone with embeddings
+    - Store documents in the vector store with embeddings
     - Query relevant documents via semantic search
     - Manage namespaces for different knowledge types
     - Handle squad isolation
-    - Generate embeddings via OpenAI
+    - Generate embeddings via OpenAI (cached by content hash, batched)
+    - Hybrid retrieval: BM25 + vector results fused with reciprocal-rank fusion
+
+    Documents store up to METADATA_TEXT_LIMIT characters of text in metadata;
+    code is indexed in syntax-aware chunks that fit within that limit.
 
     Namespace Strategy:
     - Format: {squad_id}:{knowledge_type}
@@ -38,11 +66,25 @@ class RAGService:
     - Enables squad isolation and efficient filtering
     """
 
+    METADATA_TEXT_LIMIT = 4000
+
+    RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
     def __init__(
         self,
         index_name: str = "agent-squad",
         embedding_model: str = "text-embedding-3-small",
         embedding_dimension: int = 1536,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedding_batch_size: int = 2048,
+        embedding_batch_wait_seconds: float = 0.005,
+        vector_store: Optional[VectorStore] = None,
+        code_manifest: Optional[IndexManifest] = None,
+        lexical_index: Optional[LexicalIndexStore] = None,
+        retrieval_mode: Optional[str] = None,
+        rerank: Optional[bool] = None,
+        hybrid_candidate_multiplier: int = 4,
+        rrf_k: int = 60,
     ):
         """
         Initialize RAG Service
@@ -51,17 +93,47 @@ class RAGService:
             index_name: Pinecone index name
             embedding_model: OpenAI embedding model
             embedding_dimension: Embedding vector dimension
+            embedding_cache: Optional embedding cache (default: L1 + Redis)
+            embedding_batch_size: Max texts per embedding API call
+            embedding_batch_wait_seconds: Window for coalescing concurrent requests
+            vector_store: Optional vector store backend. Defaults to the
+                backend selected by RAG_VECTOR_STORE ("pinecone" or "local")
+            code_manifest: Optional manifest of indexed code chunks
+                (default: Redis-backed IndexManifest)
+            lexical_index: Optional BM25 index store (default: in-memory,
+                persisted under RAG_LEXICAL_INDEX_PATH if set, at most
+                RAG_LEXICAL_MAX_NAMESPACES namespaces in memory)
+            retrieval_mode: Default query mode - "vector", "lexical" or
+                "hybrid" (default from RAG_RETRIEVAL_MODE, else "vector")
+            rerank: Apply the exact-match re-ranker to hybrid results by
+                default (default from RAG_RERANK)
+            hybrid_candidate_multiplier: Candidates fetched per retriever,
+                as a multiple of top_k, before fusion
+            rrf_k: Reciprocal-rank fusion damping constant
         """
         self.index_name = index_name
         self.embedding_model = embedding_model
         self.embedding_dimension = embedding_dimension
-
-        # Initialize Pinecone
-        api_key = os.getenv("PINECONE_API_KEY")
-        if not api_key:
-            raise ValueError("PINECONE_API_KEY environment variable not set")
-
-        self.pc = Pinecone(api_key=api_key)
+        self.index = None
+
+        self.retrieval_mode = retrieval_mode or os.getenv("RAG_RETRIEVAL_MODE", "vector")
+        if self.retrieval_mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {self.retrieval_mode}")
+        if rerank is None:
+            rerank = os.getenv("RAG_RERANK", "false").lower() == "true"
+        self.rerank = rerank
+        self.hybrid_candidate_multiplier = hybrid_candidate_multiplier
+        self.rrf_k = rrf_k
+        self.reranker = ExactMatchReranker()
+
+        backend = os.getenv("RAG_VECTOR_STORE", "pinecone")
+        if vector_store is None and backend == "pinecone":
+            # Initialize Pinecone
+            api_key = os.getenv("PINECONE_API_KEY")
+            if not api_key:
+                raise ValueError("PINECONE_API_KEY environment variable not set")
+
+            self.pc = Pinecone(api_key=api_key)
 
         # Initialize OpenAI for embeddings
         openai_key = os.getenv("OPENAI_API_KEY")
@@ -70,9 +142,50 @@ class RAGService:
 
         self.openai_client = openai.AsyncOpenAI(api_key=openai_key)
 
-        # Get or create index
-        self._ensure_index_exists()
-        self.index = self.pc.Index(self.index_name)
+        # Embedding cache (content-hash keyed) and request micro-batching
+        self.embedding_cache = embedding_cache or EmbeddingCache(model=embedding_model)
+        self.embedding_batcher = EmbeddingBatcher(
+            self._embed_batch,
+            max_batch_size=embedding_batch_size,
+            max_wait_seconds=embedding_batch_wait_seconds,
+        )
+
+        # Tracks indexed code chunks so unchanged files/chunks are skipped
+        self.code_manifest = code_manifest or IndexManifest()
+
+        # BM25 index per namespace for exact identifier / keyword matches
+        self.lexical_index = lexical_index or LexicalIndexStore(
+            path=os.getenv("RAG_LEXICAL_INDEX_PATH"),
+            max_namespaces=int(os.getenv("RAG_LEXICAL_MAX_NAMESPACES", "64")),
+        )
+        # Seconds between checks that a lexical index still matches the vector store
+        self.lexical_check_seconds = float(os.getenv("RAG_LEXICAL_CHECK_SECONDS", "60"))
+        self._lexical_checked: Dict[str, float] = {}
+        self._lexical_rebuilds: Dict[str, asyncio.Task] = {}
+
+        if vector_store is not None:
+            self.vector_store = vector_store
+        elif backend == "pinecone":
+            # Get or create index
+            self._ensure_index_exists()
+            self.index = self.pc.Index(self.index_name)
+            self.vector_store = PineconeVectorStore(self.index)
+        elif backend == "local":
+            self.vector_store = LocalVectorStore(
+                path=os.getenv("RAG_VECTOR_STORE_PATH", "./data/vector_store"),
+                dimension=embedding_dimension,
+                dtype=os.getenv("RAG_VECTOR_STORE_DTYPE", "float32"),
+                use_hnsw=os.getenv("RAG_VECTOR_STORE_HNSW", "false").lower() == "true",
+            )
+        else:
+            raise ValueError(f"Unknown RAG_VECTOR_STORE backend: {backend}")
+
+    async def close(self) -> None:
+        """Persist pending vector store writes and close connections"""
+        await self.vector_store.close()
+        self.lexical_index.flush()
+        await self.embedding_cache.close()
+        await self.code_manifest.close()
 
     def _ensure_index_exists(self) -> None:
         """Create Pinecone index if it doesn't exist"""
@@ -90,6 +203,22 @@ class RAGService:
                 ),
             )
 
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts with a single OpenAI call.
+
+        Args:
+            texts: Unique texts (at most the batcher's batch size)
+
+        Returns:
+            Embedding vectors in input order
+        """
+        response = await self.openai_client.embeddings.create(
+            model=self.embedding_model,
+            input=texts,
+        )
+        return [item.embedding for item in response.data]
+
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for text using OpenAI.
@@ -100,36 +229,47 @@ class RAGService:
         Returns:
             Embedding vector
         """
-        response = await self.openai_client.embeddings.create(
-            model=self.embedding_model,
-            input=text,
-        )
-        return response.data[0].embedding
+        embeddings = await self.generate_embeddings([text])
+        return embeddings[0]
 
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts (batch).
 
+        Cached vectors are served from the embedding cache; the remaining
+        unique texts go through the batcher, which coalesces them with any
+        concurrent requests into as few API calls as possible.
+
         Args:
             texts: List of texts to embed
 
         Returns:
             List of embedding vectors
         """
-        # OpenAI supports batching up to 2048 texts
-        batch_size = 2048
-        all_embeddings = []
+        if not texts:
+            return []
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=batch,
-            )
-            embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(embeddings)
+        embeddings = await self.embedding_cache.get_many(texts)
+
+        missing = [text for text in dict.fromkeys(texts) if text not in embeddings]
+        if missing:
+            fresh = dict(zip(missing, await self.embedding_batcher.embed_many(missing)))
+            await self.embedding_cache.set_many(fresh)
+            embeddings.update(fresh)
+
+        return [embeddings[text] for text in texts]
+
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """
+        Get embedding cache and batching statistics.
 
-        return all_embeddings
+        Returns:
+            Cache hits/misses and API call counts
+        """
+        return {
+            "cache": dict(self.embedding_cache.stats),
+            "batching": dict(self.embedding_batcher.stats),
+        }
 
     def _build_namespace(self, squad_id: UUID, namespace: str) -> str:
         """
@@ -151,7 +291,7 @@ class RAGService:
         documents: List[Dict[str, Any]],
     ) -> None:
         """
-        Store documents in Pinecone with embeddings.
+        Store documents in the vector store with embeddings.
 
         Args:
             squad_id: Squad UUID
@@ -170,7 +310,25 @@ class RAGService:
         texts = [doc["text"] for doc in documents]
         embeddings = await self.generate_embeddings(texts)
 
-        # Build vectors for Pinecone
+        await self.upsert_embeddings(squad_id, namespace, documents, embeddings)
+
+    async def upsert_embeddings(
+        self,
+        squad_id: UUID,
+        namespace: str,
+        documents: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+    ) -> None:
+        """
+        Store documents whose embeddings were already generated.
+
+        Args:
+            squad_id: Squad UUID
+            namespace: Namespace type (code, tickets, docs, etc.)
+            documents: Documents in the same format as upsert()
+            embeddings: One embedding per document
+        """
+        # Build vectors for the vector store
         namespace_key = self._build_namespace(squad_id, namespace)
         vectors = []
 
@@ -180,20 +338,29 @@ class RAGService:
                 "values": embedding,
                 "metadata": {
                     **doc.get("metadata", {}),
-                    "text": doc["text"][:1000],  # Store truncated text in metadata
+                    # Store truncated text in metadata
+                    "text": doc["text"][:self.METADATA_TEXT_LIMIT],
                     "squad_id": str(squad_id),
                     "namespace_type": namespace,
                 },
             })
 
-        # Upsert in batches of 100 (Pinecone limit)
-        batch_size = 100
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i:i + batch_size]
-            self.index.upsert(
-                vectors=batch,
-                namespace=namespace_key,
-            )
+        await self.vector_store.upsert(namespace_key, vectors)
+
+        # A namespace this process has no index for is rebuilt in full on first lexical use
+        if not self.lexical_index.has(namespace_key):
+            return
+        self.lexical_index.add_documents(
+            namespace_key,
+            (
+                {
+                    "id": vector["id"],
+                    "text": vector["metadata"]["text"],
+                    "metadata": {k: v for k, v in vector["metadata"].items() if k != "text"},
+                }
+                for vector in vectors
+            ),
+        )
 
     async def query(
         self,
@@ -202,9 +369,19 @@ class RAGService:
         query: str,
         top_k: int = 5,
         filter_metadata: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None,
+        mode: Optional[str] = None,
+        rerank: Optional[bool] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Query relevant documents from Pinecone.
+        Query relevant documents.
+
+        Modes:
+        - vector: semantic search in the vector store
+        - lexical: BM25 keyword search (no embedding call)
+        - hybrid: both, fused with reciprocal-rank fusion; best for queries
+          mixing natural language with identifiers (function names,
+          ticket keys, error strings)
 
         Args:
             squad_id: Squad UUID
@@ -212,14 +389,20 @@ class RAGService:
             query: Query string
             top_k: Number of results to return
             filter_metadata: Optional metadata filters
+            query_embedding: Optional precomputed embedding of the query
+                (lets callers searching several namespaces embed once)
+            mode: "vector", "lexical" or "hybrid" (default: service setting)
+            rerank: Apply the exact-match re-ranker (hybrid/lexical only,
+                default: service setting)
 
         Returns:
             List of relevant documents with scores
         """
-        # Generate query embedding
-        query_embedding = await self.generate_embedding(query)
+        mode = mode or self.retrieval_mode
+        if mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        rerank = self.rerank if rerank is None else rerank
 
-        # Query Pinecone
         namespace_key = self._build_namespace(squad_id, namespace)
 
         # Build filter
@@ -227,28 +410,133 @@ class RAGService:
         filter_dict["squad_id"] = str(squad_id)
         filter_dict["namespace_type"] = namespace
 
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            namespace=namespace_key,
-            filter=filter_dict,
-            include_metadata=True,
-        )
+        if mode == "vector":
+            # Generate query embedding
+            if query_embedding is None:
+                query_embedding = await self.generate_embedding(query)
 
-        # Format results
-        documents = []
-        for match in results.matches:
-            documents.append({
-                "id": match.id,
-                "score": match.score,
-                "text": match.metadata.get("text", ""),
-                "metadata": {
-                    k: v for k, v in match.metadata.items()
-                    if k not in ["text", "squad_id", "namespace_type"]
-                },
-            })
+            matches = await self.vector_store.query(
+                namespace_key,
+                query_embedding,
+                top_k=top_k,
+                filter=filter_dict,
+            )
+            return [
+                self._format_match(match["id"], match["score"], match["metadata"])
+                for match in matches
+            ]
+
+        candidates = top_k * self.hybrid_candidate_multiplier if (mode == "hybrid" or rerank) else top_k
+        lexical_index = await self._get_lexical_index(namespace_key)
+        lexical_matches = lexical_index.search(query, top_k=candidates, filter=filter_dict)
+        documents: Dict[str, Dict[str, Any]] = {}
+
+        if mode == "lexical":
+            ranked = lexical_matches
+        else:
+            if query_embedding is None:
+                query_embedding = await self.generate_embedding(query)
+
+            vector_matches = await self.vector_store.query(
+                namespace_key,
+                query_embedding,
+                top_k=candidates,
+                filter=filter_dict,
+            )
+            for match in vector_matches:
+                documents[match["id"]] = match["metadata"]
+
+            ranked = reciprocal_rank_fusion(
+                [
+                    [match["id"] for match in vector_matches],
+                    [doc_id for doc_id, _ in lexical_matches],
+                ],
+                k=self.rrf_k,
+            )
+
+        # The lexical index holds no text; fetch it for lexical-only hits
+        missing = [doc_id for doc_id, _ in lexical_matches if doc_id not in documents]
+        if missing:
+            documents.update(await self.vector_store.fetch(namespace_key, missing))
+        ranked = [(doc_id, score) for doc_id, score in ranked if doc_id in documents]
+
+        results = [
+            self._format_match(doc_id, score, documents[doc_id])
+            for doc_id, score in ranked
+        ]
+        if rerank:
+            results = self.reranker.rerank(query, results)
 
-        return documents
+        return results[:top_k]
+
+    async def _get_lexical_index(self, namespace_key: str) -> BM25Index:
+        """
+        BM25 index of a namespace, rebuilt from the vector store when needed.
+
+        A namespace is rebuilt when this process has no index for it (new
+        process, evicted, never persisted) and, at most every
+        lexical_check_seconds, when its document count differs from the
+        vector store's (writes made by other processes).
+
+        Raises:
+            RuntimeError: If a rebuild is needed but the vector store cannot
+                enumerate its documents
+        """
+        rebuild = not self.lexical_index.has(namespace_key)
+        now = time.monotonic()
+        if not rebuild and now - self._lexical_checked.get(namespace_key, 0.0) >= self.lexical_check_seconds:
+            self._lexical_checked[namespace_key] = now
+            stats = await self.vector_store.namespace_stats(namespace_key)
+            rebuild = stats.get("vector_count", 0) != len(self.lexical_index.get(namespace_key))
+
+        if rebuild:
+            # Concurrent queries share one rebuild
+            task = self._lexical_rebuilds.get(namespace_key)
+            if task is None:
+                task = asyncio.ensure_future(self._rebuild_lexical_index(namespace_key))
+                self._lexical_rebuilds[namespace_key] = task
+                task.add_done_callback(lambda _: self._lexical_rebuilds.pop(namespace_key, None))
+            await asyncio.shield(task)
+
+        return self.lexical_index.get(namespace_key)
+
+    async def _rebuild_lexical_index(self, namespace_key: str) -> None:
+        """Rebuild a namespace's BM25 index from the vector store metadata"""
+        started = time.perf_counter()
+        index = BM25Index()
+        try:
+            async for batch in self.vector_store.iter_documents(namespace_key):
+                for doc_id, metadata in batch:
+                    index.add(
+                        doc_id,
+                        metadata.get("text", ""),
+                        {k: v for k, v in metadata.items() if k != "text"},
+                    )
+        except NotImplementedError as e:
+            raise RuntimeError(
+                f"No lexical index for {namespace_key} and it cannot be rebuilt ({e}); "
+                f"use mode='vector'"
+            ) from e
+
+        self.lexical_index.set(namespace_key, index, dirty=True)
+        self._lexical_checked[namespace_key] = time.monotonic()
+        logger.info(
+            f"Rebuilt lexical index {namespace_key}: {len(index)} documents "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    @staticmethod
+    def _format_match(doc_id: str, score: float, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a stored match as a result document"""
+        return {
+            "id": doc_id,
+            "score": score,
+            "text": metadata.get("text", ""),
+            "metadata": {
+                k: v for k, v in metadata.items()
+                if k not in ["text", "squad_id", "namespace_type"]
+            },
+        }
 
     async def query_multiple_namespaces(
         self,
@@ -256,6 +544,8 @@ class RAGService:
         namespaces: List[str],
         query: str,
         top_k_per_namespace: int = 3,
+        mode: Optional[str] = None,
+        rerank: Optional[bool] = None,
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Query multiple namespaces in parallel.
@@ -265,17 +555,25 @@ class RAGService:
             namespaces: List of namespace types
             query: Query string
             top_k_per_namespace: Results per namespace
+            mode: Retrieval mode (see query())
+            rerank: Apply the exact-match re-ranker (see query())
 
         Returns:
             Dictionary mapping namespace to results
         """
-        # Query all namespaces in parallel
+        # Embed once, then query all namespaces in parallel
+        query_embedding = None
+        if (mode or self.retrieval_mode) != "lexical":
+            query_embedding = await self.generate_embedding(query)
         tasks = [
             self.query(
                 squad_id=squad_id,
                 namespace=ns,
                 query=query,
                 top_k=top_k_per_namespace,
+                query_embedding=query_embedding,
+                mode=mode,
+                rerank=rerank,
             )
             for ns in namespaces
         ]
@@ -295,7 +593,7 @@ class RAGService:
         document_ids: List[str],
     ) -> None:
         """
-        Delete documents from Pinecone.
+        Delete documents from the vector store.
 
         Args:
             squad_id: Squad UUID
@@ -303,10 +601,9 @@ class RAGService:
             document_ids: List of document IDs to delete
         """
         namespace_key = self._build_namespace(squad_id, namespace)
-        self.index.delete(
-            ids=document_ids,
-            namespace=namespace_key,
-        )
+        await self.vector_store.delete(namespace_key, document_ids)
+        if self.lexical_index.has(namespace_key):
+            self.lexical_index.delete(namespace_key, document_ids)
 
     async def delete_namespace(
         self,
@@ -321,10 +618,8 @@ class RAGService:
             namespace: Namespace type
         """
         namespace_key = self._build_namespace(squad_id, namespace)
-        self.index.delete(
-            delete_all=True,
-            namespace=namespace_key,
-        )
+        await self.vector_store.delete_namespace(namespace_key)
+        self.lexical_index.delete_namespace(namespace_key)
 
     async def get_namespace_stats(
         self,
@@ -342,13 +637,11 @@ class RAGService:
             Statistics (vector count, etc.)
         """
         namespace_key = self._build_namespace(squad_id, namespace)
-        stats = self.index.describe_index_stats()
-
-        namespace_stats = stats.namespaces.get(namespace_key, {})
+        stats = await self.vector_store.namespace_stats(namespace_key)
 
         return {
             "namespace": namespace_key,
-            "vector_count": namespace_stats.get("vector_count", 0),
+            **stats,
         }
 
     # Specialized methods for different knowledge types
@@ -361,10 +654,15 @@ class RAGService:
         repository: str,
         branch: str = "main",
         commit_hash: Optional[str] = None,
-    ) -> None:
+    ) -> Dict[str, Any]:
         """
         Index a code file from a repository.
 
+        The file is split into syntax-aware chunks (per function/class for
+        Python, line windows otherwise); only chunks whose content changed
+        since the last call are re-embedded, and removed chunks are deleted.
+        Use CodeIndexer directly to index whole repositories or commit ranges.
+
         Args:
             squad_id: Squad UUID
             file_path: File path in repository
@@ -372,22 +670,18 @@ class RAGService:
             repository: Repository name
             branch: Branch name
             commit_hash: Optional commit hash
+
+        Returns:
+            Indexing statistics
         """
-        await self.upsert(
+        stats = await CodeIndexer(self).index_files(
             squad_id=squad_id,
-            namespace="code",
-            documents=[{
-                "id": f"code_{repository}_{file_path}",
-                "text": content,
-                "metadata": {
-                    "file_path": file_path,
-                    "repository": repository,
-                    "branch": branch,
-                    "commit_hash": commit_hash,
-                    "indexed_at": asyncio.get_event_loop().time(),
-                },
-            }],
+            repository=repository,
+            files=[(file_path, content)],
+            branch=branch,
+            commit_hash=commit_hash,
         )
+        return stats.to_dict()
 
     async def index_ticket(
         self,
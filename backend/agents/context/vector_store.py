@@ -0,0 +1,649 @@
+"""
+Vector Stores
+
+Pluggable vector storage for the RAG Service. Every backend exposes the same
+async interface keyed by namespace ({squad_id}:{knowledge_type}):
+
+- PineconeVectorStore: managed Pinecone index; the synchronous client calls
+  are offloaded to a worker thread so they never block the event loop
+- LocalVectorStore: on-disk store with one memory-mapped float32/float16
+  matrix per namespace, NumPy brute-force cosine search and an optional
+  HNSW index (requires hnswlib). Suited to on-prem deployments and tests.
+
+Metadata filters use the Pinecone filter syntax subset:
+{"key": value}, {"key": {"$eq"|"$ne"|"$gt"|"$gte"|"$lt"|"$lte": value}},
+{"key": {"$in"|"$nin": [values]}}.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Optional dependencies for the local backend
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+
+class VectorStore(ABC):
+    """
+    Vector Store - Backend interface used by RAGService
+
+    Vectors are dicts: {"id": str, "values": List[float], "metadata": dict}.
+    Query results are dicts: {"id": str, "score": float, "metadata": dict}.
+    """
+
+    @abstractmethod
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]) -> None:
+        """Insert or replace vectors in a namespace"""
+
+    @abstractmethod
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k most similar vectors matching the metadata filter"""
+
+    @abstractmethod
+    async def delete(self, namespace: str, ids: List[str]) -> None:
+        """Delete vectors by id"""
+
+    @abstractmethod
+    async def delete_namespace(self, namespace: str) -> None:
+        """Delete every vector in a namespace"""
+
+    @abstractmethod
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        """Return statistics for a namespace (at least vector_count)"""
+
+    async def fetch(self, namespace: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return {id: metadata} for the ids that exist"""
+        raise NotImplementedError(f"{type(self).__name__} does not support fetch")
+
+    async def iter_documents(
+        self,
+        namespace: str,
+        batch_size: int = 100,
+    ) -> AsyncIterator[List[Tuple[str, Dict[str, Any]]]]:
+        """Yield every (id, metadata) in a namespace, in batches (for rebuilding derived indexes)"""
+        raise NotImplementedError(f"{type(self).__name__} cannot enumerate documents")
+        yield []  # pragma: no cover - makes this an async generator
+
+    async def close(self) -> None:
+        """Release resources and persist pending writes"""
+
+
+class PineconeVectorStore(VectorStore):
+    """
+    Pinecone-backed vector store
+
+    The Pinecone client is synchronous, so every call runs in a worker
+    thread via asyncio.to_thread.
+    """
+
+    # Pinecone upsert request limit
+    UPSERT_BATCH_SIZE = 100
+
+    def __init__(self, index: Any):
+        """
+        Initialize Pinecone vector store
+
+        Args:
+            index: Pinecone Index handle
+        """
+        self.index = index
+
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]) -> None:
+        batches = [
+            vectors[i:i + self.UPSERT_BATCH_SIZE]
+            for i in range(0, len(vectors), self.UPSERT_BATCH_SIZE)
+        ]
+        await asyncio.gather(*(
+            asyncio.to_thread(self.index.upsert, vectors=batch, namespace=namespace)
+            for batch in batches
+        ))
+
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        results = await asyncio.to_thread(
+            self.index.query,
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter,
+            include_metadata=True,
+        )
+        return [
+            {"id": match.id, "score": match.score, "metadata": match.metadata or {}}
+            for match in results.matches
+        ]
+
+    async def delete(self, namespace: str, ids: List[str]) -> None:
+        await asyncio.to_thread(self.index.delete, ids=ids, namespace=namespace)
+
+    async def delete_namespace(self, namespace: str) -> None:
+        await asyncio.to_thread(self.index.delete, delete_all=True, namespace=namespace)
+
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        stats = await asyncio.to_thread(self.index.describe_index_stats)
+        namespace_stats = stats.namespaces.get(namespace, {})
+        return {"vector_count": namespace_stats.get("vector_count", 0)}
+
+    async def fetch(self, namespace: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        response = await asyncio.to_thread(self.index.fetch, ids=ids, namespace=namespace)
+        return {doc_id: vector.metadata or {} for doc_id, vector in response.vectors.items()}
+
+    async def iter_documents(
+        self,
+        namespace: str,
+        batch_size: int = 100,
+    ) -> AsyncIterator[List[Tuple[str, Dict[str, Any]]]]:
+        token = None
+        while True:
+            page = await asyncio.to_thread(
+                self.index.list_paginated,
+                namespace=namespace,
+                limit=batch_size,
+                pagination_token=token,
+            )
+            ids = [vector.id for vector in page.vectors]
+            if ids:
+                yield list((await self.fetch(namespace, ids)).items())
+            token = page.pagination.next if page.pagination else None
+            if not token:
+                return
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter against one metadata dict.
+
+    Args:
+        metadata: Vector metadata
+        filter: Filter dict (None matches everything)
+
+    Returns:
+        True if metadata satisfies every condition
+    """
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        value = metadata.get(key)
+
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+
+        for op, expected in condition.items():
+            if op == "$eq":
+                ok = value == expected
+            elif op == "$ne":
+                ok = value != expected
+            elif op == "$in":
+                ok = value in expected
+            elif op == "$nin":
+                ok = value not in expected
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                ok = {
+                    "$gt": lambda: value > expected,
+                    "$gte": lambda: value >= expected,
+                    "$lt": lambda: value < expected,
+                    "$lte": lambda: value <= expected,
+                }[op]()
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+
+            if not ok:
+                return False
+
+    return True
+
+
+class _LocalNamespace:
+    """
+    One namespace of the local store.
+
+    Rows [0, base_rows) live in the memory-mapped vectors.npy file; newer
+    rows are kept in memory until flush. Upserts of an existing id tombstone
+    the old row and append a new one; flush compacts and rewrites the file.
+    Vectors are L2-normalized on write so the dot product is cosine similarity.
+    """
+
+    def __init__(self, directory: str, dimension: int, dtype: str, use_hnsw: bool):
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype = dtype
+        self.use_hnsw = use_hnsw
+        self.lock = threading.Lock()
+
+        self.base = np.zeros((0, dimension), dtype=dtype)
+        self.pending: List["np.ndarray"] = []
+        self._pending_matrix: Optional["np.ndarray"] = None
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.dead_rows = 0
+        self.dirty = False
+        self.hnsw = None
+
+        self._load()
+        if self.use_hnsw and self.hnsw is None:
+            self._build_hnsw()
+
+    # Paths
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.npy")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+
+    @property
+    def _hnsw_path(self) -> str:
+        return os.path.join(self.directory, "hnsw.bin")
+
+    @property
+    def row_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vector_count(self) -> int:
+        return len(self.id_to_row)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.base = np.load(self._vectors_path, mmap_mode="r")
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self.id_to_row = {doc_id: row for row, doc_id in enumerate(self.ids)}
+
+        if self.use_hnsw:
+            self._build_hnsw(load_path=self._hnsw_path)
+
+    # HNSW
+
+    def _build_hnsw(self, load_path: Optional[str] = None) -> None:
+        capacity = max(1024, self.row_count * 2)
+        index = hnswlib.Index(space="ip", dim=self.dimension)
+
+        if load_path and os.path.exists(load_path):
+            index.load_index(load_path, max_elements=capacity, allow_replace_deleted=False)
+        else:
+            index.init_index(max_elements=capacity, ef_construction=200, M=16)
+            if self.row_count:
+                index.add_items(
+                    np.asarray(self._all_rows(), dtype=np.float32),
+                    np.arange(self.row_count),
+                )
+
+        index.set_ef(64)
+        self.hnsw = index
+
+    def _hnsw_add(self, matrix: "np.ndarray", rows: "np.ndarray") -> None:
+        needed = self.row_count
+        if needed > self.hnsw.get_max_elements():
+            self.hnsw.resize_index(needed * 2)
+        self.hnsw.add_items(np.asarray(matrix, dtype=np.float32), rows)
+
+    # Matrix access
+
+    def _pending_rows(self) -> "np.ndarray":
+        if self._pending_matrix is None:
+            if self.pending:
+                self._pending_matrix = np.vstack(self.pending)
+                self.pending = [self._pending_matrix]
+            else:
+                self._pending_matrix = np.zeros((0, self.dimension), dtype=self.dtype)
+        return self._pending_matrix
+
+    def _all_rows(self) -> "np.ndarray":
+        pending = self._pending_rows()
+        if not len(pending):
+            return self.base
+        return np.concatenate([self.base, pending])
+
+    # Writes
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        if not vectors:
+            return
+
+        # Later duplicates in the same batch win
+        vectors = list({v["id"]: v for v in vectors}.values())
+
+        matrix = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {matrix.shape[1]} does not match store dimension {self.dimension}"
+            )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = (matrix / norms).astype(self.dtype)
+
+        start = self.row_count
+        for vector in vectors:
+            self._tombstone(vector["id"])
+        for offset, vector in enumerate(vectors):
+            self.ids.append(vector["id"])
+            self.metadata.append(vector.get("metadata") or {})
+            self.id_to_row[vector["id"]] = start + offset
+
+        self.pending.append(matrix)
+        self._pending_matrix = None
+        self.dirty = True
+
+        if self.hnsw is not None:
+            self._hnsw_add(matrix, np.arange(start, start + len(vectors)))
+
+    def _tombstone(self, doc_id: str) -> None:
+        row = self.id_to_row.pop(doc_id, None)
+        if row is None:
+            return
+        self.ids[row] = None
+        self.metadata[row] = None
+        self.dead_rows += 1
+        self.dirty = True
+        if self.hnsw is not None:
+            self.hnsw.mark_deleted(row)
+
+    def delete(self, ids: List[str]) -> None:
+        for doc_id in ids:
+            self._tombstone(doc_id)
+
+    def flush(self) -> None:
+        """Compact tombstones and persist matrix, metadata and HNSW index"""
+        if not self.dirty:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        alive = [row for row, doc_id in enumerate(self.ids) if doc_id is not None]
+        compacted = np.ascontiguousarray(self._all_rows()[alive], dtype=self.dtype)
+        ids = [self.ids[row] for row in alive]
+        metadata = [self.metadata[row] for row in alive]
+
+        # Write to temp files and swap atomically so readers never see partial data
+        tmp_vectors = self._vectors_path + ".tmp.npy"
+        np.save(tmp_vectors, compacted)
+        tmp_meta = self._meta_path + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(
+                {"dimension": self.dimension, "dtype": self.dtype, "ids": ids, "metadata": metadata},
+                f,
+                default=str,
+            )
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_meta, self._meta_path)
+
+        self.base = np.load(self._vectors_path, mmap_mode="r")
+        self.pending = []
+        self._pending_matrix = None
+        self.ids = ids
+        self.metadata = metadata
+        self.id_to_row = {doc_id: row for row, doc_id in enumerate(ids)}
+        had_dead_rows = self.dead_rows > 0
+        self.dead_rows = 0
+        self.dirty = False
+
+        if self.hnsw is not None:
+            if had_dead_rows:
+                # Row numbers changed during compaction
+                self._build_hnsw()
+            self.hnsw.save_index(self._hnsw_path)
+
+    # Reads
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        if not self.id_to_row or top_k <= 0:
+            return []
+
+        q = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+
+        if self.hnsw is not None:
+            return self._query_hnsw(q, top_k, filter)
+        return self._query_brute_force(q, top_k, filter)
+
+    def _scores(self, q: "np.ndarray", chunk_rows: int = 65536) -> "np.ndarray":
+        """Cosine scores for every row (chunked to bound float32 copies of float16 data)"""
+        parts = []
+        for matrix in (self.base, self._pending_rows()):
+            for i in range(0, len(matrix), chunk_rows):
+                parts.append(np.asarray(matrix[i:i + chunk_rows], dtype=np.float32) @ q)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def _collect(self, rows, scores, top_k, filter) -> List[Dict[str, Any]]:
+        results = []
+        for row, score in zip(rows, scores):
+            row = int(row)
+            if self.ids[row] is None:
+                continue
+            if not matches_filter(self.metadata[row], filter):
+                continue
+            results.append({"id": self.ids[row], "score": float(score), "metadata": self.metadata[row]})
+            if len(results) == top_k:
+                break
+        return results
+
+    def _query_brute_force(self, q, top_k, filter) -> List[Dict[str, Any]]:
+        scores = self._scores(q)
+        n = len(scores)
+
+        # Check the filter only on the best candidates, widening until top_k pass
+        k = min(n, top_k * 4 + self.dead_rows)
+        while True:
+            if k >= n:
+                candidates = np.argsort(-scores)
+            else:
+                candidates = np.argpartition(-scores, k - 1)[:k]
+                candidates = candidates[np.argsort(-scores[candidates])]
+
+            results = self._collect(candidates, scores[candidates], top_k, filter)
+            if len(results) == top_k or k >= n:
+                return results
+            k = min(n, k * 4)
+
+    def _query_hnsw(self, q, top_k, filter) -> List[Dict[str, Any]]:
+        live = self.vector_count
+        k = min(live, top_k * 4)
+        while True:
+            labels, distances = self.hnsw.knn_query(q, k=k)
+            # "ip" space returns 1 - dot product
+            results = self._collect(labels[0], 1.0 - distances[0], top_k, filter)
+            if len(results) == top_k or k >= live:
+                return results
+            k = min(live, k * 4)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Local on-disk vector store
+
+    Layout: {path}/{namespace}/vectors.npy (memory-mapped), meta.json
+    (ids + metadata) and hnsw.bin (optional ANN index). Writes are buffered
+    in memory and persisted by flush(), which runs automatically once
+    flush_threshold_rows rows are pending and on close().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimension: int,
+        dtype: str = "float32",
+        use_hnsw: bool = False,
+        flush_threshold_rows: int = 10_000,
+    ):
+        """
+        Initialize local vector store
+
+        Args:
+            path: Root directory for persisted namespaces
+            dimension: Embedding vector dimension
+            dtype: Storage precision, "float32" or "float16"
+            use_hnsw: Use an HNSW index instead of brute-force search
+            flush_threshold_rows: Pending rows that trigger an automatic flush
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for LocalVectorStore")
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        if use_hnsw and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not installed; LocalVectorStore falls back to brute-force search")
+            use_hnsw = False
+
+        self.path = path
+        self.dimension = dimension
+        self.dtype = dtype
+        self.use_hnsw = use_hnsw
+        self.flush_threshold_rows = flush_threshold_rows
+
+        self._namespaces: Dict[str, _LocalNamespace] = {}
+        self._namespaces_lock = threading.Lock()
+
+    def _directory(self, namespace: str) -> str:
+        return os.path.join(self.path, re.sub(r"[^A-Za-z0-9_.-]", "_", namespace))
+
+    def _get_namespace(self, namespace: str) -> _LocalNamespace:
+        with self._namespaces_lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None:
+                ns = _LocalNamespace(
+                    self._directory(namespace), self.dimension, self.dtype, self.use_hnsw
+                )
+                self._namespaces[namespace] = ns
+            return ns
+
+    # Blocking implementations (run in a worker thread)
+
+    def _upsert_sync(self, namespace: str, vectors: List[Dict[str, Any]]) -> None:
+        ns = self._get_namespace(namespace)
+        with ns.lock:
+            ns.upsert(vectors)
+            if ns.row_count - len(ns.base) >= self.flush_threshold_rows:
+                ns.flush()
+
+    def _query_sync(self, namespace, vector, top_k, filter) -> List[Dict[str, Any]]:
+        ns = self._get_namespace(namespace)
+        with ns.lock:
+            return ns.query(vector, top_k, filter)
+
+    def _delete_sync(self, namespace: str, ids: List[str]) -> None:
+        ns = self._get_namespace(namespace)
+        with ns.lock:
+            ns.delete(ids)
+
+    def _fetch_sync(self, namespace: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        ns = self._get_namespace(namespace)
+        with ns.lock:
+            rows = [ns.id_to_row.get(doc_id) for doc_id in ids]
+            return {doc_id: ns.metadata[row] for doc_id, row in zip(ids, rows) if row is not None}
+
+    def _documents_sync(self, namespace: str) -> List[Tuple[str, Dict[str, Any]]]:
+        ns = self._get_namespace(namespace)
+        with ns.lock:
+            return [(doc_id, ns.metadata[row]) for doc_id, row in ns.id_to_row.items()]
+
+    def _delete_namespace_sync(self, namespace: str) -> None:
+        with self._namespaces_lock:
+            self._namespaces.pop(namespace, None)
+            directory = self._directory(namespace)
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+                os.rmdir(directory)
+
+    def _flush_sync(self) -> None:
+        with self._namespaces_lock:
+            namespaces = list(self._namespaces.values())
+        for ns in namespaces:
+            with ns.lock:
+                ns.flush()
+
+    # Async interface
+
+    async def upsert(self, namespace: str, vectors: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._upsert_sync, namespace, vectors)
+
+    async def query(
+        self,
+        namespace: str,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._query_sync, namespace, vector, top_k, filter)
+
+    async def delete(self, namespace: str, ids: List[str]) -> None:
+        await asyncio.to_thread(self._delete_sync, namespace, ids)
+
+    async def fetch(self, namespace: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch_sync, namespace, ids)
+
+    async def iter_documents(
+        self,
+        namespace: str,
+        batch_size: int = 100,
+    ) -> AsyncIterator[List[Tuple[str, Dict[str, Any]]]]:
+        documents = await asyncio.to_thread(self._documents_sync, namespace)
+        for start in range(0, len(documents), batch_size):
+            yield documents[start:start + batch_size]
+
+    async def delete_namespace(self, namespace: str) -> None:
+        await asyncio.to_thread(self._delete_namespace_sync, namespace)
+
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        ns = await asyncio.to_thread(self._get_namespace, namespace)
+        return {
+            "vector_count": ns.vector_count,
+            "dtype": self.dtype,
+            "index": "hnsw" if ns.hnsw is not None else "brute_force",
+        }
+
+    async def flush(self) -> None:
+        """Persist all pending writes to disk"""
+        await asyncio.to_thread(self._flush_sync)
+
+    async def close(self) -> None:
+        await self.flush()
@@ -8,6 +8,10 @@ from backend.agents.discovery.discovery_detector import (
     DiscoveryDetector,
     get_discovery_detector,
 )
+from backend.agents.discovery.discovery_stream import (
+    DiscoveryStream,
+    get_discovery_stream,
+)
 from backend.agents.discovery.discovery_engine import (
     DiscoveryEngine,
     TaskSuggestion,
@@ -19,6 +23,8 @@ __all__ = [
     "Discovery",
     "DiscoveryDetector",
     "get_discovery_detector",
+    "DiscoveryStream",
+    "get_discovery_stream",
     "DiscoveryEngine",
     "TaskSuggestion",
     "WorkContext",
@@ -6,9 +6,15 @@ Analyzes agent messages and work to detect opportunities:
 - Bugs or issues
 - Refactoring needs
 - Performance improvements
+
+Patterns are compiled once into chains of steps: the parts of a pattern
+separated by ".*" must appear in order on one line, as with re.search
+(no DOTALL). Each step is searched once from where the previous one ended,
+so a scan is linear in the text instead of backtracking through nested
+".*" on long agent outputs.
 """
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Set, Tuple
 import logging
 import re
 
@@ -19,6 +25,66 @@ from backend.schemas.agent_message import AgentMessageResponse
 
 logger = logging.getLogger(__name__)
 
+_PERCENT = re.compile(r"(\d+)%")
+_SENTENCE_END = re.compile(r"[.!?]+")
+_DESCRIPTION_KEYWORDS = (
+    "optimization", "optimize",
+    "bug", "error", "issue",
+    "refactor", "refactoring",
+    "performance", "slow", "bottleneck",
+)
+
+
+@lru_cache(maxsize=None)
+def _compile_chain(pattern: str) -> Tuple["re.Pattern[str]", ...]:
+    """Split a pattern at its top-level ".*" and compile each step"""
+    steps, depth, start, i = [], 0, 0, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and pattern.startswith(".*", i):
+            steps.append(pattern[start:i])
+            start = i + 2
+            i += 2
+            continue
+        i += 1
+    steps.append(pattern[start:])
+    return tuple(re.compile(step) for step in steps if step)
+
+
+def _search_chain(chain: Tuple["re.Pattern[str]", ...], text: str) -> Optional["re.Match[str]"]:
+    """
+    Find a chain in lowercased text.
+
+    Returns the first step's match on the first line where every later
+    step follows it, or None. The earliest first-step match on a line
+    leaves the most room for the rest, so each line is searched once.
+    """
+    first, rest = chain[0], chain[1:]
+    pos = 0
+    while True:
+        match = first.search(text, pos)
+        if match is None:
+            return None
+        line_end = text.find("\n", match.end())
+        if line_end == -1:
+            line_end = len(text)
+        end = match.end()
+        for step in rest:
+            step_match = step.search(text, end, line_end)
+            if step_match is None:
+                break
+            end = step_match.end()
+        else:
+            return match
+        pos = line_end + 1
+
 
 class Discovery(BaseModel):
     """Represents a discovery made by an agent"""
@@ -38,9 +104,16 @@ class DiscoveryDetector:
     Can be enhanced with LLM-based detection in the future.
     """
     
+    CATEGORIES = ("optimization", "bug", "refactoring", "performance", "feature")
+    
     def __init__(self):
         """Initialize discovery detector with patterns"""
         self._initialize_patterns()
+        self._chains: Tuple[Tuple[str, Tuple[Tuple["re.Pattern[str]", ...], ...]], ...] = tuple(
+            (category, tuple(_compile_chain(p) for p in getattr(self, f"{category}_patterns")))
+            for category in self.CATEGORIES
+        )
+        self._count_chain = _compile_chain(r"(\d+).*(?:route|endpoint|function|method)")
     
     def _initialize_patterns(self) -> None:
         """Initialize detection patterns"""
@@ -95,6 +168,25 @@ class DiscoveryDetector:
             r"new.*capability.*needed",
         ]
     
+    def detect_categories(self, text: str) -> Set[str]:
+        """
+        Every discovery category whose patterns match the text, in one scan.
+        
+        Args:
+            text: Message content or work output (any case)
+            
+        Returns:
+            Matching categories (see CATEGORIES)
+        """
+        return self._detect_categories(text.lower())
+    
+    def _detect_categories(self, text: str) -> Set[str]:
+        return {
+            category
+            for category, chains in self._chains
+            if any(_search_chain(chain, text) for chain in chains)
+        }
+    
     def analyze_agent_message(
         self,
         message: AgentMessageResponse,
@@ -114,12 +206,13 @@ class DiscoveryDetector:
             return None
         
         content = message.content.lower()
+        categories = self._detect_categories(content)
         
         # Check each discovery type
         discoveries = []
         
         # Optimization
-        if self._matches_patterns(content, self.optimization_patterns):
+        if "optimization" in categories:
             value_score = self._calculate_optimization_value(content)
             discoveries.append(Discovery(
                 type="optimization",
@@ -131,7 +224,7 @@ class DiscoveryDetector:
             ))
         
         # Bug
-        if self._matches_patterns(content, self.bug_patterns):
+        if "bug" in categories:
             discoveries.append(Discovery(
                 type="bug",
                 description=self._extract_description(content, "bug"),
@@ -142,7 +235,7 @@ class DiscoveryDetector:
             ))
         
         # Refactoring
-        if self._matches_patterns(content, self.refactoring_patterns):
+        if "refactoring" in categories:
             discoveries.append(Discovery(
                 type="refactoring",
                 description=self._extract_description(content, "refactoring"),
@@ -153,7 +246,7 @@ class DiscoveryDetector:
             ))
         
         # Performance
-        if self._matches_patterns(content, self.performance_patterns):
+        if "performance" in categories:
             discoveries.append(Discovery(
                 type="performance",
                 description=self._extract_description(content, "performance"),
@@ -191,10 +284,11 @@ class DiscoveryDetector:
         
         discoveries = []
         work_lower = work_output.lower()
+        categories = self._detect_categories(work_lower)
         
         # Analyze work for all discovery types
         # Optimization opportunities
-        if self._matches_patterns(work_lower, self.optimization_patterns):
+        if "optimization" in categories:
             value_score = self._calculate_optimization_value(work_lower)
             discoveries.append(Discovery(
                 type="optimization",
@@ -206,7 +300,7 @@ class DiscoveryDetector:
             ))
         
         # Bugs found
-        if self._matches_patterns(work_lower, self.bug_patterns):
+        if "bug" in categories:
             discoveries.append(Discovery(
                 type="bug",
                 description=self._extract_description(work_output, "bug"),
@@ -218,13 +312,6 @@ class DiscoveryDetector:
         
         return discoveries
     
-    def _matches_patterns(self, text: str, patterns: List[str]) -> bool:
-        """Check if text matches any of the patterns"""
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
-    
     def _calculate_optimization_value(self, text: str) -> float:
         """
         Calculate value score for optimization discoveries.
@@ -235,7 +322,7 @@ class DiscoveryDetector:
         - Clear performance benefits
         """
         # Extract percentage if mentioned
-        percent_match = re.search(r'(\d+)%', text)
+        percent_match = _PERCENT.search(text)
         if percent_match:
             percent = int(percent_match.group(1))
             # Normalize to 0.0-1.0 (0% = 0.0, 100% = 1.0)
@@ -244,7 +331,7 @@ class DiscoveryDetector:
             value_score = 0.6  # Default for optimizations without percentage
         
         # Boost value if multiple routes/endpoints mentioned
-        count_match = re.search(r'(\d+).*(?:route|endpoint|function|method)', text)
+        count_match = _search_chain(self._count_chain, text)
         if count_match:
             count = int(count_match.group(1))
             # Boost: 1 route = +0.0, 10 routes = +0.2, 20+ routes = +0.3
@@ -261,17 +348,13 @@ class DiscoveryDetector:
         Can be enhanced with LLM extraction later.
         """
         # Find sentences with discovery keywords
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_END.split(text)
         
         for sentence in sentences:
             sentence_lower = sentence.lower()
-            if any(keyword in sentence_lower for keyword in [
-                discovery_type,
-                "optimization", "optimize",
-                "bug", "error", "issue",
-                "refactor", "refactoring",
-                "performance", "slow", "bottleneck",
-            ]):
+            if discovery_type in sentence_lower or any(
+                keyword in sentence_lower for keyword in _DESCRIPTION_KEYWORDS
+            ):
                 # Clean up and return
                 description = sentence.strip()
                 if len(description) > 200:
@@ -13,10 +13,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 
+from backend.core.config import settings
 from backend.models.workflow import WorkflowPhase, DynamicTask
 from backend.models.message import AgentMessage
 from backend.models.project import TaskExecution
 from backend.agents.discovery.discovery_detector import DiscoveryDetector, Discovery, get_discovery_detector
+from backend.agents.discovery.discovery_stream import get_discovery_stream
 from backend.agents.task_spawning import AgentTaskSpawner, get_agent_task_spawner
 
 logger = logging.getLogger(__name__)
@@ -102,6 +104,11 @@ class DiscoveryEngine:
                 discovery = self._enhance_discovery_with_context(discovery, context)
                 discoveries.append(discovery)
         
+        # Discoveries the message bus stream already found in this agent's messages
+        if settings.DISCOVERY_STREAM_ENABLED:
+            for discovery in get_discovery_stream().recent(context.execution_id, sender_id=context.agent_id):
+                discoveries.append(self._enhance_discovery_with_context(discovery.model_copy(deep=True), context))
+
         # Analyze work output if available
         if context.work_output:
             work_discoveries = self.detector.analyze_agent_work(
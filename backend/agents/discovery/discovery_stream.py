@@ -0,0 +1,145 @@
+"""
+Streaming Discovery Detection
+
+Message bus stage that runs the DiscoveryDetector on every message as it
+is sent, so discoveries are available per execution without re-reading
+and re-scanning message history. DiscoveryEngine.analyze_work_context adds
+the stream's recent discoveries of the agent it analyzes.
+
+Off by default (DISCOVERY_STREAM_ENABLED): the stage scans every sent
+message inside the bus's send lock.
+"""
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, List, Optional
+from uuid import UUID
+import asyncio
+import logging
+
+from backend.agents.discovery.discovery_detector import (
+    Discovery,
+    DiscoveryDetector,
+    get_discovery_detector,
+)
+from backend.core.config import settings
+from backend.schemas.agent_message import AgentMessageResponse
+
+logger = logging.getLogger(__name__)
+
+
+class DiscoveryStream:
+    """
+    Detects discoveries in messages flowing through a message bus.
+
+    Register with bus.add_stage(stream) (or stream.attach(bus)). Messages
+    without a task execution are skipped. The most recent discoveries are
+    kept for the max_executions executions with the latest discoveries
+    (least recently updated are forgotten first); on_discovery, if given, is
+    called (or awaited) with the message and its discovery.
+    """
+
+    def __init__(
+        self,
+        detector: Optional[DiscoveryDetector] = None,
+        max_per_execution: int = 100,
+        max_executions: int = 1000,
+        on_discovery: Optional[Callable[[AgentMessageResponse, Discovery], Any]] = None,
+    ):
+        """
+        Initialize discovery stream.
+
+        Args:
+            detector: Detector to run (default: shared instance)
+            max_per_execution: Recent discoveries kept per execution
+            max_executions: Executions whose discoveries are kept
+            on_discovery: Optional callback for each discovery
+        """
+        self.detector = detector or get_discovery_detector()
+        self.on_discovery = on_discovery
+        self.max_per_execution = max_per_execution
+        self.max_executions = max_executions
+        self._recent: "OrderedDict[UUID, Deque[Discovery]]" = OrderedDict()
+        self.messages_scanned = 0
+
+    async def __call__(self, message: AgentMessageResponse) -> Optional[Discovery]:
+        """
+        Bus stage: analyze one sent message.
+
+        Args:
+            message: Message being sent
+
+        Returns:
+            Discovery if the message contains one, None otherwise
+        """
+        # The bus sends messages without an execution as UUID(int=0)
+        if message.task_execution_id is None or message.task_execution_id.int == 0:
+            return None
+
+        self.messages_scanned += 1
+        discovery = self.detector.analyze_agent_message(
+            message=message,
+            context={"execution_id": str(message.task_execution_id)},
+        )
+        if discovery is None:
+            return None
+
+        discovery.context["sender_id"] = str(message.sender_id)
+        recent = self._recent.get(message.task_execution_id)
+        if recent is None:
+            recent = self._recent[message.task_execution_id] = deque(maxlen=self.max_per_execution)
+            if len(self._recent) > self.max_executions:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(message.task_execution_id)
+        recent.append(discovery)
+
+        if self.on_discovery is not None:
+            result = self.on_discovery(message, discovery)
+            if asyncio.iscoroutine(result):
+                await result
+        return discovery
+
+    def recent(self, execution_id: UUID, sender_id: Optional[UUID] = None) -> List[Discovery]:
+        """
+        Most recent discoveries of an execution, oldest first.
+
+        Args:
+            execution_id: Task execution ID
+            sender_id: Only discoveries in messages from this agent
+
+        Returns:
+            List of discoveries
+        """
+        discoveries = list(self._recent.get(execution_id, ()))
+        if sender_id is not None:
+            discoveries = [d for d in discoveries if d.context.get("sender_id") == str(sender_id)]
+        return discoveries
+
+    def clear(self, execution_id: Optional[UUID] = None) -> None:
+        """Forget an execution's discoveries (or all)"""
+        if execution_id is None:
+            self._recent.clear()
+        else:
+            self._recent.pop(execution_id, None)
+
+    def attach(self, bus: Any) -> None:
+        """Register as a stage of a message bus"""
+        bus.add_stage(self)
+
+    def detach(self, bus: Any) -> None:
+        """Unregister from a message bus"""
+        bus.remove_stage(self)
+
+
+# Singleton instance
+_discovery_stream: Optional[DiscoveryStream] = None
+
+
+def get_discovery_stream() -> DiscoveryStream:
+    """Get or create discovery stream instance"""
+    global _discovery_stream
+    if _discovery_stream is None:
+        _discovery_stream = DiscoveryStream(
+            max_per_execution=settings.DISCOVERY_STREAM_RECENT,
+            max_executions=settings.DISCOVERY_STREAM_EXECUTIONS,
+        )
+    return _discovery_stream
@@ -19,6 +19,13 @@ from backend.agents.guardian.advanced_anomaly_detector import (
     AdvancedAnomalyDetector,
     get_anomaly_detector,
 )
+from backend.agents.guardian.workflow_snapshot import (
+    TaskSummary,
+    WorkflowSnapshot,
+    get_workflow_snapshot,
+    invalidate_workflow_snapshot,
+)
+from backend.agents.guardian.workflow_metrics import rebuild_workflow_counters  # Registers the counter listener
 from backend.agents.guardian.recommendations_engine import (
     Recommendation,
     RecommendationsEngine,
@@ -36,6 +43,11 @@ __all__ = [
     "Anomaly",
     "AdvancedAnomalyDetector",
     "get_anomaly_detector",
+    "TaskSummary",
+    "WorkflowSnapshot",
+    "get_workflow_snapshot",
+    "invalidate_workflow_snapshot",
+    "rebuild_workflow_counters",
     "Recommendation",
     "RecommendationsEngine",
     "get_recommendations_engine",
@@ -9,11 +9,13 @@ from datetime import datetime, timedelta
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 
-from backend.models.workflow import WorkflowPhase, DynamicTask
-from backend.models.message import AgentMessage
-from backend.models.project import TaskExecution
+from backend.agents.guardian.workflow_snapshot import (
+    BRIEF_DESCRIPTION_LENGTH,
+    WorkflowSnapshot,
+    get_workflow_snapshot,
+)
+from backend.models.workflow import WorkflowPhase
 from backend.core.logging import logger
 
 
@@ -68,6 +70,8 @@ class AdvancedAnomalyDetector:
         """
         Detect anomalies in workflow.
         
+        All detectors share the execution's WorkflowSnapshot.
+        
         Args:
             db: Database session
             execution_id: Task execution ID
@@ -75,67 +79,25 @@ class AdvancedAnomalyDetector:
         Returns:
             List of detected anomalies
         """
-        anomalies = []
-        
-        # Check execution exists
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
-            return anomalies
-        
-        # Detect phase drift
-        phase_drift = await self._detect_phase_drift(db, execution_id)
-        if phase_drift:
-            anomalies.extend(phase_drift)
-        
-        # Detect low-value tasks
-        low_value = await self._detect_low_value_tasks(db, execution_id)
-        if low_value:
-            anomalies.extend(low_value)
-        
-        # Detect workflow stagnation
-        stagnation = await self._detect_stagnation(db, execution_id)
-        if stagnation:
-            anomalies.extend(stagnation)
-        
-        # Detect resource imbalance
-        imbalance = await self._detect_resource_imbalance(db, execution_id)
-        if imbalance:
-            anomalies.extend(imbalance)
+        try:
+            snapshot = await get_workflow_snapshot(db, execution_id, include_details=True)
+        except ValueError:
+            return []
         
-        # Detect communication gaps
-        gaps = await self._detect_communication_gaps(db, execution_id)
-        if gaps:
-            anomalies.extend(gaps)
+        # Every detector reads the same snapshot instead of re-querying
+        anomalies = []
+        anomalies.extend(self._detect_phase_drift(snapshot))
+        anomalies.extend(self._detect_low_value_tasks(snapshot))
+        anomalies.extend(self._detect_stagnation(snapshot))
+        anomalies.extend(self._detect_resource_imbalance(snapshot))
+        anomalies.extend(self._detect_communication_gaps(snapshot))
         
         return anomalies
     
-    async def _detect_phase_drift(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Anomaly]:
+    def _detect_phase_drift(self, snapshot: WorkflowSnapshot) -> List[Anomaly]:
         """Detect if agents are working outside their phase goals"""
         anomalies = []
         
-        # Get recent tasks
-        tasks_query = select(DynamicTask).where(
-            DynamicTask.parent_execution_id == execution_id
-        ).order_by(DynamicTask.created_at.desc()).limit(20)
-        
-        result = await db.execute(tasks_query)
-        recent_tasks = list(result.scalars().all())
-        
-        if not recent_tasks:
-            return anomalies
-        
-        # Get recent messages
-        messages_query = select(AgentMessage).where(
-            AgentMessage.task_execution_id == execution_id
-        ).order_by(AgentMessage.created_at.desc()).limit(50)
-        
-        result = await db.execute(messages_query)
-        recent_messages = list(result.scalars().all())
-        
         # Check for phase-task mismatch
         phase_keywords = {
             WorkflowPhase.INVESTIGATION.value: ["analyze", "investigate", "explore", "discover", "research"],
@@ -143,7 +105,7 @@ class AdvancedAnomalyDetector:
             WorkflowPhase.VALIDATION.value: ["test", "verify", "validate", "check", "confirm"],
         }
         
-        for task in recent_tasks[:10]:
+        for task in snapshot.recent_tasks[:10]:
             # Check if task description aligns with phase
             description_lower = task.description.lower()
             phase_words = phase_keywords.get(task.phase, [])
@@ -161,25 +123,14 @@ class AdvancedAnomalyDetector:
         
         return anomalies
     
-    async def _detect_low_value_tasks(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Anomaly]:
+    def _detect_low_value_tasks(self, snapshot: WorkflowSnapshot) -> List[Anomaly]:
         """Detect tasks with low predicted value or vague descriptions"""
         anomalies = []
         
-        tasks_query = select(DynamicTask).where(
-            DynamicTask.parent_execution_id == execution_id,
-            DynamicTask.status.in_(["pending", "in_progress"]),
-        )
-        
-        result = await db.execute(tasks_query)
-        active_tasks = list(result.scalars().all())
-        
-        for task in active_tasks:
+        # Only active tasks failing one of the checks below are in the snapshot
+        for task in snapshot.flagged_tasks:
             # Check for vague descriptions
-            if len(task.description) < 30:
+            if len(task.description) < BRIEF_DESCRIPTION_LENGTH:
                 anomalies.append(Anomaly(
                     type="low_value_task",
                     severity="low",
@@ -200,78 +151,44 @@ class AdvancedAnomalyDetector:
         
         return anomalies
     
-    async def _detect_stagnation(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Anomaly]:
+    def _detect_stagnation(self, snapshot: WorkflowSnapshot) -> List[Anomaly]:
         """Detect workflow stagnation (no progress)"""
         anomalies = []
         
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
-            return anomalies
-        
         # Check if execution is stuck
-        if execution.status == "in_progress":
-            # Check last activity
-            last_message_query = select(AgentMessage).where(
-                AgentMessage.task_execution_id == execution_id
-            ).order_by(AgentMessage.created_at.desc()).limit(1)
+        if snapshot.execution_status == "in_progress" and snapshot.last_message_at:
+            time_since_activity = datetime.utcnow() - snapshot.last_message_at
             
-            result = await db.execute(last_message_query)
-            last_message = result.scalar_one_or_none()
-            
-            if last_message:
-                time_since_activity = datetime.utcnow() - last_message.created_at
-                
-                # Stagnation thresholds
-                if time_since_activity > timedelta(hours=24):
-                    anomalies.append(Anomaly(
-                        type="workflow_stagnation",
-                        severity="high",
-                        description=f"No activity for {time_since_activity.days} days",
-                        recommendation="Check agent activity and unblock any blockers",
-                        metadata={"hours_since_activity": time_since_activity.total_seconds() / 3600},
-                    ))
-                elif time_since_activity > timedelta(hours=8):
-                    anomalies.append(Anomaly(
-                        type="workflow_stagnation",
-                        severity="medium",
-                        description=f"No activity for {int(time_since_activity.total_seconds() / 3600)} hours",
-                        recommendation="Monitor workflow progress",
-                        metadata={"hours_since_activity": time_since_activity.total_seconds() / 3600},
-                    ))
+            # Stagnation thresholds
+            if time_since_activity > timedelta(hours=24):
+                anomalies.append(Anomaly(
+                    type="workflow_stagnation",
+                    severity="high",
+                    description=f"No activity for {time_since_activity.days} days",
+                    recommendation="Check agent activity and unblock any blockers",
+                    metadata={"hours_since_activity": time_since_activity.total_seconds() / 3600},
+                ))
+            elif time_since_activity > timedelta(hours=8):
+                anomalies.append(Anomaly(
+                    type="workflow_stagnation",
+                    severity="medium",
+                    description=f"No activity for {int(time_since_activity.total_seconds() / 3600)} hours",
+                    recommendation="Monitor workflow progress",
+                    metadata={"hours_since_activity": time_since_activity.total_seconds() / 3600},
+                ))
         
         return anomalies
     
-    async def _detect_resource_imbalance(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Anomaly]:
+    def _detect_resource_imbalance(self, snapshot: WorkflowSnapshot) -> List[Anomaly]:
         """Detect resource imbalance (too many tasks in one phase)"""
         anomalies = []
         
-        tasks_query = select(DynamicTask).where(
-            DynamicTask.parent_execution_id == execution_id,
-        )
-        
-        result = await db.execute(tasks_query)
-        all_tasks = list(result.scalars().all())
-        
-        if len(all_tasks) < 5:
+        total = snapshot.total_tasks
+        if total < 5:
             return anomalies  # Not enough tasks for imbalance
         
-        # Count tasks by phase
-        phase_counts = {}
-        for task in all_tasks:
-            phase_counts[task.phase] = phase_counts.get(task.phase, 0) + 1
-        
-        total = len(all_tasks)
-        
         # Check for imbalance (>70% in one phase)
-        for phase, count in phase_counts.items():
+        for phase, count in snapshot.phase_counts.items():
             percentage = count / total
             if percentage > 0.7:
                 anomalies.append(Anomaly(
@@ -284,42 +201,26 @@ class AdvancedAnomalyDetector:
         
         return anomalies
     
-    async def _detect_communication_gaps(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Anomaly]:
+    def _detect_communication_gaps(self, snapshot: WorkflowSnapshot) -> List[Anomaly]:
         """Detect communication gaps between agents"""
         anomalies = []
         
-        # Get recent messages
-        messages_query = select(AgentMessage).where(
-            AgentMessage.task_execution_id == execution_id
-        ).order_by(AgentMessage.created_at.desc()).limit(20)
-        
-        result = await db.execute(messages_query)
-        recent_messages = list(result.scalars().all())
-        
-        if len(recent_messages) < 3:
+        if snapshot.message_count < 3:
             return anomalies
         
-        # Check for agents not communicating
-        active_agents = {msg.sender_id for msg in recent_messages[:10]}
-        
-        # Get all agents in execution's squad
-        execution = await db.get(TaskExecution, execution_id)
-        if execution and hasattr(execution, 'squad'):
-            squad_agents = {member.id for member in execution.squad.members if member.is_active}
-            
-            inactive_agents = squad_agents - active_agents
-            if len(inactive_agents) > 0 and len(squad_agents) > 2:
-                anomalies.append(Anomaly(
-                    type="communication_gap",
-                    severity="low",
-                    description=f"{len(inactive_agents)} agent(s) not active recently",
-                    recommendation="Engage inactive agents or review workload distribution",
-                    metadata={"inactive_count": len(inactive_agents)},
-                ))
+        # Check for agents not communicating (senders of the last 10 messages)
+        active_agents = set(snapshot.recent_senders[:10])
+        squad_agents = snapshot.active_member_ids
+        
+        inactive_agents = squad_agents - active_agents
+        if len(inactive_agents) > 0 and len(squad_agents) > 2:
+            anomalies.append(Anomaly(
+                type="communication_gap",
+                severity="low",
+                description=f"{len(inactive_agents)} agent(s) not active recently",
+                recommendation="Engage inactive agents or review workload distribution",
+                metadata={"inactive_count": len(inactive_agents)},
+            ))
         
         return anomalies
 
@@ -3,18 +3,18 @@ Coherence Scorer for PM-as-Guardian System (Stream C)
 
 Calculates coherence scores for agent alignment with phases and workflow goals.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
 
 from backend.models.workflow import WorkflowPhase
 from backend.models.message import AgentMessage
-from backend.models.project import TaskExecution
-from backend.models.workflow import DynamicTask
+from backend.models.guardian import WorkflowTaskCounter
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +117,76 @@ class CoherenceScorer:
                 limit=10,  # Recent messages
             )
         
+        task_stats = await self._load_task_stats(db, execution_id, [agent_id])
+        
+        return self._score(
+            agent_id=agent_id,
+            phase=phase,
+            agent_messages=agent_messages,
+            agent_work=agent_work,
+            task_stats=task_stats.get(agent_id, (0, 0)),
+        )
+    
+    async def calculate_coherence_batch(
+        self,
+        db: AsyncSession,
+        execution_id: UUID,
+        phase: WorkflowPhase,
+        agent_ids: Optional[Iterable[UUID]] = None,
+        message_limit: int = 10,
+    ) -> Dict[UUID, CoherenceScore]:
+        """
+        Calculate coherence scores for several agents of an execution at once.
+        
+        Loads every agent's recent messages in one windowed query and their
+        spawned-task counts in another, then scores them all in one pass.
+        
+        Args:
+            db: Database session
+            execution_id: Task execution ID
+            phase: Current workflow phase
+            agent_ids: Agents to score (default: every agent that sent a message)
+            message_limit: Recent messages considered per agent
+            
+        Returns:
+            Scores by agent ID, in agent_ids order
+        """
+        agent_ids = list(agent_ids) if agent_ids is not None else None
+        if agent_ids == []:
+            return {}
+        
+        messages = await self._load_recent_messages(
+            db=db,
+            execution_id=execution_id,
+            agent_ids=agent_ids,
+            limit=message_limit,
+        )
+        if agent_ids is None:
+            agent_ids = list(messages)
+        task_stats = await self._load_task_stats(db, execution_id, agent_ids)
+        
+        return {
+            agent_id: self._score(
+                agent_id=agent_id,
+                phase=phase,
+                agent_messages=messages.get(agent_id, []),
+                agent_work=None,
+                task_stats=task_stats.get(agent_id, (0, 0)),
+            )
+            for agent_id in agent_ids
+        }
+    
+    def _score(
+        self,
+        agent_id: UUID,
+        phase: WorkflowPhase,
+        agent_messages: List[AgentMessage],
+        agent_work: Optional[str],
+        task_stats: Tuple[int, int],
+    ) -> CoherenceScore:
+        """Combine the individual metrics into a CoherenceScore"""
+        task_count, tasks_with_rationale = task_stats
+        
         # Calculate individual metrics
         phase_alignment = self._analyze_phase_alignment(
             agent_messages=agent_messages,
@@ -127,8 +197,7 @@ class CoherenceScorer:
         goal_alignment = self._analyze_goal_contribution(
             agent_messages=agent_messages,
             agent_work=agent_work,
-            execution_id=execution_id,
-            db=db,
+            task_count=task_count,
         )
         
         quality_alignment = self._analyze_quality_alignment(
@@ -137,10 +206,9 @@ class CoherenceScorer:
             phase=phase,
         )
         
-        task_relevance = await self._analyze_task_relevance(
-            db=db,
-            agent_id=agent_id,
-            execution_id=execution_id,
+        task_relevance = self._analyze_task_relevance(
+            task_count=task_count,
+            tasks_with_rationale=tasks_with_rationale,
         )
         
         # Combine metrics (weighted average)
@@ -193,6 +261,59 @@ class CoherenceScorer:
         result = await db.execute(stmt)
         return list(result.scalars().all())
     
+    async def _load_recent_messages(
+        self,
+        db: AsyncSession,
+        execution_id: UUID,
+        agent_ids: Optional[List[UUID]] = None,
+        limit: int = 10,
+    ) -> Dict[UUID, List[AgentMessage]]:
+        """Load the last `limit` messages of every (or each given) sender in one query"""
+        recency = func.row_number().over(
+            partition_by=AgentMessage.sender_id,
+            order_by=(AgentMessage.created_at.desc(), AgentMessage.id.desc()),
+        ).label("recency")
+        ranked = select(AgentMessage, recency).where(AgentMessage.task_execution_id == execution_id)
+        if agent_ids is not None:
+            ranked = ranked.where(AgentMessage.sender_id.in_(agent_ids))
+        ranked = ranked.subquery()
+        
+        recent = aliased(AgentMessage, ranked)
+        stmt = (
+            select(recent)
+            .where(ranked.c.recency <= limit)
+            .order_by(ranked.c.sender_id, ranked.c.recency)
+        )
+        
+        messages: Dict[UUID, List[AgentMessage]] = {}
+        result = await db.execute(stmt)
+        for message in result.scalars().all():
+            messages.setdefault(message.sender_id, []).append(message)
+        return messages
+    
+    async def _load_task_stats(
+        self,
+        db: AsyncSession,
+        execution_id: UUID,
+        agent_ids: List[UUID],
+    ) -> Dict[UUID, Tuple[int, int]]:
+        """Spawned tasks and tasks with a rationale per agent, from the workflow counters"""
+        stmt = (
+            select(
+                WorkflowTaskCounter.agent_id,
+                func.sum(WorkflowTaskCounter.task_count),
+                func.sum(WorkflowTaskCounter.with_rationale),
+            )
+            .where(
+                WorkflowTaskCounter.execution_id == execution_id,
+                WorkflowTaskCounter.agent_id.in_(agent_ids),
+            )
+            .group_by(WorkflowTaskCounter.agent_id)
+        )
+        
+        result = await db.execute(stmt)
+        return {agent_id: (count, with_rationale) for agent_id, count, with_rationale in result.all()}
+    
     def _analyze_phase_alignment(
         self,
         agent_messages: List[AgentMessage],
@@ -232,12 +353,11 @@ class CoherenceScorer:
         
         return score
     
-    async def _analyze_goal_contribution(
+    def _analyze_goal_contribution(
         self,
         agent_messages: List[AgentMessage],
         agent_work: Optional[str],
-        execution_id: UUID,
-        db: AsyncSession,
+        task_count: int,
     ) -> float:
         """
         Analyze if agent's work contributes to workflow goals.
@@ -250,25 +370,8 @@ class CoherenceScorer:
         if len(agent_messages) == 0 and not agent_work:
             return 0.3  # Low score if no activity
         
-        # Check if agent is spawning relevant tasks (from Stream B)
-        from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
-        
-        engine = PhaseBasedWorkflowEngine()
-        
-        # Get agent's spawned tasks
-        all_tasks = await engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-        )
-        
-        sender_id = agent_messages[0].sender_id if agent_messages else None
-        if sender_id:
-            agent_tasks = [t for t in all_tasks if t.spawned_by_agent_id == sender_id]
-        else:
-            agent_tasks = []
-        
-        # Higher score if agent is actively contributing
-        if len(agent_messages) > 3 or agent_work or len(agent_tasks) > 0:
+        # Higher score if agent is actively contributing (messages, work or spawned tasks)
+        if len(agent_messages) > 3 or agent_work or task_count > 0:
             return 0.8  # Good contribution
         
         return 0.5  # Moderate contribution
@@ -308,36 +411,21 @@ class CoherenceScorer:
         
         return score
     
-    async def _analyze_task_relevance(
+    def _analyze_task_relevance(
         self,
-        db: AsyncSession,
-        agent_id: UUID,
-        execution_id: UUID,
+        task_count: int,
+        tasks_with_rationale: int,
     ) -> float:
         """
         Analyze if spawned tasks are relevant.
         
         Returns score 0.0-1.0
         """
-        # Load agent's spawned tasks
-        from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
-        
-        engine = PhaseBasedWorkflowEngine()
-        tasks = await engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-        )
-        
-        agent_tasks = [t for t in tasks if t.spawned_by_agent_id == agent_id]
-        
-        if len(agent_tasks) == 0:
+        if task_count == 0:
             return 0.7  # No tasks spawned = neutral (not bad, just no spawning yet)
         
-        # Check if tasks have rationale (especially investigation tasks)
-        tasks_with_rationale = sum(1 for t in agent_tasks if t.rationale)
-        relevance_score = tasks_with_rationale / len(agent_tasks)
-        
-        return relevance_score
+        # Share of the agent's tasks with a rationale (especially investigation tasks)
+        return tasks_with_rationale / task_count
 
 
 # Singleton instance
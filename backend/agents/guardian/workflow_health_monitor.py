@@ -9,11 +9,8 @@ from datetime import datetime
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
 
-from backend.models.workflow import WorkflowPhase, DynamicTask
-from backend.models.project import TaskExecution
-from backend.models.guardian import CoherenceMetrics
+from backend.agents.guardian.workflow_snapshot import get_workflow_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +96,9 @@ class WorkflowHealthMonitor:
         """
         Calculate overall workflow health.
         
+        Metrics come from the execution's WorkflowSnapshot (SQL aggregates,
+        briefly cached), not from loading every task and message.
+        
         Args:
             db: Database session
             execution_id: Task execution ID
@@ -106,27 +106,16 @@ class WorkflowHealthMonitor:
         Returns:
             WorkflowHealth with overall score and detailed metrics
         """
-        # Get execution
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
-            raise ValueError(f"Task execution {execution_id} not found")
-        
-        # Load tasks
-        from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+        snapshot = await get_workflow_snapshot(db, execution_id)
         
-        engine = PhaseBasedWorkflowEngine()
-        all_tasks = await engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-        )
-        
-        # Calculate metrics
-        task_completion_rate = self._calculate_completion_rate(all_tasks)
-        phase_distribution = self._calculate_phase_distribution(all_tasks)
-        blocking_issues = len(await engine.get_blocked_tasks(db=db, execution_id=execution_id))
-        agent_activity = await self._calculate_agent_activity(db=db, execution_id=execution_id)
-        discovery_rate = self._calculate_discovery_rate(all_tasks)
-        avg_coherence = await self._calculate_avg_coherence(db=db, execution_id=execution_id)
+        # Metrics straight from the snapshot's aggregates
+        task_completion_rate = snapshot.completion_rate
+        phase_distribution = snapshot.phase_counts
+        blocking_issues = snapshot.blocked_tasks
+        agent_activity = dict(snapshot.agent_activity)
+        discovery_rate = snapshot.discovery_rate
+        avg_coherence = snapshot.avg_coherence if snapshot.avg_coherence is not None else 0.7  # Default if no metrics yet
+        total_tasks = snapshot.total_tasks
         
         metrics = {
             "task_completion_rate": task_completion_rate,
@@ -140,7 +129,7 @@ class WorkflowHealthMonitor:
         # Calculate overall score (weighted average)
         overall_score = (
             task_completion_rate * 0.3 +
-            (1.0 - (blocking_issues / max(len(all_tasks), 1))) * 0.25 +
+            (1.0 - (blocking_issues / max(total_tasks, 1))) * 0.25 +
             avg_coherence * 0.25 +
             (sum(agent_activity.values()) / max(len(agent_activity), 1)) * 0.2
         )
@@ -153,7 +142,7 @@ class WorkflowHealthMonitor:
             db=db,
             execution_id=execution_id,
             metrics=metrics,
-            all_tasks=all_tasks,
+            total_tasks=total_tasks,
         )
         
         # Generate recommendations
@@ -167,91 +156,29 @@ class WorkflowHealthMonitor:
             calculated_at=datetime.utcnow(),
         )
     
-    def _calculate_completion_rate(self, tasks: List[DynamicTask]) -> float:
-        """Calculate task completion rate"""
-        if len(tasks) == 0:
-            return 0.0
-        
-        completed = sum(1 for t in tasks if t.status == "completed")
-        return completed / len(tasks)
-    
-    def _calculate_phase_distribution(self, tasks: List[DynamicTask]) -> Dict[str, int]:
-        """Calculate distribution of tasks across phases"""
-        distribution = {
-            "investigation": 0,
-            "building": 0,
-            "validation": 0,
-        }
-        
-        for task in tasks:
-            if task.phase in distribution:
-                distribution[task.phase] += 1
-        
-        return distribution
-    
-    async def _calculate_agent_activity(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> Dict[UUID, int]:
-        """Calculate activity level per agent"""
-        from backend.models.message import AgentMessage
-        
-        stmt = (
-            select(
-                AgentMessage.sender_id,
-                func.count(AgentMessage.id).label("message_count")
-            )
-            .where(AgentMessage.task_execution_id == execution_id)
-            .group_by(AgentMessage.sender_id)
-        )
-        
-        result = await db.execute(stmt)
-        activity = {row[0]: row[1] for row in result.all()}
-        
-        return activity
-    
-    def _calculate_discovery_rate(self, tasks: List[DynamicTask]) -> float:
-        """Calculate discovery rate (tasks with rationale)"""
-        if len(tasks) == 0:
-            return 0.0
-        
-        with_rationale = sum(1 for t in tasks if t.rationale)
-        return with_rationale / len(tasks)
-    
-    async def _calculate_avg_coherence(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> float:
-        """Calculate average coherence score"""
-        stmt = (
-            select(func.avg(CoherenceMetrics.coherence_score))
-            .where(CoherenceMetrics.execution_id == execution_id)
-        )
-        
-        result = await db.execute(stmt)
-        avg_score = result.scalar()
-        
-        return avg_score if avg_score is not None else 0.7  # Default if no metrics yet
-    
     async def detect_anomalies(
         self,
         db: AsyncSession,
         execution_id: UUID,
         metrics: Dict[str, Any],
-        all_tasks: List[DynamicTask],
+        total_tasks: int,
     ) -> List[WorkflowAnomaly]:
         """
         Detect anomalies in workflow execution.
         
-        Returns list of detected anomalies.
+        Args:
+            db: Database session
+            execution_id: Task execution ID
+            metrics: Metrics computed by calculate_health
+            total_tasks: Number of tasks in the execution
+            
+        Returns:
+            List of detected anomalies
         """
         anomalies = []
         
         # Check phase imbalance
         phase_dist = metrics.get("phase_distribution", {})
-        total_tasks = sum(phase_dist.values())
         
         if total_tasks > 0:
             for phase, count in phase_dist.items():
@@ -278,11 +205,11 @@ class WorkflowHealthMonitor:
         
         # Check high blocking
         blocking_issues = metrics.get("blocking_issues", 0)
-        if blocking_issues > len(all_tasks) * 0.3:  # More than 30% blocked
+        if blocking_issues > total_tasks * 0.3:  # More than 30% blocked
             anomalies.append(WorkflowAnomaly(
                 type="high_blocking",
                 severity="high",
-                description=f"{blocking_issues} tasks are blocked ({blocking_issues/len(all_tasks):.0%} of total)",
+                description=f"{blocking_issues} tasks are blocked ({blocking_issues/total_tasks:.0%} of total)",
                 affected_agents=[],
                 suggested_action="Review dependencies and unblock tasks",
             ))
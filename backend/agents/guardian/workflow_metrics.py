@@ -0,0 +1,393 @@
+"""
+Workflow Metrics Materializer
+
+Keeps running per-execution counters of dynamic tasks, messages and
+coherence scores, so completion rate, phase distribution, agent activity,
+discovery rate and coherence averages are read from a few counter rows
+instead of being recounted from every task and message:
+
+- WorkflowTaskCounter: tasks per (phase, status, spawning agent), and how
+  many of them have a rationale
+- WorkflowAgentCounter: messages sent, last message time and the coherence
+  score sum/count per agent
+
+The materializer subscribes to ORM flushes: an after_flush listener turns
+the flush's new, changed and deleted DynamicTask, AgentMessage and
+CoherenceMetrics rows into counter deltas and upserts them (INSERT ... ON
+CONFLICT DO UPDATE) on the flush's own connection. Counters therefore
+commit or roll back with the writes they count, whichever code path made
+them. A task whose previous values were not loaded (so the delta is
+unknown) makes the listener recount that execution instead.
+
+Bulk statements bypass the ORM; their callers adjust counters themselves
+(see HistoryManager.delete_old_messages) or call rebuild_workflow_counters.
+So do rows the database removes through ON DELETE CASCADE: deleting a
+squad member deletes its agent_messages without the session seeing them,
+leaving its messages_sent counts behind. rebuild_workflow_counters is the
+repair path for those executions.
+
+Upserts are only available on PostgreSQL and SQLite. On other databases
+each flush recounts the executions it touched instead (slower, same
+result).
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, delete, event, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+
+from backend.models.guardian import CoherenceMetrics, WorkflowAgentCounter, WorkflowTaskCounter
+from backend.models.message import AgentMessage
+from backend.models.workflow import DynamicTask
+
+logger = logging.getLogger(__name__)
+
+# (execution_id, phase, status, agent_id) -> [task_count, with_rationale]
+TaskDeltas = Dict[Tuple[UUID, str, str, UUID], List[int]]
+
+# (execution_id, agent_id) -> [messages_sent, last_message_at, coherence_sum, coherence_count]
+AgentDeltas = Dict[Tuple[UUID, UUID], List[Any]]
+
+_TASK_FIELDS = ("parent_execution_id", "phase", "status", "spawned_by_agent_id", "rationale")
+
+_UNKNOWN = object()
+
+
+def _has_rationale(rationale: Optional[str]) -> int:
+    return 1 if rationale else 0
+
+
+def _field_values(obj: Any, fields: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+    """(values before this flush, values after it, whether any changed); _UNKNOWN if not loaded"""
+    state = obj.__dict__["_sa_instance_state"]
+    before, after, changed = {}, {}, False
+    for name in fields:
+        history = state.attrs[name].history
+        if history.added or history.deleted:
+            changed = True
+            original = state.committed_state.get(name, NO_VALUE)
+            before[name] = _UNKNOWN if original is NO_VALUE else original
+            after[name] = history.added[0] if history.added else _UNKNOWN
+        elif history.unchanged:
+            before[name] = after[name] = history.unchanged[0]
+        else:
+            before[name] = after[name] = _UNKNOWN
+    return before, after, changed
+
+
+def _add_task(deltas: TaskDeltas, values: Dict[str, Any], sign: int) -> None:
+    key = (values["parent_execution_id"], values["phase"], values["status"], values["spawned_by_agent_id"])
+    delta = deltas.setdefault(key, [0, 0])
+    delta[0] += sign
+    delta[1] += sign * _has_rationale(values["rationale"])
+
+
+def _add_agent(
+    deltas: AgentDeltas,
+    execution_id: UUID,
+    agent_id: UUID,
+    messages: int = 0,
+    last_message_at: Optional[datetime] = None,
+    coherence: float = 0.0,
+    scores: int = 0,
+) -> None:
+    delta = deltas.setdefault((execution_id, agent_id), [0, None, 0.0, 0])
+    delta[0] += messages
+    if last_message_at is not None and (delta[1] is None or last_message_at > delta[1]):
+        delta[1] = last_message_at
+    delta[2] += coherence
+    delta[3] += scores
+
+
+def collect_deltas(session: Session) -> Tuple[TaskDeltas, AgentDeltas, Set[UUID]]:
+    """
+    Counter changes made by a session's pending flush
+
+    Args:
+        session: Session whose new/dirty/deleted collections still hold the flush
+
+    Returns:
+        (task deltas, agent deltas, executions to recount)
+    """
+    tasks: TaskDeltas = {}
+    agents: AgentDeltas = {}
+    recount: Set[UUID] = set()
+
+    for obj in session.new:
+        if isinstance(obj, DynamicTask):
+            _add_task(tasks, {name: getattr(obj, name) for name in _TASK_FIELDS}, 1)
+        elif isinstance(obj, AgentMessage) and obj.task_execution_id is not None:
+            # created_at is a server default, not loaded yet: the flush time is close enough
+            sent_at = obj.__dict__.get("created_at") or datetime.utcnow()
+            _add_agent(agents, obj.task_execution_id, obj.sender_id, messages=1, last_message_at=sent_at)
+        elif isinstance(obj, CoherenceMetrics):
+            _add_agent(agents, obj.execution_id, obj.agent_id, coherence=obj.coherence_score, scores=1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, DynamicTask):
+            continue
+        before, after, changed = _field_values(obj, _TASK_FIELDS)
+        if not changed:
+            continue
+        if any(value is _UNKNOWN for value in (*before.values(), *after.values())):
+            recount.update({after["parent_execution_id"], before["parent_execution_id"]} - {_UNKNOWN})
+            continue
+        _add_task(tasks, before, -1)
+        _add_task(tasks, after, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, DynamicTask):
+            before, _, _ = _field_values(obj, _TASK_FIELDS)
+            if any(value is _UNKNOWN for value in before.values()):
+                recount.add(obj.parent_execution_id)
+            else:
+                _add_task(tasks, before, -1)
+        elif isinstance(obj, AgentMessage) and obj.task_execution_id is not None:
+            _add_agent(agents, obj.task_execution_id, obj.sender_id, messages=-1)
+        elif isinstance(obj, CoherenceMetrics):
+            _add_agent(agents, obj.execution_id, obj.agent_id, coherence=-obj.coherence_score, scores=-1)
+
+    for key in [key for key in tasks if key[0] in recount]:
+        del tasks[key]
+    return tasks, {key: delta for key, delta in agents.items() if any(delta)}, recount
+
+
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+_warned_dialects: Set[str] = set()
+
+
+def _insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Workflow counter upsert is not supported on {dialect}")
+    return dialect_insert
+
+
+def counter_statements(dialect: str, tasks: TaskDeltas, agents: AgentDeltas) -> List[Any]:
+    """
+    Upserts adding deltas to the counters
+
+    Args:
+        dialect: Database dialect name (postgresql or sqlite)
+        tasks: Task deltas
+        agents: Agent deltas
+
+    Returns:
+        Statements to execute (at most one per counter table)
+    """
+    dialect_insert = _insert(dialect)
+    statements = []
+
+    rows = [
+        {
+            "execution_id": execution_id, "phase": phase, "status": status, "agent_id": agent_id,
+            "task_count": count, "with_rationale": with_rationale,
+        }
+        for (execution_id, phase, status, agent_id), (count, with_rationale) in sorted(
+            tasks.items(), key=lambda item: tuple(str(part) for part in item[0])
+        )
+        if count or with_rationale
+    ]
+    if rows:
+        stmt = dialect_insert(WorkflowTaskCounter.__table__).values(rows)
+        c, new = WorkflowTaskCounter.__table__.c, stmt.excluded
+        statements.append(stmt.on_conflict_do_update(
+            index_elements=["execution_id", "phase", "status", "agent_id"],
+            set_={
+                "task_count": c.task_count + new.task_count,
+                "with_rationale": c.with_rationale + new.with_rationale,
+            },
+        ))
+
+    rows = [
+        {
+            "execution_id": execution_id, "agent_id": agent_id, "messages_sent": messages,
+            "last_message_at": last_at, "coherence_sum": coherence, "coherence_count": scores,
+        }
+        for (execution_id, agent_id), (messages, last_at, coherence, scores) in sorted(
+            agents.items(), key=lambda item: tuple(str(part) for part in item[0])
+        )
+    ]
+    if rows:
+        stmt = dialect_insert(WorkflowAgentCounter.__table__).values(rows)
+        c, new = WorkflowAgentCounter.__table__.c, stmt.excluded
+        statements.append(stmt.on_conflict_do_update(
+            index_elements=["execution_id", "agent_id"],
+            set_={
+                "messages_sent": c.messages_sent + new.messages_sent,
+                "last_message_at": case(
+                    (c.last_message_at.is_(None), new.last_message_at),
+                    (new.last_message_at > c.last_message_at, new.last_message_at),
+                    else_=c.last_message_at,
+                ),
+                "coherence_sum": c.coherence_sum + new.coherence_sum,
+                "coherence_count": c.coherence_count + new.coherence_count,
+            },
+        ))
+    return statements
+
+
+def delta_statements(
+    dialect: str,
+    tasks: TaskDeltas,
+    agents: AgentDeltas,
+    recount: Iterable[UUID] = (),
+) -> List[Any]:
+    """
+    Statements applying deltas, recounting where the delta is unknown
+
+    Falls back to recounting every touched execution on databases without
+    upserts, so writes never fail because of the counters.
+
+    Args:
+        dialect: Database dialect name
+        tasks: Task deltas
+        agents: Agent deltas
+        recount: Executions whose task counters must be recounted
+
+    Returns:
+        Statements to execute, in order
+    """
+    recount = set(recount)
+    if dialect not in UPSERT_DIALECTS:
+        if dialect not in _warned_dialects:
+            _warned_dialects.add(dialect)
+            logger.warning(f"No counter upsert on {dialect}; recounting workflow counters on every write")
+        touched = recount | {key[0] for key in tasks} | {key[0] for key in agents}
+        return rebuild_statements(touched) if touched else []
+
+    statements = counter_statements(dialect, tasks, agents)
+    if recount:
+        logger.debug(f"Recounting workflow counters of {len(recount)} execution(s)")
+        statements += rebuild_statements(recount, agents=False)
+    return statements
+
+
+def rebuild_statements(execution_ids: Optional[Iterable[UUID]] = None, agents: bool = True) -> List[Any]:
+    """
+    Statements recounting counters from the task, message and coherence rows
+
+    Args:
+        execution_ids: Executions to recount (default: all)
+        agents: Also recount the agent (message/coherence) counters
+
+    Returns:
+        Delete and INSERT ... SELECT statements, in order
+    """
+    ids = list(execution_ids) if execution_ids is not None else None
+
+    def only(column):
+        return column.in_(ids) if ids is not None else literal(True)
+
+    rationale = case((and_(DynamicTask.rationale.isnot(None), DynamicTask.rationale != ""), 1), else_=0)
+    tasks = (
+        select(
+            DynamicTask.parent_execution_id, DynamicTask.phase, DynamicTask.status,
+            DynamicTask.spawned_by_agent_id, func.count(), func.sum(rationale),
+        )
+        .where(only(DynamicTask.parent_execution_id))
+        .group_by(
+            DynamicTask.parent_execution_id, DynamicTask.phase, DynamicTask.status,
+            DynamicTask.spawned_by_agent_id,
+        )
+    )
+
+    # Messages and coherence scores per (execution, agent), combined into one row each
+    activity = (
+        select(
+            AgentMessage.task_execution_id.label("execution_id"),
+            AgentMessage.sender_id.label("agent_id"),
+            func.count().label("messages_sent"),
+            func.max(AgentMessage.created_at).label("last_message_at"),
+            literal(0.0).label("coherence_sum"),
+            literal(0).label("coherence_count"),
+        )
+        .where(AgentMessage.task_execution_id.isnot(None), only(AgentMessage.task_execution_id))
+        .group_by(AgentMessage.task_execution_id, AgentMessage.sender_id)
+        .union_all(
+            select(
+                CoherenceMetrics.execution_id,
+                CoherenceMetrics.agent_id,
+                literal(0),
+                literal(None),
+                func.sum(CoherenceMetrics.coherence_score),
+                func.count(),
+            )
+            .where(only(CoherenceMetrics.execution_id))
+            .group_by(CoherenceMetrics.execution_id, CoherenceMetrics.agent_id)
+        )
+        .subquery()
+    )
+    agent_totals = select(
+        activity.c.execution_id,
+        activity.c.agent_id,
+        func.sum(activity.c.messages_sent),
+        func.max(activity.c.last_message_at),
+        func.sum(activity.c.coherence_sum),
+        func.sum(activity.c.coherence_count),
+    ).group_by(activity.c.execution_id, activity.c.agent_id)
+
+    task_table, agent_table = WorkflowTaskCounter.__table__, WorkflowAgentCounter.__table__
+    statements = [
+        delete(task_table).where(only(task_table.c.execution_id)),
+        insert(task_table).from_select(
+            ["execution_id", "phase", "status", "agent_id", "task_count", "with_rationale"], tasks
+        ),
+    ]
+    if agents:
+        statements += [
+            delete(agent_table).where(only(agent_table.c.execution_id)),
+            insert(agent_table).from_select(
+                ["execution_id", "agent_id", "messages_sent", "last_message_at", "coherence_sum", "coherence_count"],
+                agent_totals,
+            ),
+        ]
+    return statements
+
+
+async def rebuild_workflow_counters(db: AsyncSession, execution_id: Optional[UUID] = None) -> None:
+    """
+    Recount an execution's counters (or every execution's) from its rows.
+
+    For repairs after writes that bypassed the ORM: bulk statements, and
+    messages removed by ON DELETE CASCADE when squad members are deleted.
+    The caller commits.
+
+    Args:
+        db: Database session
+        execution_id: Execution to recount (default: all)
+    """
+    for statement in rebuild_statements([execution_id] if execution_id else None):
+        await db.execute(statement)
+
+
+async def apply_agent_deltas(db: AsyncSession, deltas: AgentDeltas) -> None:
+    """
+    Add message/coherence deltas computed by the caller (bulk writes).
+
+    Args:
+        db: Database session
+        deltas: (execution_id, agent_id) -> [messages, last_message_at, coherence_sum, coherence_count]
+    """
+    for statement in delta_statements(db.get_bind().dialect.name, {}, deltas):
+        await db.execute(statement)
+
+
+@event.listens_for(Session, "after_flush")
+def _materialize_counters(session: Session, flush_context) -> None:
+    """Apply the flush's counter deltas on its own connection (same transaction)"""
+    tasks, agents, recount = collect_deltas(session)
+    if not (tasks or agents or recount):
+        return
+    connection = session.connection()
+    for statement in delta_statements(connection.dialect.name, tasks, agents, recount):
+        connection.execute(statement)
+
@@ -0,0 +1,395 @@
+"""
+Workflow Snapshot for PM-as-Guardian System
+
+One aggregated view of an execution's workflow state, shared by the health
+monitor, the anomaly detector, analytics and the Kanban board. Instead of
+each of them loading the execution, every DynamicTask, the blocked tasks,
+messages and coherence metrics on its own, the snapshot reads the
+execution's running counters (tasks by phase/status/agent, messages and
+coherence per agent; see workflow_metrics.py), the blocked count and the
+newest coherence scores. The task rows the per-task anomaly checks look at
+(include_details) and every task with its dependency edges (include_tasks)
+are only loaded for the callers that need them.
+
+Snapshots are cached per execution for WORKFLOW_SNAPSHOT_TTL seconds.
+Task and message writers (PhaseBasedWorkflowEngine.spawn_task and
+update_task_status, the message buses, HistoryManager, the agent message
+endpoint and PM coherence checks) call invalidate_workflow_snapshot, and a
+snapshot built while an invalidation happened is not cached. The TTL bounds
+how long other processes serve a snapshot after a write they did not see.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from backend.core.config import settings
+from backend.models.guardian import CoherenceMetrics, WorkflowAgentCounter, WorkflowTaskCounter
+from backend.models.message import AgentMessage
+from backend.models.project import TaskExecution
+from backend.models.squad import SquadMember
+from backend.models.workflow import DynamicTask, WorkflowPhase, task_dependencies
+
+# Tasks shorter than this are flagged as vague (AdvancedAnomalyDetector)
+BRIEF_DESCRIPTION_LENGTH = 30
+
+ACTIVE_TASK_STATUSES = ("pending", "in_progress")
+
+
+@dataclass(frozen=True)
+class TaskSummary:
+    """Column values of one DynamicTask (safe to share across sessions)"""
+    id: UUID
+    phase: str
+    status: str
+    title: str
+    description: str
+    rationale: Optional[str]
+    spawned_by_agent_id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+_TASK_COLUMNS = (
+    DynamicTask.id,
+    DynamicTask.phase,
+    DynamicTask.status,
+    DynamicTask.title,
+    DynamicTask.description,
+    DynamicTask.rationale,
+    DynamicTask.spawned_by_agent_id,
+    DynamicTask.created_at,
+    DynamicTask.updated_at,
+)
+
+
+@dataclass
+class WorkflowSnapshot:
+    """
+    Aggregated workflow state of one execution.
+
+    phase_status_counts maps phase -> status -> task count; the other task
+    counts are derived from it. blocked_tasks counts tasks that are blocked
+    or pending behind an unfinished blocker of the same execution.
+
+    Details (None unless loaded): recent_tasks holds the newest tasks,
+    flagged_tasks the active ones with a vague description or (in
+    investigation) no rationale, recent_senders the senders of the newest
+    messages and active_member_ids the squad's active members. tasks and
+    dependencies are only loaded for callers that render every task.
+    """
+    execution_id: UUID
+    squad_id: UUID
+    execution_status: str
+    phase_status_counts: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    tasks_with_rationale: int = 0
+    blocked_tasks: int = 0
+    agent_task_counts: Dict[UUID, int] = field(default_factory=dict)
+    agent_completed_counts: Dict[UUID, int] = field(default_factory=dict)
+    agent_activity: Dict[UUID, int] = field(default_factory=dict)
+    last_message_at: Optional[datetime] = None
+    avg_coherence: Optional[float] = None
+    coherence_trends: List[Dict[str, Any]] = field(default_factory=list)
+    recent_tasks: Optional[List[TaskSummary]] = None
+    flagged_tasks: Optional[List[TaskSummary]] = None
+    recent_senders: Optional[List[UUID]] = None
+    active_member_ids: Optional[Set[UUID]] = None
+    tasks: Optional[List[TaskSummary]] = None
+    dependencies: Optional[List[Tuple[UUID, UUID]]] = None
+    expires_at: float = 0.0
+
+    @property
+    def phase_counts(self) -> Dict[str, int]:
+        """Tasks per phase (every phase present)"""
+        counts = {phase.value: 0 for phase in WorkflowPhase}
+        for phase, statuses in self.phase_status_counts.items():
+            counts[phase] = sum(statuses.values())
+        return counts
+
+    @property
+    def status_counts(self) -> Dict[str, int]:
+        """Tasks per status"""
+        counts: Dict[str, int] = {}
+        for statuses in self.phase_status_counts.values():
+            for status, count in statuses.items():
+                counts[status] = counts.get(status, 0) + count
+        return counts
+
+    @property
+    def total_tasks(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def message_count(self) -> int:
+        return sum(self.agent_activity.values())
+
+    @property
+    def completion_rate(self) -> float:
+        total = self.total_tasks
+        return self.status_counts.get("completed", 0) / total if total else 0.0
+
+    @property
+    def discovery_rate(self) -> float:
+        """Share of tasks spawned with a rationale"""
+        total = self.total_tasks
+        return self.tasks_with_rationale / total if total else 0.0
+
+
+# execution_id -> cached snapshot
+_snapshots: Dict[UUID, WorkflowSnapshot] = {}
+
+# Bumped by invalidate_workflow_snapshot; a snapshot is cached only if unchanged while building
+_versions: Dict[UUID, int] = {}
+
+
+def invalidate_workflow_snapshot(execution_id: Optional[UUID]) -> None:
+    """
+    Drop the cached snapshot of an execution.
+
+    Call after writing its tasks, messages or coherence metrics.
+
+    Args:
+        execution_id: Execution whose workflow state changed (None is ignored)
+    """
+    if execution_id is None:
+        return
+    _versions[execution_id] = _versions.get(execution_id, 0) + 1
+    _snapshots.pop(execution_id, None)
+
+
+def clear_workflow_snapshots() -> None:
+    """Drop every cached snapshot"""
+    _snapshots.clear()
+
+
+async def get_workflow_snapshot(
+    db: AsyncSession,
+    execution_id: UUID,
+    include_details: bool = False,
+    include_tasks: bool = False,
+    use_cache: bool = True,
+) -> WorkflowSnapshot:
+    """
+    Get an execution's workflow snapshot, from cache when fresh.
+
+    Args:
+        db: Database session
+        execution_id: Task execution ID
+        include_details: Also load the rows the anomaly detectors check
+        include_tasks: Also load every task and dependency edge
+        use_cache: Whether to use (and fill) the in-process cache
+
+    Returns:
+        WorkflowSnapshot
+
+    Raises:
+        ValueError: If execution not found
+    """
+    now = time.monotonic()
+    cached = _snapshots.get(execution_id) if use_cache else None
+    if cached and cached.expires_at > now:
+        has_details, has_tasks = cached.recent_tasks is not None, cached.tasks is not None
+        if (has_details or not include_details) and (has_tasks or not include_tasks):
+            return cached
+        # Rebuild with everything the cached snapshot had, so it serves both callers
+        include_details, include_tasks = include_details or has_details, include_tasks or has_tasks
+
+    version = _versions.get(execution_id, 0)
+    snapshot = await build_workflow_snapshot(
+        db, execution_id, include_details=include_details, include_tasks=include_tasks
+    )
+
+    if use_cache and _versions.get(execution_id, 0) == version:
+        for key in [key for key, entry in _snapshots.items() if entry.expires_at <= now]:
+            del _snapshots[key]
+        _snapshots[execution_id] = snapshot
+    return snapshot
+
+
+async def build_workflow_snapshot(
+    db: AsyncSession,
+    execution_id: UUID,
+    include_details: bool = False,
+    include_tasks: bool = False,
+) -> WorkflowSnapshot:
+    """
+    Build an execution's workflow snapshot from the database (no cache).
+
+    Without details or tasks this reads the execution's counter rows, the
+    blocked count and the newest coherence scores, however many tasks and
+    messages the execution has.
+
+    Args:
+        db: Database session
+        execution_id: Task execution ID
+        include_details: Also load the rows the anomaly detectors check
+        include_tasks: Also load every task and dependency edge
+
+    Returns:
+        WorkflowSnapshot
+
+    Raises:
+        ValueError: If execution not found
+    """
+    result = await db.execute(
+        select(TaskExecution.squad_id, TaskExecution.status).where(TaskExecution.id == execution_id)
+    )
+    execution = result.one_or_none()
+    if execution is None:
+        raise ValueError(f"Task execution {execution_id} not found")
+
+    snapshot = WorkflowSnapshot(
+        execution_id=execution_id,
+        squad_id=execution.squad_id,
+        execution_status=execution.status,
+        expires_at=time.monotonic() + settings.WORKFLOW_SNAPSHOT_TTL,
+    )
+    in_execution = DynamicTask.parent_execution_id == execution_id
+
+    # Task counts by phase, status and spawning agent
+    result = await db.execute(
+        select(
+            WorkflowTaskCounter.phase,
+            WorkflowTaskCounter.status,
+            WorkflowTaskCounter.agent_id,
+            WorkflowTaskCounter.task_count,
+            WorkflowTaskCounter.with_rationale,
+        ).where(WorkflowTaskCounter.execution_id == execution_id, WorkflowTaskCounter.task_count > 0)
+    )
+    for phase, status, agent_id, count, with_rationale in result.all():
+        statuses = snapshot.phase_status_counts.setdefault(phase, {})
+        statuses[status] = statuses.get(status, 0) + count
+        snapshot.tasks_with_rationale += with_rationale
+        snapshot.agent_task_counts[agent_id] = snapshot.agent_task_counts.get(agent_id, 0) + count
+        if status == "completed":
+            snapshot.agent_completed_counts[agent_id] = (
+                snapshot.agent_completed_counts.get(agent_id, 0) + count
+            )
+
+    # Messages and coherence per agent
+    result = await db.execute(
+        select(
+            WorkflowAgentCounter.agent_id,
+            WorkflowAgentCounter.messages_sent,
+            WorkflowAgentCounter.last_message_at,
+            WorkflowAgentCounter.coherence_sum,
+            WorkflowAgentCounter.coherence_count,
+        ).where(WorkflowAgentCounter.execution_id == execution_id)
+    )
+    coherence_sum, coherence_count = 0.0, 0
+    for agent_id, messages, last_at, agent_coherence_sum, agent_coherence_count in result.all():
+        if messages > 0:
+            snapshot.agent_activity[agent_id] = messages
+        if last_at is not None and (snapshot.last_message_at is None or last_at > snapshot.last_message_at):
+            snapshot.last_message_at = last_at
+        coherence_sum += agent_coherence_sum
+        coherence_count += agent_coherence_count
+    if coherence_count > 0:
+        snapshot.avg_coherence = coherence_sum / coherence_count
+
+    # Blocked: explicitly, or pending behind an unfinished blocker of this execution
+    if snapshot.phase_status_counts:
+        blocker = aliased(DynamicTask)
+        waiting = exists().where(
+            task_dependencies.c.blocks_task_id == DynamicTask.id,
+            blocker.id == task_dependencies.c.task_id,
+            blocker.parent_execution_id == execution_id,
+            blocker.status.notin_(["completed", "failed"]),
+        )
+        result = await db.execute(
+            select(func.count()).select_from(DynamicTask).where(
+                in_execution,
+                or_(DynamicTask.status == "blocked", and_(DynamicTask.status == "pending", waiting)),
+            )
+        )
+        snapshot.blocked_tasks = result.scalar_one()
+
+    # The newest 20 coherence scores as trend points
+    if coherence_count > 0:
+        result = await db.execute(
+            select(
+                CoherenceMetrics.agent_id,
+                CoherenceMetrics.coherence_score,
+                CoherenceMetrics.calculated_at,
+                CoherenceMetrics.phase,
+            )
+            .where(CoherenceMetrics.execution_id == execution_id)
+            .order_by(CoherenceMetrics.calculated_at.desc())
+            .limit(20)
+        )
+        snapshot.coherence_trends = [
+            {
+                "agent_id": str(row.agent_id),
+                "coherence_score": row.coherence_score,
+                "calculated_at": row.calculated_at.isoformat(),
+                "phase": row.phase,
+            }
+            for row in result.all()
+        ]
+
+    if include_details:
+        await _load_details(db, snapshot)
+
+    if include_tasks:
+        result = await db.execute(select(*_TASK_COLUMNS).where(in_execution).order_by(DynamicTask.created_at))
+        snapshot.tasks = [TaskSummary(*row) for row in result.all()]
+
+        task_ids = select(DynamicTask.id).where(in_execution)
+        result = await db.execute(
+            select(task_dependencies.c.task_id, task_dependencies.c.blocks_task_id).where(
+                or_(task_dependencies.c.task_id.in_(task_ids), task_dependencies.c.blocks_task_id.in_(task_ids))
+            )
+        )
+        snapshot.dependencies = [tuple(row) for row in result.all()]
+
+    return snapshot
+
+
+async def _load_details(db: AsyncSession, snapshot: WorkflowSnapshot) -> None:
+    """Load the task, message and member rows the anomaly detectors check"""
+    execution_id = snapshot.execution_id
+    in_execution = DynamicTask.parent_execution_id == execution_id
+    snapshot.recent_tasks, snapshot.flagged_tasks, snapshot.recent_senders = [], [], []
+
+    if snapshot.phase_status_counts:
+        result = await db.execute(
+            select(*_TASK_COLUMNS).where(in_execution).order_by(DynamicTask.created_at.desc()).limit(10)
+        )
+        snapshot.recent_tasks = [TaskSummary(*row) for row in result.all()]
+
+        has_rationale = and_(DynamicTask.rationale.isnot(None), DynamicTask.rationale != "")
+        result = await db.execute(
+            select(*_TASK_COLUMNS)
+            .where(
+                in_execution,
+                DynamicTask.status.in_(ACTIVE_TASK_STATUSES),
+                or_(
+                    func.length(DynamicTask.description) < BRIEF_DESCRIPTION_LENGTH,
+                    and_(DynamicTask.phase == WorkflowPhase.INVESTIGATION.value, ~has_rationale),
+                ),
+            )
+            .order_by(DynamicTask.created_at)
+        )
+        snapshot.flagged_tasks = [TaskSummary(*row) for row in result.all()]
+
+    if snapshot.agent_activity:
+        result = await db.execute(
+            select(AgentMessage.sender_id)
+            .where(AgentMessage.task_execution_id == execution_id)
+            .order_by(AgentMessage.created_at.desc())
+            .limit(10)
+        )
+        snapshot.recent_senders = list(result.scalars().all())
+
+    result = await db.execute(
+        select(SquadMember.id).where(
+            SquadMember.squad_id == snapshot.squad_id,
+            SquadMember.is_active.is_(True),
+        )
+    )
+    snapshot.active_member_ids = set(result.scalars().all())
@@ -32,6 +32,11 @@ from backend.agents.guardian import (
 )
 from backend.agents.branching.branching_engine import BranchingEngine, get_branching_engine
 from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.agents.orchestration.task_graph import (
+    critical_path_lengths,
+    prioritized_topological_order,
+    strongly_connected_components,
+)
 from backend.models.message import AgentMessage
 from backend.models.squad import SquadMember
 
@@ -144,18 +149,15 @@ class WorkflowIntelligence:
         agent_coherence: Dict[UUID, CoherenceScore] = {}
         if hasattr(execution, 'squad') and execution.squad:
             current_phase = self._determine_current_phase(all_tasks)
-            for member in execution.squad.members:
-                if member.is_active:
-                    try:
-                        score = await self.coherence_scorer.calculate_coherence(
-                            db=db,
-                            agent_id=member.id,
-                            execution_id=execution_id,
-                            phase=current_phase,
-                        )
-                        agent_coherence[member.id] = score
-                    except Exception as e:
-                        logger.debug(f"Could not calculate coherence for agent {member.id}: {e}")
+            try:
+                agent_coherence = await self.coherence_scorer.calculate_coherence_batch(
+                    db=db,
+                    execution_id=execution_id,
+                    phase=current_phase,
+                    agent_ids=[member.id for member in execution.squad.members if member.is_active],
+                )
+            except Exception as e:
+                logger.debug(f"Could not calculate coherence for execution {execution_id}: {e}")
         
         # Get discoveries from DiscoveryEngine
         discovery_suggestions: List[DiscoveryTaskSuggestion] = []
@@ -712,54 +714,51 @@ class WorkflowIntelligence:
         """
         Topological sort with priority consideration.
         
-        Ensures dependencies are respected while prioritizing high-value tasks.
+        Ensures dependencies are respected while prioritizing high-value tasks:
+        among unblocked tasks, the one heading the longest dependency chain
+        goes first, then higher priority, earlier phase, earlier creation.
+        Heap-based Kahn ordering, O((V + E) log V). Tasks on or behind a
+        dependency cycle are appended in their original order.
         """
-        # Build reverse graph (what blocks what)
-        reverse_graph: Dict[UUID, List[UUID]] = {task.id: [] for task in tasks}
-        for task_id, blocking in dependency_graph.items():
-            for blocked_id in blocking:
-                reverse_graph[blocked_id].append(task_id)
+        by_id = {task.id: task for task in tasks}
         
-        # Priority weights
+        # Priority weights (for tasks that carry a priority)
         priority_weights = {"urgent": 4, "high": 3, "medium": 2, "low": 1}
+        phase_order = {phase.value: i for i, phase in enumerate(WorkflowPhase)}
+        chain_lengths = critical_path_lengths(dependency_graph)
+        
+        def sort_key(task_id: UUID):
+            task = by_id[task_id]
+            return (
+                -chain_lengths[task_id],
+                -priority_weights.get(getattr(task, "priority", None), 0),
+                phase_order.get(task.phase, len(phase_order)),
+                task.created_at or datetime.min,
+            )
         
-        # Calculate in-degrees
-        in_degree = {task.id: len(reverse_graph[task.id]) for task in tasks}
-        
-        # Start with tasks that have no dependencies
-        queue = [
-            task for task in tasks
-            if in_degree[task.id] == 0
-        ]
+        order, cycles = prioritized_topological_order(dependency_graph, sort_key)
         
-        # Sort queue by created_at (earlier tasks first)
-        # Note: DynamicTask doesn't have priority field, so we use created_at
-        queue.sort(key=lambda t: t.created_at)
+        if cycles:
+            logger.warning(
+                f"Dependency cycles left {len(tasks) - len(order)} tasks unordered: "
+                + "; ".join(" -> ".join(str(task_id) for task_id in cycle) for cycle in cycles)
+            )
         
-        result = []
+        ordered = set(order)
+        return [by_id[task_id] for task_id in order] + [t for t in tasks if t.id not in ordered]
+    
+    def find_dependency_cycles(self, tasks: List[DynamicTask]) -> List[List[UUID]]:
+        """
+        Find dependency cycles among tasks.
         
-        while queue:
-            # Get task with highest priority and no dependencies
-            current = queue.pop(0)
-            result.append(current)
-            
-            # Remove this task's dependencies from other tasks
-            for blocked_id in dependency_graph[current.id]:
-                in_degree[blocked_id] -= 1
-                if in_degree[blocked_id] == 0:
-                    # Find the task and add to queue
-                    blocked_task = next((t for t in tasks if t.id == blocked_id), None)
-                    if blocked_task:
-                        queue.append(blocked_task)
+        Args:
+            tasks: Tasks with blocks_tasks loaded
             
-            # Re-sort queue (new tasks might have been added)
-            queue.sort(key=lambda t: t.created_at)
-        
-        # Handle cycles (tasks that couldn't be ordered due to circular dependencies)
-        remaining = [task for task in tasks if task not in result]
-        result.extend(remaining)
-        
-        return result
+        Returns:
+            Each cycle's task IDs (strongly connected components), empty if
+            the tasks form a DAG
+        """
+        return strongly_connected_components(self._build_dependency_graph(tasks))
 
 
 # Singleton instance
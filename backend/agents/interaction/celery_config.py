@@ -49,6 +49,20 @@ celery_app.conf.update(
                 'expires': config.celery.timeout_check_interval - 5,  # Expire before next run
             }
         },
+        'rollup-llm-costs': {
+            'task': 'backend.agents.interaction.celery_tasks.rollup_llm_costs_task',
+            'schedule': config.celery.cost_rollup_interval,  # Every 5 minutes by default
+            'options': {
+                'expires': config.celery.cost_rollup_interval - 5,
+            }
+        },
+        'fold-conversation-summaries': {
+            'task': 'backend.agents.interaction.celery_tasks.fold_conversation_summaries_task',
+            'schedule': config.celery.summary_fold_interval,  # Every 2 minutes by default
+            'options': {
+                'expires': config.celery.summary_fold_interval - 5,
+            }
+        },
     },
 
     # Task routes
@@ -62,17 +76,27 @@ def run_async_task(coro):
     """
     Helper to run async tasks in Celery (which is synchronous)
 
+    Each call runs on a new event loop; buffered usage events and execution
+    log entries recorded on it are written before the loop is closed.
+
     Args:
         coro: Async coroutine to run
 
     Returns:
         Result of the coroutine
     """
+    # Lazy imports: the services import the agents package
+    from backend.services.execution_log_service import close_execution_log_buffer
+    from backend.services.usage_writer import close_usage_writer
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
         return loop.run_until_complete(coro)
     finally:
+        # Buffers and their flushers are bound to this loop: flush them before it closes
+        loop.run_until_complete(close_usage_writer())
+        loop.run_until_complete(close_execution_log_buffer())
         loop.close()
 
 
@@ -5,6 +5,8 @@ This module contains Celery tasks for:
 - Periodic timeout monitoring
 - Conversation cleanup
 - Analytics and reporting
+- LLM cost summary rollups
+- Rolling conversation summaries
 """
 import asyncio
 from typing import Optional
@@ -122,12 +124,12 @@ async def _cleanup_old_conversations(days_old: int) -> dict:
     """
     from datetime import datetime, timedelta
     from sqlalchemy import select, delete, and_
-    from backend.core.database import get_async_session_context
+    from backend.core.database import get_db_context
     from backend.models import Conversation, ConversationEvent
 
     cutoff_date = datetime.utcnow() - timedelta(days=days_old)
 
-        async with get_db_context() as db:
+    async with get_db_context() as db:
         # Find old conversations in terminal states
         stmt = select(Conversation).where(
             and_(
@@ -211,12 +213,12 @@ async def _generate_timeout_report(days: int) -> dict:
     """
     from datetime import datetime, timedelta
     from sqlalchemy import select, func, and_
-    from backend.core.database import get_async_session_context
+    from backend.core.database import get_db_context
     from backend.models import ConversationEvent, Conversation
 
     start_date = datetime.utcnow() - timedelta(days=days)
 
-        async with get_db_context() as db:
+    async with get_db_context() as db:
         # Count timeout events
         stmt = select(func.count(ConversationEvent.id)).where(
             and_(
@@ -270,3 +272,75 @@ async def _generate_timeout_report(days: int) -> dict:
                 if total_escalations > 0 else 0
             )
         }
+
+
+@celery_app.task(
+    name='backend.agents.interaction.celery_tasks.rollup_llm_costs_task'
+)
+def rollup_llm_costs_task():
+    """
+    Celery task: Fold new LLM cost entries into cost summaries
+
+    Advances the LLMCostSummary rollup watermark so cost stats only need to
+    aggregate the short unrolled tail of LLMCostEntry rows.
+
+    Returns:
+        Dictionary with rollup statistics
+    """
+    try:
+        result = run_async_task(_rollup_llm_costs())
+        return result
+    except Exception as exc:
+        return {"error": str(exc)}
+
+
+async def _rollup_llm_costs() -> dict:
+    """
+    Internal async function to run the LLM cost rollup
+
+    Returns:
+        Dictionary with rollup statistics
+    """
+    from backend.core.database import get_db_context
+    from backend.services.cost_rollup_service import CostRollupService
+
+    async with get_db_context() as db:
+        stats = await CostRollupService.rollup(db)
+
+    if stats["watermark"] is not None:
+        stats["watermark"] = stats["watermark"].isoformat()
+    return stats
+
+
+@celery_app.task(
+    name='backend.agents.interaction.celery_tasks.fold_conversation_summaries_task'
+)
+def fold_conversation_summaries_task():
+    """
+    Celery task: Fold new messages into rolling conversation summaries
+
+    Only conversations and task executions whose unsummarized tail crossed
+    SUMMARY_TOKEN_THRESHOLD are folded, and only their new messages are read.
+
+    Returns:
+        Dictionary with fold statistics
+    """
+    try:
+        result = run_async_task(_fold_conversation_summaries())
+        return result
+    except Exception as exc:
+        return {"error": str(exc)}
+
+
+async def _fold_conversation_summaries() -> dict:
+    """
+    Internal async function to fold due conversation summaries
+
+    Returns:
+        Dictionary with fold statistics
+    """
+    from backend.core.database import get_db_context
+    from backend.services.summary_service import SummaryService
+
+    async with get_db_context() as db:
+        return await SummaryService.fold_due(db)
@@ -14,6 +14,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import (
+    AgentMessage,
     Conversation,
     ConversationState,
     ConversationEvent,
@@ -56,7 +57,8 @@ class EscalationService:
         self,
         conversation_id: UUID,
         reason: str = "timeout",
-        triggered_by_agent_id: Optional[UUID] = None
+        triggered_by_agent_id: Optional[UUID] = None,
+        commit: bool = True
     ) -> bool:
         """
         Escalate a conversation to the next level
@@ -74,6 +76,8 @@ class EscalationService:
             conversation_id: ID of conversation to escalate
             reason: Reason for escalation (timeout, cant_help, etc.)
             triggered_by_agent_id: ID of agent triggering escalation (None for system)
+            commit: Commit when done; False only flushes, for callers that
+                commit a batch of escalations together
 
         Returns:
             True if escalated successfully, False if no next level available
@@ -81,28 +85,20 @@ class EscalationService:
         Raises:
             ValueError: If conversation not found
         """
-        # Get conversation
-        stmt = select(Conversation).where(Conversation.id == conversation_id)
-        result = await self.db.execute(stmt)
-        conversation = result.scalar_one_or_none()
+        # Get conversation and participants (no round trip for rows already in the session)
+        conversation = await self.db.get(Conversation, conversation_id)
 
         if conversation is None:
             raise ValueError(f"Conversation not found: {conversation_id}")
 
         # Get asker to determine squad
-        stmt = select(SquadMember).where(SquadMember.id == conversation.asker_id)
-        result = await self.db.execute(stmt)
-        asker = result.scalar_one_or_none()
+        asker = await self.db.get(SquadMember, conversation.asker_id)
 
         if asker is None:
             raise ValueError(f"Asker not found: {conversation.asker_id}")
 
         # Get current responder for notifications
-        stmt = select(SquadMember).where(
-            SquadMember.id == conversation.current_responder_id
-        )
-        result = await self.db.execute(stmt)
-        current_responder = result.scalar_one_or_none()
+        current_responder = await self.db.get(SquadMember, conversation.current_responder_id)
 
         # Query routing engine for next level responder
         next_level = conversation.escalation_level + 1
@@ -115,11 +111,12 @@ class EscalationService:
 
         if next_responder is None:
             # No next level available - mark as unresolvable
-            await self._mark_unresolvable(conversation, reason)
+            await self._mark_unresolvable(conversation, reason, commit=commit)
             return False
 
         # Update conversation state
         old_state = conversation.current_state
+        previous_responder_id = conversation.current_responder_id
         conversation.current_state = ConversationState.ESCALATED.value
         conversation.current_responder_id = next_responder.id
         conversation.escalation_level = next_level
@@ -135,7 +132,7 @@ class EscalationService:
         )
 
         await self.message_bus.send_message(
-            sender_id=None,  # System message
+            sender_id=previous_responder_id,  # Handed off by the previous responder (messages need a sender)
             recipient_id=conversation.asker_id,
             content=escalation_msg,
             message_type="escalation_notification",
@@ -147,7 +144,6 @@ class EscalationService:
         stmt = select(AgentMessage).where(
             AgentMessage.id == conversation.initial_message_id
         )
-        from backend.models import AgentMessage
         result = await self.db.execute(stmt)
         original_message = result.scalar_one_or_none()
 
@@ -187,14 +183,18 @@ class EscalationService:
         )
 
         self.db.add(event)
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
         return True
 
     async def _mark_unresolvable(
         self,
         conversation: Conversation,
-        reason: str
+        reason: str,
+        commit: bool = True
     ) -> None:
         """
         Mark a conversation as unresolvable (no next level available)
@@ -202,6 +202,7 @@ class EscalationService:
         Args:
             conversation: Conversation object
             reason: Reason for being unresolvable
+            commit: Commit when done (False only flushes)
         """
         old_state = conversation.current_state
         conversation.current_state = "unresolvable"  # Special state
@@ -214,7 +215,7 @@ class EscalationService:
         )
 
         message = await self.message_bus.send_message(
-            sender_id=None,  # System message
+            sender_id=conversation.current_responder_id,  # Last responder in the chain (messages need a sender)
             recipient_id=conversation.asker_id,
             content=unresolvable_msg,
             message_type="unresolvable_notification",
@@ -238,7 +239,10 @@ class EscalationService:
         )
 
         self.db.add(event)
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
 
     async def handle_cant_help(
         self,
@@ -374,7 +378,6 @@ class EscalationService:
         stmt = select(AgentMessage).where(
             AgentMessage.id == conversation.initial_message_id
         )
-        from backend.models import AgentMessage
         result = await self.db.execute(stmt)
         original_message = result.scalar_one_or_none()
 
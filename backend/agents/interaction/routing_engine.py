@@ -5,21 +5,116 @@ Determines which agent should respond to a question based on:
 - Routing rules stored in the database
 - Priority-based conflict resolution
 - Fallback to default templates
+
+Routing rules change rarely but are read on every question, timeout and
+escalation, so each squad's active rules (and the members they route to) are
+compiled into an in-process RoutingTable. Steady-state lookups make no
+database round trip. Tables are versioned: the routing rule endpoints,
+apply_template_to_squad and squad member changes call
+invalidate_routing_table, and a table compiled while an invalidation happened
+is discarded. ROUTING_TABLE_TTL bounds how long other processes keep a table
+after a change they did not see.
 """
-from typing import Optional, List
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from backend.core.config import settings
 from backend.models import RoutingRule, SquadMember, DefaultRoutingTemplate
 
 
+@dataclass(frozen=True)
+class CompiledRoute:
+    """The winning routing rule for one (asker_role, question_type, escalation_level)"""
+    rule_id: UUID
+    escalation_level: int
+    responder_role: str
+    specific_responder_id: Optional[UUID]
+    priority: int
+
+
+@dataclass
+class RoutingTable:
+    """
+    Compiled routing rules of one squad (plus its organization's rules).
+
+    routes holds the best rule per (asker_role, question_type,
+    escalation_level), chosen in the same order as the database query used
+    to: squad-specific first, then priority, then newest. members holds the
+    column values of the squad's members and of specific responders, and
+    role_members the first active member per role.
+    """
+    squad_version: int
+    org_version: int
+    expires_at: float
+    routes: Dict[Tuple[str, str, int], CompiledRoute] = field(default_factory=dict)
+    members: Dict[UUID, Dict[str, Any]] = field(default_factory=dict)
+    role_members: Dict[str, UUID] = field(default_factory=dict)
+
+    def route(self, asker_role: str, question_type: str, escalation_level: int) -> Optional[CompiledRoute]:
+        return self.routes.get((asker_role, question_type, escalation_level))
+
+
+# (squad_id, organization_id) -> compiled table
+_routing_tables: Dict[Tuple[UUID, Optional[UUID]], RoutingTable] = {}
+
+# Bumped by invalidate_routing_table; a table is valid only for the versions it was compiled at
+_squad_versions: Dict[UUID, int] = {}
+_org_versions: Dict[UUID, int] = {}
+
+
+def _versions(squad_id: UUID, organization_id: Optional[UUID]) -> Tuple[int, int]:
+    org_version = _org_versions.get(organization_id, 0) if organization_id else 0
+    return _squad_versions.get(squad_id, 0), org_version
+
+
+def invalidate_routing_table(
+    squad_id: Optional[UUID] = None,
+    organization_id: Optional[UUID] = None,
+) -> None:
+    """
+    Drop the compiled routing tables of a squad or an organization.
+
+    Call after committing changes to routing rules or squad members.
+
+    Args:
+        squad_id: Squad whose rules or members changed
+        organization_id: Organization whose org-level rules changed
+    """
+    if squad_id is not None:
+        _squad_versions[squad_id] = _squad_versions.get(squad_id, 0) + 1
+    if organization_id is not None:
+        _org_versions[organization_id] = _org_versions.get(organization_id, 0) + 1
+    for key in [
+        key for key in _routing_tables
+        if (squad_id is not None and key[0] == squad_id)
+        or (organization_id is not None and key[1] == organization_id)
+    ]:
+        del _routing_tables[key]
+
+
+def clear_routing_tables() -> None:
+    """Drop every compiled routing table"""
+    _routing_tables.clear()
+
+
+def _rule_rank(rule: RoutingRule) -> Tuple:
+    """Sort key: squad-specific first, then higher priority, then newer"""
+    created = rule.created_at.timestamp() if rule.created_at else 0.0
+    return (rule.squad_id is not None, rule.priority or 0, created)
+
+
 class RoutingEngine:
     """
     Engine for routing questions to appropriate agents
 
-    The routing engine queries the database for routing rules and determines
+    The routing engine compiles the squad's routing rules into a cached
+    RoutingTable and determines
     the best agent to handle a question based on:
     - Asker role
     - Question type
@@ -58,85 +153,107 @@ class RoutingEngine:
         Returns:
             SquadMember who should respond, or None if no rule found
         """
-        # First, try to find a matching routing rule
-        rule = await self._find_best_routing_rule(
-            squad_id=squad_id,
-            asker_role=asker_role,
-            question_type=question_type,
-            escalation_level=escalation_level,
-            organization_id=organization_id
-        )
+        table = await self.get_routing_table(squad_id, organization_id)
 
-        if rule is None:
-            # No rule found - try with default question type
-            if question_type != "default":
-                rule = await self._find_best_routing_rule(
-                    squad_id=squad_id,
-                    asker_role=asker_role,
-                    question_type="default",
-                    escalation_level=escalation_level,
-                    organization_id=organization_id
-                )
+        # First, try to find a matching routing rule, then the default question type
+        route = table.route(asker_role, question_type, escalation_level)
+        if route is None and question_type != "default":
+            route = table.route(asker_role, "default", escalation_level)
 
-        if rule is None:
+        if route is None:
             return None
 
-        # If rule specifies a specific responder, use that
-        if rule.specific_responder_id:
-            stmt = select(SquadMember).where(
-                SquadMember.id == rule.specific_responder_id
-            )
-            result = await self.db.execute(stmt)
-            return result.scalar_one_or_none()
-
-        # Otherwise, find any available agent with the responder role
-        stmt = select(SquadMember).where(
-            and_(
-                SquadMember.squad_id == squad_id,
-                SquadMember.role == rule.responder_role,
-                SquadMember.is_active == True
-            )
-        ).limit(1)
+        # If rule specifies a specific responder, use that; otherwise any
+        # available agent with the responder role
+        member_id = route.specific_responder_id or table.role_members.get(route.responder_role)
+        if member_id is None or member_id not in table.members:
+            return None
 
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        return await self._attach_member(table.members[member_id])
 
-    async def _find_best_routing_rule(
+    async def get_routing_table(
         self,
         squad_id: UUID,
-        asker_role: str,
-        question_type: str,
-        escalation_level: int,
-        organization_id: Optional[UUID] = None
-    ) -> Optional[RoutingRule]:
+        organization_id: Optional[UUID] = None,
+    ) -> RoutingTable:
         """
-        Find the best matching routing rule
-
-        Rules are prioritized as follows:
-        1. Squad-specific rules
-        2. Organization-level rules
-        3. Higher priority values
-        4. Most recently created
+        Get the compiled routing table of a squad, compiling it if needed.
 
         Args:
             squad_id: Squad ID
-            asker_role: Role of asker
-            question_type: Type of question
-            escalation_level: Escalation level
-            organization_id: Organization ID
+            organization_id: Organization ID (for org-level rules)
 
         Returns:
-            Best matching RoutingRule, or None
+            RoutingTable valid for the current rule versions
         """
-        # Build query conditions
-        conditions = [
-            RoutingRule.asker_role == asker_role,
-            RoutingRule.question_type == question_type,
-            RoutingRule.escalation_level == escalation_level,
-            RoutingRule.is_active == True
-        ]
-
-        # Add squad/org conditions
+        key = (squad_id, organization_id)
+        table = _routing_tables.get(key)
+        versions = _versions(squad_id, organization_id)
+        if (
+            table is not None
+            and (table.squad_version, table.org_version) == versions
+            and table.expires_at > time.time()
+        ):
+            return table
+
+        table = await self._compile_routing_table(squad_id, organization_id, versions)
+        # Keep it only if no invalidation happened while compiling
+        if _versions(squad_id, organization_id) == versions:
+            _routing_tables[key] = table
+        return table
+
+    async def _compile_routing_table(
+        self,
+        squad_id: UUID,
+        organization_id: Optional[UUID],
+        versions: Tuple[int, int],
+    ) -> RoutingTable:
+        """Load the active rules and their responders (two queries)"""
+        rules = await self._load_active_rules(squad_id, organization_id)
+        table = RoutingTable(
+            squad_version=versions[0],
+            org_version=versions[1],
+            expires_at=time.time() + settings.ROUTING_TABLE_TTL,
+        )
+
+        for rule in sorted(rules, key=_rule_rank, reverse=True):
+            table.routes.setdefault(
+                (rule.asker_role, rule.question_type, rule.escalation_level),
+                CompiledRoute(
+                    rule_id=rule.id,
+                    escalation_level=rule.escalation_level,
+                    responder_role=rule.responder_role,
+                    specific_responder_id=rule.specific_responder_id,
+                    priority=rule.priority,
+                ),
+            )
+
+        specific_ids = {
+            route.specific_responder_id for route in table.routes.values()
+            if route.specific_responder_id is not None
+        }
+        member_filter = SquadMember.squad_id == squad_id
+        if specific_ids:
+            member_filter = or_(member_filter, SquadMember.id.in_(specific_ids))
+        result = await self.db.execute(
+            select(*SquadMember.__table__.columns)
+            .where(member_filter)
+            .order_by(SquadMember.created_at, SquadMember.id)
+        )
+        for row in result.mappings():
+            table.members[row["id"]] = dict(row)
+            if row["squad_id"] == squad_id and row["is_active"]:
+                table.role_members.setdefault(row["role"], row["id"])
+
+        return table
+
+    async def _load_active_rules(
+        self,
+        squad_id: UUID,
+        organization_id: Optional[UUID] = None,
+    ) -> List[RoutingRule]:
+        """Active rules of a squad, plus org-level rules when an organization is given"""
+        conditions = [RoutingRule.is_active == True]
         if organization_id:
             conditions.append(
                 or_(
@@ -147,20 +264,14 @@ class RoutingEngine:
         else:
             conditions.append(RoutingRule.squad_id == squad_id)
 
-        # Query for matching rules
-        stmt = select(RoutingRule).where(
-            and_(*conditions)
-        ).order_by(
-            # Prioritize squad-specific over org-level
-            RoutingRule.squad_id.is_not(None).desc(),
-            # Then by priority
-            RoutingRule.priority.desc(),
-            # Then by creation date (newer rules first)
-            RoutingRule.created_at.desc()
-        ).limit(1)
+        result = await self.db.execute(select(RoutingRule).where(and_(*conditions)))
+        return list(result.scalars().all())
 
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+    async def _attach_member(self, values: Dict[str, Any]) -> SquadMember:
+        """SquadMember for compiled column values, attached to the session without a query"""
+        member = SquadMember(**values)
+        make_transient_to_detached(member)
+        return await self.db.merge(member, load=False)
 
     async def get_escalation_chain(
         self,
@@ -183,26 +294,20 @@ class RoutingEngine:
         Returns:
             List of escalation levels with responder roles
         """
+        table = await self.get_routing_table(squad_id, organization_id)
         chain = []
 
         for level in range(max_levels):
-            rule = await self._find_best_routing_rule(
-                squad_id=squad_id,
-                asker_role=asker_role,
-                question_type=question_type,
-                escalation_level=level,
-                organization_id=organization_id
-            )
-
-            if rule is None:
+            route = table.route(asker_role, question_type, level)
+            if route is None:
                 break
 
             chain.append({
                 "escalation_level": level,
-                "responder_role": rule.responder_role,
-                "specific_responder_id": str(rule.specific_responder_id) if rule.specific_responder_id else None,
-                "rule_id": str(rule.id),
-                "priority": rule.priority
+                "responder_role": route.responder_role,
+                "specific_responder_id": str(route.specific_responder_id) if route.specific_responder_id else None,
+                "rule_id": str(route.rule_id),
+                "priority": route.priority
             })
 
         return chain
@@ -260,6 +365,7 @@ class RoutingEngine:
             rules_created += 1
 
         await self.db.commit()
+        invalidate_routing_table(squad_id=squad_id)
 
         return rules_created
 
@@ -287,20 +393,7 @@ class RoutingEngine:
         warnings = []
 
         # Get all routing rules for this squad
-        conditions = [RoutingRule.is_active == True]
-        if organization_id:
-            conditions.append(
-                or_(
-                    RoutingRule.squad_id == squad_id,
-                    RoutingRule.organization_id == organization_id
-                )
-            )
-        else:
-            conditions.append(RoutingRule.squad_id == squad_id)
-
-        stmt = select(RoutingRule).where(and_(*conditions))
-        result = await self.db.execute(stmt)
-        rules = result.scalars().all()
+        rules = await self._load_active_rules(squad_id, organization_id)
 
         if not rules:
             issues.append("No routing rules configured for this squad")
@@ -5,20 +5,34 @@ Celery task for monitoring conversation timeouts and triggering:
 - Follow-up messages after initial timeout
 - Escalation after retry limit exceeded
 - State transitions for timed-out conversations
+
+Due conversations are claimed in batches with SELECT ... FOR UPDATE SKIP
+LOCKED, so concurrent sweeps (in one process or across beat workers) each
+take a disjoint batch. A batch is handled in one transaction and committed
+once; a failing conversation only rolls back its own savepoint.
 """
-from datetime import datetime
-from typing import List
-from uuid import UUID
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncContextManager, Callable, List, Optional, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.config import settings
 from backend.core.database import get_db_context
 from backend.models import Conversation, ConversationState, ConversationEvent, SquadMember
 from backend.agents.configuration.interaction_config import get_interaction_config
 from backend.agents.communication.message_bus import get_message_bus
 from backend.agents.interaction.escalation_service import EscalationService
 
+# States whose timeout_at is still being watched
+TIMEOUT_STATES = (
+    ConversationState.INITIATED.value,
+    ConversationState.WAITING.value,
+    ConversationState.FOLLOW_UP.value,
+)
+
 
 class TimeoutMonitor:
     """
@@ -31,78 +45,125 @@ class TimeoutMonitor:
     4. Tracking timeout events in conversation history
     """
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
         """
         Initialize timeout monitor
 
         Args:
             db: Database session
+            batch_size: Conversations claimed per batch (default: settings.TIMEOUT_BATCH_SIZE)
         """
         self.db = db
+        self.batch_size = batch_size or settings.TIMEOUT_BATCH_SIZE
         self.config = get_interaction_config()
         self.message_bus = get_message_bus()
         self.escalation_service = EscalationService(db)
 
-    async def check_timeouts(self) -> dict:
+    async def check_timeouts(self, max_batches: Optional[int] = None) -> dict:
         """
         Check all conversations for timeouts and handle appropriately
 
+        Claims due conversations batch by batch, in timeout_at order, until
+        none are left (or max_batches were handled). Each batch is committed
+        once.
+
+        Args:
+            max_batches: Optional cap on batches handled in this sweep
+
         Returns:
             Dictionary with statistics about timeouts processed
         """
         now = datetime.utcnow()
+        stats = _new_stats(now)
+        cursor = None
 
-        # Find conversations that have timed out
-        timed_out_conversations = await self._find_timed_out_conversations(now)
+        while max_batches is None or stats["batches"] < max_batches:
+            conversations = await self._claim_batch(now, cursor)
+            if not conversations:
+                break
 
-        stats = {
-            "checked_at": now.isoformat(),
-            "total_timed_out": len(timed_out_conversations),
-            "follow_ups_sent": 0,
-            "escalations_triggered": 0,
-            "errors": []
-        }
+            # Handling moves timeout_at, so the keyset cursor is taken first
+            cursor = (conversations[-1].timeout_at, conversations[-1].id)
+            await self._handle_batch(conversations, stats)
+            await self.db.commit()
 
-        for conversation in timed_out_conversations:
-            try:
-                await self._handle_timeout(conversation, stats)
-            except Exception as e:
-                stats["errors"].append({
-                    "conversation_id": str(conversation.id),
-                    "error": str(e)
-                })
+            stats["batches"] += 1
+            stats["total_timed_out"] += len(conversations)
 
         return stats
 
-    async def _find_timed_out_conversations(self, now: datetime) -> List[Conversation]:
+    async def _claim_batch(
+        self,
+        now: datetime,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Conversation]:
         """
-        Find conversations that have timed out
+        Claim the next batch of timed out conversations
 
         Args:
-            now: Current timestamp
+            now: Sweep start; conversations due by then are claimed
+            after: (timeout_at, id) of the last conversation already handled
 
         Returns:
-            List of timed out conversations
+            Up to batch_size timed out conversations
+        """
+        result = await self.db.execute(self._claim_statement(now, after))
+        return list(result.scalars().all())
+
+    def _claim_statement(self, now: datetime, after: Optional[Tuple[datetime, UUID]] = None):
+        """
+        Build the claim query
+
+        Rows are locked until the batch commits; rows another sweep has
+        locked are skipped rather than waited on. SQLite has no row locks and
+        drops the clause.
         """
-        # Query for conversations with timeout_at < now and in active states
-        stmt = select(Conversation).where(
-            and_(
-                Conversation.timeout_at.is_not(None),
+        stmt = (
+            select(Conversation)
+            .where(
                 Conversation.timeout_at <= now,
-                Conversation.current_state.in_([
-                    ConversationState.INITIATED.value,
-                    ConversationState.WAITING.value,
-                    ConversationState.FOLLOW_UP.value
-                ])
+                Conversation.current_state.in_(TIMEOUT_STATES)
             )
+            .order_by(Conversation.timeout_at, Conversation.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .execution_options(populate_existing=True)
         )
+        if after is not None:
+            stmt = stmt.where(tuple_(Conversation.timeout_at, Conversation.id) > after)
+        return stmt
 
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+    async def _handle_batch(self, conversations: List[Conversation], stats: dict) -> None:
+        """
+        Handle a claimed batch inside the current transaction
+
+        Askers and responders are loaded with one query, so the follow-up and
+        escalation paths find them in the session instead of querying each.
+
+        Args:
+            conversations: Claimed conversations
+            stats: Statistics dictionary to update
+        """
+        member_ids = {c.asker_id for c in conversations} | {c.current_responder_id for c in conversations}
+        result = await self.db.execute(select(SquadMember).where(SquadMember.id.in_(member_ids)))
+        members = result.scalars().all()  # Held so the session's identity map keeps them
+
+        for conversation in conversations:
+            conversation_id = conversation.id  # Readable after a rollback expires the row
+            try:
+                async with self.db.begin_nested():
+                    await self._handle_timeout(conversation, stats)
+            except Exception as e:
+                stats["errors"].append({
+                    "conversation_id": str(conversation_id),
+                    "error": str(e)
+                })
+
+        del members
 
     async def _handle_timeout(self, conversation: Conversation, stats: dict) -> None:
         """
-        Handle a timed out conversation
+        Handle a timed out conversation (flushes; the caller commits)
 
         Decides whether to:
         - Send follow-up message (first timeout)
@@ -112,50 +173,34 @@ class TimeoutMonitor:
             conversation: Timed out conversation
             stats: Statistics dictionary to update
         """
-        # Count how many timeout events have already occurred
-        stmt = select(ConversationEvent).where(
-            and_(
-                ConversationEvent.conversation_id == conversation.id,
-                ConversationEvent.event_type == "timeout"
-            )
-        )
-        result = await self.db.execute(stmt)
-        timeout_events = result.scalars().all()
-        timeout_count = len(timeout_events)
-
-        if timeout_count < self.config.timeouts.max_retries:
+        if conversation.timeout_count < self.config.timeouts.max_retries:
             # Send follow-up message
             await self._send_follow_up(conversation)
             stats["follow_ups_sent"] += 1
         else:
-            # Exceeded retry limit - escalate
-            success = await self.escalation_service.escalate_conversation(
+            # Exceeded retry limit - escalate (or mark unresolvable when no next level exists)
+            await self.escalation_service.escalate_conversation(
                 conversation_id=conversation.id,
                 reason="timeout",
-                triggered_by_agent_id=None  # System triggered
+                triggered_by_agent_id=None,  # System triggered
+                commit=False
             )
-
-            if success:
-                stats["escalations_triggered"] += 1
-            else:
-                # No next level available - conversation already marked as unresolvable
-                stats["escalations_triggered"] += 1  # Count unresolvable as escalation attempt
+            stats["escalations_triggered"] += 1  # Unresolvable counts as an escalation attempt
 
     async def _send_follow_up(self, conversation: Conversation) -> None:
         """
         Send a follow-up message for a timed out conversation
 
-        Updates conversation state to FOLLOW_UP and sends reminder message
+        Updates conversation state to FOLLOW_UP, bumps the timeout counter
+        and sends reminder message
 
         Args:
             conversation: Timed out conversation
         """
-        from datetime import timedelta
-        from uuid import uuid4
-
         # Update conversation state
         old_state = conversation.current_state
         conversation.current_state = ConversationState.FOLLOW_UP.value
+        conversation.timeout_count += 1
 
         # Set new timeout for retry
         conversation.timeout_at = datetime.utcnow() + timedelta(
@@ -163,11 +208,7 @@ class TimeoutMonitor:
         )
 
         # Get responder for follow-up message recipient
-        stmt = select(SquadMember).where(
-            SquadMember.id == conversation.current_responder_id
-        )
-        result = await self.db.execute(stmt)
-        responder = result.scalar_one_or_none()
+        responder = await self.db.get(SquadMember, conversation.current_responder_id)
 
         # Send follow-up message via message bus
         follow_up_msg = self.config.get_message_template("follow_up")
@@ -198,23 +239,62 @@ class TimeoutMonitor:
         )
 
         self.db.add(event)
-        await self.db.commit()
+        await self.db.flush()
+
+
+def _new_stats(now: datetime) -> dict:
+    return {
+        "checked_at": now.isoformat(),
+        "batches": 0,
+        "total_timed_out": 0,
+        "follow_ups_sent": 0,
+        "escalations_triggered": 0,
+        "errors": []
+    }
 
 
 # Celery task wrapper
-async def check_conversation_timeouts() -> dict:
+async def check_conversation_timeouts(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]] = get_db_context,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> dict:
     """
     Celery task: Check all conversations for timeouts
 
     This task should be run periodically (e.g., every 60 seconds)
-    via Celery Beat.
+    via Celery Beat. Runs several sweeps concurrently, each in its own
+    session; row locks keep their batches disjoint, so on databases without
+    SKIP LOCKED (SQLite) a single sweep runs.
+
+    Args:
+        session_factory: Async context manager factory yielding sessions
+        workers: Concurrent sweeps (default: settings.TIMEOUT_WORKERS)
+        batch_size: Conversations per batch (default: settings.TIMEOUT_BATCH_SIZE)
 
     Returns:
-        Dictionary with timeout processing statistics
+        Dictionary with timeout processing statistics, summed over sweeps
     """
-    async with get_db_context() as db:
-        monitor = TimeoutMonitor(db)
-        return await monitor.check_timeouts()
+    workers = workers or settings.TIMEOUT_WORKERS
+
+    async def sweep(db: AsyncSession) -> dict:
+        return await TimeoutMonitor(db, batch_size=batch_size).check_timeouts()
+
+    async def extra_sweep() -> dict:
+        async with session_factory() as db:
+            return await sweep(db)
+
+    async with session_factory() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            workers = 1
+        results = await asyncio.gather(sweep(db), *(extra_sweep() for _ in range(workers - 1)))
+
+    stats = dict(results[0], errors=list(results[0]["errors"]))
+    for other in results[1:]:
+        for key in ("batches", "total_timed_out", "follow_ups_sent", "escalations_triggered"):
+            stats[key] += other[key]
+        stats["errors"].extend(other["errors"])
+    return stats
 
 
 # Additional helper for manual timeout checks (useful for testing)
@@ -256,17 +336,14 @@ async def check_specific_conversation_timeout(conversation_id: UUID) -> dict:
             }
 
         # Handle timeout
-        stats = {
-            "checked_at": now.isoformat(),
-            "total_timed_out": 1,
-            "follow_ups_sent": 0,
-            "escalations_triggered": 0,
-            "errors": []
-        }
+        stats = _new_stats(now)
+        stats["total_timed_out"] = 1
 
         try:
             await monitor._handle_timeout(conversation, stats)
+            await db.commit()
         except Exception as e:
+            await db.rollback()
             stats["errors"].append({
                 "conversation_id": str(conversation_id),
                 "error": str(e)
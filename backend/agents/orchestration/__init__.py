@@ -6,10 +6,15 @@ Manages task execution workflows, agent coordination, and task delegation.
 from backend.agents.orchestration.orchestrator import TaskOrchestrator
 from backend.agents.orchestration.workflow_engine import WorkflowEngine, WorkflowState
 from backend.agents.orchestration.delegation_engine import DelegationEngine
+from backend.agents.orchestration.load_index import AgentLoadIndex, get_agent_load_index
+from backend.agents.orchestration.dag_executor import DynamicTaskExecutor
 
 __all__ = [
     "TaskOrchestrator",
     "WorkflowEngine",
     "WorkflowState",
     "DelegationEngine",
+    "AgentLoadIndex",
+    "get_agent_load_index",
+    "DynamicTaskExecutor",
 ]
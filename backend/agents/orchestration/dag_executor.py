@@ -0,0 +1,260 @@
+"""
+Dynamic Task DAG Executor
+
+Runs an execution's DynamicTasks as a dependency DAG (task_dependencies):
+every task whose blockers have completed is dispatched to its agent at
+once, within per-agent and per-squad concurrency limits. Among ready tasks
+the one heading the longest remaining chain (critical path) goes first.
+
+Progress is the tasks' own status column (in_progress, completed, failed,
+blocked), written through PhaseBasedWorkflowEngine.update_task_status, so a
+restarted run skips completed tasks and re-runs the ones that were in
+flight.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.database import get_db_context
+from backend.agents.orchestration.load_index import AgentLoadIndex, get_agent_load_index
+from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.agents.orchestration.task_graph import critical_path_lengths
+from backend.models.project import TaskExecution
+from backend.models.workflow import DynamicTask, task_dependencies
+
+logger = logging.getLogger(__name__)
+
+# Runs one task for one agent; raising marks the task failed
+TaskRunner = Callable[[DynamicTask, UUID], Awaitable[Any]]
+
+# Tasks running per squad in this process, shared by all executors
+_squad_running: Dict[UUID, int] = {}
+
+
+class DynamicTaskExecutor:
+    """
+    Concurrent executor for an execution's DynamicTask DAG
+
+    Usage:
+        executor = DynamicTaskExecutor(runner=run_task)
+        report = await executor.run(execution_id)
+    """
+
+    def __init__(
+        self,
+        runner: TaskRunner,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]] = get_db_context,
+        agent_concurrency: Optional[int] = None,
+        squad_concurrency: Optional[int] = None,
+        assign: Optional[Callable[[DynamicTask], UUID]] = None,
+        estimate: Optional[Callable[[DynamicTask], float]] = None,
+        load_index: Optional[AgentLoadIndex] = None,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Initialize executor
+
+        Args:
+            runner: Coroutine function run as runner(task, agent_id)
+            session_factory: Async context manager factory yielding sessions
+            agent_concurrency: Tasks one agent runs at once (default: settings.DAG_AGENT_CONCURRENCY)
+            squad_concurrency: Tasks one squad runs at once in this process
+                (default: settings.DAG_SQUAD_CONCURRENCY)
+            assign: Picks the agent for a task (default: the agent that spawned it)
+            estimate: Relative task duration for critical-path ranking (default: 1 per task)
+            load_index: Index that running tasks are counted in (default: process-wide)
+            poll_interval: Seconds to wait when only other executors hold the squad's slots
+        """
+        self.runner = runner
+        self.session_factory = session_factory
+        self.agent_concurrency = agent_concurrency or settings.DAG_AGENT_CONCURRENCY
+        self.squad_concurrency = squad_concurrency or settings.DAG_SQUAD_CONCURRENCY
+        self.assign = assign or (lambda task: task.spawned_by_agent_id)
+        self.estimate = estimate or (lambda task: 1.0)
+        self.load_index = load_index or get_agent_load_index()
+        self.poll_interval = poll_interval
+
+    async def run(self, execution_id: UUID) -> Dict[str, Any]:
+        """
+        Run every unfinished task of an execution
+
+        Args:
+            execution_id: Parent task execution
+
+        Returns:
+            Report with completed/failed/blocked task IDs, wall and busy
+            time, and the parallelism achieved (busy time over wall time,
+            i.e. the speed-up over running the same tasks one by one)
+
+        Raises:
+            ValueError: If execution not found
+        """
+        squad_id, tasks, blockers = await self._load_graph(execution_id)
+
+        done = {tid for tid, t in tasks.items() if t.status == "completed"}
+        failed = {tid for tid, t in tasks.items() if t.status == "failed"}
+        dependents: Dict[UUID, List[UUID]] = {tid: [] for tid in tasks}
+        for tid, task_blockers in blockers.items():
+            for blocker in task_blockers:
+                dependents[blocker].append(tid)
+
+        pending = [tid for tid in tasks if tid not in done and tid not in failed]
+        waiting_on = {tid: len(blockers[tid] - done) for tid in pending}
+        pending_set = set(pending)
+        rank = critical_path_lengths(
+            {tid: [d for d in dependents[tid] if d in pending_set] for tid in pending},
+            lambda tid: self.estimate(tasks[tid]),
+        )
+        order = {tid: i for i, tid in enumerate(tasks)}  # Creation order breaks rank ties
+
+        report = {
+            "execution_id": str(execution_id),
+            "completed": [],
+            "failed": [],
+            "blocked": [],
+            "skipped": len(done),
+            "errors": {},
+            "max_concurrency": 0,
+            "critical_path": max(rank.values(), default=0.0),
+        }
+
+        # Dependents of failed tasks (from earlier runs too) can never run
+        unreachable = self._downstream(failed, dependents) - done
+        for tid in unreachable:
+            waiting_on.pop(tid, None)
+
+        ready = [(-rank[tid], order[tid], tid) for tid, count in waiting_on.items() if count == 0]
+        heapq.heapify(ready)
+        running: Dict[asyncio.Task, UUID] = {}
+        agent_running: Dict[UUID, int] = {}
+        busy_time = 0.0
+        started = time.monotonic()
+
+        try:
+            while ready or running:
+                deferred = []
+                while ready and _squad_running.get(squad_id, 0) < self.squad_concurrency:
+                    item = heapq.heappop(ready)
+                    agent_id = self.assign(tasks[item[2]])
+                    if agent_running.get(agent_id, 0) >= self.agent_concurrency:
+                        deferred.append(item)
+                        continue
+                    agent_running[agent_id] = agent_running.get(agent_id, 0) + 1
+                    _squad_running[squad_id] = _squad_running.get(squad_id, 0) + 1
+                    job = asyncio.create_task(self._run_task(tasks[item[2]], agent_id))
+                    running[job] = item[2]
+                for item in deferred:
+                    heapq.heappush(ready, item)
+                report["max_concurrency"] = max(report["max_concurrency"], len(running))
+
+                if not running:
+                    # Ready work, but other executors hold every squad slot
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for job in finished:
+                    tid = running.pop(job)
+                    agent_id = self.assign(tasks[tid])
+                    agent_running[agent_id] -= 1
+                    _squad_running[squad_id] -= 1
+
+                    elapsed, error = job.result()
+                    busy_time += elapsed
+                    if error is None:
+                        report["completed"].append(str(tid))
+                        for dependent in dependents[tid]:
+                            if dependent in waiting_on:
+                                waiting_on[dependent] -= 1
+                                if waiting_on[dependent] == 0:
+                                    heapq.heappush(ready, (-rank[dependent], order[dependent], dependent))
+                    else:
+                        report["failed"].append(str(tid))
+                        report["errors"][str(tid)] = error
+                        newly_unreachable = self._downstream({tid}, dependents) - done - unreachable
+                        for dependent in newly_unreachable:
+                            waiting_on.pop(dependent, None)
+                        unreachable |= newly_unreachable
+        finally:
+            for job, tid in running.items():
+                job.cancel()
+                _squad_running[squad_id] -= 1
+
+        # Left over: downstream of a failure, or on a dependency cycle
+        stuck = unreachable | {tid for tid, count in waiting_on.items() if count > 0}
+        if stuck:
+            await self._set_status(sorted(stuck, key=order.get), "blocked")
+        report["blocked"] = [str(tid) for tid in sorted(stuck, key=order.get)]
+
+        wall_time = time.monotonic() - started
+        report["wall_time"] = wall_time
+        report["busy_time"] = busy_time
+        report["parallelism"] = busy_time / wall_time if wall_time > 0 else 0.0
+        return report
+
+    async def _run_task(self, task: DynamicTask, agent_id: UUID):
+        """Run one task, persisting its status; returns (seconds, error or None)"""
+        await self._set_status([task.id], "in_progress")
+        started = time.monotonic()
+        error = None
+        try:
+            with self.load_index.track(agent_id, "tasks"):
+                await self.runner(task, agent_id)
+        except Exception as e:
+            logger.warning(f"Dynamic task {task.id} failed: {e}")
+            error = str(e) or type(e).__name__
+        elapsed = time.monotonic() - started
+        await self._set_status([task.id], "failed" if error else "completed")
+        return elapsed, error
+
+    async def _set_status(self, task_ids: List[UUID], status: str) -> None:
+        """Persist status changes (committed, with the usual SSE events)"""
+        engine = PhaseBasedWorkflowEngine()
+        async with self.session_factory() as db:
+            for task_id in task_ids:
+                await engine.update_task_status(db, task_id, status)
+
+    async def _load_graph(self, execution_id: UUID):
+        """Load the execution's squad, tasks and blocker sets (three queries)"""
+        async with self.session_factory() as db:
+            execution = await db.get(TaskExecution, execution_id)
+            if execution is None:
+                raise ValueError(f"Task execution {execution_id} not found")
+
+            result = await db.execute(
+                select(DynamicTask)
+                .where(DynamicTask.parent_execution_id == execution_id)
+                .order_by(DynamicTask.created_at, DynamicTask.id)
+            )
+            tasks = {task.id: task for task in result.scalars().all()}
+
+            result = await db.execute(
+                select(task_dependencies.c.task_id, task_dependencies.c.blocks_task_id)
+                .where(task_dependencies.c.blocks_task_id.in_(list(tasks)))
+            )
+            blockers: Dict[UUID, Set[UUID]] = {tid: set() for tid in tasks}
+            for blocker, blocked in result.all():
+                if blocker in tasks:  # Edges to other executions' tasks are ignored
+                    blockers[blocked].add(blocker)
+
+        return execution.squad_id, tasks, blockers
+
+    @staticmethod
+    def _downstream(roots: Set[UUID], dependents: Dict[UUID, List[UUID]]) -> Set[UUID]:
+        """Every task reachable from roots (excluding the roots)"""
+        seen: Set[UUID] = set()
+        stack = [d for root in roots for d in dependents[root]]
+        while stack:
+            tid = stack.pop()
+            if tid not in seen:
+                seen.add(tid)
+                stack.extend(dependents[tid])
+        return seen - roots
+
@@ -3,12 +3,20 @@ Delegation Engine
 
 Analyzes tasks and intelligently delegates work to the most appropriate agents.
 Handles load balancing, skill matching, and task breakdown.
+
+Assignment is load-aware: among the members whose score is within
+DELEGATION_SCORE_TOLERANCE of the best, the one with the least in-flight work
+(AgentLoadIndex) is picked, or the lighter of two random ones
+(power-of-two choices).
 """
+import random
 from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.config import settings
+from backend.agents.orchestration.load_index import AgentLoadIndex, get_agent_load_index
 from backend.models.squad import SquadMember
 
 if TYPE_CHECKING:
@@ -37,9 +45,27 @@ class DelegationEngine:
         "design": ["designer", "frontend_developer"],
     }
 
-    def __init__(self):
-        """Initialize delegation engine"""
-        pass
+    STRATEGIES = ("least_loaded", "power_of_two", "score")
+
+    def __init__(
+        self,
+        load_index: Optional[AgentLoadIndex] = None,
+        strategy: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize delegation engine
+
+        Args:
+            load_index: In-flight work index (default: process-wide index)
+            strategy: least_loaded, power_of_two or score (default: settings.DELEGATION_STRATEGY)
+            rng: Random source for power_of_two (seedable for simulations)
+        """
+        self.load_index = load_index or get_agent_load_index()
+        self.strategy = strategy or settings.DELEGATION_STRATEGY
+        if self.strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown delegation strategy: {self.strategy}")
+        self.rng = rng or random.Random()
 
     async def analyze_task_requirements(
         self,
@@ -122,7 +148,8 @@ class DelegationEngine:
         exclude_ids: Optional[List[UUID]] = None,
     ) -> Optional[SquadMember]:
         """
-        Find the best agent for the task requirements.
+        Find the best agent for the task requirements, spreading work over
+        comparable members by their in-flight load.
 
         Args:
             db: Database session
@@ -144,24 +171,85 @@ class DelegationEngine:
         if exclude_ids:
             members = [m for m in members if m.id not in exclude_ids]
 
+        if not members:
+            return None
+
+        await self.load_index.refresh(db, squad_id, [m.id for m in members])
+        return self.choose_agent(members, requirements)
+
+    def choose_agent(
+        self,
+        members: List[SquadMember],
+        requirements: Dict[str, Any],
+    ) -> Optional[SquadMember]:
+        """
+        Pick a member by score and current load (no I/O).
+
+        Members within DELEGATION_SCORE_TOLERANCE of the best score are
+        candidates. least_loaded takes the candidate with the fewest in-flight
+        items, power_of_two the lighter of two random candidates; ties go to
+        the higher score, then to member order. score ignores load.
+
+        Args:
+            members: Eligible squad members
+            requirements: Task requirements from analyze_task_requirements
+
+        Returns:
+            Chosen squad member or None
+        """
+        if not members:
+            return None
+
         # Get required roles based on task type
         task_type = requirements.get("task_type", "general")
         preferred_roles = self.TASK_TYPE_PRIORITIES.get(task_type, [])
 
-        # Score each agent
-        scored_agents = []
-        for member in members:
-            score = self._score_agent(member, requirements, preferred_roles)
-            scored_agents.append((member, score))
-
-        # Sort by score (descending)
+        # Score each agent (stable sort keeps member order among equal scores)
+        scored_agents = [
+            (member, self._score_agent(member, requirements, preferred_roles))
+            for member in members
+        ]
         scored_agents.sort(key=lambda x: x[1], reverse=True)
 
-        # Return best agent
-        if scored_agents:
+        if self.strategy == "score":
             return scored_agents[0][0]
 
-        return None
+        best_score = scored_agents[0][1]
+        candidates = [
+            (member, score) for member, score in scored_agents
+            if score >= best_score - settings.DELEGATION_SCORE_TOLERANCE
+        ]
+        if self.strategy == "power_of_two" and len(candidates) > 2:
+            candidates = self.rng.sample(candidates, 2)
+
+        member, _ = min(
+            candidates,
+            key=lambda c: (self.load_index.queue_depth(c[0].id), -c[1]),
+        )
+        return member
+
+    async def get_queue_depths(self, db: AsyncSession, squad_id: UUID) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-member in-flight work of a squad.
+
+        Conversation counts cover all workers; task and LLM call counts are
+        this process's own.
+
+        Args:
+            db: Database session
+            squad_id: Squad UUID
+
+        Returns:
+            Dictionary keyed by member ID with role and load counters
+        """
+        from backend.services.agent_service import AgentService
+        members = await AgentService.get_squad_members(db, squad_id, active_only=True)
+        await self.load_index.refresh(db, squad_id, [m.id for m in members])
+
+        return {
+            str(member.id): {"role": member.role, **self.load_index.get(member.id).to_dict()}
+            for member in members
+        }
 
     async def delegate_to_agent(
         self,
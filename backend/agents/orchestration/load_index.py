@@ -0,0 +1,174 @@
+"""
+Agent Load Index
+
+Live per-member count of in-flight work, used for load-aware delegation:
+- conversations: open conversations the member has to answer (from the
+  database, re-counted per squad at most every AGENT_LOAD_REFRESH_SECONDS)
+- tasks: work handed to the member and not yet finished (in-process)
+- llm_calls: LLM calls the member is running (in-process)
+
+The in-process counters are maintained with track(); they cover this worker
+only, the conversation counts cover every worker.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.conversation import Conversation, ConversationState
+
+# Conversation states that still wait on the current responder
+OPEN_CONVERSATION_STATES = (
+    ConversationState.INITIATED.value,
+    ConversationState.WAITING.value,
+    ConversationState.FOLLOW_UP.value,
+    ConversationState.ESCALATING.value,
+    ConversationState.ESCALATED.value,
+)
+
+LOAD_KINDS = ("conversations", "tasks", "llm_calls")
+
+
+@dataclass
+class AgentLoad:
+    """In-flight work of one squad member"""
+    conversations: int = 0
+    tasks: int = 0
+    llm_calls: int = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.conversations + self.tasks + self.llm_calls
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "conversations": self.conversations,
+            "tasks": self.tasks,
+            "llm_calls": self.llm_calls,
+            "queue_depth": self.queue_depth,
+        }
+
+
+class AgentLoadIndex:
+    """
+    In-process index of per-member in-flight work
+
+    Reads are dictionary lookups; the only query is the per-squad
+    conversation count in refresh().
+    """
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        """
+        Initialize load index
+
+        Args:
+            refresh_seconds: Seconds a squad's conversation counts are reused
+                (default: settings.AGENT_LOAD_REFRESH_SECONDS)
+        """
+        self.refresh_seconds = (
+            settings.AGENT_LOAD_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._loads: Dict[UUID, AgentLoad] = {}
+        self._refreshed_at: Dict[UUID, float] = {}
+
+    def get(self, member_id: UUID) -> AgentLoad:
+        """Current load of a member (zero when nothing is tracked)"""
+        return self._loads.get(member_id) or AgentLoad()
+
+    def queue_depth(self, member_id: UUID) -> int:
+        """Total in-flight items of a member"""
+        return self.get(member_id).queue_depth
+
+    def add(self, member_id: UUID, kind: str, delta: int = 1) -> None:
+        """
+        Adjust an in-process counter
+
+        Args:
+            member_id: Squad member ID
+            kind: "tasks" or "llm_calls" (conversations come from refresh())
+            delta: Amount to add (negative to release)
+        """
+        if kind not in LOAD_KINDS:
+            raise ValueError(f"Unknown load kind: {kind}")
+        load = self._loads.setdefault(member_id, AgentLoad())
+        setattr(load, kind, max(getattr(load, kind) + delta, 0))
+
+    @contextmanager
+    def track(self, member_id: Optional[UUID], kind: str) -> Iterator[None]:
+        """
+        Count a unit of work for a member while the block runs
+
+        Usage:
+            with get_agent_load_index().track(agent_id, "llm_calls"):
+                response = agent.run(message)
+        """
+        if member_id is None:
+            yield
+            return
+        self.add(member_id, kind)
+        try:
+            yield
+        finally:
+            self.add(member_id, kind, -1)
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        squad_id: UUID,
+        member_ids: Iterable[UUID],
+        force: bool = False,
+    ) -> None:
+        """
+        Re-count open conversations for a squad's members when stale
+
+        One grouped query; members without open conversations drop to zero.
+
+        Args:
+            db: Database session
+            squad_id: Squad UUID (refresh bookkeeping key)
+            member_ids: Members to count
+            force: Re-count even if the counts are fresh
+        """
+        now = time.monotonic()
+        refreshed_at = self._refreshed_at.get(squad_id)
+        if not force and refreshed_at is not None and now - refreshed_at < self.refresh_seconds:
+            return
+
+        member_ids = list(member_ids)
+        if not member_ids:
+            return
+
+        result = await db.execute(
+            select(Conversation.current_responder_id, func.count())
+            .where(
+                Conversation.current_responder_id.in_(member_ids),
+                Conversation.current_state.in_(OPEN_CONVERSATION_STATES),
+            )
+            .group_by(Conversation.current_responder_id)
+        )
+        counts = dict(result.all())
+
+        for member_id in member_ids:
+            self._loads.setdefault(member_id, AgentLoad()).conversations = counts.get(member_id, 0)
+        self._refreshed_at[squad_id] = now
+
+    def clear(self) -> None:
+        """Forget all counts"""
+        self._loads.clear()
+        self._refreshed_at.clear()
+
+
+_agent_load_index: Optional[AgentLoadIndex] = None
+
+
+def get_agent_load_index() -> AgentLoadIndex:
+    """Get the process-wide agent load index"""
+    global _agent_load_index
+    if _agent_load_index is None:
+        _agent_load_index = AgentLoadIndex()
+    return _agent_load_index
@@ -311,6 +311,7 @@ class TaskOrchestrator:
             execution_id=execution_id,
             level="info",
             message="Project Manager analyzing task requirements",
+            buffered=True,  # Progress note; written with the next log batch
         )
 
         # In Phase 4, this would:
@@ -352,6 +353,7 @@ class TaskOrchestrator:
             execution_id=execution_id,
             level="info",
             message="Creating implementation plan and breaking down work",
+            buffered=True,  # Progress note; written with the next log batch
         )
 
         # In Phase 4, this would:
@@ -392,6 +394,7 @@ class TaskOrchestrator:
             execution_id=execution_id,
             level="info",
             message="Tasks delegated to team members, work beginning",
+            buffered=True,  # Progress note; written with the next log batch
         )
 
         # In Phase 4, this would:
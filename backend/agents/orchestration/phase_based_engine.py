@@ -4,7 +4,7 @@ Phase-Based Workflow Engine
 Extends the existing WorkflowEngine to support Hephaestus-style phase-based workflows
 where agents can spawn tasks dynamically in any phase (Investigation, Building, Validation).
 """
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 import logging
@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
+from backend.agents.guardian.workflow_snapshot import invalidate_workflow_snapshot
 from backend.agents.orchestration.workflow_engine import WorkflowEngine, WorkflowState
 from backend.models.workflow import WorkflowPhase, DynamicTask, task_dependencies
 from backend.models.project import TaskExecution
@@ -95,6 +96,7 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
             )
         
         await db.commit()
+        invalidate_workflow_snapshot(execution_id)
         
         # Refresh the task to get updated state
         await db.refresh(dynamic_task)
@@ -136,7 +138,7 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
         Validates:
         - No self-dependencies
         - All blocked tasks exist
-        - No circular dependencies (basic check)
+        - No circular dependencies
         
         Args:
             db: Database session
@@ -172,9 +174,14 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
                 f"Blocked tasks not found: {sorted(missing_ids)}"
             )
         
-        # Check for basic circular dependency (task_id blocking itself indirectly)
-        # Note: Full circular dependency detection would require graph traversal
-        # This is a basic check - full detection can be added later if needed
+        # Reject circular dependencies: task_id must not already be reachable
+        # from a task it is about to block (one recursive query)
+        cycle_via = await self._find_cycle_via(db, task_id, blocking_task_ids)
+        if cycle_via is not None:
+            raise ValueError(
+                f"Dependency cycle: task {cycle_via} already blocks task {task_id} "
+                f"(directly or through other tasks)"
+            )
         
         # Bulk insert all dependencies in one query (much faster than N inserts)
         values = [
@@ -192,6 +199,41 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
                 f"Failed to create dependencies. Some may already exist: {e}"
             ) from e
 
+    async def _find_cycle_via(
+        self,
+        db: AsyncSession,
+        task_id: UUID,
+        blocked_task_ids: List[UUID],
+    ) -> Optional[UUID]:
+        """
+        Find a blocked task from which task_id is already reachable.
+        
+        Follows task_dependencies edges with a recursive CTE (UNION stops on
+        cycles already in the table).
+        
+        Args:
+            db: Database session
+            task_id: Task that would block the others
+            blocked_task_ids: Tasks it would block
+            
+        Returns:
+            The first blocked task that leads back to task_id, or None
+        """
+        edges = task_dependencies.c
+        reachable = (
+            select(edges.task_id.label("root"), edges.blocks_task_id.label("task_id"))
+            .where(edges.task_id.in_(blocked_task_ids))
+            .cte("reachable", recursive=True)
+        )
+        reachable = reachable.union(
+            select(reachable.c.root, edges.blocks_task_id)
+            .join(reachable, edges.task_id == reachable.c.task_id)
+        )
+        result = await db.execute(
+            select(reachable.c.root).where(reachable.c.task_id == task_id).limit(1)
+        )
+        return result.scalar_one_or_none()
+
     async def get_tasks_for_execution(
         self,
         db: AsyncSession,
@@ -301,6 +343,7 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
         
         try:
             await db.commit()
+            invalidate_workflow_snapshot(task.parent_execution_id)
             await db.refresh(task)
             
             logger.info(
@@ -331,6 +374,30 @@ class PhaseBasedWorkflowEngine(WorkflowEngine):
         
         return task
 
+    async def execute_tasks(
+        self,
+        execution_id: UUID,
+        runner: Callable[[DynamicTask, UUID], Awaitable[Any]],
+        **options: Any,
+    ) -> Dict[str, Any]:
+        """
+        Run an execution's dynamic tasks as a DAG, concurrently.
+
+        Ready tasks are dispatched as soon as their blockers complete; see
+        DynamicTaskExecutor for the concurrency limits and options.
+
+        Args:
+            execution_id: Parent execution ID
+            runner: Coroutine function run as runner(task, agent_id)
+            **options: DynamicTaskExecutor options (agent_concurrency, squad_concurrency, ...)
+
+        Returns:
+            Execution report with the parallelism achieved
+        """
+        # Lazy import: the executor persists status through this engine
+        from backend.agents.orchestration.dag_executor import DynamicTaskExecutor
+        return await DynamicTaskExecutor(runner, **options).run(execution_id)
+
     async def get_blocked_tasks(
         self,
         db: AsyncSession,
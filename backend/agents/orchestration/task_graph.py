@@ -0,0 +1,149 @@
+"""
+Task Dependency Graph Algorithms
+
+Graph helpers shared by task ordering (WorkflowIntelligence) and execution
+(DynamicTaskExecutor). A graph maps each node to the nodes it blocks; edges
+to nodes outside the mapping are ignored.
+
+All functions are iterative and O(V + E) (the ordering O((V + E) log V)),
+so they are safe on graphs with tens of thousands of tasks.
+"""
+import heapq
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Sequence, Tuple, TypeVar
+
+Node = TypeVar("Node", bound=Hashable)
+
+
+def strongly_connected_components(graph: Mapping[Node, Sequence[Node]]) -> List[List[Node]]:
+    """
+    Dependency cycles, as strongly connected components (Tarjan)
+
+    Args:
+        graph: Node -> nodes it blocks
+
+    Returns:
+        Every component with more than one node (or a node blocking itself),
+        nodes in graph order, components in order of their first node
+    """
+    position = {node: i for i, node in enumerate(graph)}
+    index: Dict[Node, int] = {}
+    lowlink: Dict[Node, int] = {}
+    on_stack = set()
+    stack: List[Node] = []
+    components: List[List[Node]] = []
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in position:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph[node]:
+                        components.append(sorted(component, key=position.get))
+
+    components.sort(key=lambda c: position[c[0]])
+    return components
+
+
+def critical_path_lengths(
+    graph: Mapping[Node, Sequence[Node]],
+    weight: Callable[[Node], float] = lambda node: 1.0,
+) -> Dict[Node, float]:
+    """
+    Longest weighted chain from each node to the end of the graph
+
+    Nodes on a cycle (and their blockers' paths through it) count only what
+    can be reached without going round the cycle.
+
+    Args:
+        graph: Node -> nodes it blocks
+        weight: Node duration estimate (default: 1 per node)
+
+    Returns:
+        Node -> its own weight plus the heaviest chain it blocks
+    """
+    successors = {node: [s for s in graph[node] if s in graph] for node in graph}
+    blockers: Dict[Node, List[Node]] = {node: [] for node in graph}
+    for node, blocked in successors.items():
+        for successor in blocked:
+            blockers[successor].append(node)
+
+    length = {node: weight(node) for node in graph}
+    remaining = {node: len(blocked) for node, blocked in successors.items()}
+    stack = [node for node, count in remaining.items() if count == 0]
+
+    while stack:
+        node = stack.pop()
+        for blocker in blockers[node]:
+            length[blocker] = max(length[blocker], weight(blocker) + length[node])
+            remaining[blocker] -= 1
+            if remaining[blocker] == 0:
+                stack.append(blocker)
+    return length
+
+
+def prioritized_topological_order(
+    graph: Mapping[Node, Sequence[Node]],
+    key: Callable[[Node], Any],
+) -> Tuple[List[Node], List[List[Node]]]:
+    """
+    Kahn ordering that always takes the ready node with the smallest key
+
+    Args:
+        graph: Node -> nodes it blocks
+        key: Sort key among ready nodes (smaller goes first; must be comparable)
+
+    Returns:
+        (order, cycles): every node not on or behind a cycle in dependency
+        order, and the cycles (strongly connected components) that kept the
+        rest from being ordered
+    """
+    position = {node: i for i, node in enumerate(graph)}
+    successors = {node: [s for s in graph[node] if s in position] for node in graph}
+    in_degree = dict.fromkeys(graph, 0)
+    for blocked in successors.values():
+        for successor in blocked:
+            in_degree[successor] += 1
+
+    ready = [(key(node), position[node], node) for node, degree in in_degree.items() if degree == 0]
+    heapq.heapify(ready)
+    order: List[Node] = []
+
+    while ready:
+        _, _, node = heapq.heappop(ready)
+        order.append(node)
+        for successor in successors[node]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                heapq.heappush(ready, (key(successor), position[successor], successor))
+
+    cycles = strongly_connected_components(graph) if len(order) < len(position) else []
+    return order, cycles
@@ -12,6 +12,7 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.services.task_execution_service import TaskExecutionService
+from backend.services.execution_log_service import ExecutionLogService
 
 
 class WorkflowState(str, Enum):
@@ -174,27 +175,27 @@ class WorkflowEngine:
         # Update execution status
         log_message = reason or f"State transitioned from {from_state.value} to {to_state.value}"
 
+        # Transition metadata is logged in the same write as the status change
+        additional_logs = []
+        if metadata:
+            additional_logs.append(ExecutionLogService.build_entry(
+                "info",
+                "State transition metadata",
+                {
+                    "from_state": from_state.value,
+                    "to_state": to_state.value,
+                    **metadata,
+                },
+            ))
+
         await TaskExecutionService.update_execution_status(
             db=db,
             execution_id=execution_id,
             status=to_state.value,
             log_message=log_message,
+            additional_logs=additional_logs,
         )
 
-        # Store transition metadata
-        if metadata:
-            await TaskExecutionService.add_log(
-                db=db,
-                execution_id=execution_id,
-                level="info",
-                message=f"State transition metadata",
-                metadata={
-                    "from_state": from_state.value,
-                    "to_state": to_state.value,
-                    **metadata,
-                },
-            )
-
         # Execute state action if registered
         if to_state in self._state_actions:
             action = self._state_actions[to_state]
@@ -8,8 +8,9 @@ to the team, and monitors progress.
 This is the Agno-powered version that leverages persistent memory,
 session management, and the Agno framework for enhanced performance.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from uuid import UUID
+import logging
 
 from backend.agents.agno_base import AgnoSquadAgent, AgentConfig, AgentResponse
 from backend.schemas.agent_message import (
@@ -32,11 +33,14 @@ from backend.agents.guardian import (
     Recommendation,
     RecommendationsEngine,
     get_recommendations_engine,
+    invalidate_workflow_snapshot,
 )
 from backend.models.workflow import WorkflowPhase, DynamicTask
 from backend.models.guardian import CoherenceMetrics
 from backend.agents.discovery import Discovery
 
+logger = logging.getLogger(__name__)
+
 
 class TicketReview(Dict[str, Any]):
     """Result of PM + TL ticket review"""
@@ -587,38 +591,74 @@ class AgnoProjectManagerAgent(AgnoSquadAgent):
         Returns:
             CoherenceScore with overall score and detailed metrics
         """
+        scores = await self.check_squad_coherence(
+            db=db,
+            execution_id=execution_id,
+            phase=phase,
+            agent_ids=[agent_id],
+        )
+        coherence = scores[agent_id]
+        
+        logger.info(
+            f"PM {self._format_agent_name()} checked coherence for agent {agent_id}: "
+            f"{coherence.overall_score:.2f} (phase={phase.value})"
+        )
+        
+        return coherence
+
+    async def check_squad_coherence(
+        self,
+        db: Any,  # AsyncSession
+        execution_id: UUID,
+        phase: WorkflowPhase,
+        agent_ids: Optional[Iterable[UUID]] = None,
+    ) -> Dict[UUID, CoherenceScore]:
+        """
+        Check coherence of several agents at once and store the scores.
+        
+        Scores are calculated in one batch and written in one commit.
+        
+        Args:
+            db: Database session
+            execution_id: Task execution ID
+            phase: Current workflow phase
+            agent_ids: Agents to check (default: every agent that sent a message)
+            
+        Returns:
+            CoherenceScore by agent ID
+        """
         if not self.agent_id:
             raise ValueError("PM agent_id must be configured to monitor coherence")
         
         scorer = get_coherence_scorer()
         
-        coherence = await scorer.calculate_coherence(
+        scores = await scorer.calculate_coherence_batch(
             db=db,
-            agent_id=agent_id,
             execution_id=execution_id,
             phase=phase,
+            agent_ids=agent_ids,
         )
+        if not scores:
+            return scores
         
         # Store coherence metrics in database
-        coherence_metric = CoherenceMetrics(
-            execution_id=execution_id,
-            agent_id=agent_id,
-            monitored_by_pm_id=self.agent_id,
-            phase=phase.value,
-            coherence_score=coherence.overall_score,
-            metrics=coherence.metrics,
-            anomaly_detected=coherence.overall_score < 0.5,
-            calculated_at=coherence.calculated_at,
-        )
-        db.add(coherence_metric)
+        db.add_all([
+            CoherenceMetrics(
+                execution_id=execution_id,
+                agent_id=agent_id,
+                monitored_by_pm_id=self.agent_id,
+                phase=phase.value,
+                coherence_score=coherence.overall_score,
+                metrics=coherence.metrics,
+                anomaly_detected=coherence.overall_score < 0.5,
+                calculated_at=coherence.calculated_at,
+            )
+            for agent_id, coherence in scores.items()
+        ])
         await db.commit()
+        invalidate_workflow_snapshot(execution_id)
         
-        logger.info(
-            f"PM {self._format_agent_name()} checked coherence for agent {agent_id}: "
-            f"{coherence.overall_score:.2f} (phase={phase.value})"
-        )
-        
-        return coherence
+        return scores
 
     async def monitor_workflow_health(
         self,
@@ -740,43 +780,24 @@ class AgnoProjectManagerAgent(AgnoSquadAgent):
         if not self.agent_id:
             raise ValueError("PM agent_id must be configured")
         
-        import logging
-        logger = logging.getLogger(__name__)
-        
         # Monitor workflow health first
         health = await self.monitor_workflow_health(
             db=db,
             execution_id=execution_id,
         )
         
-        # Check coherence for all active agents
-        from backend.models.message import AgentMessage
-        from sqlalchemy import select, distinct
-        
-        # Get active agents from messages
-        stmt = (
-            select(distinct(AgentMessage.sender_id))
-            .where(AgentMessage.task_execution_id == execution_id)
-        )
-        result = await db.execute(stmt)
-        active_agent_ids = [row[0] for row in result.all()]
-        
+        # Check coherence for every agent that sent a message, in one batch
+        # Phase is simplified (would need actual phase determination)
         coherence_results = {}
-        for agent_id in active_agent_ids:
-            # Determine phase from tasks (simplified - would need actual phase determination)
-            # For now, check all phases
-            for phase in [WorkflowPhase.INVESTIGATION, WorkflowPhase.BUILDING, WorkflowPhase.VALIDATION]:
-                try:
-                    coherence = await self.check_phase_coherence(
-                        db=db,
-                        execution_id=execution_id,
-                        agent_id=agent_id,
-                        phase=phase,
-                    )
-                    coherence_results[str(agent_id)] = coherence.to_dict()
-                    break  # Just check one phase for now
-                except Exception as e:
-                    logger.warning(f"Error checking coherence for agent {agent_id}: {e}")
+        try:
+            scores = await self.check_squad_coherence(
+                db=db,
+                execution_id=execution_id,
+                phase=WorkflowPhase.INVESTIGATION,
+            )
+            coherence_results = {str(agent_id): score.to_dict() for agent_id, score in scores.items()}
+        except Exception as e:
+            logger.warning(f"Error checking coherence for execution {execution_id}: {e}")
         
         return {
             "orchestration_status": "monitoring",
@@ -854,18 +875,16 @@ class AgnoProjectManagerAgent(AgnoSquadAgent):
         
         coherence_scores = []
         if execution and hasattr(execution, 'squad') and execution.squad:
-            for member in execution.squad.members:
-                if member.is_active:
-                    try:
-                        score = await scorer.calculate_coherence(
-                            db=db,
-                            agent_id=member.id,
-                            execution_id=execution_id,
-                            phase=WorkflowPhase.BUILDING,  # Default
-                        )
-                        coherence_scores.append(score)
-                    except Exception as e:
-                        logger.debug(f"Could not calculate coherence for agent {member.id}: {e}")
+            try:
+                scores = await scorer.calculate_coherence_batch(
+                    db=db,
+                    execution_id=execution_id,
+                    phase=WorkflowPhase.BUILDING,  # Default
+                    agent_ids=[member.id for member in execution.squad.members if member.is_active],
+                )
+                coherence_scores = list(scores.values())
+            except Exception as e:
+                logger.debug(f"Could not calculate coherence for execution {execution_id}: {e}")
         
         # Generate recommendations
         recommendations_engine = get_recommendations_engine()
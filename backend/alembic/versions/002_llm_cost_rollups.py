@@ -0,0 +1,64 @@
+"""LLM cost rollups
+
+Revision ID: 002_llm_cost_rollups
+Revises: 001_initial
+Create Date: 2026-10-18
+
+Adds the rollup watermark table and running response-time sums to
+llm_cost_summaries so summaries can be maintained incrementally, and a unique
+index on the rollup key that the rollup upserts against.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002_llm_cost_rollups'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add rollup state and incremental summary columns"""
+    op.create_table(
+        'llm_cost_rollup_state',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    op.add_column(
+        'llm_cost_summaries',
+        sa.Column('total_response_time_ms', sa.Float(), nullable=False, server_default='0.0'),
+    )
+    op.add_column(
+        'llm_cost_summaries',
+        sa.Column('response_time_samples', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # The first rollup rebuilds every summary from the entries (the state
+    # table starts empty), so rows written before rollups existed are dropped
+    # rather than deduplicated
+    op.execute("DELETE FROM llm_cost_summaries")
+    op.execute(
+        "CREATE UNIQUE INDEX uq_summary_rollup_key ON llm_cost_summaries ("
+        "summary_type, summary_date, "
+        "coalesce(organization_id, '00000000-0000-0000-0000-000000000000'), "
+        "coalesce(squad_id, '00000000-0000-0000-0000-000000000000'), "
+        "coalesce(provider, ''), coalesce(model, ''))"
+    )
+    op.create_index('idx_summary_squad_date', 'llm_cost_summaries', ['squad_id', 'summary_date'])
+    op.create_index('idx_summary_provider', 'llm_cost_summaries', ['provider', 'summary_date'])
+
+    # Org-scoped entry scans (stats tail, date range)
+    op.create_index('idx_llm_cost_org_created', 'llm_cost_entries', ['organization_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Remove rollup state and incremental summary columns"""
+    op.drop_index('idx_llm_cost_org_created', table_name='llm_cost_entries')
+    op.drop_index('idx_summary_provider', table_name='llm_cost_summaries')
+    op.drop_index('idx_summary_squad_date', table_name='llm_cost_summaries')
+    op.drop_index('uq_summary_rollup_key', table_name='llm_cost_summaries')
+    op.drop_column('llm_cost_summaries', 'response_time_samples')
+    op.drop_column('llm_cost_summaries', 'total_response_time_ms')
+    op.drop_table('llm_cost_rollup_state')
@@ -0,0 +1,46 @@
+"""Agent message correlation ids
+
+Revision ID: 003_agent_message_correlation
+Revises: 002_llm_cost_rollups
+Create Date: 2026-10-18
+
+Adds an indexed correlation_id (standup_id / question_id / review_id copied
+from message_metadata) so collaboration patterns can look up replies with one
+index scan instead of filtering the execution history in Python.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003_agent_message_correlation'
+down_revision = '002_llm_cost_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add and backfill agent_messages.correlation_id"""
+    op.add_column('agent_messages', sa.Column('correlation_id', sa.String(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE agent_messages
+        SET correlation_id = COALESCE(
+            message_metadata->>'standup_id',
+            message_metadata->>'question_id',
+            message_metadata->>'review_id'
+        )
+        WHERE message_metadata IS NOT NULL
+        """
+    )
+
+    op.create_index(
+        'ix_agent_messages_correlation',
+        'agent_messages',
+        ['correlation_id', 'message_type', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    """Remove agent_messages.correlation_id"""
+    op.drop_index('ix_agent_messages_correlation', table_name='agent_messages')
+    op.drop_column('agent_messages', 'correlation_id')
@@ -0,0 +1,50 @@
+"""Keyset pagination indexes
+
+Revision ID: 004_keyset_pagination_indexes
+Revises: 003_agent_message_correlation
+Create Date: 2026-10-18
+
+Composite indexes matching the (created_at, id) keyset order of execution
+and conversation histories, and the activity order of conversation lists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004_keyset_pagination_indexes'
+down_revision = '003_agent_message_correlation'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create keyset indexes"""
+    op.create_index(
+        'ix_agent_messages_execution_created_id',
+        'agent_messages',
+        ['task_execution_id', 'created_at', 'id'],
+    )
+    # Prefix of the new index
+    op.drop_index('ix_agent_messages_task_execution_id_created_at', table_name='agent_messages')
+
+    op.create_index(
+        'ix_conversation_messages_conv_created_id',
+        'conversation_messages',
+        ['conversation_id', 'created_at', 'id'],
+    )
+    op.create_index(
+        'ix_conversations_user_activity',
+        'conversations',
+        ['user_id', sa.text('COALESCE(last_message_at, created_at)'), 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Drop keyset indexes"""
+    op.drop_index('ix_conversations_user_activity', table_name='conversations')
+    op.drop_index('ix_conversation_messages_conv_created_id', table_name='conversation_messages')
+    op.create_index(
+        'ix_agent_messages_task_execution_id_created_at',
+        'agent_messages',
+        ['task_execution_id', 'created_at'],
+    )
+    op.drop_index('ix_agent_messages_execution_created_id', table_name='agent_messages')
@@ -0,0 +1,56 @@
+"""Rolling conversation summaries
+
+Revision ID: 005_conversation_summaries
+Revises: 004_keyset_pagination_indexes
+Create Date: 2026-10-18
+
+Persisted rolling summaries of multi-turn conversations and task execution
+histories, with the high-water mark of the last folded message.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '005_conversation_summaries'
+down_revision = '004_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create conversation_summaries"""
+    op.create_table(
+        'conversation_summaries',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            'conversation_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('conversations.id', ondelete='CASCADE'),
+            nullable=True,
+            unique=True,
+        ),
+        sa.Column(
+            'task_execution_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('task_executions.id', ondelete='CASCADE'),
+            nullable=True,
+            unique=True,
+        ),
+        sa.Column('summary', sa.Text(), nullable=False, server_default=''),
+        sa.Column('state', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('token_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_message_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('last_message_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.CheckConstraint(
+            '(conversation_id IS NULL) <> (task_execution_id IS NULL)',
+            name='ck_conversation_summaries_one_scope',
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop conversation_summaries"""
+    op.drop_table('conversation_summaries')
@@ -0,0 +1,96 @@
+"""Append-only execution logs
+
+Revision ID: 006_execution_logs
+Revises: 005_conversation_summaries
+Create Date: 2026-10-18
+
+Moves task execution log entries from the task_executions.logs JSON array
+into an append-only execution_logs table, one row per entry.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '006_execution_logs'
+down_revision = '005_conversation_summaries'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create execution_logs, copy the arrays into it and drop task_executions.logs"""
+    op.create_table(
+        'execution_logs',
+        sa.Column('seq', sa.BigInteger(), primary_key=True, autoincrement=True),  # bigserial
+        sa.Column(
+            'execution_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('task_executions.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('level', sa.String(16), nullable=False, server_default='info'),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('log_metadata', postgresql.JSON(), nullable=False, server_default='{}'),
+    )
+
+    # One row per array element; seq follows each array's order
+    op.execute(
+        """
+        INSERT INTO execution_logs (execution_id, timestamp, level, message, log_metadata)
+        SELECT
+            te.id,
+            COALESCE(
+                (entry.value->>'timestamp')::timestamp,
+                te.created_at + entry.position * interval '1 microsecond'
+            ),
+            COALESCE(entry.value->>'level', 'info'),
+            COALESCE(entry.value->>'message', ''),
+            COALESCE(entry.value->'metadata', '{}'::json)
+        FROM task_executions te
+        CROSS JOIN LATERAL json_array_elements(te.logs) WITH ORDINALITY AS entry(value, position)
+        WHERE json_typeof(te.logs) = 'array'
+        ORDER BY te.created_at, te.id, entry.position
+        """
+    )
+
+    # Built after the bulk copy, which is faster than maintaining it row by row
+    op.create_index(
+        'ix_execution_logs_execution_id_seq',
+        'execution_logs',
+        ['execution_id', 'seq'],
+    )
+
+    op.drop_column('task_executions', 'logs')
+
+
+def downgrade() -> None:
+    """Fold execution_logs back into task_executions.logs and drop the table"""
+    op.add_column(
+        'task_executions',
+        sa.Column('logs', postgresql.JSON(), nullable=False, server_default='[]'),
+    )
+    op.execute(
+        """
+        UPDATE task_executions te
+        SET logs = grouped.logs
+        FROM (
+            SELECT
+                execution_id,
+                json_agg(
+                    json_build_object(
+                        'timestamp', to_char(timestamp, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                        'level', level,
+                        'message', message,
+                        'metadata', log_metadata
+                    )
+                    ORDER BY seq
+                ) AS logs
+            FROM execution_logs
+            GROUP BY execution_id
+        ) grouped
+        WHERE grouped.execution_id = te.id
+        """
+    )
+    op.drop_index('ix_execution_logs_execution_id_seq', table_name='execution_logs')
+    op.drop_table('execution_logs')
@@ -0,0 +1,49 @@
+"""Conversation timeout counter and due index
+
+Revision ID: 007_conversation_timeout_counter
+Revises: 006_execution_logs
+Create Date: 2026-10-19
+
+Denormalizes the number of "timeout" events onto agent_conversations and
+adds the partial index the timeout monitor claims due conversations from.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007_conversation_timeout_counter'
+down_revision = '006_execution_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add agent_conversations.timeout_count, backfill it and index due conversations"""
+    op.add_column(
+        'agent_conversations',
+        sa.Column('timeout_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        """
+        UPDATE agent_conversations c
+        SET timeout_count = counts.timeouts
+        FROM (
+            SELECT conversation_id, count(*) AS timeouts
+            FROM conversation_events
+            WHERE event_type = 'timeout'
+            GROUP BY conversation_id
+        ) counts
+        WHERE counts.conversation_id = c.id
+        """
+    )
+    op.create_index(
+        'ix_conversations_timeout',
+        'agent_conversations',
+        ['timeout_at', 'id'],
+        postgresql_where=sa.text("current_state IN ('initiated', 'waiting', 'follow_up')"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the due index and the counter"""
+    op.drop_index('ix_conversations_timeout', table_name='agent_conversations')
+    op.drop_column('agent_conversations', 'timeout_count')
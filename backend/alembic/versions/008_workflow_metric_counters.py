@@ -0,0 +1,89 @@
+"""Workflow metric counters
+
+Revision ID: 008_workflow_metric_counters
+Revises: 007_conversation_timeout_counter
+Create Date: 2026-10-19
+
+Adds the per-execution counter tables the workflow metrics materializer
+keeps up to date (tasks by phase/status/agent, messages and coherence per
+agent), backfills them from the existing rows and indexes coherence
+metrics for the newest-scores trend query.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '008_workflow_metric_counters'
+down_revision = '007_conversation_timeout_counter'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill workflow_task_counters / workflow_agent_counters"""
+    op.create_table(
+        'workflow_task_counters',
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('phase', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=False, comment='Agent that spawned the tasks'),
+        sa.Column('task_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('with_rationale', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['execution_id'], ['task_executions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('execution_id', 'phase', 'status', 'agent_id'),
+    )
+    op.create_table(
+        'workflow_agent_counters',
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('messages_sent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_message_at', sa.DateTime(), nullable=True),
+        sa.Column('coherence_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('coherence_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['execution_id'], ['task_executions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('execution_id', 'agent_id'),
+    )
+    op.create_index(
+        'ix_coherence_metrics_execution_calculated',
+        'coherence_metrics',
+        ['execution_id', 'calculated_at'],
+    )
+
+    op.execute(
+        """
+        INSERT INTO workflow_task_counters
+            (execution_id, phase, status, agent_id, task_count, with_rationale)
+        SELECT parent_execution_id, phase, status, spawned_by_agent_id, count(*),
+               sum(CASE WHEN rationale IS NOT NULL AND rationale <> '' THEN 1 ELSE 0 END)
+        FROM dynamic_tasks
+        GROUP BY parent_execution_id, phase, status, spawned_by_agent_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO workflow_agent_counters
+            (execution_id, agent_id, messages_sent, last_message_at, coherence_sum, coherence_count)
+        SELECT execution_id, agent_id, sum(messages_sent), max(last_message_at),
+               sum(coherence_sum), sum(coherence_count)
+        FROM (
+            SELECT task_execution_id AS execution_id, sender_id AS agent_id,
+                   count(*) AS messages_sent, max(created_at) AS last_message_at,
+                   0.0 AS coherence_sum, 0 AS coherence_count
+            FROM agent_messages
+            WHERE task_execution_id IS NOT NULL
+            GROUP BY task_execution_id, sender_id
+            UNION ALL
+            SELECT execution_id, agent_id, 0, NULL, sum(coherence_score), count(*)
+            FROM coherence_metrics
+            GROUP BY execution_id, agent_id
+        ) activity
+        GROUP BY execution_id, agent_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the counters and the coherence index"""
+    op.drop_index('ix_coherence_metrics_execution_calculated', table_name='coherence_metrics')
+    op.drop_table('workflow_agent_counters')
+    op.drop_table('workflow_task_counters')
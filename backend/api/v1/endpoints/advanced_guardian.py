@@ -152,18 +152,16 @@ async def get_recommendations(
         
         # Get all active agents in execution's squad
         if hasattr(execution, 'squad') and execution.squad:
-            for member in execution.squad.members:
-                if member.is_active:
-                    try:
-                        score = await scorer.calculate_coherence(
-                            db=db,
-                            agent_id=member.id,
-                            execution_id=execution_id,
-                            phase=WorkflowPhase.BUILDING,  # Default, can be enhanced
-                        )
-                        coherence_scores.append(score)
-                    except Exception as e:
-                        logger.debug(f"Could not calculate coherence for agent {member.id}: {e}")
+            try:
+                scores = await scorer.calculate_coherence_batch(
+                    db=db,
+                    execution_id=execution_id,
+                    phase=WorkflowPhase.BUILDING,  # Default, can be enhanced
+                    agent_ids=[member.id for member in execution.squad.members if member.is_active],
+                )
+                coherence_scores = list(scores.values())
+            except Exception as e:
+                logger.debug(f"Could not calculate coherence for execution {execution_id}: {e}")
         
         # Generate recommendations
         recommendations_engine = get_recommendations_engine()
@@ -232,18 +230,16 @@ async def get_advanced_metrics(
         coherence_scores = []
         
         if hasattr(execution, 'squad') and execution.squad:
-            for member in execution.squad.members:
-                if member.is_active:
-                    try:
-                        score = await scorer.calculate_coherence(
-                            db=db,
-                            agent_id=member.id,
-                            execution_id=execution_id,
-                            phase=WorkflowPhase.BUILDING,
-                        )
-                        coherence_scores.append(score.to_dict())
-                    except Exception as e:
-                        logger.debug(f"Could not calculate coherence for agent {member.id}: {e}")
+            try:
+                scores = await scorer.calculate_coherence_batch(
+                    db=db,
+                    execution_id=execution_id,
+                    phase=WorkflowPhase.BUILDING,
+                    agent_ids=[member.id for member in execution.squad.members if member.is_active],
+                )
+                coherence_scores = [score.to_dict() for score in scores.values()]
+            except Exception as e:
+                logger.debug(f"Could not calculate coherence for execution {execution_id}: {e}")
         
         # Get recommendations
         recommendations_engine = get_recommendations_engine()
@@ -15,6 +15,7 @@ from backend.core.database import get_db
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models.agent_message import AgentMessage
+from backend.agents.guardian.workflow_snapshot import invalidate_workflow_snapshot
 from backend.services.squad_service import SquadService
 from backend.schemas.agent_message import (
     AgentMessageResponse,
@@ -356,6 +357,7 @@ async def send_agent_message(
 
     db.add(message)
     await db.commit()
+    invalidate_workflow_snapshot(message.task_execution_id)
     await db.refresh(message)
 
     return message
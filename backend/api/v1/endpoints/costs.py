@@ -14,6 +14,7 @@ from sqlalchemy.orm import selectinload
 
 from backend.core.database import get_db
 from backend.models import LLMCostEntry, LLMCostSummary, Squad, User, Organization
+from backend.services.cost_rollup_service import CostRollupService
 from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/costs", tags=["costs"])
@@ -163,105 +164,24 @@ async def get_cost_stats(
     """
     Get aggregated cost statistics.
 
+    Answered from the incrementally maintained daily summaries plus a SQL
+    aggregation over entries not yet rolled up (see CostRollupService).
+
     Returns:
     - Total requests, tokens, and cost
     - Average cost and tokens per request
     - Breakdown by provider and model
     - Date range of data
     """
-    # Build base query
-    query = select(LLMCostEntry)
-
-    # Apply filters
-    filters = []
-    if squad_id:
-        filters.append(LLMCostEntry.squad_id == squad_id)
-    if user_id:
-        filters.append(LLMCostEntry.user_id == user_id)
-    if organization_id:
-        filters.append(LLMCostEntry.organization_id == organization_id)
-    if start_date:
-        filters.append(LLMCostEntry.created_at >= start_date)
-    if end_date:
-        filters.append(LLMCostEntry.created_at <= end_date)
-
-    if filters:
-        query = query.where(and_(*filters))
-
-    # Execute query
-    result = await db.execute(query)
-    entries = result.scalars().all()
-
-    if not entries:
-        return CostStatsResponse(
-            total_requests=0,
-            total_tokens=0,
-            total_cost_usd=0.0,
-            avg_cost_per_request=0.0,
-            avg_tokens_per_request=0.0,
-            avg_response_time_ms=None,
-            by_provider={},
-            by_model={},
-            date_range={}
-        )
-
-    # Calculate aggregates
-    total_requests = len(entries)
-    total_tokens = sum(e.total_tokens for e in entries)
-    total_cost = sum(e.total_cost_usd for e in entries)
-
-    # Calculate averages
-    avg_cost = total_cost / total_requests if total_requests > 0 else 0.0
-    avg_tokens = total_tokens / total_requests if total_requests > 0 else 0.0
-
-    response_times = [e.response_time_ms for e in entries if e.response_time_ms is not None]
-    avg_response_time = sum(response_times) / len(response_times) if response_times else None
-
-    # Group by provider
-    by_provider = {}
-    for entry in entries:
-        if entry.provider not in by_provider:
-            by_provider[entry.provider] = {
-                "requests": 0,
-                "tokens": 0,
-                "cost_usd": 0.0
-            }
-        by_provider[entry.provider]["requests"] += 1
-        by_provider[entry.provider]["tokens"] += entry.total_tokens
-        by_provider[entry.provider]["cost_usd"] += entry.total_cost_usd
-
-    # Group by model
-    by_model = {}
-    for entry in entries:
-        model_key = f"{entry.provider}/{entry.model}"
-        if model_key not in by_model:
-            by_model[model_key] = {
-                "requests": 0,
-                "tokens": 0,
-                "cost_usd": 0.0
-            }
-        by_model[model_key]["requests"] += 1
-        by_model[model_key]["tokens"] += entry.total_tokens
-        by_model[model_key]["cost_usd"] += entry.total_cost_usd
-
-    # Date range
-    min_date = min(e.created_at for e in entries)
-    max_date = max(e.created_at for e in entries)
-
-    return CostStatsResponse(
-        total_requests=total_requests,
-        total_tokens=total_tokens,
-        total_cost_usd=round(total_cost, 6),
-        avg_cost_per_request=round(avg_cost, 6),
-        avg_tokens_per_request=round(avg_tokens, 2),
-        avg_response_time_ms=round(avg_response_time, 2) if avg_response_time else None,
-        by_provider=by_provider,
-        by_model=by_model,
-        date_range={
-            "start": min_date,
-            "end": max_date
-        }
+    stats = await CostRollupService.get_stats(
+        db,
+        squad_id=squad_id,
+        user_id=user_id,
+        organization_id=organization_id,
+        start_date=start_date,
+        end_date=end_date,
     )
+    return CostStatsResponse(**stats)
 
 
 @router.get("/squad/{squad_id}", response_model=CostStatsResponse)
@@ -297,12 +217,13 @@ async def get_squad_costs(
     start_date = end_date - timedelta(days=days)
 
     # Get stats
-    return await get_cost_stats(
+    stats = await CostRollupService.get_stats(
+        db,
         squad_id=squad_id,
         start_date=start_date,
         end_date=end_date,
-        db=db
     )
+    return CostStatsResponse(**stats)
 
 
 @router.get("/user/{user_id}", response_model=CostStatsResponse)
@@ -338,12 +259,13 @@ async def get_user_costs(
     start_date = end_date - timedelta(days=days)
 
     # Get stats
-    return await get_cost_stats(
+    stats = await CostRollupService.get_stats(
+        db,
         user_id=user_id,
         start_date=start_date,
         end_date=end_date,
-        db=db
     )
+    return CostStatsResponse(**stats)
 
 
 @router.get("/organization/{organization_id}", response_model=CostStatsResponse)
@@ -379,12 +301,13 @@ async def get_organization_costs(
     start_date = end_date - timedelta(days=days)
 
     # Get stats
-    return await get_cost_stats(
+    stats = await CostRollupService.get_stats(
+        db,
         organization_id=organization_id,
         start_date=start_date,
         end_date=end_date,
-        db=db
     )
+    return CostStatsResponse(**stats)
 
 
 @router.get("/summaries", response_model=List[CostSummaryResponse])
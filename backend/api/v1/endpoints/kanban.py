@@ -17,8 +17,7 @@ from backend.core.database import get_db
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models.workflow import WorkflowPhase, DynamicTask
-from backend.models.project import TaskExecution
-from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.agents.guardian.workflow_snapshot import get_workflow_snapshot
 from backend.core.logging import logger
 
 
@@ -87,24 +86,20 @@ async def get_kanban_board(
     Returns tasks organized by phase (columns) with status information.
     """
     try:
-        # Validate execution exists
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
+        # One snapshot: column counts are aggregates, tasks and edges plain rows
+        try:
+            snapshot = await get_workflow_snapshot(db, execution_id, include_tasks=True)
+        except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Task execution {execution_id} not found"
             )
         
-        # Get workflow engine
-        from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
-        engine = PhaseBasedWorkflowEngine()
-        
-        # Get all tasks with dependencies eagerly loaded
-        all_tasks = await engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-            include_dependencies=True,
-        )
+        blocking_ids_by_task: Dict[UUID, List[UUID]] = {}
+        blocked_by_ids_by_task: Dict[UUID, List[UUID]] = {}
+        for blocker_id, blocked_id in snapshot.dependencies:
+            blocking_ids_by_task.setdefault(blocker_id, []).append(blocked_id)
+            blocked_by_ids_by_task.setdefault(blocked_id, []).append(blocker_id)
         
         # Organize tasks by phase
         columns = []
@@ -115,21 +110,16 @@ async def get_kanban_board(
         ]
         
         dependencies = []
-        all_blocking_ids = set()
-        all_blocked_by_ids = set()
         
         for phase_enum, phase_title in phase_order:
-            phase_tasks = [t for t in all_tasks if t.phase == phase_enum.value]
+            phase_tasks = [t for t in snapshot.tasks if t.phase == phase_enum.value]
             
             # Convert to KanbanTask format
             kanban_tasks = []
             for task in phase_tasks:
                 # Get blocking relationships
-                blocking_ids = [t.id for t in task.blocks_tasks]
-                blocked_by_ids = [t.id for t in task.blocked_by_tasks]
-                
-                all_blocking_ids.update(blocking_ids)
-                all_blocked_by_ids.update(blocked_by_ids)
+                blocking_ids = blocking_ids_by_task.get(task.id, [])
+                blocked_by_ids = blocked_by_ids_by_task.get(task.id, [])
                 
                 # Add dependency edges
                 for blocked_id in blocking_ids:
@@ -154,25 +144,23 @@ async def get_kanban_board(
                 ))
             
             # Count tasks by status
-            completed = sum(1 for t in kanban_tasks if t.status == "completed")
-            in_progress = sum(1 for t in kanban_tasks if t.status == "in_progress")
-            pending = sum(1 for t in kanban_tasks if t.status == "pending")
+            status_counts = snapshot.phase_status_counts.get(phase_enum.value, {})
             
             columns.append(KanbanColumn(
                 phase=phase_enum.value,
                 title=phase_title,
                 tasks=kanban_tasks,
                 total_tasks=len(kanban_tasks),
-                completed_tasks=completed,
-                in_progress_tasks=in_progress,
-                pending_tasks=pending,
+                completed_tasks=status_counts.get("completed", 0),
+                in_progress_tasks=status_counts.get("in_progress", 0),
+                pending_tasks=status_counts.get("pending", 0),
             ))
         
         # Calculate totals
         total_completed = sum(col.completed_tasks for col in columns)
         total_in_progress = sum(col.in_progress_tasks for col in columns)
         total_pending = sum(col.pending_tasks for col in columns)
-        total_tasks = len(all_tasks)
+        total_tasks = len(snapshot.tasks)
         
         return KanbanBoardResponse(
             execution_id=execution_id,
@@ -210,25 +198,14 @@ async def get_dependency_graph(
     Returns nodes (tasks) and edges (dependencies) for graph rendering.
     """
     try:
-        # Validate execution exists
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
+        try:
+            snapshot = await get_workflow_snapshot(db, execution_id, include_tasks=True)
+        except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Task execution {execution_id} not found"
             )
         
-        # Get workflow engine
-        from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
-        engine = PhaseBasedWorkflowEngine()
-        
-        # Get all tasks with dependencies
-        all_tasks = await engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-            include_dependencies=True,
-        )
-        
         # Build nodes
         nodes = [
             {
@@ -238,26 +215,27 @@ async def get_dependency_graph(
                 "status": task.status,
                 "label": task.title[:30] + ("..." if len(task.title) > 30 else ""),
             }
-            for task in all_tasks
+            for task in snapshot.tasks
         ]
         
-        # Build edges
-        edges = []
-        for task in all_tasks:
-            # Task blocks other tasks
-            for blocked_task in task.blocks_tasks:
-                edges.append({
-                    "from": str(task.id),
-                    "to": str(blocked_task.id),
-                    "type": "blocks",
-                    "label": "blocks",
-                })
+        # Build edges (task blocks other tasks)
+        task_ids = {task.id for task in snapshot.tasks}
+        edges = [
+            {
+                "from": str(blocker_id),
+                "to": str(blocked_id),
+                "type": "blocks",
+                "label": "blocks",
+            }
+            for blocker_id, blocked_id in snapshot.dependencies
+            if blocker_id in task_ids
+        ]
         
         return {
             "nodes": nodes,
             "edges": edges,
             "execution_id": str(execution_id),
-            "total_tasks": len(all_tasks),
+            "total_tasks": len(snapshot.tasks),
             "total_dependencies": len(edges),
         }
         
@@ -10,6 +10,7 @@ from typing import Optional, List
 from uuid import UUID
 
 from backend.core.database import get_db
+from backend.core.pagination import next_cursor
 from backend.services.conversation_service import ConversationService
 from backend.schemas import (
     CreateUserAgentConversationRequest,
@@ -151,26 +152,33 @@ async def get_user_conversations(
     status: Optional[str] = Query(None, description="Filter by status (active, archived, closed)"),
     limit: int = Query(50, ge=1, le=500, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page (faster than offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all conversations for a user.
 
     Returns paginated list of conversations for the specified user.
+    Pass `next_cursor` back as `cursor` to fetch the following page.
     """
-    conversations, total_count = await ConversationService.get_user_conversations(
-        db=db,
-        user_id=user_id,
-        status=status,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        conversations, total_count = await ConversationService.get_user_conversations(
+            db=db,
+            user_id=user_id,
+            status=status,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))  # `status` is shadowed by the query param
 
     return {
         "conversations": [conv.to_dict() for conv in conversations],
         "total_count": total_count,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor(conversations, limit, sort_attr="activity_at")
     }
 
 
@@ -181,27 +189,34 @@ async def get_agent_conversations(
     status: Optional[str] = Query(None, description="Filter by status (active, archived, closed)"),
     limit: int = Query(50, ge=1, le=500, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page (faster than offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all conversations for an agent.
 
     Returns paginated list of conversations where the agent is a participant.
+    Pass `next_cursor` back as `cursor` to fetch the following page.
     """
-    conversations, total_count = await ConversationService.get_agent_conversations(
-        db=db,
-        agent_id=agent_id,
-        conversation_type=conversation_type,
-        status=status,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        conversations, total_count = await ConversationService.get_agent_conversations(
+            db=db,
+            agent_id=agent_id,
+            conversation_type=conversation_type,
+            status=status,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))  # `status` is shadowed by the query param
 
     return {
         "conversations": [conv.to_dict() for conv in conversations],
         "total_count": total_count,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor(conversations, limit, sort_attr="activity_at")
     }
 
 
@@ -251,25 +266,32 @@ async def get_conversation_messages(
     conversation_id: UUID = Path(..., description="ID of the conversation"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of messages"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page (faster than offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get messages in a conversation.
 
     Returns paginated list of messages ordered by creation time.
+    Pass `next_cursor` back as `cursor` to fetch the following page.
     """
-    messages, total_count = await ConversationService.get_conversation_history(
-        db=db,
-        conversation_id=conversation_id,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        messages, total_count = await ConversationService.get_conversation_history(
+            db=db,
+            conversation_id=conversation_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     return {
         "messages": [msg.to_dict() for msg in messages],
         "total_count": total_count,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor(messages, limit)
     }
 
 
@@ -277,32 +299,45 @@ async def get_conversation_messages(
 async def get_conversation_history(
     conversation_id: UUID = Path(..., description="ID of the conversation"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of messages"),
-    max_tokens: Optional[int] = Query(None, description="Maximum total tokens to include (for context window)"),
+    max_tokens: Optional[int] = Query(None, ge=1, description="Maximum total tokens to include (for context window)"),
+    include_summary: bool = Query(False, description="Prepend the conversation summary when older messages are left out"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get conversation history with context window support.
 
-    Returns messages suitable for LLM context, optionally limited by token count.
+    Returns messages suitable for LLM context. With `max_tokens`, the newest
+    messages that fit the budget are returned, optionally with the stored
+    summary standing in for the older ones.
     """
     conversation = await ConversationService.get_conversation(db=db, conversation_id=conversation_id)
     if not conversation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
 
-    messages, total_count = await ConversationService.get_conversation_history(
-        db=db,
-        conversation_id=conversation_id,
-        limit=limit,
-        offset=0,
-        max_tokens=max_tokens
-    )
+    summary = None
+    if max_tokens:
+        summary, messages = await ConversationService.get_context_window(
+            db=db,
+            conversation_id=conversation_id,
+            max_tokens=max_tokens,
+            limit=limit,
+            include_summary=include_summary
+        )
+    else:
+        messages, _ = await ConversationService.get_conversation_history(
+            db=db,
+            conversation_id=conversation_id,
+            limit=limit,
+            offset=0
+        )
 
     return {
         "conversation_id": conversation_id,
         "messages": [msg.to_dict() for msg in messages],
-        "total_messages": total_count,
+        "total_messages": conversation.total_messages,
         "total_tokens": conversation.total_tokens_used,
-        "context_window_tokens": sum(msg.total_tokens or 0 for msg in messages)
+        "context_window_tokens": sum(msg.total_tokens or 0 for msg in messages),
+        "summary": summary
     }
 
 
@@ -15,7 +15,7 @@ from backend.core.database import get_db
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models import RoutingRule, DefaultRoutingTemplate
-from backend.agents.interaction.routing_engine import RoutingEngine
+from backend.agents.interaction.routing_engine import RoutingEngine, invalidate_routing_table
 from backend.agents.interaction.seed_routing_templates import (
     create_default_templates,
     get_template_by_name
@@ -75,6 +75,7 @@ async def create_routing_rule(
 
     db.add(rule)
     await db.commit()
+    invalidate_routing_table(squad_id=squad_id)
     await db.refresh(rule)
 
     return {
@@ -389,6 +390,7 @@ async def delete_routing_rule(
     # Delete rule
     await db.delete(rule)
     await db.commit()
+    invalidate_routing_table(squad_id=rule.squad_id, organization_id=rule.organization_id)
 
 
 @router.patch(
@@ -428,6 +430,7 @@ async def toggle_routing_rule(
     rule.is_active = is_active
     await db.commit()
     await db.refresh(rule)
+    invalidate_routing_table(squad_id=rule.squad_id, organization_id=rule.organization_id)
 
     return {
         "id": str(rule.id),
@@ -13,6 +13,7 @@ from backend.core.database import get_db
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models.squad import SquadMember
+from backend.agents.orchestration.delegation_engine import DelegationEngine
 from backend.services.agent_service import AgentService
 from backend.services.squad_service import SquadService
 from backend.services.cached_services.squad_cache import get_squad_cache
@@ -277,6 +278,35 @@ async def get_squad_composition(
     return composition
 
 
+@router.get(
+    "/squad/{squad_id}/load",
+    summary="Get squad member load",
+    description="Get in-flight work (open conversations, tasks, LLM calls) per squad member"
+)
+async def get_squad_load(
+    squad_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get per-member queue depth.
+
+    - **squad_id**: Squad ID
+
+    Returns load counters keyed by member ID, as used for task delegation.
+    """
+    squad = await SquadService.get_squad(db, squad_id)
+    if not squad:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Squad {squad_id} not found"
+        )
+
+    await SquadService.verify_squad_ownership(db, squad_id, current_user.id)
+
+    return await DelegationEngine().get_queue_depths(db, squad_id)
+
+
 @router.put(
     "/{member_id}",
     response_model=SquadMemberResponse,
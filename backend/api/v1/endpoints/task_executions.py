@@ -3,17 +3,21 @@ Task Execution API Endpoints
 
 Endpoints for managing and monitoring AI agent task executions.
 """
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.core.database import get_db
+from backend.core.config import settings
+from backend.core.database import get_db, get_db_context
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models.task_execution import TaskExecution
 from backend.services.task_execution_service import TaskExecutionService
+from backend.services.execution_log_service import ExecutionLogService
 from backend.services.squad_service import SquadService
 from backend.services.cached_services.task_cache import get_task_cache
 from backend.schemas.task_execution import (
@@ -77,7 +81,7 @@ async def list_task_executions(
     status_filter: str | None = Query(None, description="Filter by status"),
     skip: int = Query(0, ge=0, description="Number of executions to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of executions to return"),
-) -> List[TaskExecution]:
+) -> List[TaskExecutionResponse]:
     """
     List task executions for a squad.
 
@@ -99,7 +103,7 @@ async def list_task_executions(
     )
 
     # Apply pagination
-    return executions[skip: skip + limit]
+    return await _with_recent_logs(db, executions[skip: skip + limit])
 
 
 @router.get(
@@ -112,7 +116,7 @@ async def get_task_execution(
     execution_id: UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
-) -> TaskExecution:
+) -> TaskExecutionResponse:
     """
     Get task execution by ID.
 
@@ -133,7 +137,7 @@ async def get_task_execution(
     # Verify squad ownership
     await SquadService.verify_squad_ownership(db, execution.get("squad_id"), current_user.id)
 
-    return execution
+    return (await _with_recent_logs(db, [execution]))[0]
 
 
 @router.get(
@@ -225,6 +229,31 @@ async def get_execution_messages(
     }
 
 
+async def _get_owned_execution(db: AsyncSession, execution_id: UUID, user: User) -> TaskExecution:
+    """Load an execution and verify the user owns its squad"""
+    execution = await TaskExecutionService.get_task_execution(db, execution_id)
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task execution {execution_id} not found"
+        )
+
+    # Verify squad ownership
+    await SquadService.verify_squad_ownership(db, execution.squad_id, user.id)
+    return execution
+
+
+async def _with_recent_logs(db: AsyncSession, executions: List[Any]) -> List[TaskExecutionResponse]:
+    """Responses with the deprecated `logs` field filled from the newest entries (one query)"""
+    responses = [TaskExecutionResponse.model_validate(execution) for execution in executions]
+    recent = await ExecutionLogService.get_recent_logs(
+        db, [response.id for response in responses], limit=settings.EXECUTION_LOG_RESPONSE_TAIL
+    )
+    for response in responses:
+        response.logs = [entry.to_dict() for entry in recent.get(response.id, [])]
+    return responses
+
+
 @router.get(
     "/{execution_id}/logs",
     response_model=Dict[str, Any],
@@ -236,41 +265,117 @@ async def get_execution_logs(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     level: str | None = Query(None, description="Filter by log level (info/warning/error)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of log entries"),
+    cursor: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
 ) -> Dict[str, Any]:
     """
-    Get logs for a task execution.
+    Get logs for a task execution, oldest first.
 
     - **execution_id**: UUID of the task execution
     - **level**: Filter by log level (optional)
+    - **limit**: Page size
+    - **cursor**: Pass `next_cursor` back to fetch the following page
 
-    Returns execution logs.
+    Returns one page of execution logs.
     """
-    # Get execution
-    execution = await TaskExecutionService.get_task_execution(db, execution_id)
-    if not execution:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task execution {execution_id} not found"
-        )
-
-    # Verify squad ownership
-    await SquadService.verify_squad_ownership(db, execution.squad_id, current_user.id)
-
-    # Get logs from execution
-    logs = execution.logs or []
+    await _get_owned_execution(db, execution_id, current_user)
 
-    # Filter by level if specified
-    if level:
-        logs = [log for log in logs if log.get("level") == level]
+    logs = await ExecutionLogService.get_logs(
+        db, execution_id, level=level, after_seq=cursor, limit=limit
+    )
+    counts = await ExecutionLogService.count_logs(db, execution_id)
 
     return {
         "execution_id": str(execution_id),
-        "logs": logs,
-        "total_logs": len(execution.logs or []),
-        "filtered_count": len(logs),
+        "logs": [log.to_dict() for log in logs],
+        "total_logs": counts["total"],
+        "filtered_count": counts.get(level, 0) if level else counts["total"],
+        "next_cursor": ExecutionLogService.next_cursor(logs, limit),
     }
 
 
+@router.get(
+    "/{execution_id}/logs/export",
+    summary="Export execution logs",
+    description="Stream all logs of a task execution as newline-delimited JSON"
+)
+async def export_execution_logs(
+    execution_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    level: str | None = Query(None, description="Filter by log level (info/warning/error)"),
+) -> StreamingResponse:
+    """
+    Stream every log entry as NDJSON (one JSON object per line).
+
+    Entries are read in keyset pages, so memory use does not grow with the
+    size of the log.
+    """
+    await _get_owned_execution(db, execution_id, current_user)
+
+    async def lines():
+        # The request session is closed before the body streams; use a new one
+        async with get_db_context() as stream_db:
+            async for log in ExecutionLogService.iter_logs(stream_db, execution_id, level=level):
+                yield json.dumps(log.to_dict()) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/{execution_id}/logs/stream",
+    summary="Tail execution logs",
+    description="Follow the logs of a task execution via Server-Sent Events"
+)
+async def tail_execution_logs(
+    execution_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    cursor: Optional[int] = Query(None, ge=0, description="Resume after this seq (omit to start from the first entry)"),
+) -> StreamingResponse:
+    """
+    Tail execution logs via Server-Sent Events.
+
+    Sends the existing entries after `cursor`, then new ones as they are
+    written (by any process), and closes once the execution has finished.
+    Each `log` event carries the entry's `seq` as its SSE id; pass the last
+    one as `cursor` to resume after a disconnect.
+
+    **Events streamed:**
+    - `log` - Log entry
+    - `heartbeat` - Keep-alive while no entries arrive
+    - `end` - Execution finished, all entries sent
+    """
+    await _get_owned_execution(db, execution_id, current_user)
+
+    poll_interval = 1.0
+
+    async def events():
+        idle = 0.0
+        async for entry in ExecutionLogService.tail(
+            get_db_context, execution_id, after_seq=cursor, poll_interval=poll_interval
+        ):
+            if entry is None:
+                idle += poll_interval
+                if idle >= settings.SSE_HEARTBEAT_INTERVAL:
+                    idle = 0.0
+                    yield "event: heartbeat\ndata: {}\n\n"
+                continue
+            idle = 0.0
+            yield f"id: {entry['seq']}\nevent: log\ndata: {json.dumps(entry)}\n\n"
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        }
+    )
+
+
 @router.patch(
     "/{execution_id}/status",
     response_model=TaskExecutionResponse,
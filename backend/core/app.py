@@ -13,6 +13,9 @@ from backend.core.logging import setup_logging
 from backend.core.database import init_db, close_db
 from backend.core.agno_config import initialize_agno, shutdown_agno
 from backend.core.redis import get_redis, close_redis
+from backend.core.security import shutdown_password_hash_pool
+from backend.services.usage_writer import init_usage_writer, close_usage_writer
+from backend.services.execution_log_service import close_execution_log_buffer
 from backend.api.v1.router import api_router
 
 # Production middleware
@@ -31,14 +34,18 @@ async def lifespan(app: FastAPI):
     setup_logging()
     initialize_agno()  # Initialize Agno framework
     await init_db()
-    await get_redis()  # Initialize Redis cache
+    redis = await get_redis()  # Initialize Redis cache
+    await init_usage_writer(redis)  # Buffered LLM cost writer (recovers pending events)
     print(f"🚀 {settings.APP_NAME} started in {settings.ENV} mode")
 
     yield
 
     # Shutdown
+    await close_usage_writer()  # Flush buffered LLM cost events before closing DB/Redis
+    await close_execution_log_buffer()  # Write buffered execution log entries
     await close_redis()  # Close Redis connection
     await close_db()
+    shutdown_password_hash_pool()  # Let in-flight bcrypt jobs finish
     shutdown_agno()  # Shutdown Agno framework
     print("👋 Application shutdown complete")
 
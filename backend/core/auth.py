@@ -1,15 +1,27 @@
 """
 Authentication dependencies for FastAPI routes
+
+Fast path: verified JWT payloads are kept in a process-local LRU keyed by the
+token's SHA-256 until the token expires, and the user's row (without the
+password hash) is cached in-process for AUTH_PRINCIPAL_CACHE_TTL seconds on
+top of the shared Redis copy kept by UserCacheService. A warm request
+therefore neither decodes the JWT nor queries the database;
+UserCacheService.invalidate_user drops both copies when a user changes.
 """
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
 from uuid import UUID
+import hashlib
 import logging
+import time
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from backend.core.config import settings
 from backend.core.database import get_db
 from backend.core.security import verify_token
 from backend.models.user import User
@@ -30,27 +42,137 @@ TIER_HIERARCHY = {
 }
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+class _ExpiringLRU:
+    """Bounded LRU whose entries expire at a given time (time.time())"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Verified access token payloads by sha256(token), kept until "exp"
+_token_cache = _ExpiringLRU(settings.AUTH_TOKEN_CACHE_SIZE)
+
+# Cached user rows by user ID (L1 over UserCacheService's Redis copy)
+_user_row_cache = _ExpiringLRU(settings.AUTH_PRINCIPAL_CACHE_SIZE)
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Authenticated user as needed for access checks (no ORM object)"""
+    id: UUID
+    email: str
+    plan_tier: Optional[str]
+    is_active: bool
+    email_verified: bool
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "UserPrincipal":
+        return cls(
+            id=UUID(row["id"]),
+            email=row["email"],
+            plan_tier=row.get("plan_tier"),
+            is_active=row["is_active"],
+            email_verified=row.get("email_verified", False),
+        )
+
+
+def forget_cached_user(user_id: UUID) -> None:
+    """Drop a user's in-process cached row (called by UserCacheService.invalidate_user)"""
+    _user_row_cache.pop(str(user_id))
+
+
+def clear_auth_caches() -> None:
+    """Empty the token and user caches (tests, key rotation)"""
+    _token_cache.clear()
+    _user_row_cache.clear()
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and sizes of the auth caches"""
+    return {
+        "tokens": {**_token_cache.stats, "size": len(_token_cache)},
+        "users": {**_user_row_cache.stats, "size": len(_user_row_cache)},
+    }
+
+
+def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
-    Get the current authenticated user from JWT token.
+    Verify a JWT, reusing the payload of tokens verified before.
+
+    Only valid tokens with an "exp" claim are cached, and only until they
+    expire, so the cache never extends a token's lifetime.
 
     Args:
-        credentials: HTTP Bearer token credentials
-        db: Database session
+        token: JWT token string
 
     Returns:
-        User object if authenticated
+        Decoded payload if valid, None otherwise
+    """
+    if not settings.AUTH_CACHE_ENABLED:
+        return verify_token(token)
 
-    Raises:
-        HTTPException: If token is invalid or user not found
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = verify_token(token)
+        if payload and payload.get("exp"):
+            _token_cache.put(key, payload, float(payload["exp"]))
+    return payload
+
+
+async def _get_user_row(user_id: UUID, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """Cached user row: in-process LRU, then Redis, then the database"""
+    from backend.services.cached_services.user_cache import get_user_cache
+
+    if not settings.AUTH_CACHE_ENABLED:
+        return await get_user_cache().get_user_row(db, user_id, use_cache=False)
+
+    key = str(user_id)
+    row = _user_row_cache.get(key)
+    if row is None:
+        row = await get_user_cache().get_user_row(db, user_id)
+        if row is not None:
+            _user_row_cache.put(key, row, time.time() + settings.AUTH_PRINCIPAL_CACHE_TTL)
+    return row
+
+
+def _user_id_from_token(token: str) -> UUID:
     """
-    token = credentials.credentials
+    Verify an access token and extract the user ID.
 
-    # Verify token
-    payload = verify_token(token)
+    Raises:
+        HTTPException: If the token is invalid, of the wrong type or has no valid subject
+    """
+    payload = verify_access_token(token)
 
     if not payload:
         raise HTTPException(
@@ -97,26 +219,96 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    result = await db.execute(
-        select(User).filter(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    return user_id
+
+
+async def _get_active_user_row(token: str, db: AsyncSession) -> Dict[str, Any]:
+    """
+    Cached row of the active user owning an access token.
+
+    Raises:
+        HTTPException: If the token is invalid, the user is missing or inactive
+    """
+    row = await _get_user_row(_user_id_from_token(token), db)
 
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not user.is_active:
+    if not row["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
 
-    return user
+    return row
+
+
+async def _attach_user(db: AsyncSession, row: Dict[str, Any]) -> User:
+    """
+    User for a cached row, attached to the request session without a query.
+
+    The password hash is never cached; it is loaded on first access, which
+    async sessions only allow through an explicit refresh.
+    """
+    from backend.services.cached_services.user_cache import deserialize_user_row
+
+    user = User(**deserialize_user_row(row))
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+
+    Uses the token and user caches: a warm request runs no database query.
+    The returned User is attached to the request session, so changes to it
+    are saved on commit.
+
+    Args:
+        credentials: HTTP Bearer token credentials
+        db: Database session
+
+    Returns:
+        User object if authenticated
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    row = await _get_active_user_row(credentials.credentials, db)
+    return await _attach_user(db, row)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> UserPrincipal:
+    """
+    Get the current authenticated user as a lightweight principal.
+
+    For routes that only need the user's identity, status or plan tier. The
+    session is only used on a cache miss, so a warm request never checks out
+    a database connection.
+
+    Args:
+        credentials: HTTP Bearer token credentials
+        db: Database session (lazy, used on cache miss)
+
+    Returns:
+        UserPrincipal if authenticated
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    row = await _get_active_user_row(credentials.credentials, db)
+    return UserPrincipal.from_row(row)
 
 
 async def get_current_active_user(
@@ -172,7 +364,7 @@ def require_plan_tier(required_tier: str):
     Usage:
         @app.get("/premium-feature")
         async def premium_feature(
-            user: User = Depends(require_plan_tier("pro"))
+            user: UserPrincipal = Depends(require_plan_tier("pro"))
         ):
             ...
 
@@ -180,7 +372,8 @@ def require_plan_tier(required_tier: str):
         required_tier: Minimum plan tier required (free, starter, pro, enterprise)
 
     Returns:
-        Dependency function that checks user's plan tier
+        Dependency function that checks user's plan tier and returns the
+        UserPrincipal (use get_current_user for the ORM object)
 
     Raises:
         ValueError: If required_tier is not a valid tier
@@ -193,9 +386,9 @@ def require_plan_tier(required_tier: str):
         )
 
     async def check_plan_tier(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
-        """Check if user's plan tier meets the requirement"""
+        current_user: UserPrincipal = Depends(get_current_principal)
+    ) -> UserPrincipal:
+        """Check if user's plan tier meets the requirement (no database access when cached)"""
         # Default to free tier if user has no tier set
         user_tier = current_user.plan_tier or "free"
 
@@ -249,7 +442,7 @@ async def get_optional_user(
 
     try:
         token = credentials.credentials
-        payload = verify_token(token)
+        payload = verify_access_token(token)
 
         if not payload or payload.get("type") != "access":
             logger.debug(
@@ -267,10 +460,8 @@ async def get_optional_user(
             return None
 
         user_id = UUID(user_id_str)
-        result = await db.execute(
-            select(User).filter(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
+        row = await _get_user_row(user_id, db)
+        user = await _attach_user(db, row) if row else None
 
         if not user:
             logger.warning(
@@ -40,6 +40,65 @@ class Settings(BaseSettings):
     CACHE_METRICS_ENABLED: bool = True  # Track cache performance metrics
     CACHE_METRICS_WINDOW: int = 3600  # Track metrics for last 1 hour
 
+    # LLM usage accounting (buffered cost/token writer)
+    USAGE_WRITER_BACKEND: str = "memory"  # "memory" or "redis" (Redis Streams, survives restarts)
+    USAGE_WRITER_BATCH_SIZE: int = 500  # Flush when this many events are buffered
+    USAGE_WRITER_FLUSH_INTERVAL: float = 2.0  # Seconds between background flushes
+    USAGE_WRITER_MAX_BUFFER: int = 50000  # Callers flush inline above this (backpressure)
+
+    # Execution logs (services/execution_log_service.py)
+    EXECUTION_LOG_BATCH_SIZE: int = 200  # Buffered appends: flush when this many entries wait
+    EXECUTION_LOG_FLUSH_INTERVAL: float = 0.5  # Buffered appends: seconds between flushes
+    EXECUTION_LOG_MAX_ATTEMPTS: int = 3  # Buffered appends: flushes before an execution's failing entries are dropped
+    EXECUTION_LOG_MAX_PENDING: int = 100000  # Buffered appends: new entries are dropped beyond this
+    EXECUTION_LOG_RESPONSE_TAIL: int = 100  # Newest entries in the deprecated TaskExecutionResponse.logs
+    EXECUTION_LOG_TAIL_LAG: float = 5.0  # Tail re-reads this many seconds behind for late commits
+
+    # Password hashing (core/security.py)
+    BCRYPT_ROUNDS: int = 12  # Changing it rehashes passwords on next login
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent bcrypt runs (threads)
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting hash jobs before new logins get 503
+
+    # Authentication fast path (core/auth.py)
+    AUTH_CACHE_ENABLED: bool = True  # Cache verified tokens and user rows
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # Verified tokens kept in-process (until they expire)
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000  # Users kept in-process
+    AUTH_PRINCIPAL_CACHE_TTL: int = 30  # Seconds a process trusts its copy (Redis copy: CACHE_USER_TTL)
+
+    # Routing (agents/interaction/routing_engine.py)
+    ROUTING_TABLE_TTL: int = 60  # Seconds a process keeps a compiled routing table (changes elsewhere)
+
+    # Conversation timeouts (agents/interaction/timeout_monitor.py)
+    TIMEOUT_BATCH_SIZE: int = 100  # Due conversations claimed (row-locked) and committed together
+    TIMEOUT_WORKERS: int = 4  # Concurrent sweeps per beat run; SKIP LOCKED keeps their batches apart
+
+    # Delegation (agents/orchestration/delegation_engine.py, load_index.py)
+    DELEGATION_STRATEGY: str = "least_loaded"  # least_loaded, power_of_two or score (ignore load)
+    DELEGATION_SCORE_TOLERANCE: float = 2.0  # Members this close to the best score share the work
+    AGENT_LOAD_REFRESH_SECONDS: float = 5.0  # Seconds a squad's open-conversation counts are reused
+    DAG_AGENT_CONCURRENCY: int = 2  # Dynamic tasks one agent runs at once (orchestration/dag_executor.py)
+    DAG_SQUAD_CONCURRENCY: int = 8  # Dynamic tasks one squad runs at once per process
+
+    # Guardian (agents/guardian/workflow_snapshot.py)
+    WORKFLOW_SNAPSHOT_TTL: float = 5.0  # Seconds an execution's snapshot is reused (writes elsewhere)
+
+    # Discovery (agents/discovery/discovery_stream.py)
+    DISCOVERY_STREAM_ENABLED: bool = False  # Detect discoveries as messages are sent (message bus stage)
+    DISCOVERY_STREAM_RECENT: int = 100  # Recent discoveries kept per execution
+    DISCOVERY_STREAM_EXECUTIONS: int = 1000  # Executions whose discoveries are kept (LRU)
+
+    # Rate limiting (middleware/rate_limiting.py)
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_MAX_CLIENTS: int = 10000  # Clients tracked in-process (LRU)
+    RATE_LIMIT_LOCAL_FRACTION: float = 0.1  # Share of a client's remaining quota served without Redis
+    RATE_LIMIT_LOCAL_BURST: int = 50  # Most requests served locally between two Redis round trips
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0  # Seconds before locally served requests are reported to Redis
+
+    # Rolling conversation summaries
+    SUMMARY_TOKEN_THRESHOLD: int = 2000  # Fold once the unsummarized tail exceeds this many tokens
+    SUMMARY_FOLD_BATCH_SIZE: int = 500  # Messages fetched per round trip while folding
+    SUMMARY_MAX_FOLDS_PER_RUN: int = 100  # Conversations / executions folded per background run
+
     # SSE Configuration
     SSE_QUEUE_SIZE: int = Field(default=1000, ge=100, le=10000)  # SSE queue size per connection
     SSE_HEARTBEAT_INTERVAL: int = Field(default=15, ge=10, le=120)  # Heartbeat interval in seconds
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination helpers
+
+Pages are addressed by the sort key of the last row seen, (sort value, id),
+instead of an OFFSET. With a composite index on (filter, sort value, id) every
+page is a single index range scan, so page 10,000 costs the same as page 1.
+
+Cursors are opaque URL-safe strings; clients pass back the `next_cursor` of
+the previous page.
+"""
+import base64
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """
+    Encode the sort key of a row as an opaque cursor.
+
+    Args:
+        sort_value: Value of the sort column (e.g. created_at)
+        row_id: Row ID (tie breaker for equal sort values)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (sort value, row ID)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def after_cursor(sort_column: Any, id_column: Any, cursor: str, descending: bool = False):
+    """
+    WHERE clause selecting rows after a cursor.
+
+    Uses a row-value comparison, (sort, id) > (:sort, :id), which PostgreSQL
+    turns into a single range scan on a (..., sort, id) index.
+
+    Args:
+        sort_column: Sort column or expression
+        id_column: ID column
+        cursor: Cursor of the last row of the previous page
+        descending: True when the listing is sorted newest first
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    key = tuple_(sort_column, id_column)
+    bound = tuple_(sort_value, row_id)
+    return key < bound if descending else key > bound
+
+
+def next_cursor(rows: Sequence[Any], limit: Optional[int], sort_attr: str = "created_at") -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None if this was the last page.
+
+    Args:
+        rows: Rows of the current page (objects with `id` and `sort_attr`)
+        limit: Page size that was requested
+        sort_attr: Attribute holding the sort value
+
+    Returns:
+        Cursor string or None
+    """
+    if not rows or not limit or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
@@ -1,19 +1,154 @@
 """
 Security utilities for password hashing and JWT token management
+
+bcrypt is deliberately slow (~100-300ms per hash), so async code must use
+hash_password_async / verify_password_async: they run bcrypt in a bounded
+thread pool (bcrypt releases the GIL) instead of blocking the event loop,
+and reject work with PasswordHashPoolFull once the queue is full.
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 
 import bcrypt
 from jose import jwt, JWTError
+from prometheus_client import Counter, Gauge, Histogram
 
 from backend.core.config import settings
 
 
+password_hash_duration = Histogram(
+    'password_hash_duration_seconds',
+    'bcrypt hash/verify time in the password hash pool',
+    labelnames=['operation'],  # operation: hash|verify
+    buckets=[0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5]
+)
+
+password_hash_wait = Histogram(
+    'password_hash_wait_seconds',
+    'Time password hash jobs waited for a pool worker',
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5]
+)
+
+password_hash_pending = Gauge(
+    'password_hash_pending',
+    'Password hash jobs queued or running'
+)
+
+password_hash_rejected = Counter(
+    'password_hash_rejected_total',
+    'Password hash jobs rejected because the queue was full'
+)
+
+
+class PasswordHashPoolFull(Exception):
+    """Raised when the password hash pool queue is full"""
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt.
+
+    At most `workers` hashes run at once and at most `max_queue` more wait;
+    further submissions fail fast with PasswordHashPoolFull instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {"completed": 0, "rejected": 0, "max_pending": 0}
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running"""
+        return self._pending
+
+    async def run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a bcrypt function in the pool.
+
+        Args:
+            operation: Metric label (hash or verify)
+            fn: Function to run
+            *args: Function arguments
+
+        Returns:
+            Function result
+
+        Raises:
+            PasswordHashPoolFull: If workers + max_queue jobs are already pending
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.stats["rejected"] += 1
+                password_hash_rejected.inc()
+                raise PasswordHashPoolFull("Password hashing is at capacity, try again shortly")
+            self._pending += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+        password_hash_pending.inc()
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            password_hash_wait.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                password_hash_duration.labels(operation=operation).observe(time.perf_counter() - started)
+
+        def release(_future: Future) -> None:
+            # Runs when the job finishes or is cancelled before starting, not
+            # when the awaiting request goes away, so abandoned jobs still count
+            with self._lock:
+                self._pending -= 1
+                self.stats["completed"] += 1
+            password_hash_pending.dec()
+
+        future = self._executor.submit(job)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (waits for running jobs)"""
+        self._executor.shutdown(wait=True)
+
+
+_password_hash_pool: Optional[PasswordHashPool] = None
+
+
+def get_password_hash_pool() -> PasswordHashPool:
+    """Get or create the password hash pool"""
+    global _password_hash_pool
+    if _password_hash_pool is None:
+        _password_hash_pool = PasswordHashPool(
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+        )
+    return _password_hash_pool
+
+
+def shutdown_password_hash_pool() -> None:
+    """Shut down the password hash pool (application shutdown)"""
+    global _password_hash_pool
+    if _password_hash_pool is not None:
+        _password_hash_pool.shutdown()
+        _password_hash_pool = None
+
+
 def hash_password(password: str) -> str:
     """
     Hash a plain password using bcrypt.
 
+    Blocks for the whole bcrypt run; use hash_password_async in async code.
+
     Args:
         password: Plain text password
 
@@ -21,7 +156,7 @@ def hash_password(password: str) -> str:
         Hashed password string
     """
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -42,6 +177,43 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with other parameters than the current ones.
+
+    Args:
+        hashed_password: Stored bcrypt hash ($2b$<cost>$...)
+
+    Returns:
+        True if the hash should be replaced on next successful login
+    """
+    try:
+        _, variant, cost, _ = hashed_password.split('$', 3)
+        return variant != '2b' or int(cost) != settings.BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password in the password hash pool.
+
+    Raises:
+        PasswordHashPoolFull: If the pool queue is full
+    """
+    return await get_password_hash_pool().run('hash', hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the password hash pool.
+
+    Raises:
+        PasswordHashPoolFull: If the pool queue is full
+    """
+    return await get_password_hash_pool().run('verify', verify_password, plain_password, hashed_password)
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -17,15 +17,19 @@ Complies with OWASP Top 10 security best practices.
 """
 import re
 import json
-from typing import Optional, Set
+from typing import Any, Optional, Set
+from fastapi import status
+from fastapi.routing import APIRoute
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
-from fastapi import status
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Key in request.state holding the body parsed by the middleware
+PARSED_JSON_STATE_KEY = "validated_json"
+
 
 class InputValidationMiddleware(BaseHTTPMiddleware):
     """
@@ -36,6 +40,13 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
     - allowed_content_types: Whitelist of allowed Content-Type headers
     - max_json_depth: Maximum JSON nesting depth (default: 10)
     - max_string_length: Maximum string length in JSON (default: 10000)
+
+    Each string is first checked for the literals the patterns need
+    (TRIGGER_SEQUENCES / TRIGGER_WORDS); only values containing one are
+    scanned, once, with the patterns of all categories compiled into a single
+    alternation. The per-category expressions only run to name the category
+    of a blocked value. The parsed JSON body is stored on
+    request.state so routes using ValidatedJSONRoute do not parse it again.
     """
 
     # Default configuration
@@ -91,6 +102,20 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         r"`.*`",    # Backticks
     ]
 
+    # Every pattern above needs one of these to match: a character/sequence
+    # (case-sensitive) or a word (checked on the lowercased value). Values
+    # with none of them skip the pattern scan. Extend when adding patterns.
+    TRIGGER_SEQUENCES = r"[=<;&|`$]|\.\.|--|/\*"
+    TRIGGER_WORDS = ("select", "insert", "update", "delete", "drop", "javascript:", "%2e%2e")
+
+    # Category checked first wins when a value matches several
+    CATEGORY_MESSAGES = (
+        ("sql_injection", "Potential SQL injection detected"),
+        ("xss", "Potential XSS attack detected"),
+        ("path_traversal", "Potential path traversal detected"),
+        ("command_injection", "Potential command injection detected"),
+    )
+
     def __init__(self, app, **kwargs):
         super().__init__(app)
         self.max_content_length = kwargs.get("max_content_length", self.MAX_CONTENT_LENGTH)
@@ -99,11 +124,32 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         self.max_string_length = kwargs.get("max_string_length", self.MAX_STRING_LENGTH)
         self.max_array_length = kwargs.get("max_array_length", self.MAX_ARRAY_LENGTH)
 
-        # Compile regex patterns for performance
-        self.sql_injection_re = [re.compile(p, re.IGNORECASE) for p in self.SQL_INJECTION_PATTERNS]
-        self.xss_re = [re.compile(p, re.IGNORECASE) for p in self.XSS_PATTERNS]
-        self.path_traversal_re = [re.compile(p, re.IGNORECASE) for p in self.PATH_TRAVERSAL_PATTERNS]
-        self.command_injection_re = [re.compile(p) for p in self.COMMAND_INJECTION_PATTERNS]
+        # One alternation per category (command injection patterns contain no letters,
+        # so case-insensitive matching is equivalent for them)
+        self.sql_injection_re = self._combine(self.SQL_INJECTION_PATTERNS)
+        self.xss_re = self._combine(self.XSS_PATTERNS)
+        self.path_traversal_re = self._combine(self.PATH_TRAVERSAL_PATTERNS)
+        self.command_injection_re = self._combine(self.COMMAND_INJECTION_PATTERNS)
+        self.category_re = {
+            "sql_injection": self.sql_injection_re,
+            "xss": self.xss_re,
+            "path_traversal": self.path_traversal_re,
+            "command_injection": self.command_injection_re,
+        }
+
+        # All categories in a single pass, for values that contain a trigger
+        self.trigger_re = re.compile(self.TRIGGER_SEQUENCES)
+        self.attack_re = self._combine(
+            self.SQL_INJECTION_PATTERNS
+            + self.XSS_PATTERNS
+            + self.PATH_TRAVERSAL_PATTERNS
+            + self.COMMAND_INJECTION_PATTERNS
+        )
+
+    @staticmethod
+    def _combine(patterns) -> re.Pattern:
+        """Compile patterns into one case-insensitive alternation"""
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
 
     async def dispatch(self, request: Request, call_next):
         """
@@ -131,10 +177,7 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
                         f"Request body too large: {length} bytes (max: {self.max_content_length})",
                         extra={"path": request.url.path, "client": request.client}
                     )
-                    return self._error_response(
-                        "Request body too large",
-                        f"Maximum allowed size is {self.max_content_length} bytes"
-                    )
+                    return self._body_too_large()
             except ValueError:
                 return self._error_response("Invalid Content-Length header")
 
@@ -221,20 +264,44 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         content_type = request.headers.get("content-type", "")
         return "application/json" in content_type
 
+    async def _read_body(self, request: Request) -> Optional[bytes]:
+        """
+        Read the body, stopping once it exceeds max_content_length
+
+        Chunked requests carry no Content-Length, so the limit is enforced
+        while streaming. Returns None when the body is too large.
+        """
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > self.max_content_length:
+                return None
+            chunks.append(chunk)
+        body = b"".join(chunks)
+        # Cache like Request.body() so the body is replayed to the endpoint
+        request._body = body
+        return body
+
     async def _validate_json_body(self, request: Request) -> Optional[Response]:
         """
         Validate JSON request body
 
         Checks:
+        - Body size (while streaming)
         - Valid JSON format
         - Nesting depth
         - String lengths
         - Array lengths
         - Attack patterns in string values
+
+        The parsed body is handed to the endpoint via request.state.
         """
         try:
             # Read body
-            body = await request.body()
+            body = await self._read_body(request)
+            if body is None:
+                return self._body_too_large()
 
             # Parse JSON
             try:
@@ -243,24 +310,24 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
                 return self._error_response("Invalid JSON", str(e))
 
             # Validate JSON structure
-            validation_error = self._validate_json_structure(data, depth=0)
+            validation_error = self._validate_json_structure(data)
             if validation_error:
                 return validation_error
 
+            setattr(request.state, PARSED_JSON_STATE_KEY, data)
             return None  # Valid
 
         except Exception as e:
             logger.error(f"Unexpected error in JSON validation: {e}")
             return self._error_response("Request validation error")
 
-    def _validate_json_structure(
-        self,
-        data,
-        depth: int = 0,
-        path: str = "root"
-    ) -> Optional[Response]:
+    def _validate_json_structure(self, data) -> Optional[Response]:
         """
-        Recursively validate JSON structure
+        Iteratively validate JSON structure
+
+        Walks the document depth-first with an explicit stack, in the same
+        order a recursive walk would, so the first problem is reported.
+        Paths are only rendered for errors.
 
         Checks at each level:
         - Maximum nesting depth
@@ -268,45 +335,76 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         - Array length limits
         - Attack patterns
         """
-        # Check nesting depth
-        if depth > self.max_json_depth:
-            return self._error_response(
-                "JSON too deeply nested",
-                f"Maximum nesting depth is {self.max_json_depth}"
-            )
+        # Stack entries: (value, depth, path) with path = (parent_path, key) or None for root
+        stack = [(data, 0, None)]
+        while stack:
+            value, depth, path = stack.pop()
 
-        # Validate based on type
-        if isinstance(data, dict):
-            for key, value in data.items():
-                # Validate key
-                key_error = self._validate_string(key, f"{path}.{key} (key)")
-                if key_error:
-                    return key_error
-
-                # Validate value (recursive)
-                value_error = self._validate_json_structure(value, depth + 1, f"{path}.{key}")
-                if value_error:
-                    return value_error
-
-        elif isinstance(data, list):
-            # Check array length
-            if len(data) > self.max_array_length:
+            # Check nesting depth
+            if depth > self.max_json_depth:
                 return self._error_response(
-                    f"Array too large at {path}",
-                    f"Maximum array length is {self.max_array_length}"
+                    "JSON too deeply nested",
+                    f"Maximum nesting depth is {self.max_json_depth}"
+                )
+
+            # Validate based on type
+            if isinstance(value, str):
+                if self._scan(value) is not None:
+                    return self._validate_string(value, self._render_path(path))
+
+            elif isinstance(value, dict):
+                children = []
+                for key, item in value.items():
+                    # Validate key
+                    if self._scan(key) is not None:
+                        return self._validate_string(key, f"{self._render_path((path, key))} (key)")
+                    children.append((item, depth + 1, (path, key)))
+                stack.extend(reversed(children))
+
+            elif isinstance(value, list):
+                # Check array length
+                if len(value) > self.max_array_length:
+                    return self._error_response(
+                        f"Array too large at {self._render_path(path)}",
+                        f"Maximum array length is {self.max_array_length}"
+                    )
+                stack.extend(
+                    (value[i], depth + 1, (path, i)) for i in range(len(value) - 1, -1, -1)
                 )
 
-            # Validate each item (recursive)
-            for i, item in enumerate(data):
-                item_error = self._validate_json_structure(item, depth + 1, f"{path}[{i}]")
-                if item_error:
-                    return item_error
+            # Other types (int, float, bool, null) are safe
+        return None
+
+    @staticmethod
+    def _render_path(path) -> str:
+        """Render a (parent, key) chain as root.a[0].b"""
+        parts = []
+        while path is not None:
+            path, key = path
+            parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+        return "root" + "".join(reversed(parts))
 
-        elif isinstance(data, str):
-            # Validate string
-            return self._validate_string(data, path)
+    def _scan(self, value: str) -> Optional[str]:
+        """
+        Return the reason a string is rejected, or None if it is clean
 
-        # Other types (int, float, bool, null) are safe
+        Values without a trigger are clean without running the patterns;
+        the category is only resolved for rejected values.
+        """
+        if len(value) > self.max_string_length:
+            return "too_long"
+        if self.trigger_re.search(value) is None:
+            lowered = value.lower()
+            for word in self.TRIGGER_WORDS:
+                if word in lowered:
+                    break
+            else:
+                return None
+        if self.attack_re.search(value) is None:
+            return None
+        for category, _ in self.CATEGORY_MESSAGES:
+            if self.category_re[category].search(value):
+                return category
         return None
 
     def _validate_string(self, value: str, context: str = "value") -> Optional[Response]:
@@ -320,57 +418,37 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         - Path traversal patterns
         - Command injection patterns
         """
-        # Check length
-        if len(value) > self.max_string_length:
+        reason = self._scan(value)
+        if reason is None:
+            return None  # Valid
+
+        if reason == "too_long":
             return self._error_response(
                 f"String too long in {context}",
                 f"Maximum string length is {self.max_string_length}"
             )
 
-        # Check for SQL injection
-        for pattern in self.sql_injection_re:
-            if pattern.search(value):
-                return self._error_response(
-                    f"Potential SQL injection detected in {context}",
-                    "Request blocked for security reasons"
-                )
-
-        # Check for XSS
-        for pattern in self.xss_re:
-            if pattern.search(value):
-                return self._error_response(
-                    f"Potential XSS attack detected in {context}",
-                    "Request blocked for security reasons"
-                )
-
-        # Check for path traversal
-        for pattern in self.path_traversal_re:
-            if pattern.search(value):
-                return self._error_response(
-                    f"Potential path traversal detected in {context}",
-                    "Request blocked for security reasons"
-                )
-
-        # Check for command injection
-        for pattern in self.command_injection_re:
-            if pattern.search(value):
-                return self._error_response(
-                    f"Potential command injection detected in {context}",
-                    "Request blocked for security reasons"
-                )
-
-        return None  # Valid
+        message = dict(self.CATEGORY_MESSAGES)[reason]
+        return self._error_response(
+            f"{message} in {context}",
+            "Request blocked for security reasons"
+        )
 
     def _validate_path(self, path: str) -> Optional[Response]:
         """Validate URL path for path traversal attempts"""
-        for pattern in self.path_traversal_re:
-            if pattern.search(path):
-                return self._error_response(
-                    "Invalid URL path",
-                    "Request blocked for security reasons"
-                )
+        if self.path_traversal_re.search(path):
+            return self._error_response(
+                "Invalid URL path",
+                "Request blocked for security reasons"
+            )
         return None
 
+    def _body_too_large(self) -> JSONResponse:
+        return self._error_response(
+            "Request body too large",
+            f"Maximum allowed size is {self.max_content_length} bytes"
+        )
+
     def _error_response(self, message: str, detail: Optional[str] = None) -> JSONResponse:
         """Generate error response"""
         content = {
@@ -383,6 +461,36 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         )
 
 
+class ValidatedJSONRequest(Request):
+    """Request whose json() returns the body already parsed by the middleware"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            state = self.scope.get("state", {})
+            if PARSED_JSON_STATE_KEY in state:
+                self._json = state[PARSED_JSON_STATE_KEY]
+            else:
+                return await super().json()
+        return self._json
+
+
+class ValidatedJSONRoute(APIRoute):
+    """
+    Route class that reuses the middleware's parsed body
+
+    Use with APIRouter(route_class=ValidatedJSONRoute) so FastAPI does not
+    parse the JSON body a second time.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ValidatedJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+
 # ============================================================================
 # INTEGRATION EXAMPLES
 # ============================================================================
@@ -475,12 +583,12 @@ Example 6: Test with curl
 
 Example 7: Performance considerations
 
-    # Input validation adds ~1-5ms latency per request
-    # Acceptable trade-off for security
+    # Clean strings are cleared by a literal prefilter, the rest are scanned
+    # with one combined regex; the JSON walk is iterative. See backend/scripts/benchmark_input_validation.py.
+
+    # Reuse the parsed body instead of parsing it again in FastAPI:
+    from fastapi import APIRouter
+    from backend.middleware.input_validation import ValidatedJSONRoute
 
-    # For high-performance endpoints, consider:
-    1. Skip validation for trusted clients (API keys)
-    2. Cache validation results (for identical requests)
-    3. Use async validation (already implemented)
-    4. Optimize regex patterns
+    router = APIRouter(route_class=ValidatedJSONRoute)
 """
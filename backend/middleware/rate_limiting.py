@@ -3,8 +3,24 @@ Rate Limiting Middleware
 
 Provides API rate limiting to prevent abuse and ensure fair usage.
 Uses Redis for distributed rate limiting across multiple instances.
+
+The limiter is a sliding-window counter: the previous window's count is
+weighted by how much of it still overlaps the sliding window, so each client
+needs two integers instead of one timestamp per request.
+
+- Redis: one EVALSHA per check; the Lua script reads, decides and increments
+  atomically.
+- Local token bucket: after each Redis check a process may serve a share of
+  the client's remaining quota (RATE_LIMIT_LOCAL_FRACTION, at most
+  RATE_LIMIT_LOCAL_BURST) without a round trip. Those requests are reported
+  to Redis in the background every RATE_LIMIT_SYNC_INTERVAL seconds, or with
+  the next blocking check. Across N processes a client can overshoot its
+  limit by at most N * RATE_LIMIT_LOCAL_BURST requests.
+- In-memory fallback: same algorithm, clients kept in a bounded LRU.
 """
+import asyncio
 import time
+from collections import OrderedDict
 from typing import Callable, Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
@@ -23,6 +39,78 @@ except ImportError:
     logger.warning("redis not available, rate limiting will use in-memory store")
 
 
+# KEYS[1]: current window counter, KEYS[2]: previous window counter
+# ARGV: limit, window seconds, now, recorded, cost
+#   recorded - requests already served locally (always counted)
+#   cost     - this request (counted only if allowed; 0 for a background sync)
+# Returns {allowed, remaining}
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local recorded = tonumber(ARGV[4])
+local cost = tonumber(ARGV[5])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weight = (window - (now % window)) / window
+local used = math.floor(previous * weight) + current + recorded
+local allowed = 0
+if used + cost <= limit then
+    allowed = 1
+    used = used + cost
+end
+local increment = recorded + allowed * cost
+if increment > 0 then
+    if redis.call('INCRBY', KEYS[1], increment) == increment then
+        redis.call('EXPIRE', KEYS[1], window * 2)
+    end
+end
+return {allowed, math.max(limit - used, 0)}
+"""
+
+
+class _LRUStore(OrderedDict):
+    """OrderedDict that keeps the most recently used `max_entries` keys"""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def get_or_create(self, key: str, factory: Callable):
+        value = self.get(key)
+        if value is None:
+            value = self[key] = factory()
+            if len(self) > self.max_entries:
+                self.popitem(last=False)
+        else:
+            self.move_to_end(key)
+        return value
+
+
+class _WindowCounter:
+    """In-memory sliding-window counter for one client"""
+
+    __slots__ = ("index", "current", "previous")
+
+    def __init__(self):
+        self.index = 0
+        self.current = 0
+        self.previous = 0
+
+
+class _LocalBucket:
+    """Requests a process may serve for one client before asking Redis again"""
+
+    __slots__ = ("tokens", "remaining", "pending", "synced_at", "syncing")
+
+    def __init__(self):
+        self.tokens = 0  # Requests that may still be served locally
+        self.remaining = 0  # Global remaining quota as last seen, minus local use
+        self.pending = 0  # Locally served requests not yet reported to Redis
+        self.synced_at = 0.0
+        self.syncing = False
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Middleware for API rate limiting.
@@ -30,9 +118,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     Features:
     - Per-IP rate limiting
     - Per-user rate limiting (if authenticated)
-    - Sliding window algorithm
-    - Redis-based for distributed systems
-    - In-memory fallback for development
+    - Sliding window counter algorithm
+    - Redis-based for distributed systems (single atomic script call)
+    - Local token bucket to skip Redis for clearly allowed traffic
+    - Bounded in-memory fallback for development
 
     Rate Limits:
     - Anonymous: 100 requests/minute
@@ -43,7 +132,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, redis_client: Optional[any] = None):
         super().__init__(app)
         self.redis_client = redis_client
-        self.in_memory_store = {}  # Fallback for development
+        self.window = settings.RATE_LIMIT_WINDOW_SECONDS
+        self.in_memory_store = _LRUStore(settings.RATE_LIMIT_MAX_CLIENTS)  # Fallback for development
+        self.local_buckets = _LRUStore(settings.RATE_LIMIT_MAX_CLIENTS)
+        self._script = None
+        self._redis_retry_at = 0.0
+        self._sync_tasks: set = set()
 
         # Rate limits (requests per minute)
         self.limits = {
@@ -77,18 +171,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 path=request.url.path,
             )
 
+            retry_after = max(int(reset_time - time.time()), 1)
             return JSONResponse(
                 status_code=429,
                 content={
                     "error": "Rate Limit Exceeded",
                     "message": f"Too many requests. Limit: {limit}/minute",
-                    "retry_after": int(reset_time - time.time()),
+                    "retry_after": retry_after,
                 },
                 headers={
                     "X-RateLimit-Limit": str(limit),
                     "X-RateLimit-Remaining": "0",
                     "X-RateLimit-Reset": str(int(reset_time)),
-                    "Retry-After": str(int(reset_time - time.time())),
+                    "Retry-After": str(retry_after),
                 }
             )
 
@@ -134,70 +229,137 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         Returns: (is_allowed, remaining_requests, reset_timestamp)
         """
         current_time = time.time()
-        window_start = current_time - 60  # 1 minute window
 
-        if REDIS_AVAILABLE and self.redis_client:
+        script = await self._get_script(current_time)
+        if script is not None:
             return await self._check_rate_limit_redis(
-                client_id, limit, window_start, current_time
+                script, client_id, limit, current_time
             )
         else:
             return self._check_rate_limit_memory(
-                client_id, limit, window_start, current_time
+                client_id, limit, current_time
             )
 
+    def _reset_time(self, current_time: float) -> float:
+        """End of the current fixed window (when the oldest weight drops)"""
+        return (current_time // self.window + 1) * self.window
+
+    async def _get_script(self, current_time: float):
+        """Return the registered Lua script, connecting to Redis if needed"""
+        if self._script is not None:
+            return self._script
+        if not REDIS_AVAILABLE:
+            return None
+
+        if self.redis_client is None:
+            # Use the shared client when one is configured; retry periodically after failures
+            if not settings.CACHE_ENABLED or settings.ENV == "test" or current_time < self._redis_retry_at:
+                return None
+            try:
+                from backend.core.redis import get_redis
+                self.redis_client = await get_redis()
+            except Exception as e:
+                logger.warning("rate_limit_redis_unavailable", error=str(e))
+                self._redis_retry_at = current_time + 30
+                return None
+
+        # register_script calls EVALSHA and loads the script on NOSCRIPT
+        self._script = self.redis_client.register_script(SLIDING_WINDOW_LUA)
+        return self._script
+
+    async def _eval(
+        self, script, client_id: str, limit: int, current_time: float, recorded: int, cost: int
+    ) -> tuple[bool, int]:
+        """Run the sliding-window script for one client"""
+        index = int(current_time // self.window)
+        # Hash tag keeps both windows in one cluster slot
+        keys = [f"ratelimit:{{{client_id}}}:{index}", f"ratelimit:{{{client_id}}}:{index - 1}"]
+        allowed, remaining = await script(
+            keys=keys, args=[limit, self.window, current_time, recorded, cost]
+        )
+        return bool(int(allowed)), int(remaining)
+
+    def _refill(self, bucket: _LocalBucket, remaining: int, current_time: float) -> None:
+        """Lease a share of the global remaining quota to the local bucket"""
+        bucket.remaining = max(remaining - bucket.pending, 0)
+        bucket.tokens = min(
+            int(bucket.remaining * settings.RATE_LIMIT_LOCAL_FRACTION),
+            settings.RATE_LIMIT_LOCAL_BURST,
+        )
+        bucket.synced_at = current_time
+
     async def _check_rate_limit_redis(
-        self, client_id: str, limit: int, window_start: float, current_time: float
+        self, script, client_id: str, limit: int, current_time: float
     ) -> tuple[bool, int, float]:
-        """Redis-based rate limiting (sliding window)"""
-        key = f"ratelimit:{client_id}"
-
+        """Redis-based rate limiting (sliding window counter, one EVALSHA)"""
+        reset_time = self._reset_time(current_time)
+        bucket = self.local_buckets.get_or_create(client_id, _LocalBucket)
+
+        if bucket.tokens > 0:
+            # Clearly within the limit: serve locally, report later
+            bucket.tokens -= 1
+            bucket.remaining = max(bucket.remaining - 1, 0)
+            bucket.pending += 1
+            if not bucket.syncing and current_time - bucket.synced_at >= settings.RATE_LIMIT_SYNC_INTERVAL:
+                bucket.syncing = True
+                task = asyncio.create_task(self._sync_bucket(script, client_id, bucket, limit))
+                self._sync_tasks.add(task)
+                task.add_done_callback(self._sync_tasks.discard)
+            return True, bucket.remaining, reset_time
+
+        recorded, bucket.pending = bucket.pending, 0
         try:
-            # Remove old entries
-            await self.redis_client.zremrangebyscore(key, 0, window_start)
-
-            # Count requests in window
-            count = await self.redis_client.zcard(key)
-
-            if count < limit:
-                # Add current request
-                await self.redis_client.zadd(key, {str(current_time): current_time})
-                await self.redis_client.expire(key, 60)
-
-                remaining = limit - count - 1
-                reset_time = current_time + 60
-                return True, remaining, reset_time
-            else:
-                # Rate limit exceeded
-                reset_time = current_time + 60
-                return False, 0, reset_time
-
+            allowed, remaining = await self._eval(
+                script, client_id, limit, current_time, recorded, 1
+            )
         except Exception as e:
+            bucket.pending += recorded
             logger.error("redis_rate_limit_error", error=str(e))
             # Fall back to allowing request if Redis fails
-            return True, limit - 1, current_time + 60
+            return True, limit - 1, reset_time
+
+        self._refill(bucket, remaining, current_time)
+        if not allowed:
+            return False, 0, reset_time
+        return True, bucket.remaining, reset_time
+
+    async def _sync_bucket(
+        self, script, client_id: str, bucket: _LocalBucket, limit: int
+    ) -> None:
+        """Report locally served requests and refresh the bucket in the background"""
+        recorded, bucket.pending = bucket.pending, 0
+        current_time = time.time()
+        try:
+            _, remaining = await self._eval(script, client_id, limit, current_time, recorded, 0)
+            self._refill(bucket, remaining, current_time)
+        except Exception as e:
+            bucket.pending += recorded
+            logger.error("redis_rate_limit_sync_error", error=str(e))
+        finally:
+            bucket.syncing = False
 
     def _check_rate_limit_memory(
-        self, client_id: str, limit: int, window_start: float, current_time: float
+        self, client_id: str, limit: int, current_time: float
     ) -> tuple[bool, int, float]:
         """In-memory rate limiting (for development)"""
-        if client_id not in self.in_memory_store:
-            self.in_memory_store[client_id] = []
+        index = int(current_time // self.window)
+        counter = self.in_memory_store.get_or_create(client_id, _WindowCounter)
 
-        # Remove old entries
-        self.in_memory_store[client_id] = [
-            t for t in self.in_memory_store[client_id] if t > window_start
-        ]
+        if counter.index != index:
+            # Roll the window; anything older than the previous window no longer counts
+            counter.previous = counter.current if counter.index == index - 1 else 0
+            counter.current = 0
+            counter.index = index
 
-        # Count requests
-        count = len(self.in_memory_store[client_id])
+        weight = (self.window - current_time % self.window) / self.window
+        count = int(counter.previous * weight) + counter.current
+        reset_time = self._reset_time(current_time)
 
         if count < limit:
             # Add current request
-            self.in_memory_store[client_id].append(current_time)
+            counter.current += 1
             remaining = limit - count - 1
-            reset_time = current_time + 60
             return True, remaining, reset_time
         else:
             # Rate limit exceeded
-            reset_time = current_time + 60
             return False, 0, reset_time
@@ -5,6 +5,7 @@ from backend.models.base import Base, TimestampMixin
 from backend.models.user import User, Organization
 from backend.models.squad import Squad, SquadMember
 from backend.models.project import Project, Task, TaskExecution
+from backend.models.execution_log import ExecutionLog
 from backend.models.message import AgentMessage
 from backend.models.conversation import Conversation, ConversationEvent, ConversationState
 from backend.models.routing_rule import RoutingRule, DefaultRoutingTemplate
@@ -18,16 +19,18 @@ from backend.models.multi_turn_conversation import (
     ConversationMessage,
     ConversationParticipant
 )
+from backend.models.conversation_summary import ConversationSummary
 from backend.models.workflow import (
     WorkflowPhase,
     DynamicTask,
     task_dependencies,
 )
 from backend.models.branching import WorkflowBranch
-from backend.models.guardian import CoherenceMetrics
+from backend.models.guardian import CoherenceMetrics, WorkflowAgentCounter, WorkflowTaskCounter
 from backend.models.llm_cost_tracking import (
     LLMCostEntry,
     LLMCostSummary,
+    LLMCostRollupState,
     LLMProvider as LLMProviderEnum,
     calculate_cost,
     get_model_pricing,
@@ -45,6 +48,7 @@ __all__ = [
     "Project",
     "Task",
     "TaskExecution",
+    "ExecutionLog",
     "AgentMessage",
     "Conversation",
     "ConversationEvent",
@@ -62,13 +66,17 @@ __all__ = [
     "MultiTurnConversation",
     "ConversationMessage",
     "ConversationParticipant",
+    "ConversationSummary",
     "WorkflowPhase",
     "DynamicTask",
     "task_dependencies",
     "WorkflowBranch",
     "CoherenceMetrics",
+    "WorkflowTaskCounter",
+    "WorkflowAgentCounter",
     "LLMCostEntry",
     "LLMCostSummary",
+    "LLMCostRollupState",
     "LLMProviderEnum",
     "calculate_cost",
     "get_model_pricing",
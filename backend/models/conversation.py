@@ -61,6 +61,7 @@ class Conversation(Base):
 
     # Escalation tracking
     escalation_level = Column(Integer, nullable=False, default=0)
+    timeout_count = Column(Integer, nullable=False, default=0, server_default="0")  # Follow-ups sent ("timeout" events)
 
     # Question context
     question_type = Column(String(100), nullable=True)  # 'implementation', 'architecture', etc.
@@ -110,12 +111,12 @@ class Conversation(Base):
         Index("ix_conversations_asker", "asker_id"),
         Index("ix_conversations_responder", "current_responder_id"),
         Index("ix_conversations_task", "task_execution_id"),
-        # Important: index for timeout monitoring queries
+        # Important: index for timeout monitoring queries (due scans ordered by timeout_at)
         Index(
             "ix_conversations_timeout",
             "timeout_at",
-            "current_state",
-            postgresql_where="current_state IN ('waiting', 'follow_up')"
+            "id",
+            postgresql_where="current_state IN ('initiated', 'waiting', 'follow_up')"
         ),
     )
 
@@ -0,0 +1,66 @@
+"""
+Rolling Conversation Summary Model
+
+Persisted, incrementally maintained summary of a multi-turn conversation or of
+a task execution's agent message history.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from backend.models.base import Base
+
+
+class ConversationSummary(Base):
+    """
+    Rolling summary of one conversation or task execution.
+
+    Messages up to the high-water mark (last_message_at, last_message_id), in
+    (created_at, id) order, are folded into `summary`; newer messages are the
+    unsummarized tail. `state` holds the summary accumulator so new messages
+    can be folded in without re-reading the history.
+    """
+    __tablename__ = "conversation_summaries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Exactly one scope is set
+    conversation_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=True,
+        unique=True
+    )
+    task_execution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("task_executions.id", ondelete="CASCADE"),
+        nullable=True,
+        unique=True
+    )
+
+    summary = Column(Text, nullable=False, default="")
+    state = Column(JSONB, nullable=False, default=dict)
+
+    # Folded messages and their estimated tokens
+    message_count = Column(Integer, nullable=False, default=0)
+    token_count = Column(Integer, nullable=False, default=0)
+
+    # High-water mark: last folded message
+    last_message_id = Column(UUID(as_uuid=True), nullable=True)
+    last_message_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint(
+            "(conversation_id IS NULL) <> (task_execution_id IS NULL)",
+            name="ck_conversation_summaries_one_scope"
+        ),
+    )
+
+    def __repr__(self):
+        scope = self.conversation_id or self.task_execution_id
+        return f"<ConversationSummary(scope={scope}, messages={self.message_count})>"
@@ -0,0 +1,53 @@
+"""
+Execution Log Model
+
+Append-only log entries of a task execution, one row per entry.
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from backend.models.base import Base
+
+
+class ExecutionLog(Base):
+    """
+    One log entry of a task execution.
+
+    Rows are only ever inserted. `seq` is assigned by the database (bigserial),
+    so it is unique and increasing across writers, unlike `timestamp`, which
+    is the writer's clock. Entries are read in seq order through
+    ix_execution_logs_execution_id_seq, so appending and paging cost the same
+    however long the execution runs.
+    """
+    __tablename__ = "execution_logs"
+
+    # INTEGER on SQLite, where only an INTEGER PRIMARY KEY auto-increments
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    execution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("task_executions.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+    level = Column(String(16), nullable=False, default="info")  # info, warning, error
+    message = Column(Text, nullable=False)
+    log_metadata = Column(JSON, nullable=False, default=dict)
+
+    __table_args__ = (
+        Index("ix_execution_logs_execution_id_seq", "execution_id", "seq"),
+    )
+
+    def to_dict(self) -> dict:
+        """Log entry in the shape of the former TaskExecution.logs items"""
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp.isoformat(),
+            "level": self.level,
+            "message": self.message,
+            "metadata": self.log_metadata or {},
+        }
+
+    def __repr__(self) -> str:
+        return f"<ExecutionLog(execution_id={self.execution_id}, level={self.level})>"
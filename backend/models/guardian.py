@@ -3,7 +3,7 @@ Guardian Models for PM-as-Guardian System (Stream C)
 
 Models for tracking coherence metrics and workflow health monitoring.
 """
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey, Index, Text
+from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
 from sqlalchemy.orm import relationship
 import uuid
@@ -95,6 +95,8 @@ class CoherenceMetrics(Base, TimestampMixin):
     __table_args__ = (
         Index("ix_coherence_metrics_execution_agent", "execution_id", "agent_id"),
         Index("ix_coherence_metrics_execution_phase", "execution_id", "phase"),
+        # Newest scores of an execution (coherence trends)
+        Index("ix_coherence_metrics_execution_calculated", "execution_id", "calculated_at"),
         Index("ix_coherence_metrics_agent_phase", "agent_id", "phase"),
         Index("ix_coherence_metrics_anomaly", "anomaly_detected", "calculated_at"),
         Index("ix_coherence_metrics_pm_action", "pm_action_taken"),
@@ -113,3 +115,60 @@ class CoherenceMetrics(Base, TimestampMixin):
             f"score={self.coherence_score:.2f}, phase={self.phase})>"
         )
 
+
+
+class WorkflowTaskCounter(Base):
+    """
+    Running count of an execution's dynamic tasks per phase, status and
+    spawning agent.
+
+    Maintained incrementally by the workflow metrics materializer
+    (agents/guardian/workflow_metrics.py) in the same flush as the task
+    writes, so an execution's task metrics are read from a few rows however
+    many tasks it has.
+    """
+    __tablename__ = "workflow_task_counters"
+
+    execution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("task_executions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    phase = Column(String(20), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    agent_id = Column(UUID(as_uuid=True), primary_key=True, comment="Agent that spawned the tasks")
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    with_rationale = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return (
+            f"<WorkflowTaskCounter(execution={self.execution_id}, phase={self.phase}, "
+            f"status={self.status}, count={self.task_count})>"
+        )
+
+
+class WorkflowAgentCounter(Base):
+    """
+    Running message and coherence totals of one agent in an execution.
+
+    Maintained like WorkflowTaskCounter; the execution's coherence average
+    is sum(coherence_sum) / sum(coherence_count) over its agents.
+    """
+    __tablename__ = "workflow_agent_counters"
+
+    execution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("task_executions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    agent_id = Column(UUID(as_uuid=True), primary_key=True)
+    messages_sent = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_at = Column(DateTime, nullable=True)
+    coherence_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    coherence_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return (
+            f"<WorkflowAgentCounter(execution={self.execution_id}, agent={self.agent_id}, "
+            f"messages={self.messages_sent})>"
+        )
@@ -5,7 +5,7 @@ Tracks token usage and costs for all LLM API calls across providers.
 Enables cost analysis, budgeting, and optimization.
 """
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, ForeignKey, Index, func, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -108,6 +108,11 @@ class LLMCostSummary(Base):
 
     Periodically updated materialized view of cost aggregations.
     Speeds up dashboard queries by pre-calculating common aggregations.
+
+    Maintained incrementally by CostRollupService: one row per
+    (summary_type, summary_date, organization, squad, provider, model),
+    covering entries created before the rollup watermark. The rollup key is
+    enforced by a unique index (see summary_rollup_key).
     """
     __tablename__ = "llm_cost_summaries"
 
@@ -137,6 +142,10 @@ class LLMCostSummary(Base):
     avg_cost_per_request = Column(Float, nullable=True)
     avg_response_time_ms = Column(Float, nullable=True)
 
+    # Running sums so averages can be updated incrementally
+    total_response_time_ms = Column(Float, nullable=False, default=0.0)
+    response_time_samples = Column(Integer, nullable=False, default=0)
+
     # Updated timestamp
     last_updated = Column(DateTime, nullable=False, default=datetime.utcnow)
 
@@ -162,6 +171,50 @@ class LLMCostSummary(Base):
         )
 
 
+def summary_rollup_key() -> list:
+    """
+    Get the rollup key expressions of llm_cost_summaries.
+
+    NULL dimensions (no organization, squad, provider or model) are coalesced
+    to sentinels so they compare equal in the unique index. Upserts must name
+    the same expressions as their conflict target.
+
+    Returns:
+        Key expressions, in index order
+    """
+    c = LLMCostSummary.__table__.c
+    no_id = literal_column("'00000000-0000-0000-0000-000000000000'")
+    no_name = literal_column("''")
+    return [
+        c.summary_type,
+        c.summary_date,
+        func.coalesce(c.organization_id, no_id),
+        func.coalesce(c.squad_id, no_id),
+        func.coalesce(c.provider, no_name),
+        func.coalesce(c.model, no_name),
+    ]
+
+
+Index('uq_summary_rollup_key', *summary_rollup_key(), unique=True)
+
+
+class LLMCostRollupState(Base):
+    """
+    Watermark for the incremental cost rollup.
+
+    Entries with created_at < watermark are already folded into
+    LLMCostSummary; newer entries are the unrolled tail.
+    """
+    __tablename__ = "llm_cost_rollup_state"
+
+    name = Column(String, primary_key=True)  # Rollup name, e.g. "llm_cost"
+    watermark = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<LLMCostRollupState(name={self.name}, watermark={self.watermark})>"
+
+
 # Pricing constants (per 1M tokens in USD)
 # Updated as of November 2025
 LLM_PRICING = {
@@ -5,11 +5,31 @@ from sqlalchemy import Column, String, ForeignKey, Index, Text, JSON, DateTime,
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
+from typing import Optional
 from sqlalchemy.sql import func
 
 from backend.models.base import Base
 
 
+# Metadata keys that correlate replies with the request that triggered them
+# (standups, problem-solving questions, code reviews)
+CORRELATION_KEYS = ("standup_id", "question_id", "review_id")
+
+
+def correlation_id_from_metadata(metadata) -> Optional[str]:
+    """Return the first correlation key found in message metadata"""
+    for key in CORRELATION_KEYS:
+        value = (metadata or {}).get(key)
+        if value:
+            return str(value)
+    return None
+
+
+def _default_correlation_id(context) -> Optional[str]:
+    """Column default: derive correlation_id from the inserted metadata"""
+    return correlation_id_from_metadata(context.get_current_parameters().get("message_metadata"))
+
+
 class AgentMessage(Base):
     """Agent-to-Agent Message model"""
 
@@ -26,6 +46,8 @@ class AgentMessage(Base):
     content = Column(Text, nullable=False)
     message_type = Column(String, nullable=False)  # task_assignment, question, response, etc.
     message_metadata = Column(JSON, nullable=False, server_default="{}")
+    # Copy of the standup/question/review id from message_metadata, indexed for reply lookups
+    correlation_id = Column(String, nullable=True, default=_default_correlation_id)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
     # Conversation tracking (new columns for hierarchical routing)
@@ -53,9 +75,11 @@ class AgentMessage(Base):
 
     __table_args__ = (
         Index("ix_agent_messages_task_execution_id", "task_execution_id"),
-        Index("ix_agent_messages_task_execution_id_created_at", "task_execution_id", "created_at"),
+        # Keyset pagination of execution history on (created_at, id)
+        Index("ix_agent_messages_execution_created_id", "task_execution_id", "created_at", "id"),
         Index("ix_agent_messages_sender_id", "sender_id"),
         Index("ix_agent_messages_recipient_id", "recipient_id"),
         Index("ix_agent_messages_conversation", "conversation_id"),
         Index("ix_agent_messages_parent", "parent_message_id"),
+        Index("ix_agent_messages_correlation", "correlation_id", "message_type", "created_at"),
     )
@@ -13,7 +13,7 @@ which handles agent escalations. This model handles ongoing multi-turn dialogues
 import uuid
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, ForeignKey, ARRAY, Float
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, ForeignKey, ARRAY, Float, Index, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from backend.models.base import Base
@@ -100,6 +100,11 @@ class MultiTurnConversation(Base):
     # Link to hierarchical routing conversation (if applicable)
     agent_conversation = relationship("Conversation", foreign_keys=[agent_conversation_id])
 
+    @property
+    def activity_at(self) -> Optional[datetime]:
+        """Sort key of conversation listings: last message time, else creation time"""
+        return self.last_message_at or self.created_at
+
     def __repr__(self):
         return f"<MultiTurnConversation(id={self.id}, type={self.conversation_type}, status={self.status}, messages={self.total_messages})>"
 
@@ -309,3 +314,19 @@ class ConversationParticipant(Base):
             "left_at": self.left_at.isoformat() if self.left_at else None,
             "metadata": self.conv_metadata
         }
+
+
+# Keyset pagination indexes: conversation listings sort on
+# (COALESCE(last_message_at, created_at), id), message history on (created_at, id)
+Index(
+    "ix_conversations_user_activity",
+    MultiTurnConversation.user_id,
+    func.coalesce(MultiTurnConversation.last_message_at, MultiTurnConversation.created_at),
+    MultiTurnConversation.id,
+)
+Index(
+    "ix_conversation_messages_conv_created_id",
+    ConversationMessage.conversation_id,
+    ConversationMessage.created_at,
+    ConversationMessage.id,
+)
@@ -72,7 +72,6 @@ class TaskExecution(Base, TimestampMixin):
     status = Column(String, nullable=False, default="pending")  # pending, in_progress, completed, failed, blocked
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
-    logs = Column(JSON, nullable=False, server_default="[]")
     error_message = Column(Text, nullable=True)
     execution_metadata = Column(JSON, nullable=False, server_default="{}")
 
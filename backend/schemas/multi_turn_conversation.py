@@ -105,6 +105,7 @@ class ConversationListResponse(BaseModel):
     total_count: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 # ============================================================================
@@ -147,6 +148,7 @@ class MessageListResponse(BaseModel):
     total_count: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 class ConversationHistoryResponse(BaseModel):
@@ -156,6 +158,7 @@ class ConversationHistoryResponse(BaseModel):
     total_messages: int
     total_tokens: int
     context_window_tokens: Optional[int] = None
+    summary: Optional[str] = None
 
 
 # ============================================================================
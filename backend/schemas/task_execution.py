@@ -38,7 +38,15 @@ class TaskExecutionResponse(BaseModel):
     result: Optional[Dict[str, Any]] = Field(None, description="Execution result")
     error_message: Optional[str] = Field(None, description="Error message if failed")
     execution_metadata: Dict[str, Any] = Field(default_factory=dict)
-    logs: List[Dict[str, Any]] = Field(default_factory=list, description="Execution logs")
+    logs: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        deprecated=True,
+        description=(
+            "Deprecated: the newest log entries, oldest first, on GET /task-executions "
+            "and GET /task-executions/{id} only (null elsewhere). "
+            "Use GET /task-executions/{id}/logs to page through all entries."
+        ),
+    )
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,119 @@
+"""
+Authentication Query Benchmark
+
+Load-tests two authenticated routes with and without the auth fast path and
+reports database queries, connection checkouts and latency per request:
+- /me       -> get_current_user (ORM User attached to the request session)
+- /premium  -> require_plan_tier("pro") (principal only)
+
+Usage:
+    python -m backend.scripts.benchmark_auth_queries --users 50 --requests 2000
+
+Runs against an in-memory SQLite database; each request goes through the full
+FastAPI dependency stack via an in-process ASGI client.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from backend.core.auth import clear_auth_caches, get_current_user, require_plan_tier
+from backend.core.config import settings
+from backend.core.database import get_db
+from backend.core.security import create_access_token
+from backend.models.base import Base
+from backend.models.user import User
+
+
+@compiles(PG_UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def build_app(session_maker) -> FastAPI:
+    app = FastAPI()
+
+    async def bench_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = bench_db
+
+    @app.get("/me")
+    async def me(user: User = Depends(get_current_user)):
+        return {"id": str(user.id), "email": user.email}
+
+    @app.get("/premium")
+    async def premium(user=Depends(require_plan_tier("pro"))):
+        return {"id": str(user.id)}
+
+    return app
+
+
+async def run(client, tokens, path: str, requests: int, counters) -> dict:
+    counters.update(queries=0, checkouts=0)
+    latencies = []
+    for _ in range(requests):
+        token = random.choice(tokens)
+        start = time.perf_counter()
+        response = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return {
+        "queries": counters["queries"] / requests,
+        "checkouts": counters["checkouts"] / requests,
+        "p50_ms": statistics.median(latencies),
+    }
+
+
+async def main(args) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_maker() as db:
+        users = [
+            User(id=uuid.uuid4(), email=f"user{i}@example.com", name=f"User {i}",
+                 password_hash="-", plan_tier="pro")
+            for i in range(args.users)
+        ]
+        db.add_all(users)
+        await db.commit()
+    tokens = [create_access_token({"sub": str(u.id)}) for u in users]
+
+    counters = {"queries": 0, "checkouts": 0}
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda *a: counters.__setitem__("queries", counters["queries"] + 1))
+    event.listen(engine.sync_engine, "checkout",
+                 lambda *a: counters.__setitem__("checkouts", counters["checkouts"] + 1))
+
+    transport = httpx.ASGITransport(app=build_app(session_maker))
+    print(f"{args.requests:,} requests over {args.users} users\n")
+    print(f"{'route':<10} {'auth cache':<11} {'queries/req':>12} {'checkouts/req':>14} {'p50_ms':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/me", "/premium"):
+            for enabled in (False, True):
+                settings.AUTH_CACHE_ENABLED = enabled
+                clear_auth_caches()
+                result = await run(client, tokens, path, args.requests, counters)
+                print(f"{path:<10} {'on' if enabled else 'off':<11} {result['queries']:>12.3f} "
+                      f"{result['checkouts']:>14.3f} {result['p50_ms']:>8.2f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
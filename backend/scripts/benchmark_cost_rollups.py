@@ -0,0 +1,164 @@
+"""
+LLM Cost Rollup Benchmark
+
+Seeds N synthetic LLMCostEntry rows into a scratch database and compares
+GET /costs/stats strategies:
+- legacy: load every matching entry and sum in Python (skipped above 2M rows)
+- sql: a single GROUP BY over all entries
+- rollup: CostRollupService.get_stats (daily summaries + unrolled tail)
+
+Also reports the one-off backfill time and the steady-state incremental
+rollup time for a 5 minute tail.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../bench \\
+        python -m backend.scripts.benchmark_cost_rollups --entries 1000000
+    python -m backend.scripts.benchmark_cost_rollups --entries 10000000 --days 365
+
+Runs against SQLite (in-memory) when BENCH_DATABASE_URL is not set.
+Never point it at a production database: it creates and fills the tables.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from backend.models import LLMCostEntry, LLMCostRollupState, LLMCostSummary
+from backend.models.base import Base
+from backend.services.cost_rollup_service import CostRollupService
+
+
+@compiles(PG_UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+INSERT_BATCH = 20_000
+LEGACY_MAX_ENTRIES = 2_000_000
+
+
+async def seed(session_maker, entries: int, days: int, orgs: int, squads: int) -> datetime:
+    """Insert synthetic entries spread over the last `days` days"""
+    rng = random.Random(42)
+    org_ids = [uuid.uuid4() for _ in range(orgs)]
+    # Each squad belongs to one organization
+    squad_orgs = {uuid.uuid4(): rng.choice(org_ids) for _ in range(squads)}
+    squad_ids = list(squad_orgs)
+    models = [("openai", "gpt-4o-mini"), ("openai", "gpt-4o"),
+              ("anthropic", "claude-3-haiku-20240307"), ("groq", "llama-3.1-8b-instant")]
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    span = (end - start).total_seconds()
+
+    for offset in range(0, entries, INSERT_BATCH):
+        rows = []
+        for _ in range(min(INSERT_BATCH, entries - offset)):
+            provider, model = rng.choice(models)
+            prompt, completion = rng.randint(10, 4000), rng.randint(10, 1500)
+            created = start + timedelta(seconds=rng.uniform(0, span))
+            squad_id = rng.choice(squad_ids)
+            rows.append({
+                "id": uuid.uuid4(),
+                "provider": provider,
+                "model": model,
+                "organization_id": squad_orgs[squad_id],
+                "squad_id": squad_id,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+                "prompt_cost_usd": 0.0,
+                "completion_cost_usd": 0.0,
+                "total_cost_usd": rng.random() / 100,
+                "response_time_ms": rng.randint(100, 5000),
+                "created_at": created,
+                "updated_at": created,
+            })
+        async with session_maker() as db:
+            await db.execute(insert(LLMCostEntry), rows)
+            await db.commit()
+        print(f"  seeded {offset + len(rows):,}/{entries:,}", end="\r")
+
+    print()
+    return end
+
+
+async def time_call(fn, repeat: int) -> float:
+    """Median latency of an async callable in ms"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args) -> None:
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite://")
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    tables = [LLMCostEntry.__table__, LLMCostSummary.__table__, LLMCostRollupState.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=tables)
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    print(f"Seeding {args.entries:,} entries over {args.days} days ({url.split('://')[0]})")
+    now = await seed(session_maker, args.entries, args.days, args.orgs, args.squads)
+    report = {}
+
+    async with session_maker() as db:
+        if args.entries <= LEGACY_MAX_ENTRIES:
+            async def legacy():
+                entries = (await db.execute(select(LLMCostEntry))).scalars().all()
+                sum(e.total_cost_usd for e in entries)
+                db.expunge_all()
+            report["legacy_python_ms"] = await time_call(legacy, 1)
+
+        async def full_sql():
+            await db.execute(
+                select(LLMCostEntry.provider, LLMCostEntry.model, func.count(), func.sum(LLMCostEntry.total_cost_usd))
+                .group_by(LLMCostEntry.provider, LLMCostEntry.model)
+            )
+        report["sql_group_by_ms"] = await time_call(full_sql, args.repeat)
+
+        start = time.perf_counter()
+        backfill = await CostRollupService.rollup(db, until=now - timedelta(minutes=5))
+        report["backfill_s"] = round(time.perf_counter() - start, 2)
+        report["backfill_entries"] = backfill["entries"]
+        report["summary_rows"] = (await db.execute(select(func.count()).select_from(LLMCostSummary))).scalar()
+
+        # Stats with a 5 minute unrolled tail
+        report["rollup_stats_ms"] = await time_call(lambda: CostRollupService.get_stats(db), args.repeat)
+        report["rollup_stats_30d_ms"] = await time_call(
+            lambda: CostRollupService.get_stats(db, start_date=now - timedelta(days=30), end_date=now),
+            args.repeat,
+        )
+
+        start = time.perf_counter()
+        await CostRollupService.rollup(db, until=now)
+        report["incremental_5min_tail_ms"] = (time.perf_counter() - start) * 1000
+
+    await engine.dispose()
+
+    print("\nResults:")
+    for key, value in report.items():
+        print(f"  {key:28s} {value:,.2f}" if isinstance(value, float) else f"  {key:28s} {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--squads", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""
+Delegation Strategy Benchmark
+
+Simulates a squad working through a synthetic task mix and reports the
+makespan (time until the last task finishes) for each assignment strategy:
+- score:        best _score_agent match only (the old behaviour)
+- least_loaded: fewest in-flight items among members near the best score
+- power_of_two: lighter of two random members near the best score
+
+Each member works through its assignments one at a time; in-flight work is
+tracked in an AgentLoadIndex exactly as the live engine sees it. Tasks arrive
+as a Poisson stream; durations depend on the task type.
+
+Usage:
+    python -m backend.scripts.benchmark_delegation --tasks 2000 --arrival-rate 0.5
+"""
+import argparse
+import asyncio
+import heapq
+import random
+import statistics
+from uuid import uuid4
+
+from backend.agents.orchestration.delegation_engine import DelegationEngine
+from backend.agents.orchestration.load_index import AgentLoadIndex
+from backend.models.squad import SquadMember
+
+SQUAD = [
+    ("backend_developer", "python fastapi postgres"),
+    ("backend_developer", "python api"),
+    ("backend_developer", "python"),
+    ("backend_developer", "go services"),
+    ("frontend_developer", "react typescript"),
+    ("frontend_developer", "react"),
+    ("qa_tester", "pytest cypress"),
+    ("tech_lead", "python architecture"),
+    ("devops_engineer", "docker kubernetes"),
+]
+
+# (title, description, mean duration, share of the mix)
+TASK_MIX = [
+    ("Add REST API endpoint", "Implement a FastAPI endpoint with postgres queries", 40, 0.35),
+    ("Fix broken login bug", "Fix the error raised by the python auth service", 25, 0.20),
+    ("Build settings page", "Create a react form component for the settings page", 35, 0.20),
+    ("Write pytest suite", "Add pytest tests for the billing service", 20, 0.10),
+    ("Refactor queue worker", "Refactor and cleanup the queue worker internals", 50, 0.10),
+    ("Deploy preview stack", "Deploy the preview environment with docker", 30, 0.05),
+]
+
+
+def build_workload(tasks: int, arrival_rate: float, seed: int):
+    rng = random.Random(seed)
+    weights = [share for *_, share in TASK_MIX]
+    workload, now = [], 0.0
+    for _ in range(tasks):
+        now += rng.expovariate(arrival_rate)
+        title, description, mean, _ = rng.choices(TASK_MIX, weights)[0]
+        workload.append((now, {"title": title, "description": description}, rng.expovariate(1 / mean)))
+    return workload
+
+
+def simulate(strategy: str, members, workload, requirements, seed: int) -> dict:
+    index = AgentLoadIndex()
+    engine = DelegationEngine(load_index=index, strategy=strategy, rng=random.Random(seed))
+    free_at = {m.id: 0.0 for m in members}
+    completions = []  # (finish time, member id)
+    waits, peak_depth = [], 0
+
+    for (arrival, _, duration), reqs in zip(workload, requirements):
+        while completions and completions[0][0] <= arrival:
+            _, done_by = heapq.heappop(completions)
+            index.add(done_by, "tasks", -1)
+
+        member = engine.choose_agent(members, reqs)
+        start = max(arrival, free_at[member.id])
+        free_at[member.id] = start + duration
+        heapq.heappush(completions, (start + duration, member.id))
+        index.add(member.id, "tasks")
+
+        waits.append(start - arrival)
+        peak_depth = max(peak_depth, index.queue_depth(member.id))
+
+    return {
+        "makespan": max(free_at.values()),
+        "mean_wait": statistics.fmean(waits),
+        "p95_wait": statistics.quantiles(waits, n=20)[-1],
+        "peak_depth": peak_depth,
+        "members_used": sum(1 for t in free_at.values() if t > 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--arrival-rate", type=float, default=0.5, help="Tasks per time unit")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    members = [SquadMember(id=uuid4(), role=role, specialization=spec) for role, spec in SQUAD]
+    workload = build_workload(args.tasks, args.arrival_rate, args.seed)
+    analyzer = DelegationEngine(load_index=AgentLoadIndex())
+
+    async def analyze():
+        return [await analyzer.analyze_task_requirements(task) for _, task, _ in workload]
+
+    requirements = asyncio.run(analyze())
+
+    print(f"{args.tasks} tasks, arrival rate {args.arrival_rate}/unit, {len(members)} members")
+    print(f"{'strategy':<14}{'makespan':>12}{'mean wait':>12}{'p95 wait':>12}{'peak depth':>12}{'members':>9}")
+    baseline = None
+    for strategy in DelegationEngine.STRATEGIES[::-1]:
+        result = simulate(strategy, members, workload, requirements, args.seed)
+        baseline = baseline or result["makespan"]
+        print(
+            f"{strategy:<14}{result['makespan']:>12.0f}{result['mean_wait']:>12.1f}"
+            f"{result['p95_wait']:>12.1f}{result['peak_depth']:>12}{result['members_used']:>9}"
+            f"  ({baseline / result['makespan']:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+History Pagination Benchmark
+
+Seeds N AgentMessage rows for one task execution into a scratch database and
+compares the latency of fetching pages at increasing depth:
+- offset: ORDER BY created_at, id OFFSET :depth LIMIT :page
+- keyset: WHERE (created_at, id) > (:cursor) ORDER BY created_at, id LIMIT :page
+
+Also times streaming the full history with yield_per.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../bench \\
+        python -m backend.scripts.benchmark_history_pagination --messages 1000000
+    python -m backend.scripts.benchmark_history_pagination --messages 200000
+
+Runs against SQLite (in-memory) when BENCH_DATABASE_URL is not set.
+Never point it at a production database: it creates and fills the table.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from backend.agents.communication.history_manager import HistoryManager
+from backend.core.pagination import encode_cursor
+from backend.models.base import Base
+from backend.models.message import AgentMessage
+
+
+@compiles(PG_UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+INSERT_BATCH = 20_000
+
+
+async def seed(session_maker, execution_id: uuid.UUID, messages: int) -> None:
+    """Insert `messages` rows, several per second so created_at has ties"""
+    start = datetime.utcnow() - timedelta(days=30)
+    senders = [uuid.uuid4() for _ in range(8)]
+    for offset in range(0, messages, INSERT_BATCH):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "task_execution_id": execution_id,
+                "sender_id": senders[i % len(senders)],
+                "content": f"message {i}",
+                "message_type": "status_update",
+                "message_metadata": {},
+                "created_at": start + timedelta(milliseconds=250 * i),
+            }
+            for i in range(offset, min(offset + INSERT_BATCH, messages))
+        ]
+        async with session_maker() as db:
+            await db.execute(insert(AgentMessage), rows)
+            await db.commit()
+        print(f"  seeded {offset + len(rows):,}/{messages:,}", end="\r")
+    print()
+
+
+async def time_call(fn, repeat: int) -> float:
+    """Median latency of an async callable in ms"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args) -> None:
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite://")
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[AgentMessage.__table__])
+        await conn.run_sync(Base.metadata.create_all, tables=[AgentMessage.__table__])
+
+    execution_id = uuid.uuid4()
+    print(f"Seeding {args.messages:,} messages ({url.split('://')[0]})")
+    await seed(session_maker, execution_id, args.messages)
+
+    depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, args.messages - args.page) if 0 <= d < args.messages]
+    print(f"\n{'depth':>10} {'offset_ms':>12} {'keyset_ms':>12}")
+
+    async with session_maker() as db:
+        manager = HistoryManager(db)
+        for depth in sorted(set(depths)):
+            # Cursor = key of the row just before the page
+            cursor = None
+            if depth:
+                row = (await db.execute(
+                    select(AgentMessage.created_at, AgentMessage.id)
+                    .where(AgentMessage.task_execution_id == execution_id)
+                    .order_by(AgentMessage.created_at, AgentMessage.id)
+                    .offset(depth - 1).limit(1)
+                )).one()
+                cursor = encode_cursor(row.created_at, row.id)
+
+            async def by_offset():
+                await manager.get_conversation_history(execution_id, limit=args.page, offset=depth)
+                db.expunge_all()
+
+            async def by_cursor():
+                await manager.get_conversation_history(execution_id, limit=args.page, cursor=cursor)
+                db.expunge_all()
+
+            offset_ms = await time_call(by_offset, args.repeat)
+            keyset_ms = await time_call(by_cursor, args.repeat)
+            print(f"{depth:>10,} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+        start = time.perf_counter()
+        streamed = 0
+        async for _ in manager.iter_conversation_history(execution_id, batch_size=1000):
+            streamed += 1
+        print(f"\nStreamed {streamed:,} messages with yield_per in {time.perf_counter() - start:.2f}s")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
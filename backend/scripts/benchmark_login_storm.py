@@ -0,0 +1,124 @@
+"""
+Login Storm Benchmark
+
+Fires a burst of concurrent logins at an app while probing a cheap endpoint,
+and compares probe latency and the longest gap between completed probes (a
+stalled event loop shows up as few probes and a long stall) when bcrypt runs:
+- inline: verify_password on the event loop (previous behaviour)
+- pool:   verify_password_async in the bounded password hash pool
+
+Usage:
+    python -m backend.scripts.benchmark_login_storm --logins 200 --concurrency 20
+
+Logins rejected by the pool's queue limit (503) are counted separately.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from backend.core.config import settings
+from backend.core.security import (
+    PasswordHashPoolFull,
+    hash_password,
+    shutdown_password_hash_pool,
+    verify_password,
+    verify_password_async,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(mode: str, stored_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if mode == "inline":
+            ok = verify_password(PASSWORD, stored_hash)
+        else:
+            try:
+                ok = await verify_password_async(PASSWORD, stored_hash)
+            except PasswordHashPoolFull:
+                raise HTTPException(status_code=503)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def storm(mode: str, stored_hash: str, args) -> dict:
+    transport = httpx.ASGITransport(app=build_app(mode, stored_hash))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probes, ticks, statuses = [], [], []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                probes.append((time.perf_counter() - start) * 1000)
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(args.probe_interval)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/login")
+                statuses.append(response.status_code)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    gaps = [(b - a) * 1000 for a, b in zip(ticks, ticks[1:])] or [elapsed * 1000]
+    return {
+        "probes": len(probes),
+        "max_stall": max(gaps),
+        "probe_p50": statistics.median(probes),
+        "probe_p99": percentile(probes, 0.99),
+        "logins_per_s": statuses.count(200) / elapsed,
+        "rejected": statuses.count(503),
+    }
+
+
+async def main(args) -> None:
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.workers
+    settings.PASSWORD_HASH_MAX_QUEUE = args.max_queue
+    stored_hash = hash_password(PASSWORD)
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, bcrypt cost {args.rounds}, "
+          f"pool {args.workers} workers / queue {args.max_queue}\n")
+    print(f"{'mode':<8} {'ping p50':>9} {'ping p99':>9} {'probes':>7} {'max stall':>10} {'logins/s':>9} {'503s':>6}")
+    for mode in ("inline", "pool"):
+        result = await storm(mode, stored_hash, args)
+        print(f"{mode:<8} {result['probe_p50']:>7.1f}ms {result['probe_p99']:>7.1f}ms "
+              f"{result['probes']:>7} {result['max_stall']:>8.1f}ms {result['logins_per_s']:>9.1f} {result['rejected']:>6}")
+    shutdown_password_hash_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-queue", type=int, default=settings.PASSWORD_HASH_MAX_QUEUE)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
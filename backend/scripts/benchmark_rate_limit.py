@@ -0,0 +1,144 @@
+"""
+Rate Limit Middleware Benchmark
+
+Measures per-request overhead of RateLimitMiddleware against the same app
+without it, for each store:
+- memory:       in-process sliding-window counter (bounded LRU)
+- redis:        one EVALSHA per request (local bucket disabled)
+- redis+bucket: local token bucket in front of the script
+
+Usage:
+    python -m backend.scripts.benchmark_rate_limit --requests 5000 --clients 50
+    python -m backend.scripts.benchmark_rate_limit --redis-url redis://localhost:6379/1
+
+Without a reachable --redis-url the Redis rows use an in-process stand-in that
+evaluates the script's logic after sleeping --rtt-ms, which shows how many
+round trips each mode costs.
+"""
+import argparse
+import asyncio
+import math
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from backend.core.config import settings
+from backend.middleware.rate_limiting import RateLimitMiddleware
+
+
+class SimulatedRedis:
+    """Evaluates the sliding-window script in-process after a fixed delay"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.counters = {}
+        self.calls = 0
+
+    def register_script(self, source):
+        return self._run
+
+    async def _run(self, keys, args):
+        self.calls += 1
+        await asyncio.sleep(self.rtt)
+        limit, window, now, recorded, cost = args
+        current = self.counters.get(keys[0], 0)
+        previous = self.counters.get(keys[1], 0)
+        used = math.floor(previous * (window - now % window) / window) + current + recorded
+        allowed = 1 if used + cost <= limit else 0
+        self.counters[keys[0]] = current + recorded + allowed * cost
+        return [allowed, max(limit - used - allowed * cost, 0)]
+
+
+class CountingRedis:
+    """Wraps a real client to count script calls"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def register_script(self, source):
+        script = self.client.register_script(source)
+
+        async def run(keys, args):
+            self.calls += 1
+            return await script(keys=keys, args=args)
+
+        return run
+
+
+def build_app(limiter_kwargs) -> FastAPI:
+    app = FastAPI()
+    if limiter_kwargs is not None:
+        app.add_middleware(RateLimitMiddleware, **limiter_kwargs)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, clients: int) -> list:
+    latencies = []
+    for i in range(requests):
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.{i % clients // 256}.{i % clients % 256}", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            await client.get("/ping")
+            latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+async def main(args) -> None:
+    settings.CACHE_ENABLED = False  # Memory row must not pick up the shared client
+    real = None
+    if args.redis_url:
+        try:
+            import redis.asyncio as redis
+            real = redis.from_url(args.redis_url, decode_responses=True)
+            await real.ping()
+            await real.flushdb()
+        except Exception as e:
+            print(f"Redis unavailable ({e}); using simulated {args.rtt_ms}ms round trips")
+            real = None
+
+    def redis_client():
+        return CountingRedis(real) if real else SimulatedRedis(args.rtt_ms / 1000)
+
+    modes = [
+        ("none", None, None),
+        ("memory", {}, None),
+        ("redis", "redis", 0.0),
+        ("redis+bucket", "redis", 0.1),
+    ]
+    print(f"{args.requests:,} requests over {args.clients} clients (limit 100/min each)\n")
+    print(f"{'mode':<14} {'p50_us':>8} {'p99_us':>8} {'overhead_us':>12} {'redis calls/req':>16}")
+    baseline = None
+    for name, kwargs, fraction in modes:
+        client = None
+        if kwargs == "redis":
+            client = redis_client()
+            kwargs = {"redis_client": client}
+            settings.RATE_LIMIT_LOCAL_FRACTION = fraction
+        latencies = await run(build_app(kwargs), args.requests, args.clients)
+        p50 = statistics.median(latencies)
+        p99 = sorted(latencies)[int(len(latencies) * 0.99)]
+        baseline = p50 if baseline is None else baseline
+        calls = f"{client.calls / args.requests:.3f}" if client else "-"
+        print(f"{name:<14} {p50:>8.0f} {p99:>8.0f} {p50 - baseline:>12.0f} {calls:>16}")
+        if real:
+            await real.flushdb()
+
+    if real:
+        await real.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--redis-url", default="")
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
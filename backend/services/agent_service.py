@@ -14,6 +14,7 @@ from sqlalchemy.orm import selectinload
 
 from backend.models.squad import Squad, SquadMember
 from backend.agents.agno_base import AgnoSquadAgent
+from backend.agents.interaction.routing_engine import invalidate_routing_table
 from backend.services.cached_services.squad_cache import get_squad_cache
 # NOTE: AgentFactory import moved to method level to avoid circular import
 # (factory → specialized agents → orchestration → services → factory)
@@ -114,6 +115,7 @@ class AgentService:
 
         db.add(squad_member)
         await db.commit()
+        invalidate_routing_table(squad_id=squad_id)
         await db.refresh(squad_member)
 
         return squad_member
@@ -291,6 +293,7 @@ class AgentService:
             squad_member.config = {**current_config, **config}
 
         await db.commit()
+        invalidate_routing_table(squad_id=squad_member.squad_id)
         await db.refresh(squad_member)
 
         return squad_member
@@ -323,6 +326,7 @@ class AgentService:
 
         squad_member.is_active = False
         await db.commit()
+        invalidate_routing_table(squad_id=squad_member.squad_id)
         await db.refresh(squad_member)
 
         return squad_member
@@ -355,6 +359,7 @@ class AgentService:
 
         squad_member.is_active = True
         await db.commit()
+        invalidate_routing_table(squad_id=squad_member.squad_id)
         await db.refresh(squad_member)
 
         return squad_member
@@ -385,8 +390,10 @@ class AgentService:
                 detail=f"Squad member {member_id} not found"
             )
 
+        squad_id = squad_member.squad_id
         await db.delete(squad_member)
         await db.commit()
+        invalidate_routing_table(squad_id=squad_id)
         return True
 
     @staticmethod
@@ -9,16 +9,14 @@ from datetime import datetime, timedelta
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import func, and_
 from sqlalchemy.orm import selectinload
 
 from backend.models.workflow import DynamicTask, WorkflowPhase
-from backend.models.project import TaskExecution
 from backend.models.branching import WorkflowBranch
-from backend.models.guardian import CoherenceMetrics
 from backend.models.message import AgentMessage
 from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
-from backend.agents.guardian import get_workflow_health_monitor
+from backend.agents.guardian import get_workflow_health_monitor, get_workflow_snapshot
 from backend.core.logging import logger
 
 
@@ -87,6 +85,9 @@ class AnalyticsService:
         """
         Calculate comprehensive analytics for a workflow.
         
+        Task, agent and coherence figures come from the execution's
+        WorkflowSnapshot.
+        
         Args:
             db: Database session
             execution_id: Task execution ID
@@ -94,31 +95,17 @@ class AnalyticsService:
         Returns:
             WorkflowAnalytics with all metrics
         """
-        # Get execution
-        execution = await db.get(TaskExecution, execution_id)
-        if not execution:
-            raise ValueError(f"Task execution {execution_id} not found")
-        
-        # Get all tasks
-        all_tasks = await self.workflow_engine.get_tasks_for_execution(
-            db=db,
-            execution_id=execution_id,
-        )
+        snapshot = await get_workflow_snapshot(db, execution_id)
         
         # Calculate completion rate
-        completed_tasks = [t for t in all_tasks if t.status == "completed"]
-        completion_rate = len(completed_tasks) / len(all_tasks) if all_tasks else 0.0
+        completion_rate = snapshot.completion_rate
         
         # Calculate average task duration (simple heuristic)
         # In production, would use actual start/end times
         avg_duration = 4.0  # Default 4 hours
         
         # Phase distribution
-        phase_distribution = {
-            WorkflowPhase.INVESTIGATION.value: len([t for t in all_tasks if t.phase == WorkflowPhase.INVESTIGATION.value]),
-            WorkflowPhase.BUILDING.value: len([t for t in all_tasks if t.phase == WorkflowPhase.BUILDING.value]),
-            WorkflowPhase.VALIDATION.value: len([t for t in all_tasks if t.phase == WorkflowPhase.VALIDATION.value]),
-        }
+        phase_distribution = snapshot.phase_counts
         
         # Branch count
         from backend.agents.branching.branching_engine import get_branching_engine
@@ -131,31 +118,16 @@ class AnalyticsService:
         
         # Discovery-to-value conversion (simplified)
         # In production, would track discoveries -> spawned tasks -> completion
-        discovery_to_value = 0.7 if completed_tasks else 0.0
-        
-        # Agent performance (tasks completed per agent)
-        agent_performance: Dict[UUID, float] = {}
-        for task in completed_tasks:
-            agent_id = task.spawned_by_agent_id
-            if agent_id not in agent_performance:
-                agent_performance[agent_id] = 0.0
-            agent_performance[agent_id] += 1.0
+        discovery_to_value = 0.7 if snapshot.status_counts.get("completed") else 0.0
         
-        # Normalize by total tasks per agent
-        agent_task_counts: Dict[UUID, int] = {}
-        for task in all_tasks:
-            agent_id = task.spawned_by_agent_id
-            agent_task_counts[agent_id] = agent_task_counts.get(agent_id, 0) + 1
-        
-        for agent_id in agent_performance:
-            total = agent_task_counts.get(agent_id, 1)
-            agent_performance[agent_id] = agent_performance[agent_id] / total
+        # Agent performance (share of each agent's spawned tasks completed)
+        agent_performance: Dict[UUID, float] = {
+            agent_id: completed / snapshot.agent_task_counts[agent_id]
+            for agent_id, completed in snapshot.agent_completed_counts.items()
+        }
         
         # Coherence trends (simplified - would use historical data)
-        coherence_trends = await self._calculate_coherence_trends(
-            db=db,
-            execution_id=execution_id,
-        )
+        coherence_trends = snapshot.coherence_trends
         
         return WorkflowAnalytics(
             execution_id=execution_id,
@@ -232,33 +204,6 @@ class AnalyticsService:
             "branches": branch_info,
             "phases": [phase.value for phase in WorkflowPhase],
         }
-    
-    async def _calculate_coherence_trends(
-        self,
-        db: AsyncSession,
-        execution_id: UUID,
-    ) -> List[Dict[str, Any]]:
-        """Calculate coherence trends over time"""
-        # Get recent coherence metrics
-        metrics_stmt = (
-            select(CoherenceMetrics)
-            .where(CoherenceMetrics.execution_id == execution_id)
-            .order_by(CoherenceMetrics.calculated_at.desc())
-            .limit(20)
-        )
-        result = await db.execute(metrics_stmt)
-        metrics = list(result.scalars().all())
-        
-        trends = []
-        for metric in metrics:
-            trends.append({
-                "agent_id": str(metric.agent_id),
-                "coherence_score": metric.coherence_score,
-                "calculated_at": metric.calculated_at.isoformat(),
-                "phase": metric.phase,
-            })
-        
-        return trends
 
 
 # Singleton instance
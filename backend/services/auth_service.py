@@ -9,9 +9,12 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.logging import logger
 from backend.core.security import (
-    hash_password,
-    verify_password,
+    PasswordHashPoolFull,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -21,6 +24,7 @@ from backend.core.security import (
     verify_email_verification_token,
 )
 from backend.models.user import User
+from backend.services.cached_services.user_cache import get_user_cache
 from backend.schemas.auth import (
     UserRegister,
     UserLogin,
@@ -31,6 +35,18 @@ from backend.schemas.auth import (
 )
 
 
+async def _password_op(fn, *args):
+    """Run a pooled bcrypt operation, answering 503 when the pool is saturated"""
+    try:
+        return await fn(*args)
+    except PasswordHashPoolFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
+
 class AuthService:
     """Service for handling authentication operations"""
 
@@ -68,7 +84,7 @@ class AuthService:
         user = User(
             email=user_data.email,
             name=user_data.name,
-            password_hash=hash_password(user_data.password),
+            password_hash=await _password_op(hash_password_async, user_data.password),
             plan_tier="starter",
             is_active=True,
             email_verified=False
@@ -105,7 +121,7 @@ class AuthService:
         user = result.scalar_one_or_none()
 
         # Verify user exists and password is correct
-        if not user or not verify_password(credentials.password, user.password_hash):
+        if not user or not await _password_op(verify_password_async, credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -118,6 +134,17 @@ class AuthService:
                 detail="User account is inactive"
             )
 
+        # Upgrade hashes made with old cost parameters while the password is at hand
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = await hash_password_async(credentials.password)
+                await db.commit()
+            except Exception as e:
+                logger.warning(f"Password rehash skipped for user {user.id}: {e}")
+                # Leave the session usable and the user loaded (rollback expires it)
+                await db.rollback()
+                await db.refresh(user)
+
         return user
 
     @staticmethod
@@ -222,15 +249,18 @@ class AuthService:
         Raises:
             HTTPException: If current password is incorrect
         """
+        # The cached auth path does not load the password hash
+        await db.refresh(user, attribute_names=["password_hash"])
+
         # Verify current password
-        if not verify_password(password_data.current_password, user.password_hash):
+        if not await _password_op(verify_password_async, password_data.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password"
             )
 
         # Update password
-        user.password_hash = hash_password(password_data.new_password)
+        user.password_hash = await _password_op(hash_password_async, password_data.new_password)
         await db.commit()
 
     @staticmethod
@@ -302,7 +332,7 @@ class AuthService:
             )
 
         # Update password
-        user.password_hash = hash_password(reset_data.new_password)
+        user.password_hash = await _password_op(hash_password_async, reset_data.new_password)
         await db.commit()
 
     @staticmethod
@@ -348,6 +378,7 @@ class AuthService:
         user.email_verified = True
         await db.commit()
         await db.refresh(user)
+        await get_user_cache().invalidate_user(user.id, user.email)
 
         return user
 
@@ -426,6 +457,8 @@ class AuthService:
         Raises:
             HTTPException: If email is already taken
         """
+        old_email = user.email
+
         if name:
             user.name = name
 
@@ -447,6 +480,7 @@ class AuthService:
 
         await db.commit()
         await db.refresh(user)
+        await get_user_cache().invalidate_user(user.id, old_email)
 
         return user
 
@@ -464,6 +498,7 @@ class AuthService:
         """
         user.is_active = False
         await db.commit()
+        await get_user_cache().invalidate_user(user.id, user.email)
 
     @staticmethod
     async def reactivate_user(
@@ -479,3 +514,4 @@ class AuthService:
         """
         user.is_active = True
         await db.commit()
+        await get_user_cache().invalidate_user(user.id, user.email)
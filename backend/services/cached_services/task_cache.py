@@ -110,7 +110,6 @@ class TaskCacheService:
             "status": execution.status,
             "started_at": execution.started_at.isoformat() if execution.started_at else None,
             "completed_at": execution.completed_at.isoformat() if execution.completed_at else None,
-            "logs": execution.logs,
             "error_message": execution.error_message,
             "execution_metadata": execution.execution_metadata,
             "created_at": execution.created_at.isoformat() if execution.created_at else None,
@@ -8,9 +8,11 @@ Features:
 - Cache by email
 - Automatic invalidation on updates
 - Configurable TTL (default: 5 minutes)
+- User rows for the authentication fast path (core.auth)
 """
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,6 +25,33 @@ from backend.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+# Never cached: loaded explicitly where needed
+UNCACHED_USER_COLUMNS = {"password_hash"}
+
+
+def serialize_user_row(user: User) -> Dict[str, Any]:
+    """Column values of a user, JSON-safe, without the password hash"""
+    row = {}
+    for column in User.__table__.columns:
+        if column.key in UNCACHED_USER_COLUMNS:
+            continue
+        value = getattr(user, column.key)
+        if isinstance(value, (UUID, datetime)):
+            value = str(value) if isinstance(value, UUID) else value.isoformat()
+        row[column.key] = value
+    return row
+
+
+def deserialize_user_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """User constructor kwargs from a serialized row"""
+    values = dict(row)
+    values["id"] = UUID(values["id"])
+    for key in ("created_at", "updated_at"):
+        if values.get(key):
+            values[key] = datetime.fromisoformat(values[key])
+    return values
+
+
 class UserCacheService:
     """
     User caching service with invalidation support.
@@ -30,6 +59,7 @@ class UserCacheService:
     Cache Keys:
     - user:{user_id} -> Full user object
     - user:email:{email} -> Full user object
+    - user:row:{user_id} -> Column values for authentication (no password hash)
 
     TTL: CACHE_USER_TTL (default: 300 seconds = 5 minutes)
     """
@@ -42,6 +72,10 @@ class UserCacheService:
         """Generate cache key for user by ID"""
         return f"user:{str(user_id)}"
 
+    def _user_row_key(self, user_id: UUID) -> str:
+        """Generate cache key for a user's authentication row"""
+        return f"user:row:{str(user_id)}"
+
     def _user_email_key(self, email: str) -> str:
         """Generate cache key for user by email"""
         return f"user:email:{email.lower()}"
@@ -104,6 +138,45 @@ class UserCacheService:
 
         return user
 
+    async def get_user_row(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's column values (without the password hash) with caching.
+
+        Used by the authentication fast path (core.auth), which rebuilds the
+        User from these values without querying the database.
+
+        Args:
+            db: Database session (used on cache miss)
+            user_id: User ID
+            use_cache: Whether to use cache (default: True)
+
+        Returns:
+            Serialized row or None if not found
+        """
+        cache_key = self._user_row_key(user_id)
+
+        if use_cache:
+            cached_row = await self.cache.get(cache_key, cache_type="user")
+            if cached_row:
+                return cached_row
+
+        result = await db.execute(
+            select(User).filter(User.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            return None
+
+        row = serialize_user_row(user)
+        if use_cache:
+            await self.cache.set(cache_key, row, ttl=self.ttl)
+        return row
+
     async def get_user_by_email(
         self,
         db: AsyncSession,
@@ -161,6 +234,12 @@ class UserCacheService:
         await self.cache.delete(id_key)
         logger.info(f"Invalidated cache: {id_key}")
 
+        # Invalidate the authentication row (shared and in-process copies)
+        from backend.core.auth import forget_cached_user
+
+        await self.cache.delete(self._user_row_key(user_id))
+        forget_cached_user(user_id)
+
         # Invalidate email cache if provided
         if email:
             email_key = self._user_email_key(email)
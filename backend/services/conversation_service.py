@@ -12,7 +12,7 @@ Handles:
 import uuid
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, func, and_, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,10 +20,17 @@ from backend.models import (
     MultiTurnConversation,
     ConversationMessage,
     ConversationParticipant,
+    ConversationSummary,
     User,
     SquadMember
 )
 from backend.core.logging import logger
+from backend.core.pagination import after_cursor
+from backend.services.cache_service import get_cache
+from backend.services.summary_service import SummaryService, estimate_tokens
+
+# Conversation list counts are cached briefly instead of COUNT(*) on every page
+CONVERSATION_COUNT_TTL = 60
 
 
 class ConversationService:
@@ -311,62 +318,260 @@ class ConversationService:
         conversation_id: uuid.UUID,
         limit: int = 100,
         offset: int = 0,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> Tuple[List[ConversationMessage], int]:
         """
         Get message history for a conversation.
 
+        Pass the `cursor` of the previous page (core.pagination.next_cursor)
+        for keyset pagination on (created_at, id); deep pages then cost the
+        same as the first one. `offset` is still honoured without a cursor.
+
         Args:
             db: Database session
             conversation_id: UUID of the conversation
             limit: Maximum number of messages to return
-            offset: Offset for pagination
-            max_tokens: Optional maximum total tokens to include (for context window management)
+            offset: Offset for pagination (ignored when cursor is given)
+            max_tokens: Optional token budget; returns the newest messages that fit
+                (cursor and offset are ignored)
+            cursor: Optional keyset cursor of the last message already seen
 
         Returns:
             Tuple of (messages list, total_count)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        # Count total messages
-        count_query = select(func.count(ConversationMessage.id)).where(
-            ConversationMessage.conversation_id == conversation_id
+        # Total from the conversation's message counter (kept by send_message)
+        count_result = await db.execute(
+            select(MultiTurnConversation.total_messages).where(
+                MultiTurnConversation.id == conversation_id
+            )
         )
-        count_result = await db.execute(count_query)
-        total_count = count_result.scalar_one()
+        total_count = count_result.scalar_one_or_none() or 0
+
+        # Newest messages that fit the budget, computed in SQL
+        if max_tokens:
+            messages = await ConversationService._token_window(db, conversation_id, max_tokens, limit)
+            return messages, total_count
 
         # Get messages (ordered by creation time, oldest first)
         query = (
             select(ConversationMessage)
             .where(ConversationMessage.conversation_id == conversation_id)
-            .order_by(ConversationMessage.created_at.asc())
+            .order_by(ConversationMessage.created_at.asc(), ConversationMessage.id.asc())
             .limit(limit)
-            .offset(offset)
         )
+        if cursor:
+            query = query.where(
+                after_cursor(ConversationMessage.created_at, ConversationMessage.id, cursor)
+            )
+        elif offset:
+            query = query.offset(offset)
 
         result = await db.execute(query)
         messages = list(result.scalars().all())
 
-        # If max_tokens specified, trim from the beginning
-        if max_tokens and messages:
-            token_sum = 0
-            trimmed_messages = []
-            for msg in reversed(messages):  # Start from most recent
-                msg_tokens = msg.total_tokens or 0
-                if token_sum + msg_tokens <= max_tokens:
-                    trimmed_messages.insert(0, msg)
-                    token_sum += msg_tokens
-                else:
-                    break
-            messages = trimmed_messages
-
         return messages, total_count
 
+    @staticmethod
+    async def _token_window(
+        db: AsyncSession,
+        conversation_id: uuid.UUID,
+        max_tokens: int,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> List[ConversationMessage]:
+        """
+        Newest messages whose running token total fits in max_tokens.
+
+        The running total is SUM(total_tokens) OVER (ORDER BY created_at DESC),
+        so the cut happens in the database, walking the
+        (conversation_id, created_at, id) index from the newest message and
+        reading at most `limit` rows.
+
+        Args:
+            db: Database session
+            conversation_id: UUID of the conversation
+            max_tokens: Token budget
+            limit: Optional maximum number of messages
+            after: Only consider messages after this (created_at, id)
+
+        Returns:
+            Messages in chronological order
+        """
+        newest_first = (ConversationMessage.created_at.desc(), ConversationMessage.id.desc())
+        newest = (
+            select(
+                ConversationMessage.id,
+                ConversationMessage.created_at,
+                func.coalesce(ConversationMessage.total_tokens, 0).label("tokens"),
+            )
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(*newest_first)
+        )
+        if after is not None:
+            newest = newest.where(tuple_(ConversationMessage.created_at, ConversationMessage.id) > tuple_(*after))
+        if limit:
+            newest = newest.limit(limit)
+        newest = newest.subquery()
+
+        window = select(
+            newest.c.id,
+            func.sum(newest.c.tokens).over(
+                order_by=(newest.c.created_at.desc(), newest.c.id.desc()),
+                rows=(None, 0),
+            ).label("running_tokens"),
+        ).subquery()
+
+        result = await db.execute(
+            select(ConversationMessage)
+            .join(window, window.c.id == ConversationMessage.id)
+            .where(window.c.running_tokens <= max_tokens)
+            .order_by(ConversationMessage.created_at.asc(), ConversationMessage.id.asc())
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_context_window(
+        db: AsyncSession,
+        conversation_id: uuid.UUID,
+        max_tokens: int,
+        limit: Optional[int] = None,
+        include_summary: bool = True
+    ) -> Tuple[Optional[str], List[ConversationMessage]]:
+        """
+        Build an LLM context window for a conversation.
+
+        Returns the newest messages that fit the token budget and, when older
+        messages had to be left out, a summary to stand in for them. The
+        summary's estimated size (~4 characters per token) is taken from the
+        budget first. Cost depends on the window size and the unsummarized
+        tail, not on the length of the conversation.
+
+        When the conversation has a rolling summary (SummaryService), the
+        window only holds messages after its high-water mark, so no folded
+        message appears twice. Messages between the mark and the start of
+        the window are folded into the returned summary text (not stored), so
+        none is skipped either. Otherwise the stored
+        MultiTurnConversation.summary is returned as is.
+
+        Args:
+            db: Database session
+            conversation_id: UUID of the conversation
+            max_tokens: Token budget for summary plus messages
+            limit: Optional maximum number of messages
+            include_summary: Prepend a summary of older messages
+
+        Returns:
+            Tuple of (summary or None, messages in chronological order)
+        """
+        result = await db.execute(
+            select(MultiTurnConversation.summary, MultiTurnConversation.total_messages, ConversationSummary)
+            .outerjoin(ConversationSummary, ConversationSummary.conversation_id == MultiTurnConversation.id)
+            .where(MultiTurnConversation.id == conversation_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None, []
+
+        rolling = row.ConversationSummary if include_summary else None
+        if rolling is not None and rolling.last_message_at is not None:
+            return await ConversationService._window_after_summary(db, rolling, max_tokens, limit)
+
+        summary = row.summary if include_summary else None
+        budget = max_tokens
+        if summary:
+            budget -= estimate_tokens(summary)
+
+        messages = await ConversationService._token_window(db, conversation_id, max(budget, 0), limit)
+
+        # Everything is in the window: no summary needed
+        if len(messages) >= (row.total_messages or 0):
+            summary = None
+
+        return summary, messages
+
+    @staticmethod
+    async def _window_after_summary(
+        db: AsyncSession,
+        rolling: ConversationSummary,
+        max_tokens: int,
+        limit: Optional[int],
+    ) -> Tuple[str, List[ConversationMessage]]:
+        """Context window starting after a rolling summary's high-water mark"""
+        mark = (rolling.last_message_at, rolling.last_message_id)
+        budget = max_tokens - estimate_tokens(rolling.summary)
+        messages = await ConversationService._token_window(
+            db, rolling.conversation_id, max(budget, 0), limit, after=mark
+        )
+
+        position = tuple_(ConversationMessage.created_at, ConversationMessage.id)
+        gap_query = (
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == rolling.conversation_id, position > tuple_(*mark))
+            .order_by(ConversationMessage.created_at, ConversationMessage.id)
+        )
+        if messages:
+            gap_query = gap_query.where(position < tuple_(messages[0].created_at, messages[0].id))
+        result = await db.execute(gap_query)
+        gap = list(result.scalars().all())
+        if not gap:
+            return rolling.summary, messages
+
+        accumulator = SummaryService.new_accumulator(rolling, for_conversation=True)
+        for message in gap:
+            SummaryService.add_message(accumulator, message)
+        return accumulator.render(), messages
+
+    @staticmethod
+    async def _list_conversations(
+        db: AsyncSession,
+        filters: List[Any],
+        count_key: str,
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+    ) -> Tuple[List[MultiTurnConversation], int]:
+        """
+        Page through conversations, most recently active first.
+
+        Sorted on (COALESCE(last_message_at, created_at), id) DESC so pages can
+        be addressed by cursor (MultiTurnConversation.activity_at). The total is
+        cached for CONVERSATION_COUNT_TTL seconds, so it may lag slightly.
+        """
+        activity = func.coalesce(MultiTurnConversation.last_message_at, MultiTurnConversation.created_at)
+
+        cache = get_cache()
+        total_count = await cache.get(count_key, cache_type="conversation_count")
+        if total_count is None:
+            count_query = select(func.count(MultiTurnConversation.id)).where(and_(*filters))
+            total_count = (await db.execute(count_query)).scalar_one()
+            await cache.set(count_key, total_count, ttl=CONVERSATION_COUNT_TTL)
+
+        query = (
+            select(MultiTurnConversation)
+            .where(and_(*filters))
+            .order_by(activity.desc(), MultiTurnConversation.id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            query = query.where(after_cursor(activity, MultiTurnConversation.id, cursor, descending=True))
+        elif offset:
+            query = query.offset(offset)
+
+        result = await db.execute(query)
+        return list(result.scalars().all()), total_count
+
     @staticmethod
     async def get_user_conversations(
         db: AsyncSession,
         user_id: uuid.UUID,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Tuple[List[MultiTurnConversation], int]:
         """
         Get all conversations for a user.
@@ -376,35 +581,24 @@ class ConversationService:
             user_id: UUID of the user
             status: Optional status filter ('active', 'archived', 'closed')
             limit: Maximum number of conversations to return
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored when cursor is given)
+            cursor: Optional keyset cursor of the last conversation already seen
 
         Returns:
             Tuple of (conversations list, total_count)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         # Build filters
         filters = [MultiTurnConversation.user_id == user_id]
         if status:
             filters.append(MultiTurnConversation.status == status)
 
-        # Count total
-        count_query = select(func.count(MultiTurnConversation.id)).where(and_(*filters))
-        count_result = await db.execute(count_query)
-        total_count = count_result.scalar_one()
-
-        # Get conversations (ordered by last message time, most recent first)
-        query = (
-            select(MultiTurnConversation)
-            .where(and_(*filters))
-            .order_by(desc(MultiTurnConversation.last_message_at))
-            .limit(limit)
-            .offset(offset)
+        return await ConversationService._list_conversations(
+            db, filters, f"conv_count:user:{user_id}:{status}", limit, offset, cursor
         )
 
-        result = await db.execute(query)
-        conversations = list(result.scalars().all())
-
-        return conversations, total_count
-
     @staticmethod
     async def get_agent_conversations(
         db: AsyncSession,
@@ -412,7 +606,8 @@ class ConversationService:
         conversation_type: Optional[str] = None,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Tuple[List[MultiTurnConversation], int]:
         """
         Get all conversations for an agent.
@@ -423,10 +618,14 @@ class ConversationService:
             conversation_type: Optional type filter ('user_agent', 'agent_agent', 'multi_party')
             status: Optional status filter ('active', 'archived', 'closed')
             limit: Maximum number of conversations to return
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored when cursor is given)
+            cursor: Optional keyset cursor of the last conversation already seen
 
         Returns:
             Tuple of (conversations list, total_count)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         # Build filters - agent is either primary responder or initiator
         agent_filter = or_(
@@ -443,25 +642,10 @@ class ConversationService:
         if status:
             filters.append(MultiTurnConversation.status == status)
 
-        # Count total
-        count_query = select(func.count(MultiTurnConversation.id)).where(and_(*filters))
-        count_result = await db.execute(count_query)
-        total_count = count_result.scalar_one()
-
-        # Get conversations
-        query = (
-            select(MultiTurnConversation)
-            .where(and_(*filters))
-            .order_by(desc(MultiTurnConversation.last_message_at))
-            .limit(limit)
-            .offset(offset)
+        return await ConversationService._list_conversations(
+            db, filters, f"conv_count:agent:{agent_id}:{conversation_type}:{status}", limit, offset, cursor
         )
 
-        result = await db.execute(query)
-        conversations = list(result.scalars().all())
-
-        return conversations, total_count
-
     # ============================================================================
     # CONVERSATION MANAGEMENT
     # ============================================================================
@@ -571,6 +755,8 @@ class ConversationService:
         """
         Update conversation summary.
 
+        The rolling summary (SummaryService) replaces it on its next fold.
+
         Args:
             db: Database session
             conversation_id: UUID of the conversation
@@ -0,0 +1,540 @@
+"""
+Cost Rollup Service
+
+Incrementally maintains LLMCostSummary rollups from LLMCostEntry rows:
+- Daily, weekly (Monday) and monthly (1st) summaries
+- One row per organization, squad, provider and model, enforced by a unique
+  index on the rollup key and written with INSERT ... ON CONFLICT DO UPDATE
+- Driven by a watermark (LLMCostRollupState): each run folds entries in
+  [watermark, now - lag) into the summaries and advances the watermark in the
+  same transaction, so every entry is counted exactly once
+
+Cost statistics are answered from monthly/daily summaries for rolled-up days plus
+a SQL aggregation over the unrolled tail (and partial days at the edges of the
+requested range), instead of loading every entry into Python.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, select, func, and_, or_, case, cast
+
+from backend.models import LLMCostEntry, LLMCostSummary, LLMCostRollupState
+from backend.models.llm_cost_tracking import summary_rollup_key
+from backend.core.logging import logger
+
+
+ROLLUP_NAME = "llm_cost"
+SUMMARY_TYPES = ("daily", "weekly", "monthly")
+
+# Entries committed slightly out of created_at order are still picked up
+# as long as they land within this lag
+DEFAULT_ROLLUP_LAG = timedelta(seconds=60)
+
+# Max span of entries folded per transaction (bounds backfill transactions)
+DEFAULT_ROLLUP_WINDOW = timedelta(days=1)
+
+# Summary rows per upsert statement (stays under bind parameter limits)
+UPSERT_CHUNK_SIZE = 500
+
+_METRICS = (
+    "requests", "tokens", "prompt_tokens", "completion_tokens",
+    "cost_usd", "response_time_ms", "response_time_samples",
+)
+
+
+def _to_date(value: Any) -> date:
+    """Normalize a SQL date() result (date on PostgreSQL, str on SQLite)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _floor_day(value: datetime) -> datetime:
+    return datetime.combine(value.date(), time.min)
+
+
+def _ceil_day(value: datetime) -> datetime:
+    floor = _floor_day(value)
+    return floor if floor == value else floor + timedelta(days=1)
+
+
+def _next_month(value: datetime) -> datetime:
+    """Start of the month after the one containing value"""
+    first = datetime.combine(value.date().replace(day=1), time.min)
+    return (first + timedelta(days=32)).replace(day=1)
+
+
+def bucket_start(summary_type: str, day: date) -> datetime:
+    """
+    Get the summary_date of the bucket containing a day.
+
+    Args:
+        summary_type: daily, weekly or monthly
+        day: Day of the entry
+
+    Returns:
+        Bucket start (midnight of the day, its Monday, or the 1st of its month)
+    """
+    if summary_type == "daily":
+        start = day
+    elif summary_type == "weekly":
+        start = day - timedelta(days=day.weekday())
+    elif summary_type == "monthly":
+        start = day.replace(day=1)
+    else:
+        raise ValueError(f"Unknown summary type: {summary_type}")
+
+    return datetime.combine(start, time.min)
+
+
+class CostRollupService:
+    """
+    Service maintaining LLM cost rollups and answering cost statistics.
+
+    Provides methods to:
+    - Fold new cost entries into daily/weekly/monthly summaries
+    - Get the current rollup watermark
+    - Compute cost statistics from summaries plus the unrolled tail
+    """
+
+    @staticmethod
+    async def get_watermark(db: AsyncSession) -> Optional[datetime]:
+        """
+        Get the rollup watermark.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Entries created before this time are in the summaries (None if
+            the rollup has never run)
+        """
+        result = await db.execute(
+            select(LLMCostRollupState.watermark).where(LLMCostRollupState.name == ROLLUP_NAME)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def rollup(
+        db: AsyncSession,
+        until: Optional[datetime] = None,
+        lag: timedelta = DEFAULT_ROLLUP_LAG,
+        window: timedelta = DEFAULT_ROLLUP_WINDOW,
+        max_windows: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fold entries created since the watermark into the summaries.
+
+        Each window is committed together with the watermark advance. The
+        state row is locked (SELECT ... FOR UPDATE) so concurrent runs on
+        insert and from Celery beat serialize instead of double counting.
+
+        Args:
+            db: Database session
+            until: Roll up entries created before this time
+                (default: now - lag)
+            lag: Safety lag behind now for in-flight inserts
+            window: Max span of entries per transaction
+            max_windows: Optional cap on windows processed in this call
+
+        Returns:
+            Rollup statistics
+        """
+        until = until or datetime.utcnow() - lag
+        stats = {
+            "windows": 0,
+            "entries": 0,
+            "summaries_upserted": 0,
+            "watermark": None,
+        }
+
+        while max_windows is None or stats["windows"] < max_windows:
+            result = await db.execute(
+                select(LLMCostRollupState)
+                .where(LLMCostRollupState.name == ROLLUP_NAME)
+                .with_for_update()
+            )
+            state = result.scalar_one_or_none()
+
+            if state is None:
+                first = (await db.execute(select(func.min(LLMCostEntry.created_at)))).scalar()
+                if first is None:
+                    break
+                state = LLMCostRollupState(name=ROLLUP_NAME, watermark=_floor_day(first))
+                db.add(state)
+
+            start = state.watermark
+            stats["watermark"] = start
+            if start >= until:
+                # Release the state lock (nothing else changed)
+                await db.commit()
+                break
+
+            end = min(until, start + window)
+            window_stats = await CostRollupService._rollup_window(db, start, end)
+
+            state.watermark = end
+            state.last_run_at = datetime.utcnow()
+            await db.commit()
+
+            stats["windows"] += 1
+            stats["watermark"] = end
+            for key, value in window_stats.items():
+                stats[key] += value
+
+        if stats["windows"]:
+            logger.info(
+                f"LLM cost rollup: {stats['entries']} entries in {stats['windows']} windows, "
+                f"watermark {stats['watermark']}"
+            )
+        return stats
+
+    @staticmethod
+    async def _rollup_window(
+        db: AsyncSession,
+        start: datetime,
+        end: datetime,
+    ) -> Dict[str, int]:
+        """Aggregate entries in [start, end) and add them to the summaries"""
+        day = func.date(LLMCostEntry.created_at)
+        stmt = (
+            select(
+                day,
+                LLMCostEntry.organization_id,
+                LLMCostEntry.squad_id,
+                LLMCostEntry.provider,
+                LLMCostEntry.model,
+                func.count(LLMCostEntry.id),
+                func.coalesce(func.sum(LLMCostEntry.total_tokens), 0),
+                func.coalesce(func.sum(LLMCostEntry.prompt_tokens), 0),
+                func.coalesce(func.sum(LLMCostEntry.completion_tokens), 0),
+                func.coalesce(func.sum(LLMCostEntry.total_cost_usd), 0.0),
+                func.coalesce(func.sum(LLMCostEntry.response_time_ms), 0),
+                func.count(LLMCostEntry.response_time_ms),
+            )
+            .where(
+                and_(
+                    LLMCostEntry.created_at >= start,
+                    LLMCostEntry.created_at < end,
+                )
+            )
+            .group_by(
+                day,
+                LLMCostEntry.organization_id,
+                LLMCostEntry.squad_id,
+                LLMCostEntry.provider,
+                LLMCostEntry.model,
+            )
+        )
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return {"entries": 0, "summaries_upserted": 0}
+
+        # Fan each (day, org, squad, provider, model) group out to its buckets
+        deltas: Dict[Tuple, List[float]] = {}
+        for row in rows:
+            entry_day = _to_date(row[0])
+            dims = tuple(row[1:5])
+            metrics = row[5:]
+            for summary_type in SUMMARY_TYPES:
+                key = (summary_type, bucket_start(summary_type, entry_day)) + dims
+                totals = deltas.setdefault(key, [0] * len(_METRICS))
+                for i, value in enumerate(metrics):
+                    totals[i] += value
+
+        now = datetime.utcnow()
+        rows_to_upsert = []
+        for key, totals in deltas.items():
+            summary_type, summary_date, org_id, squad_id, provider, model = key
+            requests, tokens, prompt, completion, cost, rt_sum, rt_samples = totals
+            rows_to_upsert.append({
+                "id": uuid4(),
+                "summary_type": summary_type,
+                "summary_date": summary_date,
+                "organization_id": org_id,
+                "squad_id": squad_id,
+                "provider": provider,
+                "model": model,
+                "total_requests": int(requests),
+                "total_tokens": int(tokens),
+                "prompt_tokens": int(prompt),
+                "completion_tokens": int(completion),
+                "total_cost_usd": float(cost),
+                "total_response_time_ms": float(rt_sum),
+                "response_time_samples": int(rt_samples),
+                "avg_tokens_per_request": int(tokens) / int(requests),
+                "avg_cost_per_request": float(cost) / int(requests),
+                "avg_response_time_ms": float(rt_sum) / int(rt_samples) if rt_samples else None,
+                "last_updated": now,
+            })
+
+        # Add to existing buckets in one statement per chunk: concurrent or
+        # repeated runs can never create a second row for a rollup key
+        for offset in range(0, len(rows_to_upsert), UPSERT_CHUNK_SIZE):
+            await db.execute(
+                CostRollupService._upsert_statement(
+                    db, rows_to_upsert[offset:offset + UPSERT_CHUNK_SIZE]
+                )
+            )
+
+        return {
+            "entries": sum(int(row[5]) for row in rows),
+            "summaries_upserted": len(rows_to_upsert),
+        }
+
+    @staticmethod
+    def _upsert_statement(db: AsyncSession, rows: List[Dict[str, Any]]):
+        """INSERT ... ON CONFLICT (rollup key) DO UPDATE adding the new totals"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Cost rollup upsert is not supported on {dialect}")
+
+        table = LLMCostSummary.__table__
+        c = table.c
+        stmt = insert(table).values(rows)
+        new = stmt.excluded
+
+        requests = c.total_requests + new.total_requests
+        tokens = c.total_tokens + new.total_tokens
+        cost = c.total_cost_usd + new.total_cost_usd
+        rt_sum = c.total_response_time_ms + new.total_response_time_ms
+        rt_samples = c.response_time_samples + new.response_time_samples
+
+        return stmt.on_conflict_do_update(
+            index_elements=summary_rollup_key(),
+            set_={
+                "total_requests": requests,
+                "total_tokens": tokens,
+                "prompt_tokens": c.prompt_tokens + new.prompt_tokens,
+                "completion_tokens": c.completion_tokens + new.completion_tokens,
+                "total_cost_usd": cost,
+                "total_response_time_ms": rt_sum,
+                "response_time_samples": rt_samples,
+                "avg_tokens_per_request": cast(tokens, Float) / requests,
+                "avg_cost_per_request": cost / requests,
+                "avg_response_time_ms": case(
+                    (rt_samples > 0, rt_sum / rt_samples),
+                    else_=c.avg_response_time_ms,
+                ),
+                "last_updated": new.last_updated,
+            },
+        )
+
+    @staticmethod
+    def _summary_range_clause(lo: Optional[datetime], hi: datetime, hi_is_watermark: bool):
+        """
+        Select summary rows covering exactly [lo, hi).
+
+        The summary rows of the watermark's day and month are partial but
+        cover exactly up to the watermark, so they are usable when hi is the
+        watermark.
+        """
+        daily = LLMCostSummary.summary_type == "daily"
+        monthly = LLMCostSummary.summary_type == "monthly"
+
+        month_lo = None if lo is None else _next_month(lo) if lo.day != 1 else lo
+        month_hi = _next_month(hi) if hi_is_watermark else bucket_start("monthly", hi.date())
+
+        if month_lo is not None and month_lo >= month_hi:
+            day_clause = LLMCostSummary.summary_date < hi
+            if lo is not None:
+                day_clause = and_(LLMCostSummary.summary_date >= lo, day_clause)
+            return and_(daily, day_clause)
+
+        months = LLMCostSummary.summary_date < month_hi
+        head_days = None
+        if month_lo is not None:
+            months = and_(LLMCostSummary.summary_date >= month_lo, months)
+            head_days = and_(LLMCostSummary.summary_date >= lo, LLMCostSummary.summary_date < month_lo)
+        tail_days = and_(LLMCostSummary.summary_date >= month_hi, LLMCostSummary.summary_date < hi)
+
+        day_clause = tail_days if head_days is None else or_(head_days, tail_days)
+        return or_(and_(monthly, months), and_(daily, day_clause))
+
+    @staticmethod
+    async def get_stats(
+        db: AsyncSession,
+        squad_id: Optional[UUID] = None,
+        user_id: Optional[UUID] = None,
+        organization_id: Optional[UUID] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get aggregated cost statistics.
+
+        Whole months and days before the watermark come from monthly and
+        daily summaries; partial days at the range edges and entries after
+        the watermark are aggregated in SQL. Filtering by user (not a summary dimension)
+        aggregates entries in SQL only.
+
+        Args:
+            db: Database session
+            squad_id: Filter by squad
+            user_id: Filter by user
+            organization_id: Filter by organization
+            start_date: Filter from this date (inclusive)
+            end_date: Filter to this date (inclusive)
+
+        Returns:
+            Statistics in the CostStatsResponse shape
+        """
+        entry_filters = []
+        summary_filters = []
+        if squad_id:
+            entry_filters.append(LLMCostEntry.squad_id == squad_id)
+            summary_filters.append(LLMCostSummary.squad_id == squad_id)
+        if organization_id:
+            entry_filters.append(LLMCostEntry.organization_id == organization_id)
+            summary_filters.append(LLMCostSummary.organization_id == organization_id)
+        if user_id:
+            entry_filters.append(LLMCostEntry.user_id == user_id)
+
+        # Split the range into a summarized middle and raw edges
+        summary_range = None
+        watermark = None if user_id else await CostRollupService.get_watermark(db)
+        if watermark is not None:
+            lo = _ceil_day(start_date) if start_date else None
+            hi = watermark if end_date is None or end_date >= watermark else _floor_day(end_date)
+            if lo is None or lo < hi:
+                summary_range = (lo, hi)
+
+        raw_ranges = []
+        if summary_range is None:
+            raw_ranges.append((start_date, end_date, True))
+        else:
+            lo, hi = summary_range
+            if lo is not None and start_date is not None and start_date < lo:
+                raw_ranges.append((start_date, lo, False))
+            raw_ranges.append((hi, end_date, True))
+
+        groups: Dict[Tuple[str, str], List[float]] = {}
+
+        def merge(provider: str, model: str, metrics) -> None:
+            totals = groups.setdefault((provider, model), [0] * len(_METRICS))
+            for i, value in enumerate(metrics):
+                totals[i] += value or 0
+
+        # Unrolled tail and partial days: SQL aggregation over entries
+        range_clauses = []
+        for low, high, high_inclusive in raw_ranges:
+            clause = []
+            if low is not None:
+                clause.append(LLMCostEntry.created_at >= low)
+            if high is not None:
+                clause.append(
+                    LLMCostEntry.created_at <= high if high_inclusive else LLMCostEntry.created_at < high
+                )
+            range_clauses.append(and_(*clause) if clause else None)
+
+        raw_stmt = select(
+            LLMCostEntry.provider,
+            LLMCostEntry.model,
+            func.count(LLMCostEntry.id),
+            func.sum(LLMCostEntry.total_tokens),
+            func.sum(LLMCostEntry.prompt_tokens),
+            func.sum(LLMCostEntry.completion_tokens),
+            func.sum(LLMCostEntry.total_cost_usd),
+            func.sum(LLMCostEntry.response_time_ms),
+            func.count(LLMCostEntry.response_time_ms),
+        ).group_by(LLMCostEntry.provider, LLMCostEntry.model)
+
+        raw_filters = list(entry_filters)
+        if all(clause is not None for clause in range_clauses):
+            raw_filters.append(or_(*range_clauses))
+        if raw_filters:
+            raw_stmt = raw_stmt.where(and_(*raw_filters))
+
+        for row in (await db.execute(raw_stmt)).all():
+            merge(row[0], row[1], row[2:])
+
+        # Rolled-up whole days: SQL aggregation over monthly summaries for
+        # whole months and daily summaries for the days around them
+        if summary_range is not None:
+            lo, hi = summary_range
+            summary_filters.append(
+                CostRollupService._summary_range_clause(lo, hi, hi == watermark)
+            )
+
+            summary_stmt = (
+                select(
+                    LLMCostSummary.provider,
+                    LLMCostSummary.model,
+                    func.sum(LLMCostSummary.total_requests),
+                    func.sum(LLMCostSummary.total_tokens),
+                    func.sum(LLMCostSummary.prompt_tokens),
+                    func.sum(LLMCostSummary.completion_tokens),
+                    func.sum(LLMCostSummary.total_cost_usd),
+                    func.sum(LLMCostSummary.total_response_time_ms),
+                    func.sum(LLMCostSummary.response_time_samples),
+                )
+                .where(and_(*summary_filters))
+                .group_by(LLMCostSummary.provider, LLMCostSummary.model)
+            )
+            for row in (await db.execute(summary_stmt)).all():
+                merge(row[0], row[1], row[2:])
+
+        total_requests = int(sum(totals[0] for totals in groups.values()))
+        if not total_requests:
+            return {
+                "total_requests": 0,
+                "total_tokens": 0,
+                "total_cost_usd": 0.0,
+                "avg_cost_per_request": 0.0,
+                "avg_tokens_per_request": 0.0,
+                "avg_response_time_ms": None,
+                "by_provider": {},
+                "by_model": {},
+                "date_range": {},
+            }
+
+        total_tokens = int(sum(totals[1] for totals in groups.values()))
+        total_cost = sum(totals[4] for totals in groups.values())
+        rt_sum = sum(totals[5] for totals in groups.values())
+        rt_samples = sum(totals[6] for totals in groups.values())
+
+        by_provider: Dict[str, Dict[str, Any]] = {}
+        by_model: Dict[str, Dict[str, Any]] = {}
+        for (provider, model), totals in groups.items():
+            for bucket, key in ((by_provider, provider), (by_model, f"{provider}/{model}")):
+                entry = bucket.setdefault(key, {"requests": 0, "tokens": 0, "cost_usd": 0.0})
+                entry["requests"] += int(totals[0])
+                entry["tokens"] += int(totals[1])
+                entry["cost_usd"] += float(totals[4])
+
+        # Date range: index-backed min/max over the filtered entries
+        range_filters = list(entry_filters)
+        if start_date:
+            range_filters.append(LLMCostEntry.created_at >= start_date)
+        if end_date:
+            range_filters.append(LLMCostEntry.created_at <= end_date)
+        bounds = []
+        for aggregate in (func.min, func.max):
+            bound = select(aggregate(LLMCostEntry.created_at))
+            if range_filters:
+                bound = bound.where(and_(*range_filters))
+            # Separate subqueries so each resolves from the created_at index
+            bounds.append(bound.scalar_subquery())
+        range_stmt = select(*bounds)
+        min_date, max_date = (await db.execute(range_stmt)).one()
+
+        avg_response_time = rt_sum / rt_samples if rt_samples else None
+
+        return {
+            "total_requests": total_requests,
+            "total_tokens": total_tokens,
+            "total_cost_usd": round(total_cost, 6),
+            "avg_cost_per_request": round(total_cost / total_requests, 6),
+            "avg_tokens_per_request": round(total_tokens / total_requests, 2),
+            "avg_response_time_ms": round(avg_response_time, 2) if avg_response_time else None,
+            "by_provider": by_provider,
+            "by_model": by_model,
+            "date_range": {"start": min_date, "end": max_date} if min_date else {},
+        }
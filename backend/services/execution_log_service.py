@@ -0,0 +1,542 @@
+"""
+Execution Log Service
+
+Append-only storage for task execution logs (execution_logs table).
+
+Entries are inserted, never rewritten: appending costs one multi-row INSERT
+regardless of how many entries an execution already has, and concurrent
+writers cannot overwrite each other's entries. Reads are keyset-paginated on
+the database-assigned `seq` and can be streamed or tailed.
+
+Call sites that log often and do not need the entry committed before they
+continue can use ExecutionLogBuffer, which gathers entries from every caller
+in the process into one INSERT and commit per flush.
+"""
+import asyncio
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.logging import logger
+from backend.models.execution_log import ExecutionLog
+from backend.models.project import TaskExecution
+
+# Executions in these states receive no further log entries
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+
+class ExecutionLogService:
+    """Service for appending and reading task execution logs"""
+
+    @staticmethod
+    def build_entry(
+        level: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build a log entry for append().
+
+        Args:
+            level: Log level (info, warning, error)
+            message: Log message
+            metadata: Optional metadata
+
+        Returns:
+            Entry dict
+        """
+        return {
+            "timestamp": datetime.utcnow(),
+            "level": level,
+            "message": message,
+            "metadata": metadata or {},
+        }
+
+    @staticmethod
+    def _row(execution_id: UUID, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "execution_id": execution_id,
+            "timestamp": entry.get("timestamp") or datetime.utcnow(),
+            "level": entry.get("level", "info"),
+            "message": entry.get("message", ""),
+            "log_metadata": entry.get("metadata") or {},
+        }
+
+    @staticmethod
+    async def _insert(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows with one statement; returns them in API shape, in input order"""
+        # seq defaults are drawn in VALUES order, but RETURNING order is not
+        # guaranteed; sorting avoids sort_by_parameter_order, which makes
+        # SQLAlchemy fall back to one INSERT per row on some backends
+        result = await db.execute(insert(ExecutionLog).returning(ExecutionLog.seq), rows)
+        return [
+            {
+                "seq": seq,
+                "execution_id": row["execution_id"],
+                "timestamp": row["timestamp"].isoformat(),
+                "level": row["level"],
+                "message": row["message"],
+                "metadata": row["log_metadata"],
+            }
+            for seq, row in zip(sorted(result.scalars().all()), rows)
+        ]
+
+    @staticmethod
+    async def append(
+        db: AsyncSession,
+        execution_id: UUID,
+        entries: Sequence[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Append entries with a single INSERT. Does not commit.
+
+        Entries receive increasing seq values in the order given.
+
+        Args:
+            db: Database session
+            execution_id: Task execution UUID
+            entries: Entries from build_entry()
+
+        Returns:
+            Written entries in API shape (ISO timestamps, with seq)
+        """
+        if not entries:
+            return []
+        rows = [ExecutionLogService._row(execution_id, entry) for entry in entries]
+        written = await ExecutionLogService._insert(db, rows)
+        for entry in written:
+            del entry["execution_id"]
+        return written
+
+    @staticmethod
+    def _query(execution_id: UUID, level: Optional[str] = None, after_seq: Optional[int] = None):
+        query = select(ExecutionLog).where(ExecutionLog.execution_id == execution_id)
+        if level:
+            query = query.where(ExecutionLog.level == level)
+        if after_seq is not None:
+            query = query.where(ExecutionLog.seq > after_seq)
+        return query.order_by(ExecutionLog.seq)
+
+    @staticmethod
+    def next_cursor(entries: Sequence[ExecutionLog], limit: int) -> Optional[int]:
+        """Cursor for the page after `entries`, or None if this was the last page"""
+        if not entries or len(entries) < limit:
+            return None
+        return entries[-1].seq
+
+    @staticmethod
+    async def get_logs(
+        db: AsyncSession,
+        execution_id: UUID,
+        level: Optional[str] = None,
+        after_seq: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[ExecutionLog]:
+        """
+        Get one page of log entries, oldest first.
+
+        Args:
+            db: Database session
+            execution_id: Task execution UUID
+            level: Filter by log level
+            after_seq: seq of the last entry of the previous page
+            limit: Page size
+
+        Returns:
+            Log entries (next_cursor(entries, limit) gives the next after_seq)
+        """
+        result = await db.execute(
+            ExecutionLogService._query(execution_id, level, after_seq).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_recent_logs(
+        db: AsyncSession,
+        execution_ids: Sequence[UUID],
+        limit: int = 100,
+    ) -> Dict[UUID, List[ExecutionLog]]:
+        """
+        Get the newest entries of several executions with one query.
+
+        Args:
+            db: Database session
+            execution_ids: Task execution UUIDs
+            limit: Entries per execution
+
+        Returns:
+            {execution_id: entries, oldest first}; executions without entries are omitted
+        """
+        if not execution_ids:
+            return {}
+        ranked = (
+            select(
+                ExecutionLog.seq,
+                func.row_number().over(
+                    partition_by=ExecutionLog.execution_id,
+                    order_by=ExecutionLog.seq.desc(),
+                ).label("rank"),
+            )
+            .where(ExecutionLog.execution_id.in_(set(execution_ids)))
+            .subquery()
+        )
+        result = await db.execute(
+            select(ExecutionLog)
+            .join(ranked, ranked.c.seq == ExecutionLog.seq)
+            .where(ranked.c.rank <= limit)
+            .order_by(ExecutionLog.seq)
+        )
+        recent: Dict[UUID, List[ExecutionLog]] = {}
+        for entry in result.scalars().all():
+            recent.setdefault(entry.execution_id, []).append(entry)
+        return recent
+
+    @staticmethod
+    async def iter_logs(
+        db: AsyncSession,
+        execution_id: UUID,
+        level: Optional[str] = None,
+        after_seq: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[ExecutionLog]:
+        """
+        Stream all log entries in pages of batch_size.
+
+        Each page is a separate keyset query, so memory stays bounded and no
+        long-running cursor is held open.
+
+        Args:
+            db: Database session
+            execution_id: Task execution UUID
+            level: Filter by log level
+            after_seq: Start after this seq
+            batch_size: Entries per query
+
+        Yields:
+            Log entries, oldest first
+        """
+        while True:
+            page = await ExecutionLogService.get_logs(db, execution_id, level, after_seq, batch_size)
+            for entry in page:
+                yield entry
+            if len(page) < batch_size:
+                return
+            after_seq = page[-1].seq
+
+    @staticmethod
+    async def count_logs(db: AsyncSession, execution_id: UUID) -> Dict[str, int]:
+        """
+        Count log entries by level.
+
+        Args:
+            db: Database session
+            execution_id: Task execution UUID
+
+        Returns:
+            {level: count, ..., "total": count}
+        """
+        result = await db.execute(
+            select(ExecutionLog.level, func.count())
+            .where(ExecutionLog.execution_id == execution_id)
+            .group_by(ExecutionLog.level)
+        )
+        counts = {level: count for level, count in result.all()}
+        counts["total"] = sum(counts.values())
+        return counts
+
+    @staticmethod
+    async def tail(
+        session_factory,
+        execution_id: UUID,
+        after_seq: Optional[int] = None,
+        poll_interval: float = 1.0,
+        batch_size: int = 500,
+        lag: Optional[float] = None,
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Follow an execution's log: existing entries after `after_seq`, then new ones.
+
+        Polls the table, so entries written by any process are seen. Each poll
+        uses a short-lived session from session_factory. Stops once the
+        execution has finished and every entry has been read.
+
+        seq is assigned at INSERT but an entry only becomes visible at COMMIT,
+        so a writer can commit a lower seq after a higher one was already
+        sent. Each poll therefore re-reads from where the stream stood `lag`
+        seconds earlier and skips entries it already sent; an entry is only
+        missed if its transaction stays open for longer than `lag`.
+
+        Args:
+            session_factory: Async context manager factory yielding a session
+                (e.g. get_db_context)
+            execution_id: Task execution UUID
+            after_seq: Start after this seq (None: from the first entry)
+            poll_interval: Seconds between polls when caught up
+            batch_size: Entries per query
+            lag: Seconds to keep re-reading behind the newest entry sent
+                (default: settings.EXECUTION_LOG_TAIL_LAG)
+
+        Yields:
+            Entry dicts, or None after each poll without new entries
+            (callers can use it for heartbeats)
+        """
+        lag = settings.EXECUTION_LOG_TAIL_LAG if lag is None else lag
+        floor = after_seq or 0  # Everything at or below has been sent
+        newest = floor
+        checkpoints: deque = deque()  # (poll time, newest seq sent before it)
+        sent: set = set()  # seqs above floor already sent
+
+        while True:
+            now = time.monotonic()
+            checkpoints.append((now, newest))
+            while checkpoints and checkpoints[0][0] <= now - lag:
+                floor = max(floor, checkpoints.popleft()[1])
+            sent = {seq for seq in sent if seq > floor}
+
+            new_entries = []
+            async with session_factory() as db:
+                # Status first: entries committed with or before the final status are then read
+                status = await db.scalar(
+                    select(TaskExecution.status).where(TaskExecution.id == execution_id)
+                )
+                async for entry in ExecutionLogService.iter_logs(
+                    db, execution_id, after_seq=floor, batch_size=batch_size
+                ):
+                    if entry.seq not in sent:
+                        new_entries.append(entry.to_dict())
+            finished = status is None or status in FINISHED_STATUSES
+
+            for entry in new_entries:
+                sent.add(entry["seq"])
+                newest = max(newest, entry["seq"])
+                yield entry
+
+            if finished:
+                return
+            if not new_entries:
+                yield None
+            await asyncio.sleep(poll_interval)
+
+
+class ExecutionLogBuffer:
+    """
+    Process-wide batching of log appends.
+
+    add() returns immediately. Pending entries of every execution are written
+    with one INSERT and one commit when batch_size entries are waiting, every
+    flush_interval seconds, and on close(). Written entries are then broadcast
+    to SSE subscribers.
+
+    When a batch fails, its entries are written again one execution at a
+    time, so one bad entry cannot hold back the others. Entries of an
+    execution that no longer exists are dropped; those of an execution whose
+    writes keep failing are dropped after max_attempts flushes. If the
+    database is unreachable everything is kept for the next flush, up to
+    max_pending entries; add() drops new entries beyond that.
+
+    Entries are only in process memory until flushed; use
+    ExecutionLogService.append() where an entry must be committed before the
+    caller continues.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.EXECUTION_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.EXECUTION_LOG_FLUSH_INTERVAL
+        self.max_attempts = max_attempts or settings.EXECUTION_LOG_MAX_ATTEMPTS
+        self.max_pending = max_pending or settings.EXECUTION_LOG_MAX_PENDING
+        self._pending: List[Tuple[UUID, Dict[str, Any]]] = []
+        self._failures: Dict[UUID, int] = {}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
+        self.dropped = 0
+
+    def add(self, execution_id: UUID, entry: Dict[str, Any]) -> None:
+        """
+        Queue an entry for the next flush.
+
+        Args:
+            execution_id: Task execution UUID
+            entry: Entry from ExecutionLogService.build_entry()
+        """
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.error(
+                    f"Execution log buffer full ({self.max_pending} entries), "
+                    f"{self.dropped} entries dropped so far"
+                )
+            return
+        self._pending.append((execution_id, entry))
+        if self._flusher is None and not self._closed:
+            self._flusher = asyncio.create_task(self._run())
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all pending entries.
+
+        Returns:
+            Number of entries written
+        """
+        written_count = 0
+        async with self._lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                try:
+                    written, squads = await self._write(batch)
+                    retry, reachable = [], True
+                except Exception as e:
+                    logger.warning(f"Execution log batch of {len(batch)} entries failed, retrying per execution: {e}")
+                    written, squads, retry, reachable = await self._write_per_execution(batch)
+                self._pending[:len(batch)] = retry
+                written_count += len(written)
+                await self._broadcast(written, squads)
+                if not reachable:
+                    logger.error(f"Execution log flush failed, keeping {len(self._pending)} entries")
+                    break
+                if retry:
+                    break  # Retried with the next flush, ahead of newer entries
+        return written_count
+
+    async def _write(
+        self, batch: List[Tuple[UUID, Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[UUID, UUID]]:
+        """Insert and commit entries in one transaction; returns them and their squads"""
+        rows = [ExecutionLogService._row(execution_id, entry) for execution_id, entry in batch]
+        async with self.session_factory() as db:
+            written = await ExecutionLogService._insert(db, rows)
+            await db.commit()
+            try:
+                result = await db.execute(
+                    select(TaskExecution.id, TaskExecution.squad_id)
+                    .where(TaskExecution.id.in_({row["execution_id"] for row in rows}))
+                )
+                squads = dict(result.all())
+            except Exception as e:
+                # Committed: never retry the insert, only skip the broadcast
+                logger.warning(f"Execution log broadcast skipped: {e}")
+                squads = {}
+        return written, squads
+
+    async def _write_per_execution(self, batch: List[Tuple[UUID, Dict[str, Any]]]):
+        """
+        Write a failed batch one execution per transaction.
+
+        Returns:
+            (written, squads, entries to retry, whether the database was reachable)
+        """
+        groups: Dict[UUID, List[Tuple[UUID, Dict[str, Any]]]] = {}
+        for item in batch:
+            groups.setdefault(item[0], []).append(item)
+
+        written: List[Dict[str, Any]] = []
+        squads: Dict[UUID, UUID] = {}
+        retry: List[Tuple[UUID, Dict[str, Any]]] = []
+        remaining = list(groups.items())
+        while remaining:
+            execution_id, group = remaining.pop(0)
+            try:
+                group_written, group_squads = await self._write(group)
+            except Exception as e:
+                try:
+                    async with self.session_factory() as db:
+                        exists = await db.scalar(
+                            select(TaskExecution.id).where(TaskExecution.id == execution_id)
+                        ) is not None
+                except Exception:
+                    # Database unreachable: keep this and every later execution
+                    retry.extend(group)
+                    for _, rest in remaining:
+                        retry.extend(rest)
+                    return written, squads, retry, False
+
+                failures = self._failures.get(execution_id, 0) + 1
+                if not exists or failures >= self.max_attempts:
+                    self._failures.pop(execution_id, None)
+                    reason = "execution not found" if not exists else f"{failures} failed writes"
+                    logger.error(
+                        f"Dropping {len(group)} execution log entries of {execution_id} ({reason}): {e}"
+                    )
+                else:
+                    self._failures[execution_id] = failures
+                    retry.extend(group)
+                continue
+
+            self._failures.pop(execution_id, None)
+            written.extend(group_written)
+            squads.update(group_squads)
+        return written, squads, retry, True
+
+    @staticmethod
+    async def _broadcast(written: List[Dict[str, Any]], squads: Dict[UUID, UUID]) -> None:
+        # Lazy import to avoid circular dependency
+        from backend.services.task_execution_service import broadcast_sse_event
+
+        for entry in written:
+            execution_id = entry.pop("execution_id")
+            if execution_id in squads:
+                await broadcast_sse_event(execution_id, squads[execution_id], "log", entry)
+
+    async def close(self) -> None:
+        """Stop the background flusher and write what is left"""
+        self._closed = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+
+# One buffer per event loop: its lock, event and flusher task belong to that loop
+_log_buffers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ExecutionLogBuffer]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_execution_log_buffer() -> ExecutionLogBuffer:
+    """Get the log buffer of the running event loop"""
+    loop = asyncio.get_running_loop()
+    buffer = _log_buffers.get(loop)
+    if buffer is None:
+        from backend.core.database import get_db_context
+
+        buffer = ExecutionLogBuffer(get_db_context)
+        _log_buffers[loop] = buffer
+    return buffer
+
+
+async def close_execution_log_buffer() -> None:
+    """Flush and drop the log buffer of the running event loop"""
+    buffer = _log_buffers.pop(asyncio.get_running_loop(), None)
+    if buffer is not None:
+        await buffer.close()
@@ -11,7 +11,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, insert, bindparam
 from sqlalchemy.orm import selectinload
 
 from backend.models import SquadMember, AgentMessage, SquadMemberStats, Squad
@@ -70,6 +70,90 @@ class SquadAnalyticsService:
         logger.info(f"Created stats record for squad member {squad_member_id}")
         return stats
 
+    @staticmethod
+    async def apply_token_deltas(
+        db: AsyncSession,
+        deltas: Dict[UUID, Tuple[int, int]],
+        last_llm_call_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Add token usage deltas for many squad members at once.
+
+        Existing stats rows are updated with a single executemany
+        UPDATE ... SET total_tokens = total_tokens + :delta, so concurrent
+        writers never lose increments. Rows are inserted for members that
+        have none yet. Does not commit.
+
+        Args:
+            db: Database session
+            deltas: Squad member ID -> (input_tokens, output_tokens)
+            last_llm_call_at: Timestamp of the latest call (default: now)
+
+        Returns:
+            Number of squad members updated or created
+        """
+        if not deltas:
+            return 0
+
+        now = last_llm_call_at or datetime.utcnow()
+        member_ids = list(deltas)
+
+        result = await db.execute(
+            select(SquadMemberStats.squad_member_id).where(
+                SquadMemberStats.squad_member_id.in_(member_ids)
+            )
+        )
+        existing = set(result.scalars().all())
+
+        table = SquadMemberStats.__table__
+        updates = [
+            {
+                "member_id": member_id,
+                "d_input": input_tokens,
+                "d_output": output_tokens,
+                "d_total": input_tokens + output_tokens,
+                "called_at": now,
+            }
+            for member_id, (input_tokens, output_tokens) in deltas.items()
+            if member_id in existing
+        ]
+        if updates:
+            await db.execute(
+                table.update()
+                .where(table.c.squad_member_id == bindparam("member_id"))
+                .values(
+                    total_input_tokens=table.c.total_input_tokens + bindparam("d_input"),
+                    total_output_tokens=table.c.total_output_tokens + bindparam("d_output"),
+                    total_tokens=table.c.total_tokens + bindparam("d_total"),
+                    last_llm_call_at=bindparam("called_at"),
+                    updated_at=bindparam("called_at"),
+                ),
+                updates,
+            )
+
+        missing = [member_id for member_id in member_ids if member_id not in existing]
+        created = 0
+        if missing:
+            # Only members that still exist (agent_id is not a foreign key)
+            result = await db.execute(select(SquadMember.id).where(SquadMember.id.in_(missing)))
+            rows = [
+                {
+                    "squad_member_id": member_id,
+                    "total_input_tokens": deltas[member_id][0],
+                    "total_output_tokens": deltas[member_id][1],
+                    "total_tokens": sum(deltas[member_id]),
+                    "total_messages_sent": 0,
+                    "total_messages_received": 0,
+                    "last_llm_call_at": now,
+                }
+                for member_id in result.scalars().all()
+            ]
+            if rows:
+                await db.execute(insert(SquadMemberStats), rows)
+                created = len(rows)
+
+        return len(updates) + created
+
     @staticmethod
     async def update_token_usage(
         db: AsyncSession,
@@ -91,16 +175,13 @@ class SquadAnalyticsService:
         Returns:
             Updated SquadMemberStats
         """
-        stats = await SquadAnalyticsService.get_or_create_stats(db, squad_member_id)
-
-        # Update token counts
-        stats.total_input_tokens += input_tokens
-        stats.total_output_tokens += output_tokens
-        stats.total_tokens += (input_tokens + output_tokens)
-        stats.last_llm_call_at = datetime.utcnow()
-        stats.updated_at = datetime.utcnow()
-
+        # Atomic increment: concurrent calls for the same member never lose updates
+        await SquadAnalyticsService.apply_token_deltas(
+            db, {squad_member_id: (input_tokens, output_tokens)}
+        )
         await db.commit()
+
+        stats = await SquadAnalyticsService.get_or_create_stats(db, squad_member_id)
         await db.refresh(stats)
 
         logger.debug(
@@ -0,0 +1,406 @@
+"""
+Summary Service
+
+Maintains rolling summaries (ConversationSummary) of multi-turn conversations
+and task execution message histories:
+- Each summary has a high-water mark, the (created_at, id) of the last folded
+  message; folding reads only the messages after it
+- The summary accumulator is persisted with the text, so a fold never
+  re-reads older history
+- A background job folds scopes whose unsummarized tail crossed a token
+  threshold (SUMMARY_TOKEN_THRESHOLD)
+
+Context builders read the summary plus the unsummarized tail in one query
+(get_summary_with_tail) instead of replaying the full history.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, literal, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.logging import logger
+from backend.models import (
+    AgentMessage,
+    ConversationMessage,
+    ConversationSummary,
+    MultiTurnConversation,
+)
+
+
+# Only messages this recent count towards the fold threshold (bounds the scan)
+DEFAULT_LOOKBACK = timedelta(days=7)
+
+# Message kinds kept as key events
+EXECUTION_KEY_KINDS = ("task_assignment", "task_completion", "human_intervention_required")
+CONVERSATION_KEY_KINDS = ("user",)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def estimate_tokens(content: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(content or "") // 4 + 1
+
+
+def _sql_token_estimate(content_column):
+    """SQL version of estimate_tokens"""
+    return func.length(content_column) // 4 + 1
+
+
+class RollingSummary:
+    """
+    Incrementally built, serializable summary of messages.
+
+    Tracks message counts per kind (message type or role), participants and
+    the most recent key events.
+    """
+
+    MAX_KEY_EVENTS = 5
+    EXCERPT_CHARS = 100
+
+    def __init__(
+        self,
+        key_kinds: Iterable[str] = EXECUTION_KEY_KINDS,
+        participant_noun: str = "agents",
+        state: Optional[Dict[str, Any]] = None,
+    ):
+        state = state or {}
+        self.key_kinds = tuple(key_kinds)
+        self.participant_noun = participant_noun
+        self.count: int = state.get("count", 0)
+        self.kind_counts: Dict[str, int] = dict(state.get("kind_counts", {}))
+        self.participants = set(state.get("participants", []))
+        self.key_events = deque(
+            (tuple(event) for event in state.get("key_events", [])),
+            maxlen=self.MAX_KEY_EVENTS,
+        )
+
+    def add(self, kind: str, content: str, *participant_ids: Optional[UUID]) -> None:
+        """Fold one message into the summary"""
+        self.count += 1
+        self.kind_counts[kind] = self.kind_counts.get(kind, 0) + 1
+        self.participants.update(str(p) for p in participant_ids if p)
+        if kind in self.key_kinds:
+            self.key_events.append((kind, (content or "")[:self.EXCERPT_CHARS]))
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serializable accumulator state"""
+        return {
+            "count": self.count,
+            "kind_counts": self.kind_counts,
+            "participants": sorted(self.participants),
+            "key_events": [list(event) for event in self.key_events],
+        }
+
+    def render(self) -> str:
+        if not self.count:
+            return "No messages to summarize."
+
+        summary_parts = [
+            f"Summary of {self.count} older messages:",
+            f"- {len(self.participants)} {self.participant_noun} participated",
+            f"- Message types: {', '.join(f'{k} ({c})' for k, c in self.kind_counts.items())}",
+        ]
+
+        if self.key_events:
+            summary_parts.append("- Key events:")
+            for kind, excerpt in self.key_events:
+                summary_parts.append(f"  • {kind}: {excerpt}")
+
+        return "\n".join(summary_parts)
+
+
+def _scope(conversation_id: Optional[UUID], task_execution_id: Optional[UUID]):
+    """Message model, its scope column and the summary filter for a scope"""
+    if (conversation_id is None) == (task_execution_id is None):
+        raise ValueError("Exactly one of conversation_id and task_execution_id is required")
+    if conversation_id is not None:
+        return (
+            ConversationMessage,
+            ConversationMessage.conversation_id == conversation_id,
+            ConversationSummary.conversation_id == conversation_id,
+        )
+    return (
+        AgentMessage,
+        AgentMessage.task_execution_id == task_execution_id,
+        ConversationSummary.task_execution_id == task_execution_id,
+    )
+
+
+class SummaryService:
+    """Service for rolling conversation and task execution summaries"""
+
+    @staticmethod
+    def new_accumulator(
+        summary: Optional[ConversationSummary] = None,
+        for_conversation: bool = False,
+    ) -> RollingSummary:
+        """
+        Accumulator for a scope, resumed from a stored summary.
+
+        Args:
+            summary: Stored summary to resume from
+            for_conversation: True for multi-turn conversations (role-based)
+
+        Returns:
+            RollingSummary
+        """
+        state = summary.state if summary is not None else None
+        if for_conversation:
+            return RollingSummary(CONVERSATION_KEY_KINDS, "participants", state)
+        return RollingSummary(EXECUTION_KEY_KINDS, "agents", state)
+
+    @staticmethod
+    def add_message(accumulator: RollingSummary, message: Any) -> None:
+        """Fold an AgentMessage or ConversationMessage into an accumulator"""
+        if isinstance(message, ConversationMessage):
+            accumulator.add(message.role, message.content, message.sender_id)
+        else:
+            accumulator.add(message.message_type, message.content, message.sender_id, message.recipient_id)
+
+    @staticmethod
+    async def get_summary(
+        db: AsyncSession,
+        conversation_id: Optional[UUID] = None,
+        task_execution_id: Optional[UUID] = None,
+    ) -> Optional[ConversationSummary]:
+        """
+        Get the stored summary of a conversation or task execution.
+
+        Args:
+            db: Database session
+            conversation_id: Multi-turn conversation ID
+            task_execution_id: Task execution ID
+
+        Returns:
+            ConversationSummary or None if nothing was folded yet
+        """
+        _, _, summary_filter = _scope(conversation_id, task_execution_id)
+        result = await db.execute(select(ConversationSummary).where(summary_filter))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def fold(
+        db: AsyncSession,
+        conversation_id: Optional[UUID] = None,
+        task_execution_id: Optional[UUID] = None,
+        until: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+    ) -> Optional[ConversationSummary]:
+        """
+        Fold messages after the high-water mark into the stored summary.
+
+        Streams only the unsummarized messages (keyset on (created_at, id))
+        and advances the high-water mark. For conversations the summary text
+        is also copied to MultiTurnConversation.summary. Flushes; the caller
+        commits.
+
+        Args:
+            db: Database session
+            conversation_id: Multi-turn conversation ID
+            task_execution_id: Task execution ID
+            until: Only fold messages created before this time
+            batch_size: Rows fetched per round trip while streaming
+
+        Returns:
+            Updated summary, or None if there is nothing to summarize yet
+        """
+        model, scope_filter, summary_filter = _scope(conversation_id, task_execution_id)
+        batch_size = batch_size or settings.SUMMARY_FOLD_BATCH_SIZE
+
+        result = await db.execute(select(ConversationSummary).where(summary_filter).with_for_update())
+        summary = result.scalar_one_or_none()
+        accumulator = SummaryService.new_accumulator(summary, for_conversation=conversation_id is not None)
+
+        query = select(model).where(scope_filter).order_by(model.created_at, model.id)
+        if summary is not None and summary.last_message_at is not None:
+            query = query.where(
+                tuple_(model.created_at, model.id) > tuple_(summary.last_message_at, summary.last_message_id)
+            )
+        if until is not None:
+            query = query.where(model.created_at < until)
+
+        folded = tokens = 0
+        last = None
+        stream = await db.stream(query.execution_options(yield_per=batch_size))
+        async for message in stream.scalars():
+            SummaryService.add_message(accumulator, message)
+            tokens += estimate_tokens(message.content)
+            folded += 1
+            last = (message.created_at, message.id)
+
+        if not folded:
+            return summary
+
+        if summary is None:
+            summary = ConversationSummary(
+                conversation_id=conversation_id,
+                task_execution_id=task_execution_id,
+                message_count=0,
+                token_count=0,
+            )
+            db.add(summary)
+
+        summary.summary = accumulator.render()
+        summary.state = accumulator.to_state()
+        summary.message_count += folded
+        summary.token_count += tokens
+        summary.last_message_at, summary.last_message_id = last
+        summary.updated_at = datetime.utcnow()
+
+        if conversation_id is not None:
+            await db.execute(
+                update(MultiTurnConversation)
+                .where(MultiTurnConversation.id == conversation_id)
+                .values(summary=summary.summary)
+            )
+
+        await db.flush()
+        return summary
+
+    @staticmethod
+    async def get_summary_with_tail(
+        db: AsyncSession,
+        conversation_id: Optional[UUID] = None,
+        task_execution_id: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+    ) -> Tuple[Optional[str], List[Any]]:
+        """
+        Get the stored summary and the messages after its high-water mark.
+
+        One query (summary LEFT JOIN tail messages) when a summary exists;
+        falls back to the full history when nothing was folded yet.
+
+        Args:
+            db: Database session
+            conversation_id: Multi-turn conversation ID
+            task_execution_id: Task execution ID
+            since: Also include messages created at or after this time, even
+                if they were already folded into the summary
+
+        Returns:
+            Tuple of (summary text or None, tail messages oldest first)
+        """
+        model, scope_filter, summary_filter = _scope(conversation_id, task_execution_id)
+        scope_column = model.conversation_id if conversation_id is not None else model.task_execution_id
+        summary_scope = (
+            ConversationSummary.conversation_id if conversation_id is not None
+            else ConversationSummary.task_execution_id
+        )
+
+        in_tail = tuple_(model.created_at, model.id) > tuple_(
+            ConversationSummary.last_message_at, ConversationSummary.last_message_id
+        )
+        if since is not None:
+            in_tail = or_(in_tail, model.created_at >= since)
+
+        result = await db.execute(
+            select(ConversationSummary.summary, model)
+            .select_from(ConversationSummary)
+            .outerjoin(model, and_(scope_column == summary_scope, in_tail))
+            .where(summary_filter)
+            .order_by(model.created_at, model.id)
+        )
+        rows = result.all()
+        if rows:
+            return rows[0][0], [row[1] for row in rows if row[1] is not None]
+
+        result = await db.execute(select(model).where(scope_filter).order_by(model.created_at, model.id))
+        return None, list(result.scalars().all())
+
+    @staticmethod
+    async def find_due(
+        db: AsyncSession,
+        token_threshold: Optional[int] = None,
+        limit: int = 100,
+        lookback: timedelta = DEFAULT_LOOKBACK,
+    ) -> List[Tuple[str, UUID]]:
+        """
+        Find scopes whose unsummarized tail crossed the token threshold.
+
+        Tail tokens are estimated in SQL over messages newer than both the
+        high-water mark and the lookback window.
+
+        Args:
+            db: Database session
+            token_threshold: Minimum estimated tail tokens
+            limit: Maximum scopes per kind
+            lookback: Ignore messages older than this
+
+        Returns:
+            List of ("conversation" | "task_execution", scope ID)
+        """
+        token_threshold = token_threshold or settings.SUMMARY_TOKEN_THRESHOLD
+        since = datetime.utcnow() - lookback
+        due: List[Tuple[str, UUID]] = []
+
+        for kind, model, scope_column, summary_scope, tokens in (
+            (
+                "conversation", ConversationMessage, ConversationMessage.conversation_id,
+                ConversationSummary.conversation_id,
+                func.coalesce(ConversationMessage.total_tokens, _sql_token_estimate(ConversationMessage.content)),
+            ),
+            (
+                "task_execution", AgentMessage, AgentMessage.task_execution_id,
+                ConversationSummary.task_execution_id,
+                _sql_token_estimate(AgentMessage.content),
+            ),
+        ):
+            tail_tokens = func.sum(tokens)
+            result = await db.execute(
+                select(scope_column)
+                .select_from(model)
+                .outerjoin(ConversationSummary, summary_scope == scope_column)
+                .where(
+                    scope_column.is_not(None),
+                    model.created_at >= since,
+                    model.created_at > func.coalesce(ConversationSummary.last_message_at, literal(_EPOCH)),
+                )
+                .group_by(scope_column)
+                .having(tail_tokens >= token_threshold)
+                .order_by(tail_tokens.desc())
+                .limit(limit)
+            )
+            due.extend((kind, scope_id) for scope_id in result.scalars().all())
+
+        return due
+
+    @staticmethod
+    async def fold_due(
+        db: AsyncSession,
+        token_threshold: Optional[int] = None,
+        max_folds: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Fold every scope whose tail crossed the threshold, one commit per scope.
+
+        Args:
+            db: Database session
+            token_threshold: Minimum estimated tail tokens
+            max_folds: Maximum scopes per kind in this run
+            batch_size: Rows fetched per round trip while streaming
+
+        Returns:
+            Dictionary with folded scope counts
+        """
+        max_folds = max_folds or settings.SUMMARY_MAX_FOLDS_PER_RUN
+        stats = {"conversations": 0, "task_executions": 0, "errors": 0}
+
+        for kind, scope_id in await SummaryService.find_due(db, token_threshold, max_folds):
+            scope = {"conversation_id": scope_id} if kind == "conversation" else {"task_execution_id": scope_id}
+            try:
+                await SummaryService.fold(db, batch_size=batch_size, **scope)
+                await db.commit()
+            except Exception as e:
+                logger.error(f"Failed to fold summary for {kind} {scope_id}: {e}")
+                await db.rollback()
+                stats["errors"] += 1
+                continue
+            stats["conversations" if kind == "conversation" else "task_executions"] += 1
+
+        return stats
@@ -4,7 +4,7 @@ Task Execution Service
 Business logic for task execution operations.
 Handles task execution lifecycle, status updates, logging, and error handling.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
 
@@ -14,8 +14,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from backend.models.project import Task, TaskExecution
-from backend.models.squad import Squad
+from backend.models.squad import Squad, SquadMember
 from backend.models.message import AgentMessage
+from backend.services.execution_log_service import ExecutionLogService, get_execution_log_buffer
 
 
 def get_sse_manager():
@@ -53,6 +54,17 @@ async def broadcast_sse_event(
 class TaskExecutionService:
     """Service for handling task execution operations"""
 
+    @staticmethod
+    async def _broadcast_logs(execution: TaskExecution, log_entries: List[Dict[str, Any]]) -> None:
+        """Broadcast written log entries to SSE subscribers"""
+        for log_entry in log_entries:
+            await broadcast_sse_event(
+                execution_id=execution.id,
+                squad_id=execution.squad_id,
+                event="log",
+                data=log_entry
+            )
+
     @staticmethod
     async def start_task_execution(
         db: AsyncSession,
@@ -111,25 +123,23 @@ class TaskExecutionService:
             squad_id=squad_id,
             status="pending",
             started_at=datetime.utcnow(),
-            logs=[],
             execution_metadata=execution_metadata or {},
         )
 
         db.add(task_execution)
+        await db.flush()
 
         # Update task status
         task.status = "in_progress"
 
+        # Initial log, committed with the execution
+        log_entries = await ExecutionLogService.append(
+            db, task_execution.id, [ExecutionLogService.build_entry("info", "Task execution started")]
+        )
+
         await db.commit()
         await db.refresh(task_execution)
-
-        # Add initial log
-        await TaskExecutionService.add_log(
-            db,
-            task_execution.id,
-            "info",
-            "Task execution started",
-        )
+        await TaskExecutionService._broadcast_logs(task_execution, log_entries)
 
         # Broadcast SSE event
         await broadcast_sse_event(
@@ -206,6 +216,7 @@ class TaskExecutionService:
         execution_id: UUID,
         status: str,
         log_message: Optional[str] = None,
+        additional_logs: Optional[List[Dict[str, Any]]] = None,
     ) -> TaskExecution:
         """
         Update task execution status.
@@ -215,6 +226,8 @@ class TaskExecutionService:
             execution_id: Task execution UUID
             status: New status (pending, in_progress, completed, failed, blocked)
             log_message: Optional log message
+            additional_logs: Entries from ExecutionLogService.build_entry, written
+                in the same INSERT and commit as the status log
 
         Returns:
             Updated task execution
@@ -245,18 +258,18 @@ class TaskExecutionService:
         if status in ["completed", "failed"]:
             execution.completed_at = datetime.utcnow()
 
-        await db.commit()
-        await db.refresh(execution)
-
-        # Add log
+        # Log the change in the same transaction
         message = log_message or f"Status changed from {old_status} to {status}"
-        await TaskExecutionService.add_log(
+        log_entries = await ExecutionLogService.append(
             db,
             execution_id,
-            "info",
-            message,
+            [ExecutionLogService.build_entry("info", message), *(additional_logs or [])],
         )
 
+        await db.commit()
+        await db.refresh(execution)
+        await TaskExecutionService._broadcast_logs(execution, log_entries)
+
         # Broadcast SSE event
         await broadcast_sse_event(
             execution_id=execution_id,
@@ -278,7 +291,8 @@ class TaskExecutionService:
         level: str,
         message: str,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> TaskExecution:
+        buffered: bool = False,
+    ) -> Optional[TaskExecution]:
         """
         Add a log entry to task execution.
 
@@ -288,13 +302,22 @@ class TaskExecutionService:
             level: Log level (info, warning, error)
             message: Log message
             metadata: Optional metadata
+            buffered: Queue the entry in the process-wide ExecutionLogBuffer
+                instead of inserting and committing it now. Entries from all
+                callers are then written in one INSERT per flush. Skips the
+                execution lookup; returns None.
 
         Returns:
-            Updated task execution
+            Task execution (None when buffered)
 
         Raises:
             HTTPException: If execution not found
         """
+        entry = ExecutionLogService.build_entry(level, message, metadata)
+        if buffered:
+            get_execution_log_buffer().add(execution_id, entry)
+            return None
+
         execution = await TaskExecutionService.get_task_execution(db, execution_id)
 
         if not execution:
@@ -303,28 +326,12 @@ class TaskExecutionService:
                 detail=f"Task execution {execution_id} not found"
             )
 
-        log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": level,
-            "message": message,
-            "metadata": metadata or {},
-        }
-
-        # Append to logs array
-        current_logs = execution.logs or []
-        current_logs.append(log_entry)
-        execution.logs = current_logs
-
+        # Append-only insert; earlier entries are never read or rewritten
+        log_entries = await ExecutionLogService.append(db, execution_id, [entry])
         await db.commit()
-        await db.refresh(execution)
 
         # Broadcast SSE event for log
-        await broadcast_sse_event(
-            execution_id=execution_id,
-            squad_id=execution.squad_id,
-            event="log",
-            data=log_entry
-        )
+        await TaskExecutionService._broadcast_logs(execution, log_entries)
 
         return execution
 
@@ -373,16 +380,13 @@ class TaskExecutionService:
         if task:
             task.status = "completed"
 
+        log_entries = await ExecutionLogService.append(
+            db, execution_id, [ExecutionLogService.build_entry("info", "Task execution completed successfully")]
+        )
+
         await db.commit()
         await db.refresh(execution)
-
-        # Add log
-        await TaskExecutionService.add_log(
-            db,
-            execution_id,
-            "info",
-            "Task execution completed successfully",
-        )
+        await TaskExecutionService._broadcast_logs(execution, log_entries)
 
         # Broadcast SSE event
         await broadcast_sse_event(
@@ -445,18 +449,16 @@ class TaskExecutionService:
         if task:
             task.status = "failed"
 
-        await db.commit()
-        await db.refresh(execution)
-
-        # Add log
-        await TaskExecutionService.add_log(
+        log_entries = await ExecutionLogService.append(
             db,
             execution_id,
-            "error",
-            f"Task execution failed: {error}",
-            metadata=error_metadata,
+            [ExecutionLogService.build_entry("error", f"Task execution failed: {error}", error_metadata)],
         )
 
+        await db.commit()
+        await db.refresh(execution)
+        await TaskExecutionService._broadcast_logs(execution, log_entries)
+
         # Broadcast SSE event
         await broadcast_sse_event(
             execution_id=execution_id,
@@ -510,6 +512,66 @@ class TaskExecutionService:
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_correlated_messages(
+        db: AsyncSession,
+        correlation_id: str,
+        message_type: str,
+        task_execution_id: Optional[UUID] = None,
+    ) -> List[Tuple[AgentMessage, Optional[str]]]:
+        """
+        Get replies to a standup, question or code review.
+
+        One indexed query on (correlation_id, message_type) joined to the
+        sender's squad member, regardless of how long the execution history is.
+
+        Args:
+            db: Database session
+            correlation_id: standup_id, question_id or review_id
+            message_type: Reply message type (status_update, answer, ...)
+            task_execution_id: Optional execution to restrict to
+
+        Returns:
+            List of (message, sender role) in chronological order; the role
+            is None when the sender no longer exists
+        """
+        query = (
+            select(AgentMessage, SquadMember.role)
+            .outerjoin(SquadMember, SquadMember.id == AgentMessage.sender_id)
+            .where(
+                AgentMessage.correlation_id == correlation_id,
+                AgentMessage.message_type == message_type,
+            )
+            .order_by(AgentMessage.created_at)
+        )
+        if task_execution_id:
+            query = query.where(AgentMessage.task_execution_id == task_execution_id)
+
+        result = await db.execute(query)
+        return [(message, role) for message, role in result.all()]
+
+    @staticmethod
+    async def count_execution_messages_by_type(
+        db: AsyncSession,
+        execution_id: UUID,
+    ) -> Dict[str, int]:
+        """
+        Count all messages of an execution per message type.
+
+        Args:
+            db: Database session
+            execution_id: Task execution UUID
+
+        Returns:
+            Message type -> count
+        """
+        result = await db.execute(
+            select(AgentMessage.message_type, func.count())
+            .where(AgentMessage.task_execution_id == execution_id)
+            .group_by(AgentMessage.message_type)
+        )
+        return {message_type: count for message_type, count in result.all()}
+
     @staticmethod
     async def get_execution_summary(
         db: AsyncSession,
@@ -540,6 +602,7 @@ class TaskExecutionService:
 
         # Get message count
         message_count = len(execution.messages) if execution.messages else 0
+        log_counts = await ExecutionLogService.count_logs(db, execution_id)
 
         # Calculate duration
         duration_seconds = None
@@ -556,7 +619,8 @@ class TaskExecutionService:
             "duration_seconds": duration_seconds,
             "error_message": execution.error_message,
             "message_count": message_count,
-            "log_count": len(execution.logs) if execution.logs else 0,
+            "log_count": log_counts["total"],
+            "error_count": log_counts.get("error", 0),
             "metadata": execution.execution_metadata,
             "created_at": execution.created_at.isoformat(),
             "updated_at": execution.updated_at.isoformat(),
@@ -600,15 +664,14 @@ class TaskExecutionService:
         execution.completed_at = datetime.utcnow()
         execution.error_message = f"Cancelled by user. {reason or ''}"
 
-        await db.commit()
-        await db.refresh(execution)
-
-        # Add log
-        await TaskExecutionService.add_log(
+        log_entries = await ExecutionLogService.append(
             db,
             execution_id,
-            "warning",
-            f"Task execution cancelled. {reason or 'No reason provided.'}",
+            [ExecutionLogService.build_entry("warning", f"Task execution cancelled. {reason or 'No reason provided.'}")],
         )
 
+        await db.commit()
+        await db.refresh(execution)
+        await TaskExecutionService._broadcast_logs(execution, log_entries)
+
         return execution
@@ -15,6 +15,7 @@ from sqlalchemy import select
 from backend.models.squad_template import SquadTemplate
 from backend.models import Squad, SquadMember
 from backend.models.routing_rule import RoutingRule
+from backend.agents.interaction.routing_engine import invalidate_routing_table
 from backend.services.agent_service import AgentService
 
 
@@ -171,6 +172,7 @@ class TemplateService:
             created_rules.append(rule)
 
         await db.commit()
+        invalidate_routing_table(squad_id=squad_id)
 
         # Update template usage
         template.usage_count += 1
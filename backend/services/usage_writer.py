@@ -0,0 +1,438 @@
+"""
+Buffered LLM Usage Writer
+
+Agents record one cost event per LLM call. Instead of inserting an
+LLMCostEntry and committing inline, events are buffered (in memory or in a
+Redis Stream) and written in batches:
+
+1. Insert all new LLMCostEntry rows with one executemany
+2. Add per-member token deltas with atomic UPDATE ... SET x = x + :d
+3. Commit, then acknowledge the events in the buffer
+
+Events are only dropped from the buffer after the transaction commits, so a
+failed flush keeps them for the next attempt. Each event carries its
+LLMCostEntry id, and ids already in the table are skipped, so re-delivering a
+batch after a crash between commit and acknowledge never double counts.
+
+Flushes happen when the buffer reaches the batch size, on a timer, and on
+application shutdown. The memory buffer only survives errors inside the
+process; use the Redis backend when events must survive a process crash.
+"""
+import asyncio
+import json
+import os
+import socket
+import uuid
+import weakref
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.logging import logger
+from backend.models import LLMCostEntry
+from backend.services.squad_analytics_service import SquadAnalyticsService
+
+
+UUID_FIELDS = (
+    "id", "squad_id", "agent_id", "user_id", "organization_id",
+    "task_execution_id", "conversation_id",
+)
+
+
+def encode_event(event: Dict[str, Any]) -> str:
+    """Serialize a usage event to JSON (UUIDs and datetimes as strings)"""
+    return json.dumps(
+        event,
+        default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value),
+    )
+
+
+def decode_event(payload: str) -> Dict[str, Any]:
+    """Inverse of encode_event"""
+    event = json.loads(payload)
+    for field in UUID_FIELDS:
+        if event.get(field) is not None:
+            event[field] = UUID(event[field])
+    return event
+
+
+class MemoryUsageBuffer:
+    """
+    In-process FIFO buffer.
+
+    pending() returns the oldest events without removing them; ack() removes
+    them once they are safely in the database.
+    """
+
+    def __init__(self):
+        self._events: deque = deque()
+        self._seq = 0
+
+    async def append(self, event: Dict[str, Any]) -> None:
+        self._seq += 1
+        self._events.append((self._seq, event))
+
+    async def pending(self, limit: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        return [self._events[i] for i in range(min(limit, len(self._events)))]
+
+    async def ack(self, tokens: List[Any]) -> None:
+        # Acknowledged events are always the oldest ones (flushes read from the front)
+        acked = set(tokens)
+        while self._events and self._events[0][0] in acked:
+            self._events.popleft()
+
+    async def size(self) -> int:
+        return len(self._events)
+
+
+class RedisStreamUsageBuffer:
+    """
+    Durable buffer on a Redis Stream with a consumer group.
+
+    Events stay in the consumer's pending entries list until XACK, so events
+    read by a process that crashed before committing are re-read on restart
+    (own pending entries) or claimed by another writer after claim_idle_ms.
+    """
+
+    def __init__(
+        self,
+        redis,
+        stream: str = "usage:llm_cost",
+        group: str = "usage-writer",
+        consumer: Optional[str] = None,
+        claim_idle_ms: int = 60_000,
+    ):
+        self.redis = redis
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = claim_idle_ms
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    @staticmethod
+    def _decode_entries(entries) -> List[Tuple[Any, Dict[str, Any]]]:
+        decoded = []
+        for entry_id, fields in entries or []:
+            payload = fields.get(b"event", fields.get("event"))
+            if payload is None:
+                continue
+            if isinstance(payload, bytes):
+                payload = payload.decode()
+            decoded.append((entry_id, decode_event(payload)))
+        return decoded
+
+    async def _read(self, start_id: str, limit: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: start_id}, count=limit
+        )
+        return self._decode_entries(response[0][1] if response else [])
+
+    async def append(self, event: Dict[str, Any]) -> None:
+        await self._ensure_group()
+        await self.redis.xadd(self.stream, {"event": encode_event(event)})
+
+    async def pending(self, limit: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        await self._ensure_group()
+
+        # 1. Entries this consumer read but never acknowledged
+        entries = await self._read("0", limit)
+        if entries:
+            return entries
+
+        # 2. Entries stuck with a consumer that died
+        claimed = await self.redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=limit,
+        )
+        entries = self._decode_entries(claimed[1] if claimed else [])
+        if entries:
+            return entries
+
+        # 3. New entries
+        return await self._read(">", limit)
+
+    async def ack(self, tokens: List[Any]) -> None:
+        if tokens:
+            await self.redis.xack(self.stream, self.group, *tokens)
+            await self.redis.xdel(self.stream, *tokens)
+
+    async def size(self) -> int:
+        await self._ensure_group()
+        return await self.redis.xlen(self.stream)
+
+
+class UsageWriter:
+    """
+    Batches LLM usage events into bulk database writes.
+
+    Usage:
+        writer = get_usage_writer()
+        await writer.record({...})   # cheap, no database round trip
+        await writer.close()         # on shutdown: stop the loop, flush
+    """
+
+    def __init__(
+        self,
+        buffer=None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_buffer: int = 50_000,
+    ):
+        self.buffer = buffer or MemoryUsageBuffer()
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self.stats = {"recorded": 0, "written": 0, "duplicates": 0, "flushes": 0, "failed_flushes": 0}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def record(self, event: Dict[str, Any]) -> None:
+        """
+        Buffer one usage event.
+
+        The event is a dict of LLMCostEntry columns; an id is assigned if
+        missing so the write is idempotent.
+
+        Args:
+            event: LLMCostEntry column values
+        """
+        event.setdefault("id", uuid.uuid4())
+        event.setdefault("recorded_at", datetime.utcnow())
+        await self.buffer.append(event)
+        self.stats["recorded"] += 1
+
+        if self._closed:
+            await self.flush()
+            return
+
+        self._ensure_running()
+        size = await self.buffer.size()
+        if size >= self.max_buffer:
+            # Backpressure: the background loop is not keeping up
+            await self.flush()
+        elif size >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Background loop: flush on timer or when woken by a full batch"""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:  # Never let the loop die
+                logger.error(f"Usage writer flush loop error: {e}", exc_info=True)
+
+    async def flush(self) -> int:
+        """
+        Write all buffered events.
+
+        Stops at the first failed batch; its events stay buffered for the
+        next flush.
+
+        Returns:
+            Number of LLMCostEntry rows inserted
+        """
+        written = 0
+        async with self._lock:
+            while True:
+                batch = await self.buffer.pending(self.batch_size)
+                if not batch:
+                    break
+
+                try:
+                    written += await self._write_batch([event for _, event in batch])
+                except Exception as e:
+                    self.stats["failed_flushes"] += 1
+                    logger.error(f"Failed to flush {len(batch)} usage events (will retry): {e}")
+                    break
+
+                await self.buffer.ack([token for token, _ in batch])
+                self.stats["flushes"] += 1
+
+                if len(batch) < self.batch_size:
+                    break
+
+        self.stats["written"] += written
+        return written
+
+    async def _write_batch(self, events: List[Dict[str, Any]]) -> int:
+        """Insert one batch and apply its token deltas in a single transaction"""
+        if self.session_factory is None:
+            from backend.core.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+
+        async with self.session_factory() as db:
+            return await write_usage_batch(db, events, stats=self.stats)
+
+    async def close(self) -> None:
+        """Stop the background loop and flush what is left"""
+        self._closed = True
+        if self._task is not None:
+            self._wake.set()
+            try:
+                await self._task
+            except Exception:
+                pass
+            self._task = None
+        await self.flush()
+
+
+async def write_usage_batch(
+    db: AsyncSession,
+    events: List[Dict[str, Any]],
+    stats: Optional[Dict[str, int]] = None,
+) -> int:
+    """
+    Write a batch of usage events in one transaction.
+
+    Events whose id is already stored (re-delivery after a crash) are
+    skipped, so neither the entries nor the token counters are counted twice.
+    created_at is the write time rather than the call time (kept in
+    extra_metadata.recorded_at) so late rows never land behind the cost
+    rollup watermark.
+
+    Args:
+        db: Database session (committed on success)
+        events: LLMCostEntry column values
+        stats: Optional counters to update
+
+    Returns:
+        Number of rows inserted
+    """
+    ids = [event["id"] for event in events]
+    result = await db.execute(select(LLMCostEntry.id).where(LLMCostEntry.id.in_(ids)))
+    stored = set(result.scalars().all())
+
+    now = datetime.utcnow()
+    rows = []
+    seen = set()
+    for event in events:
+        if event["id"] in stored or event["id"] in seen:
+            continue
+        seen.add(event["id"])
+        row = {key: value for key, value in event.items() if key != "recorded_at"}
+        metadata = dict(row.get("extra_metadata") or {})
+        recorded_at = event.get("recorded_at")
+        if recorded_at is not None:
+            metadata["recorded_at"] = (
+                recorded_at.isoformat() if isinstance(recorded_at, datetime) else recorded_at
+            )
+        row["extra_metadata"] = metadata
+        row["created_at"] = now
+        row["updated_at"] = now
+        rows.append(row)
+
+    if stats is not None:
+        stats["duplicates"] = stats.get("duplicates", 0) + len(events) - len(rows)
+    if not rows:
+        return 0
+
+    # Keys must match across rows for a single executemany
+    columns = set().union(*(row.keys() for row in rows))
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+    await db.execute(insert(LLMCostEntry), rows)
+
+    deltas: Dict[UUID, List[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        if row.get("agent_id") is not None:
+            deltas[row["agent_id"]][0] += row.get("prompt_tokens") or 0
+            deltas[row["agent_id"]][1] += row.get("completion_tokens") or 0
+    await SquadAnalyticsService.apply_token_deltas(
+        db, {member_id: tuple(delta) for member_id, delta in deltas.items()}, last_llm_call_at=now
+    )
+
+    await db.commit()
+    return len(rows)
+
+
+# One writer per event loop: its lock, wake event and flusher task belong to
+# that loop (Celery runs each task on a new loop, see run_async_task)
+_usage_writers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, UsageWriter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_usage_writer(buffer=None) -> UsageWriter:
+    return UsageWriter(
+        buffer=buffer,
+        batch_size=settings.USAGE_WRITER_BATCH_SIZE,
+        flush_interval=settings.USAGE_WRITER_FLUSH_INTERVAL,
+        max_buffer=settings.USAGE_WRITER_MAX_BUFFER,
+    )
+
+
+def get_usage_writer() -> UsageWriter:
+    """
+    Get the usage writer of the running event loop
+
+    Loops without init_usage_writer() get a writer on the memory buffer.
+    """
+    loop = asyncio.get_running_loop()
+    writer = _usage_writers.get(loop)
+    if writer is None:
+        writer = _new_usage_writer()
+        _usage_writers[loop] = writer
+    return writer
+
+
+async def init_usage_writer(redis=None) -> UsageWriter:
+    """
+    Create the usage writer of the running event loop on startup.
+
+    With USAGE_WRITER_BACKEND=redis, events go to a Redis Stream and pending
+    events left by a previous process are flushed right away.
+
+    Args:
+        redis: Redis client (required for the redis backend)
+    """
+    buffer = None
+    if settings.USAGE_WRITER_BACKEND == "redis" and redis is not None:
+        buffer = RedisStreamUsageBuffer(redis)
+
+    loop = asyncio.get_running_loop()
+    previous = _usage_writers.get(loop)
+    writer = _usage_writers[loop] = _new_usage_writer(buffer)
+    if previous is not None:
+        await previous.close()
+
+    if buffer is not None:
+        try:
+            await writer.flush()
+        except Exception as e:
+            logger.warning(f"Could not recover pending usage events: {e}")
+    return writer
+
+
+async def close_usage_writer() -> None:
+    """Flush and drop the usage writer of the running event loop (on shutdown)"""
+    writer = _usage_writers.pop(asyncio.get_running_loop(), None)
+    if writer is not None:
+        await writer.close()
@@ -7,11 +7,17 @@ from typing import AsyncGenerator, Generator
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import ARRAY
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.pool import NullPool
 
 from backend.core.app import app
 from backend.core.database import get_db
+from backend.models import (
+    AgentMessage, CoherenceMetrics, DynamicTask, WorkflowAgentCounter, WorkflowTaskCounter,
+)
 from backend.models.base import Base
 
 
@@ -110,6 +116,59 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
                 await session.rollback()
 
 
+# PostgreSQL column types rendered on SQLite, for sqlite_session_maker databases
+@compiles(PG_UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest_asyncio.fixture(scope="function")
+async def sqlite_session_maker(tmp_path):
+    """
+    Factory for isolated SQLite databases holding only the given tables.
+
+    Usage:
+        session_maker = await sqlite_session_maker(User.__table__)
+        engine = session_maker.kw["bind"]
+
+    In-memory by default (one shared connection). Pass file=True when a test
+    needs separate connections, e.g. to see commits isolated as on
+    PostgreSQL. Engines are disposed after the test. The workflow counter
+    tables are added whenever a table they count (dynamic tasks, agent
+    messages, coherence metrics) is, since every flush writing those
+    updates them.
+    """
+    counted = {DynamicTask.__table__, AgentMessage.__table__, CoherenceMetrics.__table__}
+    counters = [WorkflowTaskCounter.__table__, WorkflowAgentCounter.__table__]
+    engines = []
+
+    async def create(*tables, file: bool = False) -> async_sessionmaker:
+        if counted & set(tables):
+            tables = tuple(tables) + tuple(t for t in counters if t not in tables)
+        url = f"sqlite+aiosqlite:///{tmp_path / f'db{len(engines)}.sqlite'}" if file else "sqlite+aiosqlite://"
+        engine = create_async_engine(url)
+        engines.append(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=list(tables))
+        return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        yield create
+    finally:
+        for engine in engines:
+            await engine.dispose()
+
+
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
     """Override get_db dependency for tests"""
     async with TestAsyncSessionLocal() as session:
@@ -0,0 +1,306 @@
+"""
+Tests for CodeIndexer - Chunked, incremental repository indexing
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+
+from backend.agents.context.code_indexer import (
+    CodeIndexer,
+    IndexManifest,
+    chunk_file,
+)
+
+
+PYTHON_SOURCE = '''import os
+
+MAX_RETRIES = 3
+
+
+@decorator
+def authenticate(user):
+    return user.is_active
+
+
+class TokenStore:
+    """Stores tokens"""
+
+    def get(self, key):
+        return self.tokens[key]
+
+
+async def refresh(token):
+    return token
+'''
+
+
+class FakeRAG:
+    """Records embeddings, upserts and deletes made by the indexer"""
+
+    def __init__(self, embed_delay: float = 0.0):
+        self.code_manifest = IndexManifest(use_redis=False)
+        self.embed_delay = embed_delay
+        self.embedded = []
+        self.vectors = {}
+        self.deleted = []
+        self.in_flight_batches = 0
+        self.max_in_flight_batches = 0
+
+    async def generate_embeddings(self, texts):
+        self.in_flight_batches += 1
+        self.max_in_flight_batches = max(self.max_in_flight_batches, self.in_flight_batches)
+        await asyncio.sleep(self.embed_delay)
+        self.in_flight_batches -= 1
+        self.embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    async def upsert_embeddings(self, squad_id, namespace, documents, embeddings):
+        for doc in documents:
+            self.vectors[doc["id"]] = doc
+
+    async def delete(self, squad_id, namespace, document_ids):
+        self.deleted.extend(document_ids)
+        for doc_id in document_ids:
+            self.vectors.pop(doc_id, None)
+
+
+def test_chunk_python_by_symbol():
+    """Test Python files are chunked per function, class and module block"""
+    chunks = chunk_file("auth.py", PYTHON_SOURCE)
+
+    assert [(c.kind, c.symbol) for c in chunks] == [
+        ("module", "<module>"),
+        ("function", "authenticate"),
+        ("class", "TokenStore"),
+        ("function", "refresh"),
+    ]
+    # Decorators belong to their function
+    assert chunks[1].text.startswith("@decorator")
+    assert chunks[1].start_line == 6
+    assert "MAX_RETRIES" in chunks[0].text
+
+
+def test_chunk_large_class_splits_methods():
+    """Test classes over the size limit are split into header and methods"""
+    methods = "".join(f"    def method_{i}(self):\n        return {i}\n\n" for i in range(20))
+    source = f'class Big:\n    """Big class"""\n\n{methods}'
+
+    chunks = chunk_file("big.py", source, max_chars=200)
+
+    assert chunks[0].kind == "class"
+    assert "Big class" in chunks[0].text
+    assert [c.symbol for c in chunks[1:]] == [f"Big.method_{i}" for i in range(20)]
+    assert all(c.kind == "method" for c in chunks[1:])
+
+
+def test_chunk_window_fallback():
+    """Test non-Python and unparsable files use overlapping line windows"""
+    source = "".join(f"line {i}\n" for i in range(1, 131))
+
+    chunks = chunk_file("notes.md", source, window_lines=60, overlap_lines=10)
+
+    assert [(c.start_line, c.end_line) for c in chunks] == [(1, 60), (51, 110), (101, 130)]
+    assert all(c.kind == "window" for c in chunks)
+
+    broken = chunk_file("broken.py", "def oops(:\n    pass\n")
+    assert broken[0].kind == "window"
+
+
+def test_chunk_window_splits_long_lines():
+    """Test windows longer than max_chars are split instead of truncated"""
+    source = "x = '" + "a" * 2500 + "'\n" + "y = 1\n"
+
+    chunks = chunk_file("data.js", source, max_chars=1000)
+
+    assert "".join(c.text for c in chunks) == source
+    assert all(len(c.text) <= 1000 for c in chunks)
+    assert (chunks[0].start_line, chunks[-1].end_line) == (1, 2)
+
+
+def test_chunk_ids_are_content_addressed():
+    """Test unchanged chunks keep their id when other code changes"""
+    before = chunk_file("auth.py", PYTHON_SOURCE)
+    after = chunk_file("auth.py", PYTHON_SOURCE.replace("return token", "return token.strip()"))
+
+    before_ids = {c.symbol: c.document_id("repo") for c in before}
+    after_ids = {c.symbol: c.document_id("repo") for c in after}
+
+    assert before_ids["authenticate"] == after_ids["authenticate"]
+    assert before_ids["refresh"] != after_ids["refresh"]
+
+
+@pytest.mark.asyncio
+async def test_index_files_skips_unchanged_files_and_chunks():
+    """Test re-indexing embeds only changed chunks and deletes removed ones"""
+    rag = FakeRAG()
+    indexer = CodeIndexer(rag)
+    squad_id = uuid4()
+
+    stats = await indexer.index_files(squad_id, "repo", [("auth.py", PYTHON_SOURCE)])
+    assert stats.chunks_embedded == 4
+    assert len(rag.vectors) == 4
+
+    # Unchanged file: skipped before chunking
+    stats = await indexer.index_files(squad_id, "repo", [("auth.py", PYTHON_SOURCE)])
+    assert stats.files_skipped == 1
+    assert stats.chunks_embedded == 0
+
+    # One function changed, one removed
+    changed = PYTHON_SOURCE.replace("return token", "return token.strip()")
+    changed = changed.replace("@decorator\ndef authenticate(user):\n    return user.is_active\n", "")
+    stats = await indexer.index_files(squad_id, "repo", [("auth.py", changed)])
+
+    assert stats.chunks_embedded == 2  # new refresh + module block absorbing removed lines
+    assert stats.chunks_skipped == 1   # TokenStore untouched
+    assert stats.chunks_deleted == 3
+    assert sorted(doc["metadata"]["symbol"] for doc in rag.vectors.values()) == [
+        "<module>", "TokenStore", "refresh"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_index_files_metadata():
+    """Test chunk metadata records location and provenance"""
+    rag = FakeRAG()
+    await CodeIndexer(rag).index_files(
+        uuid4(), "repo", [("auth.py", PYTHON_SOURCE)], branch="dev", commit_hash="abc"
+    )
+
+    doc = next(d for d in rag.vectors.values() if d["metadata"]["symbol"] == "refresh")
+    assert doc["id"].startswith("code_repo_auth.py#")
+    assert doc["metadata"]["chunk_kind"] == "function"
+    assert doc["metadata"]["branch"] == "dev"
+    assert doc["metadata"]["commit_hash"] == "abc"
+    assert doc["metadata"]["start_line"] == 18
+    assert doc["text"].startswith("async def refresh")
+
+
+@pytest.mark.asyncio
+async def test_index_files_skips_binary_and_oversized_files():
+    """Test binary and oversized files are not indexed"""
+    rag = FakeRAG()
+    stats = await CodeIndexer(rag, max_file_bytes=100).index_files(
+        uuid4(), "repo", [("image.png", "\x89PNG\x00data"), ("big.py", "x = 1\n" * 100)]
+    )
+
+    assert stats.files_skipped == 2
+    assert rag.vectors == {}
+
+
+@pytest.mark.asyncio
+async def test_index_files_accepts_async_source_with_backpressure():
+    """Test async file streams and concurrent embedding workers"""
+    rag = FakeRAG(embed_delay=0.01)
+    indexer = CodeIndexer(rag, embed_batch_size=2, embed_workers=3, queue_size=1)
+
+    async def files():
+        for i in range(20):
+            yield f"mod_{i}.py", f"def f_{i}():\n    return {i}\n"
+
+    stats = await indexer.index_files(uuid4(), "repo", files())
+
+    assert stats.chunks_embedded == 20
+    assert 1 < rag.max_in_flight_batches <= 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failing_stage", ["generate_embeddings", "upsert_embeddings"])
+async def test_failed_workers_do_not_block_pipeline(failing_stage):
+    """Test the run fails fast when every worker of a stage dies with full queues"""
+    rag = FakeRAG()
+
+    async def fail(*args):
+        raise RuntimeError(f"{failing_stage} down")
+
+    setattr(rag, failing_stage, fail)
+    indexer = CodeIndexer(rag, embed_batch_size=1, queue_size=2)
+    files = [(f"mod_{i}.py", f"def f_{i}():\n    return {i}\n") for i in range(50)]
+
+    with pytest.raises(RuntimeError, match=failing_stage):
+        await asyncio.wait_for(indexer.index_files(uuid4(), "repo", files), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_failed_run_does_not_update_manifest():
+    """Test a failed embedding run is retried in full next time"""
+    rag = FakeRAG()
+
+    async def fail(texts):
+        raise RuntimeError("embedding API down")
+
+    rag.generate_embeddings = fail
+    squad_id = uuid4()
+
+    with pytest.raises(RuntimeError):
+        await CodeIndexer(rag).index_files(squad_id, "repo", [("auth.py", PYTHON_SOURCE)])
+
+    assert await rag.code_manifest.get_files(squad_id, "repo", ["auth.py"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_delete_files():
+    """Test deleting files removes all their chunks"""
+    rag = FakeRAG()
+    indexer = CodeIndexer(rag)
+    squad_id = uuid4()
+    await indexer.index_files(squad_id, "repo", [("auth.py", PYTHON_SOURCE)])
+
+    stats = await indexer.delete_files(squad_id, "repo", ["auth.py", "unknown.py"])
+
+    assert stats.files_deleted == 1
+    assert stats.chunks_deleted == 4
+    assert rag.vectors == {}
+
+
+@pytest.mark.asyncio
+async def test_index_commit_range(tmp_path):
+    """Test only files changed between commits are re-indexed"""
+    git = pytest.importorskip("git")
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+
+    (tmp_path / "auth.py").write_text(PYTHON_SOURCE)
+    (tmp_path / "util.py").write_text("def helper():\n    return 1\n")
+    (tmp_path / "old.py").write_text("def legacy():\n    return 0\n")
+    repo.index.add(["auth.py", "util.py", "old.py"])
+    base = repo.index.commit("initial").hexsha
+
+    (tmp_path / "util.py").write_text("def helper():\n    return 2\n")
+    repo.index.add(["util.py"])
+    repo.index.remove(["old.py"], working_tree=True)
+    head = repo.index.commit("change").hexsha
+
+    rag = FakeRAG()
+    indexer = CodeIndexer(rag)
+    squad_id = uuid4()
+
+    full = await indexer.index_repository(squad_id, str(tmp_path), "repo", commit=base)
+    assert full.files_seen == 3
+
+    stats = await indexer.index_commit_range(squad_id, str(tmp_path), "repo", base, head)
+
+    assert stats.files_seen == 1
+    assert stats.files_deleted == 1
+    assert stats.chunks_embedded == 1
+    symbols = sorted(doc["metadata"]["symbol"] for doc in rag.vectors.values())
+    assert "legacy" not in symbols and "helper" in symbols
+    assert all(
+        doc["metadata"]["commit_hash"] == head
+        for doc in rag.vectors.values() if doc["metadata"]["symbol"] == "helper"
+    )
+
+
+@pytest.mark.asyncio
+async def test_throughput_reporting():
+    """Test throughput stats for a larger synthetic repository"""
+    rag = FakeRAG()
+    files = [(f"pkg/mod_{i}.py", PYTHON_SOURCE.replace("refresh", f"refresh_{i}")) for i in range(300)]
+
+    stats = (await CodeIndexer(rag, progress_every_files=100).index_files(uuid4(), "repo", files)).to_dict()
+
+    assert stats["files_seen"] == 300
+    assert stats["chunks_embedded"] == 1200
+    assert stats["chunks_per_second"] > 0
+    assert stats["megabytes_per_second"] > 0
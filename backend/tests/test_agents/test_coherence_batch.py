@@ -0,0 +1,146 @@
+"""
+Batched Coherence Scoring Tests
+
+Tests scoring every agent of an execution from one windowed message query,
+and the PM storing the batch's CoherenceMetrics in one commit.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from backend.agents.agno_base import AgentConfig, LLMProvider
+from backend.agents.guardian.coherence_scorer import CoherenceScorer
+from backend.agents.guardian.workflow_snapshot import build_workflow_snapshot, clear_workflow_snapshots
+from backend.agents.specialized.agno_project_manager import AgnoProjectManagerAgent
+from backend.models.branching import WorkflowBranch
+from backend.models.guardian import CoherenceMetrics
+from backend.models.message import AgentMessage
+from backend.models.project import TaskExecution
+from backend.models.squad import SquadMember
+from backend.models.workflow import DynamicTask, WorkflowPhase, task_dependencies
+from backend.tests.test_agents.test_workflow_snapshot import count_queries
+
+
+@pytest_asyncio.fixture
+async def workflow_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(
+        TaskExecution.__table__, DynamicTask.__table__, task_dependencies,
+        AgentMessage.__table__, CoherenceMetrics.__table__, SquadMember.__table__,
+        WorkflowBranch.__table__,
+    )
+    clear_workflow_snapshots()
+    async with session_maker() as db:
+        yield db
+    clear_workflow_snapshots()
+
+
+async def seed(db, agents=4, messages=15):
+    """Execution where agent i sent `messages` messages and spawned i tasks"""
+    squad_id = uuid4()
+    execution = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=squad_id, status="in_progress")
+    members = [
+        SquadMember(id=uuid4(), squad_id=squad_id, role="backend_developer", system_prompt="-")
+        for _ in range(agents)
+    ]
+    base = datetime.utcnow() - timedelta(hours=1)
+    db.add(execution)
+    db.add_all(members)
+    for i, member in enumerate(members):
+        db.add_all([
+            AgentMessage(
+                sender_id=member.id, task_execution_id=execution.id, message_type="status_update",
+                # Only the newest 10 mention building work
+                content="Implement and test the endpoint" if m >= messages - 10 else "Old chatter",
+                created_at=base + timedelta(minutes=m),
+            )
+            for m in range(messages)
+        ])
+        db.add_all([
+            DynamicTask(
+                parent_execution_id=execution.id, phase="building", spawned_by_agent_id=member.id,
+                title=f"Task {t}", description="Build it", rationale="Needed" if t % 2 == 0 else None,
+            )
+            for t in range(i)
+        ])
+    await db.commit()
+    return execution, members
+
+
+@pytest.mark.asyncio
+async def test_batch_scores_every_agent_in_two_queries(workflow_db):
+    """Test the batch costs two statements however many agents it scores"""
+    db = workflow_db
+    small, small_members = await seed(db, agents=2)
+    large, large_members = await seed(db, agents=12)
+    scorer = CoherenceScorer()
+    statements = count_queries(db)
+
+    await scorer.calculate_coherence_batch(db, small.id, WorkflowPhase.BUILDING)
+    small_count = len(statements)
+    statements.clear()
+    scores = await scorer.calculate_coherence_batch(db, large.id, WorkflowPhase.BUILDING)
+
+    assert len(statements) == small_count == 2
+    assert "row_number() OVER (PARTITION BY agent_messages.sender_id" in statements[0]
+    assert set(scores) == {member.id for member in large_members}
+    assert all(score.details["message_count"] == 10 for score in scores.values())
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_per_agent_scores(workflow_db):
+    """Test batch scores equal scoring each agent on its own"""
+    db = workflow_db
+    execution, members = await seed(db)
+    scorer = CoherenceScorer()
+    idle = uuid4()  # No messages, no tasks
+
+    batch = await scorer.calculate_coherence_batch(
+        db, execution.id, WorkflowPhase.BUILDING, agent_ids=[member.id for member in members] + [idle],
+    )
+
+    assert list(batch) == [member.id for member in members] + [idle]
+    for agent_id, score in batch.items():
+        single = await scorer.calculate_coherence(db, agent_id, execution.id, WorkflowPhase.BUILDING)
+        assert score.metrics == pytest.approx(single.metrics)
+        assert score.overall_score == pytest.approx(single.overall_score)
+    assert batch[members[0].id].metrics["task_relevance"] == 0.7  # Spawned nothing
+    assert batch[members[3].id].metrics["task_relevance"] == pytest.approx(2 / 3)
+    assert batch[idle].metrics["goal_alignment"] == 0.3
+    assert await scorer.calculate_coherence_batch(db, execution.id, WorkflowPhase.BUILDING, agent_ids=[]) == {}
+
+
+@pytest.mark.asyncio
+async def test_pm_stores_squad_coherence_in_one_commit(workflow_db):
+    """Test the PM writes one CoherenceMetrics row per agent and the counters see them"""
+    db = workflow_db
+    execution, members = await seed(db)
+    pm = AgnoProjectManagerAgent(
+        config=AgentConfig(
+            role="project_manager", llm_provider=LLMProvider.OLLAMA,
+            llm_model="llama3.2", system_prompt="Test prompt",
+        ),
+        agent_id=uuid4(),
+    )
+    commits = []
+    original_commit = db.commit
+
+    async def counting_commit():
+        commits.append(1)
+        await original_commit()
+
+    db.commit = counting_commit
+    scores = await pm.check_squad_coherence(db, execution.id, WorkflowPhase.BUILDING)
+
+    assert len(commits) == 1
+    assert len(scores) == 4
+    stored = await db.scalar(select(func.count()).select_from(CoherenceMetrics))
+    assert stored == 4
+    snapshot = await build_workflow_snapshot(db, execution.id)
+    expected = sum(score.overall_score for score in scores.values()) / 4
+    assert snapshot.avg_coherence == pytest.approx(expected)
+
+    single = await pm.check_phase_coherence(db, execution.id, members[1].id, WorkflowPhase.BUILDING)
+    assert single.overall_score == pytest.approx(scores[members[1].id].overall_score)
@@ -1,6 +1,7 @@
 """
 Tests for ContextManager - Context Aggregation from Multiple Sources
 """
+import asyncio
 import pytest
 from uuid import uuid4
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -146,6 +147,7 @@ async def test_build_context_with_code_only(context_manager, mock_rag_service, m
         namespace="code",
         query=query,
         top_k=5,
+        query_embedding=mock_rag_service.generate_embedding.return_value,
     )
     assert "code" in context["rag"]
 
@@ -182,6 +184,128 @@ async def test_build_context_with_all_sources(context_manager, mock_rag_service,
     assert "decisions" in context["rag"]
 
 
+@pytest.mark.asyncio
+async def test_build_context_embeds_query_once(context_manager, mock_rag_service, mock_memory_store):
+    """Test the query is embedded once and shared across all namespaces"""
+    mock_rag_service.generate_embedding = AsyncMock(return_value=[0.1] * 1536)
+    mock_rag_service.query.return_value = []
+    mock_memory_store.get_context.return_value = {}
+
+    with patch.object(context_manager, '_get_squad_metadata', new=AsyncMock(return_value={})), \
+         patch.object(context_manager, '_get_agent_metadata', new=AsyncMock(return_value={})):
+        context = await context_manager.build_context(
+            agent_id=uuid4(),
+            squad_id=uuid4(),
+            query="test query",
+            include_conversations=True,
+        )
+
+    mock_rag_service.generate_embedding.assert_called_once_with("test query")
+    for call in mock_rag_service.query.call_args_list:
+        assert call[1]["query_embedding"] == [0.1] * 1536
+
+    # Per-source timings are reported
+    assert "embedding" in context["timings"]
+    assert "rag.code" in context["timings"]
+    assert "squad" in context["timings"]
+    assert "memory" in context["timings"]
+    assert context["partial_sources"] == []
+
+
+@pytest.mark.asyncio
+async def test_build_context_latency_budget_returns_partial(context_manager, mock_rag_service,
+                                                           mock_memory_store):
+    """Test sources exceeding the latency budget are dropped, not awaited"""
+    async def slow_query(**kwargs):
+        if kwargs["namespace"] == "docs":
+            await asyncio.sleep(5)
+        return [{"id": kwargs["namespace"], "text": "x", "score": 0.9}]
+
+    mock_rag_service.query.side_effect = slow_query
+    mock_memory_store.get_context.return_value = {"state": "ok"}
+
+    with patch.object(context_manager, '_get_squad_metadata', new=AsyncMock(return_value={"id": "s"})), \
+         patch.object(context_manager, '_get_agent_metadata', new=AsyncMock(return_value={})):
+        context = await context_manager.build_context(
+            agent_id=uuid4(),
+            squad_id=uuid4(),
+            query="test",
+            latency_budget_seconds=0.2,
+        )
+
+    assert context["partial_sources"] == ["rag.docs"]
+    assert context["rag"]["docs"] == []
+    assert context["rag"]["code"][0]["id"] == "code"
+    assert context["squad"] == {"id": "s"}
+    assert context["memory"] == {"state": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_build_context_failed_source_is_partial(context_manager, mock_rag_service,
+                                                      mock_memory_store):
+    """Test a failing source degrades to an empty result"""
+    mock_rag_service.query.return_value = []
+    mock_memory_store.get_context.side_effect = ConnectionError("redis down")
+
+    with patch.object(context_manager, '_get_squad_metadata', new=AsyncMock(return_value={})), \
+         patch.object(context_manager, '_get_agent_metadata', new=AsyncMock(return_value={})):
+        context = await context_manager.build_context(
+            agent_id=uuid4(),
+            squad_id=uuid4(),
+            query="test",
+        )
+
+    assert context["memory"] == {}
+    assert context["partial_sources"] == ["memory"]
+
+
+@pytest.mark.asyncio
+async def test_build_context_token_budget(context_manager, mock_rag_service,
+                                          mock_memory_store, mock_history_manager):
+    """Test token budget keeps newest history and highest-scoring RAG results"""
+    async def ranked_query(**kwargs):
+        scores = {"code": 0.9, "tickets": 0.5, "docs": 0.7, "decisions": 0.2}
+        return [{"id": kwargs["namespace"], "text": "a" * 400, "score": scores[kwargs["namespace"]]}]
+
+    messages = []
+    for i in range(10):
+        msg = MagicMock()
+        msg.created_at = datetime.utcnow()
+        msg.sender_id = uuid4()
+        msg.recipient_id = None
+        msg.message_type = "chat"
+        msg.content = f"message {i} " + "b" * 392
+        messages.append(msg)
+
+    mock_rag_service.query.side_effect = ranked_query
+    mock_memory_store.get_context.return_value = {}
+    mock_history_manager.get_conversation_history.return_value = messages
+
+    with patch.object(context_manager, '_get_squad_metadata', new=AsyncMock(return_value={})), \
+         patch.object(context_manager, '_get_agent_metadata', new=AsyncMock(return_value={})):
+        context = await context_manager.build_context(
+            agent_id=uuid4(),
+            squad_id=uuid4(),
+            query="test",
+            task_execution_id=uuid4(),
+            max_context_tokens=500,
+        )
+
+    # Each item is ~101 tokens: 2 newest messages fit in half the budget
+    history = context["conversation_history"]
+    assert [m["content"].split(" ")[1] for m in history] == ["8", "9"]
+
+    # Remaining budget goes to the two best-scoring documents
+    assert context["rag"]["code"] and context["rag"]["docs"]
+    assert context["rag"]["tickets"] == [] and context["rag"]["decisions"] == []
+
+    usage = context["token_usage"]
+    assert usage["budget"] == 500
+    assert usage["used"] <= 500
+    assert usage["dropped_history_messages"] == 8
+    assert usage["dropped_rag_results"] == 2
+
+
 @pytest.mark.asyncio
 async def test_build_context_with_task_execution(context_manager, mock_rag_service,
                                                   mock_memory_store, mock_history_manager):
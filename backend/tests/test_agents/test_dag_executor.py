@@ -0,0 +1,210 @@
+"""
+Dynamic Task DAG Executor Tests
+
+Tests concurrent dispatch of ready tasks, concurrency limits, critical-path
+ordering, failure propagation and resuming from persisted status.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from backend.agents.orchestration.dag_executor import DynamicTaskExecutor
+from backend.agents.orchestration.load_index import AgentLoadIndex
+from backend.models.project import TaskExecution
+from backend.models.workflow import DynamicTask, task_dependencies
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    # File database: the executor writes status from several sessions
+    return await sqlite_session_maker(
+        TaskExecution.__table__, DynamicTask.__table__, task_dependencies, file=True
+    )
+
+
+def session_factory(session_maker):
+    @asynccontextmanager
+    async def factory():
+        async with session_maker() as db:
+            yield db
+    return factory
+
+
+async def build_dag(session_maker, edges, agents=None, statuses=None):
+    """Create an execution whose tasks are named by edges' endpoints; returns (execution_id, ids)"""
+    execution = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=uuid4(), status="in_progress")
+    names = sorted({name for edge in edges for name in edge if name} | set(agents or {}))
+    agents = agents or {}
+    default_agent = uuid4()
+    base = datetime(2026, 1, 1)
+    tasks = {
+        name: DynamicTask(
+            id=uuid4(), parent_execution_id=execution.id, phase="building",
+            spawned_by_agent_id=agents.get(name, default_agent), title=name, description=name,
+            status=(statuses or {}).get(name, "pending"), created_at=base + timedelta(seconds=i),
+        )
+        for i, name in enumerate(names)
+    }
+    async with session_maker() as db:
+        db.add(execution)
+        db.add_all(tasks.values())
+        await db.flush()
+        pairs = [(a, b) for a, b in edges if a and b]
+        if pairs:
+            await db.execute(task_dependencies.insert().values([
+                {"task_id": tasks[a].id, "blocks_task_id": tasks[b].id} for a, b in pairs
+            ]))
+        await db.commit()
+    return execution.id, {name: task.id for name, task in tasks.items()}
+
+
+async def statuses_of(session_maker, ids):
+    async with session_maker() as db:
+        rows = dict((await db.execute(select(DynamicTask.id, DynamicTask.status))).all())
+    return {name: rows[tid] for name, tid in ids.items()}
+
+
+class Recorder:
+    """Runner that records start/finish order and peak concurrency"""
+
+    def __init__(self, delay=0.02, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.events = []
+        self.running = {}
+        self.peak = 0
+        self.peak_per_agent = 0
+
+    async def __call__(self, task, agent_id):
+        self.events.append(("start", task.title))
+        self.running[agent_id] = self.running.get(agent_id, 0) + 1
+        self.peak = max(self.peak, sum(self.running.values()))
+        self.peak_per_agent = max(self.peak_per_agent, self.running[agent_id])
+        try:
+            await asyncio.sleep(self.delay)
+            if task.title in self.fail:
+                raise RuntimeError(f"{task.title} broke")
+        finally:
+            self.running[agent_id] -= 1
+            self.events.append(("finish", task.title))
+
+    def started(self):
+        return [name for kind, name in self.events if kind == "start"]
+
+
+@pytest.mark.asyncio
+async def test_ready_tasks_run_concurrently_after_blockers(session_maker):
+    """Test independent tasks overlap, dependents wait for blockers, and the report shows the speed-up"""
+    execution_id, ids = await build_dag(
+        session_maker,
+        [("a", "c"), ("b", "c"), ("c", "d"), ("e", None), ("f", None)],
+        agents={name: uuid4() for name in "abcdef"},
+    )
+    runner = Recorder(delay=0.1)
+    executor = DynamicTaskExecutor(
+        runner, session_factory(session_maker), squad_concurrency=8, load_index=AgentLoadIndex()
+    )
+
+    report = await executor.run(execution_id)
+
+    events = runner.events
+    assert events.index(("start", "c")) > max(events.index(("finish", "a")), events.index(("finish", "b")))
+    assert events.index(("start", "d")) > events.index(("finish", "c"))
+    assert runner.peak == 4  # a, b, e and f together
+    assert report["max_concurrency"] == 4
+    assert sorted(report["completed"]) == sorted(str(tid) for tid in ids.values())
+    assert report["critical_path"] == 3.0  # a -> c -> d
+    assert report["parallelism"] > 1.5  # 6 tasks in about 3 task-lengths
+    assert set((await statuses_of(session_maker, ids)).values()) == {"completed"}
+
+
+@pytest.mark.asyncio
+async def test_agent_and_squad_limits(session_maker):
+    """Test no agent or squad runs more tasks at once than allowed"""
+    busy_agent, other_agent = uuid4(), uuid4()
+    agents = {name: busy_agent for name in "abcd"} | {name: other_agent for name in "efgh"}
+    execution_id, _ = await build_dag(session_maker, [], agents=agents)
+    runner = Recorder()
+
+    report = await DynamicTaskExecutor(
+        runner, session_factory(session_maker),
+        agent_concurrency=2, squad_concurrency=3, load_index=AgentLoadIndex(),
+    ).run(execution_id)
+
+    assert runner.peak_per_agent == 2
+    assert runner.peak == 3
+    assert len(report["completed"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_critical_path_goes_first(session_maker):
+    """Test the ready task heading the longest chain is dispatched before shorter ones"""
+    execution_id, _ = await build_dag(
+        session_maker, [("a", None), ("b", None), ("z", "y"), ("y", "x")]
+    )
+    runner = Recorder(delay=0.001)
+
+    await DynamicTaskExecutor(
+        runner, session_factory(session_maker), squad_concurrency=1, load_index=AgentLoadIndex()
+    ).run(execution_id)
+
+    assert runner.started()[0] == "z"  # Created last, but three tasks long
+    assert runner.started().index("y") < runner.started().index("b")
+
+
+@pytest.mark.asyncio
+async def test_failure_blocks_only_downstream(session_maker):
+    """Test a failed task blocks its dependents while unrelated tasks still complete"""
+    execution_id, ids = await build_dag(session_maker, [("a", "b"), ("b", "c"), ("d", None)])
+    runner = Recorder(fail={"a"})
+
+    report = await DynamicTaskExecutor(
+        runner, session_factory(session_maker), load_index=AgentLoadIndex()
+    ).run(execution_id)
+
+    assert report["failed"] == [str(ids["a"])]
+    assert report["errors"] == {str(ids["a"]): "a broke"}
+    assert report["blocked"] == [str(ids["b"]), str(ids["c"])]
+    assert "b" not in runner.started()
+    assert await statuses_of(session_maker, ids) == {
+        "a": "failed", "b": "blocked", "c": "blocked", "d": "completed"
+    }
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_and_reruns_in_flight(session_maker):
+    """Test a restarted run picks up from the persisted status"""
+    execution_id, ids = await build_dag(
+        session_maker, [("a", "b"), ("b", "c")],
+        statuses={"a": "completed", "b": "in_progress"},
+    )
+    runner = Recorder()
+
+    report = await DynamicTaskExecutor(
+        runner, session_factory(session_maker), load_index=AgentLoadIndex()
+    ).run(execution_id)
+
+    assert runner.started() == ["b", "c"]
+    assert report["skipped"] == 1
+    assert set((await statuses_of(session_maker, ids)).values()) == {"completed"}
+
+
+@pytest.mark.asyncio
+async def test_cycle_is_reported_as_blocked(session_maker):
+    """Test tasks on a dependency cycle are left blocked instead of hanging the run"""
+    execution_id, ids = await build_dag(session_maker, [("a", "b"), ("b", "a"), ("c", None)])
+
+    report = await asyncio.wait_for(
+        DynamicTaskExecutor(
+            Recorder(), session_factory(session_maker), load_index=AgentLoadIndex()
+        ).run(execution_id),
+        timeout=5,
+    )
+
+    assert report["completed"] == [str(ids["c"])]
+    assert sorted(report["blocked"]) == sorted([str(ids["a"]), str(ids["b"])])
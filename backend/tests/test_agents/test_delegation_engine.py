@@ -3,9 +3,17 @@ Delegation Engine Tests
 
 Tests for task delegation engine.
 """
+import random
+
 import pytest
+import pytest_asyncio
 from uuid import uuid4
+
+from sqlalchemy import event
+
 from backend.agents.orchestration.delegation_engine import DelegationEngine
+from backend.agents.orchestration.load_index import AgentLoadIndex
+from backend.models import Conversation, SquadMember
 
 
 class TestDelegationEngine:
@@ -76,6 +84,108 @@ class TestDelegationEngineIntegration:
         assert True
 
 
+API_TASK = {"task_type": "api_endpoint", "required_skills": ["python"]}
+
+
+def squad_members(squad_id=None):
+    squad_id = squad_id or uuid4()
+    return [
+        SquadMember(id=uuid4(), squad_id=squad_id, role=role, specialization=spec, system_prompt="-")
+        for role, spec in [
+            ("backend_developer", "python"),
+            ("backend_developer", "python"),
+            ("backend_developer", "python"),
+            ("qa_tester", "python"),
+        ]
+    ]
+
+
+def test_least_loaded_spreads_work_over_comparable_members():
+    """Test the top scorer stops getting everything once it is busier than its peers"""
+    members = squad_members()
+    index = AgentLoadIndex()
+    engine = DelegationEngine(load_index=index, strategy="least_loaded")
+
+    picks = []
+    for _ in range(6):
+        member = engine.choose_agent(members, API_TASK)
+        index.add(member.id, "tasks")
+        picks.append(member)
+
+    assert [m.id for m in picks] == [m.id for m in members[:3]] * 2  # Ties go to member order
+    assert index.queue_depth(members[3].id) == 0  # QA tester is not a comparable match
+
+    score_only = DelegationEngine(load_index=index, strategy="score")
+    assert score_only.choose_agent(members, API_TASK).id == members[0].id
+
+
+def test_power_of_two_takes_lighter_sample():
+    """Test power-of-two choices picks the less loaded of its two samples"""
+    members = squad_members()
+    index = AgentLoadIndex()
+    index.add(members[0].id, "tasks", 5)
+    index.add(members[1].id, "tasks", 3)
+    engine = DelegationEngine(load_index=index, strategy="power_of_two", rng=random.Random(1))
+
+    for _ in range(20):
+        sampled = engine.choose_agent(members, API_TASK)
+        assert sampled.id != members[0].id  # Always loses against either other sample
+
+
+def test_unknown_strategy_rejected():
+    """Test a misconfigured strategy fails fast"""
+    with pytest.raises(ValueError):
+        DelegationEngine(load_index=AgentLoadIndex(), strategy="round_robin")
+
+
+@pytest_asyncio.fixture
+async def load_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(SquadMember.__table__, Conversation.__table__)
+    async with session_maker() as db:
+        yield db
+
+
+def open_conversation(responder, state="waiting"):
+    return Conversation(
+        id=uuid4(), initial_message_id=uuid4(), asker_id=uuid4(),
+        current_responder_id=responder.id, current_state=state,
+    )
+
+
+@pytest.mark.asyncio
+async def test_find_best_agent_counts_open_conversations(load_db):
+    """Test open conversations count as load, answered ones do not, and counts are reused"""
+    squad_id = uuid4()
+    members = squad_members(squad_id)
+    load_db.add_all(members)
+    load_db.add_all([open_conversation(members[0]), open_conversation(members[0], "follow_up")])
+    load_db.add_all([open_conversation(members[1]), open_conversation(members[2], "answered")])
+    await load_db.commit()
+
+    index = AgentLoadIndex(refresh_seconds=60)
+    engine = DelegationEngine(load_index=index, strategy="least_loaded")
+
+    assert (await engine.find_best_agent(load_db, squad_id, API_TASK)).id == members[2].id
+    depths = await engine.get_queue_depths(load_db, squad_id)
+    assert [depths[str(m.id)]["conversations"] for m in members] == [2, 1, 0, 0]
+
+    with index.track(members[2].id, "llm_calls"), index.track(members[2].id, "tasks"):
+        assert index.get(members[2].id).queue_depth == 2
+        statements = []
+        sync_engine = load_db.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(sync_engine, "before_cursor_execute", listener)
+        try:
+            chosen = await engine.find_best_agent(load_db, squad_id, API_TASK)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", listener)
+        assert chosen.id == members[1].id
+        assert not any("agent_conversations" in s for s in statements)  # Fresh counts reused
+    assert index.queue_depth(members[2].id) == 0
+
+
+
+
 if __name__ == "__main__":
     print("""
     Delegation Engine Tests
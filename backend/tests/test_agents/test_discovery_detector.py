@@ -4,6 +4,7 @@ Tests for Discovery Detection System (Stream B)
 Tests for the DiscoveryDetector that identifies opportunities in agent messages and work.
 """
 import pytest
+from unittest.mock import AsyncMock
 from uuid import uuid4
 from datetime import datetime
 
@@ -300,3 +301,162 @@ async def test_get_discovery_detector_singleton():
     
     assert detector1 is detector2  # Same instance
 
+
+
+def _all_patterns(detector):
+    return [
+        pattern
+        for category in DiscoveryDetector.CATEGORIES
+        for pattern in getattr(detector, f"{category}_patterns")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compiled_chains_match_like_re_search():
+    """Test compiled pattern chains agree with re.search on a random corpus"""
+    import random
+    import re
+    from backend.agents.discovery.discovery_detector import _compile_chain, _search_chain
+
+    detector = DiscoveryDetector()
+    words = (
+        "could apply to for across 12 3 routes endpoint function speedup 40% reduce latency memory cpu "
+        "cache should optimization opportunity optimize performance improvement bug found error detected "
+        "refactor would code duplication technical debt clean up slow bottleneck leak high usage missing "
+        "feature benefit from add new capability needed the a and\n"
+    ).split(" ")
+    rng = random.Random(7)
+    patterns = _all_patterns(detector) + [r"(\d+).*(?:route|endpoint|function|method)"]
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 25))) for _ in range(400)]
+
+    for text in texts:
+        for pattern in patterns:
+            expected = re.search(pattern, text)
+            found = _search_chain(_compile_chain(pattern), text)
+            assert bool(found) == bool(expected), (pattern, text)
+            if expected and expected.groups():
+                assert found.group(1) == expected.group(1)
+
+
+@pytest.mark.asyncio
+async def test_detect_categories_returns_every_hit():
+    """Test one scan reports every matching category"""
+    detector = DiscoveryDetector()
+
+    categories = detector.detect_categories(
+        "Bug found in the parser. Memory leak in the cache.\nMissing feature: export. Could optimize it."
+    )
+
+    assert categories == {"bug", "performance", "feature", "optimization"}
+    assert detector.detect_categories("All good here") == set()
+
+
+@pytest.mark.asyncio
+async def test_long_message_scans_in_linear_time():
+    """Test a long single-line message without a full match does not backtrack"""
+    import time
+
+    detector = DiscoveryDetector()
+    # Many partial matches of "could.*apply.*(?:to|for|across).*\d+.*(?:route|...)" and no route
+    content = "we could apply this to 7 places and " * 6000
+    message = AgentMessageResponse(
+        id=uuid4(),
+        task_execution_id=uuid4(),
+        sender_id=uuid4(),
+        recipient_id=None,
+        content=content,
+        message_type="status_update",
+        message_metadata={},
+        created_at=datetime.utcnow(),
+    )
+
+    start = time.perf_counter()
+    discovery = detector.analyze_agent_message(message)
+    elapsed = time.perf_counter() - start
+
+    assert discovery is None
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_discovery_stream_on_message_bus():
+    """Test the stream stage detects discoveries as messages are sent"""
+    from backend.agents.communication.message_bus import MessageBus
+    from backend.agents.discovery.discovery_stream import DiscoveryStream
+
+    seen = []
+
+    async def on_discovery(message, discovery):
+        seen.append((message.id, discovery.type))
+
+    def failing_stage(message):
+        raise RuntimeError("stage failure must not break sending")
+
+    bus = MessageBus()
+    stream = DiscoveryStream(max_per_execution=2, on_discovery=on_discovery)
+    stream.attach(bus)
+    bus.add_stage(failing_stage)
+    execution_id, sender_id = uuid4(), uuid4()
+    received = []
+    await bus.subscribe(sender_id, received.append)
+
+    for content in ("Bug found in login", "Working on it", "Memory leak in worker", "Error detected in sync"):
+        await bus.send_message(
+            sender_id=uuid4(), recipient_id=sender_id, content=content,
+            message_type="status_update", task_execution_id=execution_id,
+        )
+
+    assert stream.messages_scanned == 4
+    assert len(received) == 4
+    assert [discovery.type for discovery in stream.recent(execution_id)] == ["performance", "bug"]
+    assert [kind for _, kind in seen] == ["bug", "performance", "bug"]
+    assert stream.recent(uuid4()) == []
+
+    stream.detach(bus)
+    await bus.send_message(
+        sender_id=uuid4(), recipient_id=None, content="Bug found again",
+        message_type="status_update", task_execution_id=execution_id,
+    )
+    assert stream.messages_scanned == 4
+
+
+@pytest.mark.asyncio
+async def test_discovery_stream_is_bounded_and_feeds_the_engine(monkeypatch):
+    """Test the stream skips messages without an execution, forgets old executions, and the engine reads it"""
+    from backend.agents.communication.message_bus import MessageBus
+    from backend.agents.discovery import discovery_engine
+    from backend.agents.discovery.discovery_engine import DiscoveryEngine, WorkContext
+    from backend.agents.discovery.discovery_stream import DiscoveryStream
+
+    bus = MessageBus()
+    stream = DiscoveryStream(max_executions=2)
+    stream.attach(bus)
+    executions, agent = [uuid4() for _ in range(3)], uuid4()
+
+    await bus.send_message(sender_id=agent, recipient_id=None, content="Bug found in login", message_type="status_update")
+    for execution_id in executions:
+        for sender_id in (agent, uuid4()):
+            await bus.send_message(
+                sender_id=sender_id, recipient_id=None, content="Memory leak in worker",
+                message_type="status_update", task_execution_id=execution_id,
+            )
+
+    assert stream.messages_scanned == 6  # The message without an execution was skipped
+    assert stream.recent(executions[0]) == []  # Least recently updated execution forgotten
+    assert len(stream.recent(executions[2])) == 2
+    assert len(stream.recent(executions[2], sender_id=agent)) == 1
+
+    monkeypatch.setattr(discovery_engine.settings, "DISCOVERY_STREAM_ENABLED", True)
+    monkeypatch.setattr(discovery_engine, "get_discovery_stream", lambda: stream)
+    engine = DiscoveryEngine()
+    monkeypatch.setattr(engine, "_analyze_task_patterns", AsyncMock(return_value=[]))
+    context = WorkContext(
+        execution_id=executions[2], agent_id=agent, phase=WorkflowPhase.BUILDING,
+        recent_messages=[], recent_tasks=[],
+    )
+
+    discoveries = await engine.analyze_work_context(db=None, context=context)
+
+    assert [d.type for d in discoveries] == ["performance"]
+    assert discoveries[0].context["agent_id"] == str(agent)
+    assert "agent_id" not in stream.recent(executions[2], sender_id=agent)[0].context  # Stored copy untouched
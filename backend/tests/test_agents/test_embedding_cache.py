@@ -0,0 +1,152 @@
+"""
+Tests for EmbeddingCache and EmbeddingBatcher
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.agents.context.embedding_cache import EmbeddingBatcher, EmbeddingCache
+
+
+def make_embedder(calls):
+    """Fake batch embedder recording each API call"""
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+    return embed_batch
+
+
+@pytest.fixture
+def l1_cache():
+    """Embedding cache without Redis"""
+    return EmbeddingCache(model="test-model", use_redis=False)
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_requests():
+    """Test concurrent requests are sent as one API call"""
+    calls = []
+    batcher = EmbeddingBatcher(make_embedder(calls), max_wait_seconds=0.01)
+
+    results = await asyncio.gather(*(batcher.embed(f"text {i}") for i in range(10)))
+
+    assert len(calls) == 1
+    assert len(calls[0]) == 10
+    assert results[3] == [6.0, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_batcher_dedupes_identical_texts():
+    """Test identical texts within a batch are embedded once"""
+    calls = []
+    batcher = EmbeddingBatcher(make_embedder(calls))
+
+    results = await batcher.embed_many(["same", "same", "other", "same"])
+
+    assert calls == [["same", "other"]]
+    assert results[0] == results[1] == results[3]
+    assert batcher.stats["requests"] == 4
+    assert batcher.stats["texts_embedded"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batcher_respects_max_batch_size():
+    """Test batches are flushed at the model's batch limit"""
+    calls = []
+    batcher = EmbeddingBatcher(make_embedder(calls), max_batch_size=4)
+
+    results = await batcher.embed_many([f"t{i}" for i in range(10)])
+
+    assert [len(call) for call in calls] == [4, 4, 2]
+    assert len(results) == 10
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_errors_to_all_waiters():
+    """Test an API failure fails every request in the batch"""
+    batcher = EmbeddingBatcher(AsyncMock(side_effect=RuntimeError("rate limited")))
+
+    results = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batcher_rejects_mismatched_response():
+    """Test a short API response is reported instead of misaligning vectors"""
+    batcher = EmbeddingBatcher(AsyncMock(return_value=[[0.1]]))
+
+    with pytest.raises(ValueError):
+        await batcher.embed_many(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_cache_l1_roundtrip(l1_cache):
+    """Test vectors stored in the cache are returned on lookup"""
+    await l1_cache.set_many({"hello": [0.25, 0.5]})
+
+    found = await l1_cache.get_many(["hello", "missing"])
+
+    assert found == {"hello": [0.25, 0.5]}
+    assert l1_cache.stats["l1_hits"] == 1
+    assert l1_cache.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_l1_is_bounded():
+    """Test the local cache evicts least recently used vectors"""
+    cache = EmbeddingCache(model="test-model", use_redis=False, l1_max_entries=2)
+
+    await cache.set_many({"a": [1.0], "b": [2.0]})
+    await cache.get_many(["a"])  # touch "a" so "b" is evicted next
+    await cache.set_many({"c": [3.0]})
+
+    found = await cache.get_many(["a", "b", "c"])
+    assert set(found) == {"a", "c"}
+
+
+@pytest.mark.asyncio
+async def test_cache_keys_include_model():
+    """Test vectors from different models never collide"""
+    small = EmbeddingCache(model="small", use_redis=False)
+    large = EmbeddingCache(model="large", use_redis=False)
+
+    assert small._build_key("text") != large._build_key("text")
+
+
+@pytest.mark.asyncio
+async def test_cache_redis_hit_promotes_to_l1():
+    """Test Redis hits are unpacked and promoted into L1"""
+    cache = EmbeddingCache(model="test-model", use_redis=False)
+    cache.redis = MagicMock()
+    cache.redis.mget = AsyncMock(return_value=[EmbeddingCache._pack([0.25, 0.5]), None])
+
+    found = await cache.get_many(["cached", "missing"])
+
+    assert found == {"cached": [0.25, 0.5]}
+    assert cache.stats["redis_hits"] == 1
+    assert cache.stats["misses"] == 1
+
+    # Second lookup is served locally
+    await cache.get_many(["cached"])
+    assert cache.redis.mget.call_count == 1
+    assert cache.stats["l1_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_degrades_when_redis_unavailable():
+    """Test Redis errors fall back to L1 and back off"""
+    cache = EmbeddingCache(model="test-model", use_redis=False)
+    cache.redis = MagicMock()
+    cache.redis.mget = AsyncMock(side_effect=ConnectionError("refused"))
+
+    assert await cache.get_many(["a"]) == {}
+    assert await cache.get_many(["b"]) == {}
+
+    # Redis is not retried during the cooldown
+    assert cache.redis.mget.call_count == 1
+
+    await cache.set_many({"a": [1.0]})
+    assert await cache.get_many(["a"]) == {"a": [1.0]}
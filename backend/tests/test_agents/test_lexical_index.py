@@ -0,0 +1,107 @@
+"""
+Tests for the BM25 lexical index, rank fusion and re-ranking
+"""
+import os
+
+import pytest
+
+from backend.agents.context.lexical_index import (
+    BM25Index,
+    ExactMatchReranker,
+    LexicalIndexStore,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+def test_tokenize_splits_identifiers():
+    """Test identifiers are indexed whole and by their parts"""
+    terms = tokenize("call get_user_by_id in UserCacheService for PROJ-123")
+
+    assert "get_user_by_id" in terms
+    assert {"get", "user", "by", "id"} <= set(terms)
+    assert "usercacheservice" in terms
+    assert {"cache", "service"} <= set(terms)
+    assert "proj-123" in terms
+
+
+def test_bm25_ranks_rare_terms_higher():
+    """Test BM25 favours documents matching rarer query terms"""
+    index = BM25Index()
+    index.add("a", "login flow for users")
+    index.add("b", "login flow calls validate_token")
+    index.add("c", "billing flow for users")
+
+    ranked = index.search("validate_token login", top_k=3)
+
+    assert ranked[0][0] == "b"
+    assert "c" not in [doc_id for doc_id, _ in ranked]
+
+
+def test_bm25_replace_remove_and_filter():
+    """Test re-adding replaces postings and filters apply to metadata"""
+    index = BM25Index()
+    index.add("a", "old text", {"source": "jira"})
+    index.add("a", "new text", {"source": "jira"})
+    index.add("b", "new text", {"source": "github"})
+
+    assert index.search("old", top_k=5) == []
+    assert [d for d, _ in index.search("new", top_k=5, filter={"source": "github"})] == ["b"]
+
+    index.remove("a")
+    index.remove("missing")
+    assert len(index) == 1
+    assert "a" not in index.postings["new"]
+
+
+def test_lexical_store_persists(tmp_path):
+    """Test namespaces are flushed to disk and reloaded"""
+    store = LexicalIndexStore(path=str(tmp_path))
+    store.add_documents("squad-1:code", [{"id": "x", "text": "def parse_config()", "metadata": {"k": 1}}])
+    store.flush()
+
+    reloaded = LexicalIndexStore(path=str(tmp_path))
+    assert reloaded.get("squad-1:code").search("parse_config", top_k=1)[0][0] == "x"
+
+    reloaded.delete_namespace("squad-1:code")
+    assert not os.listdir(tmp_path)
+
+
+def test_lexical_store_bounds_namespaces(tmp_path):
+    """Test least recently used namespaces are evicted, flushed first when persisted"""
+    store = LexicalIndexStore(path=str(tmp_path), max_namespaces=2)
+    for name in ("a", "b", "c"):
+        store.add_documents(name, [{"id": name, "text": f"handler_{name}"}])
+
+    assert list(store._indexes) == ["b", "c"]
+    assert store.has("a")
+    assert store.get("a").search("handler_a", top_k=1)[0][0] == "a"
+
+    memory_only = LexicalIndexStore(max_namespaces=1)
+    memory_only.add_documents("a", [{"id": "x", "text": "x"}])
+    memory_only.add_documents("b", [{"id": "y", "text": "y"}])
+    assert not memory_only.has("a")
+
+
+def test_reciprocal_rank_fusion():
+    """Test documents ranked well by both retrievers come first"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]], k=60)
+
+    assert [doc_id for doc_id, _ in fused][:2] == ["b", "a"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_exact_match_reranker():
+    """Test exact identifier matches are boosted; plain queries untouched"""
+    reranker = ExactMatchReranker()
+    documents = [
+        {"id": "a", "text": "handles tokens", "score": 0.5},
+        {"id": "b", "text": "raises TokenExpiredError", "score": 0.1},
+    ]
+
+    assert [d["id"] for d in reranker.rerank("why TokenExpiredError", documents)] == ["b", "a"]
+    assert reranker.rerank("handles tokens", documents) is documents
+
+    tickets = [{"id": "10", "text": "PROJ-10 crash", "score": 0.2},
+               {"id": "1", "text": "PROJ-1 crash", "score": 0.1}]
+    assert reranker.rerank("PROJ-1", tickets)[0]["id"] == "1"
@@ -4,11 +4,16 @@ Tests for RAGService - Vector Search with Pinecone
 Note: These tests mock Pinecone and OpenAI to test business logic.
 Integration tests with real Pinecone should be done separately.
 """
+import copy
 import pytest
 from uuid import uuid4
 from unittest.mock import AsyncMock, MagicMock, patch
 import os
+import statistics
 import sys
+import time
+
+from backend.agents.context.lexical_index import LexicalIndexStore
 
 # Mock pinecone and database modules at module level BEFORE any backend imports
 # This is necessary because:
@@ -154,16 +159,51 @@ async def test_generate_embedding(rag_service, mock_openai_client):
 
     embedding = await rag_service.generate_embedding(text)
 
-    # Verify OpenAI was called correctly
+    # Verify OpenAI was called correctly (single text sent as a batch of one)
     mock_openai_client.embeddings.create.assert_called_once_with(
         model="text-embedding-3-small",
-        input=text,
+        input=[text],
     )
 
     assert len(embedding) == 1536
     assert all(isinstance(x, float) for x in embedding)
 
 
+@pytest.mark.asyncio
+async def test_generate_embedding_uses_cache(rag_service, mock_openai_client):
+    """Test repeated embeddings of the same text are served from cache"""
+    await rag_service.generate_embedding("Hello world")
+    await rag_service.generate_embedding("Hello world")
+
+    mock_openai_client.embeddings.create.assert_called_once()
+    stats = rag_service.get_embedding_stats()
+    assert stats["cache"]["l1_hits"] == 1
+    assert stats["batching"]["api_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_embedding_coalesces_concurrent_requests(rag_service, mock_openai_client):
+    """Test concurrent single-text requests share one API call"""
+    import asyncio
+
+    async def create(model, input):
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[float(len(text))] * 1536) for text in input]
+        return response
+
+    mock_openai_client.embeddings.create = AsyncMock(side_effect=create)
+
+    results = await asyncio.gather(
+        rag_service.generate_embedding("a"),
+        rag_service.generate_embedding("bb"),
+        rag_service.generate_embedding("a"),
+    )
+
+    mock_openai_client.embeddings.create.assert_called_once()
+    assert sorted(mock_openai_client.embeddings.create.call_args[1]["input"]) == ["a", "bb"]
+    assert [r[0] for r in results] == [1.0, 2.0, 1.0]
+
+
 @pytest.mark.asyncio
 async def test_generate_embeddings_batch(rag_service, mock_openai_client):
     """Test generating multiple embeddings in batch"""
@@ -475,10 +515,27 @@ async def test_index_code_file(rag_service, mock_openai_client):
     assert call_args["namespace"] == f"{squad_id}:code"
     vectors = call_args["vectors"]
     assert len(vectors) == 1
-    assert vectors[0]["id"] == f"code_{repository}_{file_path}"
+    assert vectors[0]["id"].startswith(f"code_{repository}_{file_path}#")
     assert vectors[0]["metadata"]["repository"] == repository
     assert vectors[0]["metadata"]["branch"] == "develop"
     assert vectors[0]["metadata"]["commit_hash"] == "abc123"
+    assert vectors[0]["metadata"]["symbol"] == "authenticate"
+    assert vectors[0]["metadata"]["text"] == content
+
+
+@pytest.mark.asyncio
+async def test_index_code_file_skips_unchanged_content(rag_service, mock_openai_client):
+    """Test re-indexing an unchanged file makes no embedding or upsert calls"""
+    squad_id = uuid4()
+    content = "def authenticate(user): pass"
+
+    await rag_service.index_code_file(squad_id, "src/auth.py", content, "my-repo")
+    stats = await rag_service.index_code_file(squad_id, "src/auth.py", content, "my-repo")
+
+    assert stats["files_skipped"] == 1
+    assert stats["chunks_embedded"] == 0
+    mock_openai_client.embeddings.create.assert_called_once()
+    rag_service.index.upsert.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -560,3 +617,207 @@ async def test_index_document(rag_service, mock_openai_client):
     assert vectors[0]["metadata"]["source"] == source
     assert vectors[0]["metadata"]["url"] == url
     assert vectors[0]["metadata"]["author"] == "architect"
+
+
+@pytest.mark.asyncio
+async def test_rag_service_with_local_vector_store(tmp_path, mock_openai_client):
+    """Test RAGService runs end-to-end on the local vector store without Pinecone"""
+    async def create(model, input):
+        response = MagicMock()
+        response.data = [
+            MagicMock(embedding=[1.0, 0.0, 0.0] if "auth" in text else [0.0, 1.0, 0.0])
+            for text in input
+        ]
+        return response
+
+    mock_openai_client.embeddings.create = AsyncMock(side_effect=create)
+
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key', 'RAG_VECTOR_STORE': 'local',
+                                 'RAG_VECTOR_STORE_PATH': str(tmp_path)}):
+        os.environ.pop('PINECONE_API_KEY', None)
+        with patch('openai.AsyncOpenAI', return_value=mock_openai_client):
+            from backend.agents.context.rag_service import RAGService
+            service = RAGService(embedding_dimension=3)
+
+    squad_id = uuid4()
+    await service.upsert(squad_id, "docs", [
+        {"id": "auth", "text": "auth guide", "metadata": {"title": "Auth"}},
+        {"id": "billing", "text": "billing guide", "metadata": {"title": "Billing"}},
+    ])
+
+    results = await service.query(squad_id=squad_id, namespace="docs", query="auth flow", top_k=1)
+
+    assert service.index is None
+    assert results[0]["id"] == "auth"
+    assert results[0]["text"] == "auth guide"
+    assert results[0]["metadata"] == {"title": "Auth"}
+    assert (await service.get_namespace_stats(squad_id, "docs"))["vector_count"] == 2
+    await service.close()
+
+
+RETRIEVAL_TOPICS = ["auth", "billing", "search", "upload", "email", "reports", "cache", "queue"]
+
+
+def _topic_embedding(text):
+    """Embedding that only captures topic words, not identifiers"""
+    return [1.0 if topic in text else 0.0 for topic in RETRIEVAL_TOPICS] + [0.01]
+
+
+@pytest.fixture
+def local_rag_service(tmp_path):
+    """RAGService on the local vector store with topic-only embeddings"""
+    async def create(model, input):
+        response = MagicMock()
+        response.data = [MagicMock(embedding=_topic_embedding(text)) for text in input]
+        return response
+
+    client = AsyncMock()
+    client.embeddings.create = AsyncMock(side_effect=create)
+
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key', 'RAG_VECTOR_STORE': 'local',
+                                 'RAG_VECTOR_STORE_PATH': str(tmp_path)}):
+        with patch('openai.AsyncOpenAI', return_value=client):
+            from backend.agents.context.rag_service import RAGService
+            return RAGService(embedding_dimension=len(RETRIEVAL_TOPICS) + 1)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_finds_identifier_matches(local_rag_service):
+    """Test hybrid mode surfaces exact identifier hits the vector search misses"""
+    service = local_rag_service
+    squad_id = uuid4()
+    await service.upsert(squad_id, "code", [
+        {"id": f"doc{i}", "text": f"auth handler step_{i} validates session", "metadata": {"i": i}}
+        for i in range(20)
+    ])
+
+    vector = await service.query(squad_id, "code", "auth step_17", top_k=3, mode="vector")
+    hybrid = await service.query(squad_id, "code", "auth step_17", top_k=3, mode="hybrid")
+    lexical = await service.query(squad_id, "code", "step_17", top_k=1, mode="lexical")
+
+    reranked = await service.query(squad_id, "code", "auth step_17", top_k=3,
+                                   mode="hybrid", rerank=True)
+
+    assert "doc17" not in [d["id"] for d in vector]
+    assert len(hybrid) == 3
+    assert reranked[0]["id"] == "doc17"
+    assert reranked[0]["metadata"] == {"i": 17}
+    assert lexical[0]["text"] == "auth handler step_17 validates session"
+
+    await service.delete(squad_id, "code", ["doc17"])
+    hybrid = await service.query(squad_id, "code", "auth step_17", top_k=3, mode="hybrid")
+    assert "doc17" not in [d["id"] for d in hybrid]
+
+    with pytest.raises(ValueError):
+        await service.query(squad_id, "code", "auth", mode="fuzzy")
+
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_lexical_index_rebuilt_from_vector_store(local_rag_service):
+    """Test a process without a lexical index (restart, other worker) rebuilds it instead of returning nothing"""
+    writer = local_rag_service
+    squad_id = uuid4()
+    await writer.upsert(squad_id, "tickets", [
+        {"id": f"t{i}", "text": f"PROJ-{i} login broken", "metadata": {"i": i}} for i in range(5)
+    ])
+
+    # Second service on the same vector store, as in another process
+    reader = copy.copy(writer)
+    reader.lexical_index = LexicalIndexStore()
+    reader.lexical_check_seconds = 0.0
+    reader._lexical_checked, reader._lexical_rebuilds = {}, {}
+
+    results = await reader.query(squad_id, "tickets", "PROJ-3", top_k=1, mode="lexical")
+    assert [(d["id"], d["text"], d["metadata"]) for d in results] == [("t3", "PROJ-3 login broken", {"i": 3})]
+
+    # Written by another process after the rebuild: picked up at the next count check
+    await writer.upsert(squad_id, "tickets", [{"id": "t9", "text": "PROJ-9 billing broken"}])
+    results = await reader.query(squad_id, "tickets", "PROJ-9", top_k=1, mode="lexical")
+    assert results[0]["id"] == "t9"
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_lexical_mode_refuses_unrebuildable_namespace(local_rag_service):
+    """Test lexical/hybrid queries fail loudly when the index cannot be rebuilt"""
+    service = local_rag_service
+
+    async def cannot_enumerate(namespace, batch_size=100):
+        raise NotImplementedError("store cannot enumerate documents")
+        yield []
+
+    service.vector_store.iter_documents = cannot_enumerate
+
+    with pytest.raises(RuntimeError, match="mode='vector'"):
+        await service.query(uuid4(), "code", "parse_config", mode="hybrid")
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_query_multiple_namespaces_lexical_skips_embedding(local_rag_service):
+    """Test lexical mode across namespaces makes no embedding call"""
+    service = local_rag_service
+    squad_id = uuid4()
+    await service.upsert(squad_id, "tickets", [{"id": "t1", "text": "PROJ-42 login broken"}])
+    await service.upsert(squad_id, "docs", [{"id": "d1", "text": "login guide"}])
+    calls = service.openai_client.embeddings.create.await_count
+
+    results = await service.query_multiple_namespaces(
+        squad_id, ["tickets", "docs"], "PROJ-42", mode="lexical"
+    )
+
+    assert [d["id"] for d in results["tickets"]] == ["t1"]
+    assert results["docs"] == []
+    assert service.openai_client.embeddings.create.await_count == calls
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_retrieval_benchmark_recall_and_latency(local_rag_service):
+    """
+    Benchmark recall@k and latency for vector vs hybrid retrieval.
+
+    Queries name a ticket key plus its topic; the embedding only captures the
+    topic, so vector search alone cannot single out the right ticket.
+    """
+    service = local_rag_service
+    squad_id = uuid4()
+    num_docs, k = 2000, 5
+
+    await service.upsert(squad_id, "tickets", [
+        {
+            "id": f"ticket{i}",
+            "text": f"PROJ-{i}: {RETRIEVAL_TOPICS[i % len(RETRIEVAL_TOPICS)]} fails in handler_{i} after deploy",
+        }
+        for i in range(num_docs)
+    ])
+
+    queries = [(f"{RETRIEVAL_TOPICS[i % len(RETRIEVAL_TOPICS)]} bug PROJ-{i}", f"ticket{i}") for i in range(0, num_docs, 20)]
+    report = {}
+    # Warm the embedding cache so latency measures retrieval only
+    await service.generate_embeddings([query for query, _ in queries])
+
+    for name, mode, rerank in (("vector", "vector", False), ("hybrid", "hybrid", False),
+                               ("hybrid+rerank", "hybrid", True)):
+        hits, latencies = 0, []
+        for query, expected in queries:
+            start = time.perf_counter()
+            results = await service.query(squad_id, "tickets", query, top_k=k,
+                                          mode=mode, rerank=rerank)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += expected in [d["id"] for d in results]
+
+        latencies.sort()
+        report[name] = {
+            f"recall@{k}": hits / len(queries),
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        }
+
+    print(f"\nRetrieval benchmark ({num_docs} docs, {len(queries)} queries): {report}")
+
+    assert report["hybrid"][f"recall@{k}"] >= report["vector"][f"recall@{k}"]
+    assert report["hybrid+rerank"][f"recall@{k}"] >= 0.95
+    await service.close()
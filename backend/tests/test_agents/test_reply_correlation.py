@@ -0,0 +1,185 @@
+"""
+Reply Correlation Tests
+
+Tests indexed correlation lookups for standup/question/review replies and
+the event-driven wait for expected responders.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+from backend.agents.collaboration.correlation import wait_for_replies
+from backend.agents.collaboration.standup import StandupPattern
+from backend.agents.communication.message_bus import MessageBus
+from backend.models.message import AgentMessage, correlation_id_from_metadata
+from backend.models.squad import Squad, SquadMember
+from backend.services.task_execution_service import TaskExecutionService
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session_maker):
+    """Fresh in-memory database with message and member tables"""
+    session_maker = await sqlite_session_maker(
+        Squad.__table__, SquadMember.__table__, AgentMessage.__table__
+    )
+    async with session_maker() as session:
+        yield session
+
+
+async def add_members(db, count, squad_id):
+    members = [
+        SquadMember(id=uuid4(), squad_id=squad_id, role=f"role_{i}", system_prompt="-")
+        for i in range(count)
+    ]
+    db.add_all(members)
+    await db.commit()
+    return members
+
+
+def test_correlation_id_from_metadata():
+    """Test the first known correlation key is used"""
+    assert correlation_id_from_metadata({"standup_id": "s1", "other": 1}) == "s1"
+    assert correlation_id_from_metadata({"review_id": "r1"}) == "r1"
+    assert correlation_id_from_metadata({"urgency": "high"}) is None
+    assert correlation_id_from_metadata(None) is None
+
+
+@pytest.mark.asyncio
+async def test_correlation_id_is_set_on_insert(db):
+    """Test the column is derived from metadata for ORM and bulk inserts"""
+    (member,) = await add_members(db, 1, uuid4())
+    db.add(AgentMessage(
+        sender_id=member.id, content="hi", message_type="answer",
+        message_metadata={"question_id": "q1"},
+    ))
+    await db.execute(insert(AgentMessage), [
+        {"id": uuid4(), "sender_id": member.id, "content": "x", "message_type": "answer",
+         "message_metadata": {"question_id": "q2"}},
+        {"id": uuid4(), "sender_id": member.id, "content": "y", "message_type": "answer",
+         "message_metadata": {}},
+    ])
+    await db.commit()
+
+    assert len(await TaskExecutionService.get_correlated_messages(db, "q1", "answer")) == 1
+    assert len(await TaskExecutionService.get_correlated_messages(db, "q2", "answer")) == 1
+
+
+@pytest.mark.asyncio
+async def test_collect_updates_sees_replies_beyond_first_100_messages(db):
+    """Test collection is one query over the whole history, joined to the sender"""
+    execution_id = uuid4()
+    members = await add_members(db, 3, uuid4())
+    # 300 unrelated messages first: the old "first 100 by time" scan missed everything after
+    db.add_all([
+        AgentMessage(
+            task_execution_id=execution_id, sender_id=members[0].id, content="chatter",
+            message_type="status_update", message_metadata={"standup_id": "old"},
+        )
+        for _ in range(300)
+    ])
+    await db.commit()
+    for member in members[1:]:
+        db.add(AgentMessage(
+            task_execution_id=execution_id, sender_id=member.id, content=f"update from {member.role}",
+            message_type="status_update", message_metadata={"standup_id": "standup_1"},
+        ))
+    await db.commit()
+
+    updates = await StandupPattern(MessageBus()).collect_updates(db, execution_id, "standup_1")
+
+    assert sorted(u["agent_role"] for u in updates) == ["role_1", "role_2"]
+    assert all(u["metadata"]["standup_id"] == "standup_1" for u in updates)
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_as_soon_as_all_expected_replied(db):
+    """Test the wait is event-driven rather than a fixed sleep"""
+    bus = MessageBus()
+    pm_id = uuid4()
+    responders = [uuid4(), uuid4()]
+
+    async def reply_later():
+        await asyncio.sleep(0.05)
+        for responder in responders:
+            await bus.send_message(
+                sender_id=responder, recipient_id=pm_id, content="done",
+                message_type="status_update", metadata={"standup_id": "s1"},
+            )
+
+    start = time.perf_counter()
+    reply_task = asyncio.create_task(reply_later())
+    missing = await wait_for_replies(db, bus, pm_id, "s1", "status_update", responders, timeout_seconds=5)
+    await reply_task
+
+    assert missing == set()
+    assert time.perf_counter() - start < 1
+    assert bus._subscribers[pm_id] == []  # Unsubscribed
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_with_missing_responders(db):
+    """Test unrelated replies do not count and the missing responders are reported"""
+    bus = MessageBus()
+    pm_id, responder, silent = uuid4(), uuid4(), uuid4()
+
+    waiter = asyncio.create_task(
+        wait_for_replies(db, bus, pm_id, "s1", "status_update", [responder, silent], timeout_seconds=0.2)
+    )
+    await asyncio.sleep(0.01)
+    await bus.send_message(
+        sender_id=silent, recipient_id=pm_id, content="other standup",
+        message_type="status_update", metadata={"standup_id": "s0"},
+    )
+    await bus.send_message(
+        sender_id=responder, recipient_id=pm_id, content="done",
+        message_type="status_update", metadata={"standup_id": "s1"},
+    )
+
+    assert await waiter == {silent}
+
+
+@pytest.mark.asyncio
+async def test_wait_counts_replies_already_stored(db):
+    """Test replies stored before the wait started are not waited for"""
+    (member,) = await add_members(db, 1, uuid4())
+    db.add(AgentMessage(
+        sender_id=member.id, content="early", message_type="answer",
+        message_metadata={"question_id": "q1"},
+    ))
+    await db.commit()
+
+    missing = await wait_for_replies(
+        db, SimpleNamespace(
+            subscribe=MessageBus().subscribe, unsubscribe=MessageBus().unsubscribe
+        ), uuid4(), "q1", "answer", [member.id], timeout_seconds=5,
+    )
+
+    assert missing == set()
+
+
+@pytest.mark.asyncio
+async def test_expected_responders_are_released(db):
+    """Test standups that are never waited on, or whose wait is cancelled, leave no entry"""
+    squad_id = uuid4()
+    pm, *_ = await add_members(db, 3, squad_id)
+    standup = StandupPattern(MessageBus())
+
+    result = await standup.conduct_standup(db, pm.id, squad_id)
+    assert result["status"] == "waiting_for_updates"
+    assert standup._expected_responders == {}
+
+    standup_id = await standup.request_updates(db, pm.id, squad_id)
+    collecting = asyncio.create_task(
+        standup.collect_updates(db, uuid4(), standup_id, timeout_seconds=5)
+    )
+    await asyncio.sleep(0.05)
+    collecting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await collecting
+
+    assert standup._expected_responders == {}
@@ -2,10 +2,18 @@
 Tests for Routing Engine
 """
 import pytest
+import pytest_asyncio
+from datetime import datetime
 from uuid import uuid4
 
-from backend.agents.interaction.routing_engine import RoutingEngine
-from backend.models import RoutingRule, DefaultRoutingTemplate
+from sqlalchemy import event
+
+from backend.agents.interaction.routing_engine import (
+    RoutingEngine,
+    clear_routing_tables,
+    invalidate_routing_table,
+)
+from backend.models import RoutingRule, DefaultRoutingTemplate, Squad, SquadMember
 
 
 @pytest.mark.asyncio
@@ -487,3 +495,139 @@ async def test_apply_template_overwrite(test_db, test_squad):
 
     assert len(rules) == 1
     assert rules[0].asker_role == "frontend_developer"
+
+
+# Compiled routing table (in-memory SQLite, no shared fixtures)
+
+@pytest_asyncio.fixture
+async def routing_db(sqlite_session_maker):
+    """Fresh in-memory database with squads, members and routing rules"""
+    clear_routing_tables()
+    session_maker = await sqlite_session_maker(
+        Squad.__table__, SquadMember.__table__, RoutingRule.__table__
+    )
+    async with session_maker() as session:
+        yield session
+    clear_routing_tables()
+
+
+async def add_squad(db, *roles):
+    squad_id = uuid4()
+    members = {
+        role: SquadMember(id=uuid4(), squad_id=squad_id, role=role, system_prompt="-")
+        for role in roles
+    }
+    db.add_all(members.values())
+    await db.commit()
+    return squad_id, members
+
+
+def rule(squad_id, level, responder_role, question_type="default", **kwargs):
+    return RoutingRule(
+        id=uuid4(), squad_id=squad_id, asker_role="backend_developer",
+        question_type=question_type, escalation_level=level,
+        responder_role=responder_role, **{"is_active": True, **kwargs},
+    )
+
+
+@pytest.mark.asyncio
+async def test_routing_table_serves_lookups_without_queries(routing_db):
+    """Test steady-state responder and escalation lookups make no database round trip"""
+    squad_id, members = await add_squad(routing_db, "tech_lead", "solution_architect", "project_manager")
+    routing_db.add_all([
+        rule(squad_id, 0, "tech_lead"),
+        rule(squad_id, 1, "solution_architect"),
+        rule(squad_id, 2, "project_manager"),
+    ])
+    await routing_db.commit()
+
+    engine = RoutingEngine(routing_db)
+    await engine.get_routing_table(squad_id)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sync_engine = routing_db.get_bind()
+    event.listen(sync_engine, "before_cursor_execute", listener)
+    try:
+        for _ in range(100):
+            responder = await engine.get_responder(squad_id, "backend_developer", "implementation", 1)
+            chain = await engine.get_escalation_chain(squad_id, "backend_developer")
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", listener)
+
+    assert statements == []
+    assert responder.id == members["solution_architect"].id
+    assert [level["responder_role"] for level in chain] == [
+        "tech_lead", "solution_architect", "project_manager"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_routing_table_keeps_rule_precedence(routing_db):
+    """Test squad rules beat org rules, then higher priority, then newer rules"""
+    org_id = uuid4()
+    squad_id, members = await add_squad(routing_db, "tech_lead", "solution_architect", "project_manager")
+    routing_db.add_all([
+        RoutingRule(
+            id=uuid4(), organization_id=org_id, asker_role="backend_developer",
+            question_type="default", escalation_level=0, responder_role="project_manager",
+            is_active=True, priority=100,
+        ),
+        rule(squad_id, 0, "tech_lead", priority=5, created_at=datetime(2026, 1, 1)),
+        rule(squad_id, 0, "solution_architect", priority=5, created_at=datetime(2026, 2, 1)),
+        rule(squad_id, 0, "project_manager", priority=1),
+        rule(squad_id, 1, "tech_lead", question_type="review", is_active=False),
+    ])
+    await routing_db.commit()
+
+    engine = RoutingEngine(routing_db)
+    responder = await engine.get_responder(squad_id, "backend_developer", organization_id=org_id)
+    assert responder.id == members["solution_architect"].id
+    assert await engine.get_responder(squad_id, "backend_developer", "review", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_routing_table_invalidation(routing_db):
+    """Test rule and member changes are picked up after invalidation, and only then"""
+    squad_id, members = await add_squad(routing_db, "tech_lead", "solution_architect")
+    routing_db.add(rule(squad_id, 0, "tech_lead"))
+    await routing_db.commit()
+
+    engine = RoutingEngine(routing_db)
+    assert (await engine.get_responder(squad_id, "backend_developer")).role == "tech_lead"
+
+    routing_db.add(rule(squad_id, 0, "solution_architect", priority=10))
+    await routing_db.commit()
+    assert (await engine.get_responder(squad_id, "backend_developer")).role == "tech_lead"
+
+    invalidate_routing_table(squad_id=squad_id)
+    assert (await engine.get_responder(squad_id, "backend_developer")).role == "solution_architect"
+
+    members["solution_architect"].is_active = False
+    await routing_db.commit()
+    invalidate_routing_table(squad_id=squad_id)
+    assert await engine.get_responder(squad_id, "backend_developer") is None
+
+
+@pytest.mark.asyncio
+async def test_routing_table_compiled_during_invalidation_is_not_kept(routing_db, monkeypatch):
+    """Test a table compiled from rules read before an invalidation is used once, not cached"""
+    squad_id, _ = await add_squad(routing_db, "tech_lead")
+    routing_db.add(rule(squad_id, 0, "tech_lead"))
+    await routing_db.commit()
+
+    engine = RoutingEngine(routing_db)
+    load_rules = engine._load_active_rules
+
+    async def load_then_invalidate(*args):
+        rules = await load_rules(*args)
+        invalidate_routing_table(squad_id=squad_id)  # A concurrent rule change
+        return rules
+
+    monkeypatch.setattr(engine, "_load_active_rules", load_then_invalidate)
+    first = await engine.get_routing_table(squad_id)
+    monkeypatch.setattr(engine, "_load_active_rules", load_rules)
+    second = await engine.get_routing_table(squad_id)
+
+    assert second is not first
+    assert await engine.get_routing_table(squad_id) is second
@@ -0,0 +1,101 @@
+"""
+Task Dependency Graph Tests
+
+Tests the shared graph helpers (ordering, critical path, cycle detection)
+and cycle rejection when dependencies are created.
+"""
+import random
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.agents.orchestration.task_graph import (
+    critical_path_lengths,
+    prioritized_topological_order,
+    strongly_connected_components,
+)
+from backend.models.project import TaskExecution
+from backend.models.workflow import DynamicTask, WorkflowPhase, task_dependencies
+
+
+def test_order_respects_edges_and_key():
+    """Test every node comes after its blockers, ready nodes by smallest key"""
+    graph = {"d": [], "a": ["c"], "b": ["c"], "c": ["d"], "e": []}
+    order, cycles = prioritized_topological_order(graph, key=lambda n: n)
+
+    assert order == ["a", "b", "c", "d", "e"]
+    assert cycles == []
+
+
+def test_order_on_large_random_dag():
+    """Test a 10k-node DAG is fully ordered with every edge respected"""
+    rng = random.Random(3)
+    nodes = list(range(10_000))
+    graph = {n: sorted({rng.randrange(n + 1, 10_000) for _ in range(3)} if n < 9_999 else set()) for n in nodes}
+    rng.shuffle(nodes)
+    graph = {n: graph[n] for n in nodes}
+
+    order, cycles = prioritized_topological_order(graph, key=lambda n: -n)
+    position = {n: i for i, n in enumerate(order)}
+
+    assert cycles == [] and len(order) == 10_000
+    assert all(position[a] < position[b] for a, blocked in graph.items() for b in blocked)
+
+
+def test_cycles_are_reported_as_components():
+    """Test nodes on and behind cycles are left out and the cycles named"""
+    graph = {"a": ["b"], "b": ["c"], "c": ["a", "d"], "d": [], "e": ["e"], "f": []}
+    order, cycles = prioritized_topological_order(graph, key=lambda n: n)
+
+    assert order == ["f"]
+    assert cycles == [["a", "b", "c"], ["e"]]
+    assert strongly_connected_components({"x": ["y"], "y": []}) == []
+
+
+def test_critical_path_lengths():
+    """Test each node's longest weighted chain to the end"""
+    graph = {"a": ["b", "c"], "b": ["d"], "c": [], "d": []}
+    weights = {"a": 1, "b": 2, "c": 10, "d": 3}
+
+    assert critical_path_lengths(graph) == {"a": 3, "b": 2, "c": 1, "d": 1}
+    assert critical_path_lengths(graph, weights.get) == {"a": 11, "b": 5, "c": 10, "d": 3}
+
+
+@pytest_asyncio.fixture
+async def task_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(
+        TaskExecution.__table__, DynamicTask.__table__, task_dependencies
+    )
+    async with session_maker() as db:
+        execution = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=uuid4(), status="in_progress")
+        db.add(execution)
+        await db.commit()
+        yield db, execution
+
+
+@pytest.mark.asyncio
+async def test_create_dependencies_rejects_cycles(task_db):
+    """Test a dependency that would close a cycle is rejected, others are created"""
+    db, execution = task_db
+    engine = PhaseBasedWorkflowEngine()
+    ids = {}
+    for name in "abcd":
+        task = await engine.spawn_task(
+            db=db, agent_id=uuid4(), execution_id=execution.id,
+            phase=WorkflowPhase.BUILDING, title=name, description=name,
+        )
+        ids[name] = task.id
+
+    await engine._create_task_dependencies(db, ids["a"], [ids["b"]])
+    await engine._create_task_dependencies(db, ids["b"], [ids["c"]])
+
+    with pytest.raises(ValueError, match="Dependency cycle") as excinfo:
+        await engine._create_task_dependencies(db, ids["c"], [ids["d"], ids["a"]])
+    assert str(ids["a"]) in str(excinfo.value)
+
+    await engine._create_task_dependencies(db, ids["a"], [ids["c"]])  # Shortcut, not a cycle
+    await engine._create_task_dependencies(db, ids["c"], [ids["d"]])
+    rows = (await db.execute(task_dependencies.select())).all()
+    assert len(rows) == 4
@@ -4,8 +4,24 @@ Timeout Monitor Tests
 Tests for timeout monitoring system.
 """
 import pytest
+import pytest_asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from uuid import uuid4
-from backend.agents.interaction.timeout_monitor import TimeoutMonitor
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from backend.agents.interaction.routing_engine import clear_routing_tables
+from backend.agents.interaction.timeout_monitor import TimeoutMonitor, check_conversation_timeouts
+from backend.models import (
+    AgentMessage,
+    Conversation,
+    ConversationEvent,
+    RoutingRule,
+    Squad,
+    SquadMember,
+)
 
 
 class TestTimeoutMonitor:
@@ -76,6 +92,138 @@ class TestTimeoutMonitorIntegration:
         assert True
 
 
+@pytest_asyncio.fixture
+async def timeout_db(sqlite_session_maker):
+    """Fresh database with a squad, its routing rules and conversation tables"""
+    clear_routing_tables()
+    session_maker = await sqlite_session_maker(
+        Squad.__table__, SquadMember.__table__, RoutingRule.__table__, AgentMessage.__table__,
+        Conversation.__table__, ConversationEvent.__table__, file=True,
+    )
+    squad_id = uuid4()
+    members = {
+        role: SquadMember(id=uuid4(), squad_id=squad_id, role=role, system_prompt="-")
+        for role in ("backend_developer", "tech_lead", "solution_architect")
+    }
+    async with session_maker() as db:
+        db.add_all(members.values())
+        db.add_all([
+            RoutingRule(
+                id=uuid4(), squad_id=squad_id, asker_role="backend_developer", question_type="default",
+                escalation_level=level, responder_role=role, is_active=True,
+            )
+            for level, role in enumerate(("tech_lead", "solution_architect"))
+        ])
+        await db.commit()
+    yield session_maker, members
+    clear_routing_tables()
+
+
+def conversation(members, minutes_overdue=1, timeout_count=0, asker_id=None):
+    return Conversation(
+        id=uuid4(),
+        initial_message_id=uuid4(),
+        asker_id=asker_id or members["backend_developer"].id,
+        current_responder_id=members["tech_lead"].id,
+        current_state="waiting",
+        question_type="default",
+        timeout_count=timeout_count,
+        timeout_at=datetime.utcnow() - timedelta(minutes=minutes_overdue),
+    )
+
+
+@pytest.mark.asyncio
+async def test_sweep_commits_once_per_batch(timeout_db):
+    """Test due conversations are claimed in batches, followed up or escalated, one commit per batch"""
+    session_maker, members = timeout_db
+    follow_ups = [conversation(members, minutes_overdue=i + 1) for i in range(3)]
+    escalations = [conversation(members, minutes_overdue=i + 1, timeout_count=1) for i in range(2)]
+    not_due = conversation(members, minutes_overdue=-5)
+    async with session_maker() as db:
+        db.add_all(follow_ups + escalations + [not_due])
+        await db.commit()
+
+    commits = []
+    engine = session_maker.kw["bind"].sync_engine
+    listener = lambda conn: commits.append(conn)
+    event.listen(engine, "commit", listener)
+    try:
+        async with session_maker() as db:
+            stats = await TimeoutMonitor(db, batch_size=2).check_timeouts()
+    finally:
+        event.remove(engine, "commit", listener)
+
+    assert stats["errors"] == []
+    assert (stats["batches"], stats["total_timed_out"]) == (3, 5)
+    assert (stats["follow_ups_sent"], stats["escalations_triggered"]) == (3, 2)
+    assert len(commits) == 3
+
+    async with session_maker() as db:
+        rows = {c.id: c for c in (await db.execute(select(Conversation))).scalars()}
+        events = (await db.execute(select(ConversationEvent.event_type))).scalars().all()
+    assert all(rows[c.id].current_state == "follow_up" and rows[c.id].timeout_count == 1 for c in follow_ups)
+    assert all(rows[c.id].timeout_at > datetime.utcnow() for c in follow_ups)
+    assert all(
+        rows[c.id].current_state == "escalated"
+        and rows[c.id].current_responder_id == members["solution_architect"].id
+        for c in escalations
+    )
+    assert rows[not_due.id].current_state == "waiting"
+    assert sorted(events) == ["escalated"] * 2 + ["timeout"] * 3
+
+
+@pytest.mark.asyncio
+async def test_failed_conversation_does_not_undo_its_batch(timeout_db):
+    """Test one failing conversation is reported and rolled back without losing the rest of the batch"""
+    session_maker, members = timeout_db
+    broken = conversation(members, minutes_overdue=2, timeout_count=1, asker_id=uuid4())  # Asker is gone
+    healthy = conversation(members, minutes_overdue=1)
+    async with session_maker() as db:
+        db.add_all([broken, healthy])
+        await db.commit()
+
+    async with session_maker() as db:
+        stats = await TimeoutMonitor(db, batch_size=10).check_timeouts()
+
+    assert [e["conversation_id"] for e in stats["errors"]] == [str(broken.id)]
+    assert stats["follow_ups_sent"] == 1
+    async with session_maker() as db:
+        assert (await db.get(Conversation, healthy.id)).current_state == "follow_up"
+        assert (await db.get(Conversation, broken.id)).current_state == "waiting"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sweeps_on_sqlite_run_once(timeout_db):
+    """Test the beat entry point falls back to one sweep where rows cannot be locked"""
+    session_maker, members = timeout_db
+    async with session_maker() as db:
+        db.add_all([conversation(members, minutes_overdue=i + 1) for i in range(4)])
+        await db.commit()
+
+    @asynccontextmanager
+    async def session_factory():
+        async with session_maker() as db:
+            yield db
+
+    stats = await check_conversation_timeouts(session_factory, workers=4, batch_size=3)
+
+    assert (stats["batches"], stats["follow_ups_sent"], stats["errors"]) == (2, 4, [])
+
+
+def test_claim_skips_locked_rows():
+    """Test the claim query locks its batch and skips rows other sweeps hold"""
+    monitor = TimeoutMonitor(db=None, batch_size=50)
+    sql = str(monitor._claim_statement(datetime.utcnow(), (datetime.utcnow(), uuid4())).compile(
+        dialect=postgresql.dialect()
+    ))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY agent_conversations.timeout_at, agent_conversations.id" in sql
+    assert "(agent_conversations.timeout_at, agent_conversations.id) >" in sql
+
+
+
+
 if __name__ == "__main__":
     print("""
     Timeout Monitor Tests
@@ -0,0 +1,210 @@
+"""
+Tests for vector store backends (local on-disk store and Pinecone adapter)
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from backend.agents.context.vector_store import (
+    LocalVectorStore,
+    PineconeVectorStore,
+    matches_filter,
+)
+
+NAMESPACE = "squad-1:code"
+
+
+def vec(*values):
+    """Pad a short vector to the test dimension"""
+    return list(values) + [0.0] * (4 - len(values))
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Local vector store in a temp directory"""
+    return LocalVectorStore(path=str(tmp_path), dimension=4)
+
+
+@pytest.fixture
+def documents():
+    return [
+        {"id": "a", "values": vec(1, 0), "metadata": {"lang": "python", "size": 10}},
+        {"id": "b", "values": vec(0.9, 0.1), "metadata": {"lang": "go", "size": 20}},
+        {"id": "c", "values": vec(0, 1), "metadata": {"lang": "python", "size": 30}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_local_query_ranks_by_cosine(store, documents):
+    """Test brute-force search returns nearest vectors first"""
+    await store.upsert(NAMESPACE, documents)
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=2)
+
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert results[0]["metadata"]["lang"] == "python"
+
+
+@pytest.mark.asyncio
+async def test_local_query_applies_metadata_filter(store, documents):
+    """Test metadata filters exclude non-matching vectors"""
+    await store.upsert(NAMESPACE, documents)
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=2, filter={"lang": "python"})
+    assert [r["id"] for r in results] == ["a", "c"]
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=5, filter={"size": {"$gte": 20}})
+    assert [r["id"] for r in results] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_local_upsert_replaces_existing_id(store, documents):
+    """Test upserting an existing id replaces its vector and metadata"""
+    await store.upsert(NAMESPACE, documents)
+    await store.upsert(NAMESPACE, [{"id": "a", "values": vec(0, 0, 1), "metadata": {"lang": "rust"}}])
+
+    results = await store.query(NAMESPACE, vec(0, 0, 1), top_k=1)
+    assert results[0]["id"] == "a"
+    assert results[0]["metadata"] == {"lang": "rust"}
+    assert (await store.namespace_stats(NAMESPACE))["vector_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_local_delete(store, documents):
+    """Test deleted vectors are no longer returned"""
+    await store.upsert(NAMESPACE, documents)
+    await store.delete(NAMESPACE, ["a"])
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=3)
+
+    assert [r["id"] for r in results] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_local_namespaces_are_isolated(store, documents):
+    """Test vectors never leak across namespaces"""
+    await store.upsert(NAMESPACE, documents)
+
+    assert await store.query("squad-2:code", vec(1, 0), top_k=3) == []
+
+
+@pytest.mark.asyncio
+async def test_local_persists_to_disk(tmp_path, documents):
+    """Test flushed data is reloaded memory-mapped by a new store"""
+    store = LocalVectorStore(path=str(tmp_path), dimension=4)
+    await store.upsert(NAMESPACE, documents)
+    await store.delete(NAMESPACE, ["b"])
+    await store.close()
+
+    reopened = LocalVectorStore(path=str(tmp_path), dimension=4)
+    results = await reopened.query(NAMESPACE, vec(1, 0), top_k=3)
+
+    assert [r["id"] for r in results] == ["a", "c"]
+    ns = reopened._get_namespace(NAMESPACE)
+    assert ns.base.__class__.__name__ == "memmap"
+
+
+@pytest.mark.asyncio
+async def test_local_auto_flush_threshold(tmp_path, documents):
+    """Test pending rows are flushed once the threshold is reached"""
+    store = LocalVectorStore(path=str(tmp_path), dimension=4, flush_threshold_rows=2)
+
+    await store.upsert(NAMESPACE, documents)
+
+    assert (tmp_path / "squad-1_code" / "vectors.npy").exists()
+
+
+@pytest.mark.asyncio
+async def test_local_float16_storage(tmp_path, documents):
+    """Test float16 storage keeps ranking and persists at half precision"""
+    store = LocalVectorStore(path=str(tmp_path), dimension=4, dtype="float16")
+    await store.upsert(NAMESPACE, documents)
+    await store.flush()
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=1)
+
+    assert results[0]["id"] == "a"
+    assert str(store._get_namespace(NAMESPACE).base.dtype) == "float16"
+
+
+@pytest.mark.asyncio
+async def test_local_rejects_wrong_dimension(store):
+    """Test vectors with the wrong dimension are rejected"""
+    with pytest.raises(ValueError):
+        await store.upsert(NAMESPACE, [{"id": "x", "values": [1.0, 2.0], "metadata": {}}])
+
+
+@pytest.mark.asyncio
+async def test_local_delete_namespace(tmp_path, documents):
+    """Test deleting a namespace removes its files"""
+    store = LocalVectorStore(path=str(tmp_path), dimension=4)
+    await store.upsert(NAMESPACE, documents)
+    await store.flush()
+
+    await store.delete_namespace(NAMESPACE)
+
+    assert not (tmp_path / "squad-1_code").exists()
+    assert (await store.namespace_stats(NAMESPACE))["vector_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_local_hnsw_index(tmp_path, documents):
+    """Test the optional HNSW index returns the same neighbours"""
+    pytest.importorskip("hnswlib")
+    store = LocalVectorStore(path=str(tmp_path), dimension=4, use_hnsw=True)
+    await store.upsert(NAMESPACE, documents)
+    await store.delete(NAMESPACE, ["a"])
+
+    results = await store.query(NAMESPACE, vec(1, 0), top_k=2, filter={"lang": {"$in": ["go", "python"]}})
+    assert [r["id"] for r in results] == ["b", "c"]
+
+    await store.close()
+    reopened = LocalVectorStore(path=str(tmp_path), dimension=4, use_hnsw=True)
+    results = await reopened.query(NAMESPACE, vec(1, 0), top_k=1)
+    assert results[0]["id"] == "b"
+    assert (await reopened.namespace_stats(NAMESPACE))["index"] == "hnsw"
+
+
+def test_matches_filter_operators():
+    """Test supported Pinecone filter operators"""
+    metadata = {"lang": "python", "size": 10}
+
+    assert matches_filter(metadata, None)
+    assert matches_filter(metadata, {"lang": {"$eq": "python"}})
+    assert not matches_filter(metadata, {"lang": {"$ne": "python"}})
+    assert matches_filter(metadata, {"lang": {"$nin": ["go"]}})
+    assert matches_filter(metadata, {"size": {"$gt": 5, "$lt": 20}})
+    assert not matches_filter(metadata, {"missing": {"$gt": 5}})
+    with pytest.raises(ValueError):
+        matches_filter(metadata, {"size": {"$regex": ".*"}})
+
+
+@pytest.mark.asyncio
+async def test_pinecone_calls_run_off_event_loop():
+    """Test Pinecone's synchronous client is called from a worker thread"""
+    loop_thread = threading.get_ident()
+    call_threads = []
+
+    index = MagicMock()
+    index.upsert.side_effect = lambda **kwargs: call_threads.append(threading.get_ident())
+
+    store = PineconeVectorStore(index)
+    await store.upsert(NAMESPACE, [{"id": str(i), "values": vec(1), "metadata": {}} for i in range(250)])
+
+    # Batched to Pinecone's 100-vector request limit
+    assert index.upsert.call_count == 3
+    assert loop_thread not in call_threads
+
+
+@pytest.mark.asyncio
+async def test_pinecone_query_normalizes_matches():
+    """Test Pinecone matches are returned as plain dicts"""
+    match = MagicMock(id="a", score=0.9, metadata={"text": "hi"})
+    index = MagicMock()
+    index.query.return_value = MagicMock(matches=[match])
+
+    results = await PineconeVectorStore(index).query(NAMESPACE, vec(1), top_k=1, filter={"x": 1})
+
+    assert results == [{"id": "a", "score": 0.9, "metadata": {"text": "hi"}}]
+    assert index.query.call_args[1]["filter"] == {"x": 1}
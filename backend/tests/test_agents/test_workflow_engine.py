@@ -146,12 +146,13 @@ async def test_transition_state_with_metadata():
             metadata=metadata,
         )
 
-        # Verify metadata was logged
-        mock_service.add_log.assert_called_once()
-        call_args = mock_service.add_log.call_args[1]
+        # Verify metadata was logged with the status change (one write)
+        mock_service.add_log.assert_not_called()
+        call_args = mock_service.update_execution_status.call_args[1]
         assert call_args["execution_id"] == execution_id
-        assert "plan_id" in call_args["metadata"]
-        assert call_args["metadata"]["plan_id"] == "123"
+        [entry] = call_args["additional_logs"]
+        assert "plan_id" in entry["metadata"]
+        assert entry["metadata"]["plan_id"] == "123"
 
 
 @pytest.mark.asyncio
@@ -2,6 +2,7 @@
 Tests for Workflow Intelligence System (Stream I)
 """
 import pytest
+from types import SimpleNamespace
 from uuid import uuid4
 from datetime import datetime, timedelta
 
@@ -282,3 +283,47 @@ async def test_build_dependency_graph(db: AsyncSession, setup_intelligence_test_
     assert task1.id in graph
     assert task2.id in graph
 
+
+
+def make_tasks(names, edges, phases=None):
+    """Plain task stand-ins: edges are (blocker, blocked) name pairs"""
+    base = datetime(2026, 1, 1)
+    tasks = {
+        name: SimpleNamespace(
+            id=uuid4(), title=name, status="pending", blocks_tasks=[],
+            phase=(phases or {}).get(name, "building"), created_at=base + timedelta(minutes=i),
+        )
+        for i, name in enumerate(names)
+    }
+    for blocker, blocked in edges:
+        tasks[blocker].blocks_tasks.append(tasks[blocked])
+    return tasks
+
+
+def test_task_ordering_prefers_critical_path():
+    """Test unblocked tasks heading longer chains come first, then phase, then creation order"""
+    intelligence = get_workflow_intelligence()
+    tasks = make_tasks(
+        ["solo", "validate", "investigate", "chain1", "chain2", "chain3"],
+        [("chain1", "chain2"), ("chain2", "chain3")],
+        phases={"validate": "validation", "investigate": "investigation"},
+    )
+    ordered = intelligence._topological_sort_with_priority(
+        list(tasks.values()), intelligence._build_dependency_graph(list(tasks.values()))
+    )
+
+    assert [t.title for t in ordered] == ["chain1", "chain2", "investigate", "solo", "chain3", "validate"]
+
+
+def test_task_ordering_reports_cycles():
+    """Test tasks caught in a cycle are reported and still returned once"""
+    intelligence = get_workflow_intelligence()
+    tasks = make_tasks(["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "b"), ("c", "d")])
+    task_list = list(tasks.values())
+
+    ordered = intelligence._topological_sort_with_priority(
+        task_list, intelligence._build_dependency_graph(task_list)
+    )
+
+    assert [t.title for t in ordered] == ["a", "b", "c", "d"]  # a ordered; b, c, d appended
+    assert intelligence.find_dependency_cycles(task_list) == [[tasks["b"].id, tasks["c"].id]]
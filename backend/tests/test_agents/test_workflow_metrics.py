@@ -0,0 +1,226 @@
+"""
+Workflow Metrics Tests
+
+Tests the counter tables the workflow metrics materializer maintains from
+task, message and coherence writes, and the O(1) health/analytics reads
+built on them.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select, update
+
+from backend.agents.communication.history_manager import HistoryManager
+from backend.agents.guardian.workflow_health_monitor import WorkflowHealthMonitor
+from backend.agents.guardian import workflow_metrics
+from backend.agents.guardian.workflow_metrics import rebuild_workflow_counters
+from backend.agents.guardian.workflow_snapshot import build_workflow_snapshot, clear_workflow_snapshots
+from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.models.branching import WorkflowBranch
+from backend.models.guardian import CoherenceMetrics, WorkflowAgentCounter, WorkflowTaskCounter
+from backend.models.message import AgentMessage
+from backend.models.project import TaskExecution
+from backend.models.squad import SquadMember
+from backend.models.workflow import DynamicTask, WorkflowPhase, task_dependencies
+from backend.services.analytics_service import AnalyticsService
+from backend.tests.test_agents.test_workflow_snapshot import count_queries, seed
+
+
+@pytest_asyncio.fixture
+async def workflow_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(
+        TaskExecution.__table__, DynamicTask.__table__, task_dependencies,
+        AgentMessage.__table__, CoherenceMetrics.__table__, SquadMember.__table__,
+        WorkflowBranch.__table__,
+    )
+    clear_workflow_snapshots()
+    async with session_maker() as db:
+        yield db
+    clear_workflow_snapshots()
+
+
+async def counters(db, execution_id):
+    """Both counter tables of an execution, zero rows dropped"""
+    result = await db.execute(
+        select(
+            WorkflowTaskCounter.phase, WorkflowTaskCounter.status, WorkflowTaskCounter.agent_id,
+            WorkflowTaskCounter.task_count, WorkflowTaskCounter.with_rationale,
+        ).where(WorkflowTaskCounter.execution_id == execution_id, WorkflowTaskCounter.task_count != 0)
+    )
+    tasks = {tuple(row[:3]): tuple(row[3:]) for row in result.all()}
+    result = await db.execute(
+        select(
+            WorkflowAgentCounter.agent_id, WorkflowAgentCounter.messages_sent,
+            WorkflowAgentCounter.last_message_at, WorkflowAgentCounter.coherence_sum,
+            WorkflowAgentCounter.coherence_count,
+        ).where(WorkflowAgentCounter.execution_id == execution_id)
+    )
+    agents = {row[0]: (row[1], row[2], pytest.approx(row[3]), row[4]) for row in result.all()}
+    return tasks, agents
+
+
+async def assert_matches_rebuild(db, execution_id):
+    """The incrementally maintained counters equal a recount from the rows"""
+    incremental = await counters(db, execution_id)
+    await rebuild_workflow_counters(db, execution_id)
+    assert await counters(db, execution_id) == incremental
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_direct_orm_writes(workflow_db):
+    """Test added tasks, messages and coherence scores land in the counters on flush"""
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+
+    tasks, agent_counters = await counters(db, execution.id)
+    assert tasks[("investigation", "completed", agents[0].id)] == (2, 2)
+    assert tasks[("investigation", "pending", agents[1].id)] == (2, 0)
+    assert sum(count for count, _ in tasks.values()) == 8
+    messages, last_at, coherence, scores = agent_counters[agents[0].id]
+    assert (messages, coherence, scores) == (3, 1.2, 2)
+    assert last_at == rows[0].created_at + timedelta(minutes=4)  # Its newest message
+    assert agent_counters[agents[1].id][:1] == (2,)
+    await assert_matches_rebuild(db, execution.id)
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_status_changes_and_deletes(workflow_db):
+    """Test engine status updates, attribute edits and deletes move tasks between counters"""
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+    engine = PhaseBasedWorkflowEngine()
+
+    await engine.update_task_status(db, rows[1].id, "completed")
+    await engine.spawn_task(
+        db=db, agent_id=agents[2].id, execution_id=execution.id,
+        phase=WorkflowPhase.VALIDATION, title="New", description="Verify the fix",
+    )
+    rows[2].rationale = None
+    rows[2].phase = "validation"
+    await db.delete(rows[5])
+    await db.commit()
+
+    tasks, _ = await counters(db, execution.id)
+    assert tasks[("investigation", "completed", agents[1].id)] == (1, 0)
+    assert ("investigation", "pending", agents[1].id) not in tasks  # rows[1] completed, rows[5] deleted
+    assert tasks[("validation", "pending", agents[2].id)] == (1, 0)
+    assert tasks[("validation", "in_progress", agents[0].id)] == (1, 0)
+    await assert_matches_rebuild(db, execution.id)
+
+
+@pytest.mark.asyncio
+async def test_counters_roll_back_with_the_transaction(workflow_db):
+    """Test counters written by a flush disappear when its transaction rolls back"""
+    db = workflow_db
+    execution, agents, _ = await seed(db)
+    execution_id = execution.id
+    before = await counters(db, execution_id)
+
+    db.add(DynamicTask(
+        parent_execution_id=execution_id, phase="building", spawned_by_agent_id=agents[0].id,
+        title="Rolled back", description="Never committed",
+    ))
+    db.add(AgentMessage(
+        sender_id=agents[1].id, task_execution_id=execution_id, content="x", message_type="status_update",
+    ))
+    await db.flush()
+    assert await counters(db, execution_id) != before
+    await db.rollback()
+
+    assert await counters(db, execution_id) == before
+
+
+@pytest.mark.asyncio
+async def test_unloaded_prior_value_triggers_recount(workflow_db):
+    """Test an edit whose previous value was never loaded recounts the execution"""
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+
+    db.expire(rows[0], ["status"])
+    rows[0].status = "failed"  # previous status unknown to the session
+    await db.commit()
+
+    tasks, _ = await counters(db, execution.id)
+    assert tasks[("investigation", "failed", agents[0].id)] == (1, 1)
+    assert tasks[("investigation", "completed", agents[0].id)] == (1, 1)
+    await assert_matches_rebuild(db, execution.id)
+
+
+@pytest.mark.asyncio
+async def test_bulk_message_delete_adjusts_counters(workflow_db):
+    """Test HistoryManager's bulk delete takes the deleted messages out of the counters"""
+    db = workflow_db
+    execution, agents, _ = await seed(db)
+    await db.execute(
+        update(AgentMessage)
+        .where(AgentMessage.sender_id == agents[1].id)
+        .values(created_at=datetime.utcnow() - timedelta(days=40))
+    )
+
+    assert await HistoryManager(db).delete_old_messages(older_than_days=30) == 2
+    await db.commit()
+
+    _, agent_counters = await counters(db, execution.id)
+    assert agent_counters[agents[0].id][0] == 3
+    assert agent_counters[agents[1].id][0] == 0
+
+
+@pytest.mark.asyncio
+async def test_health_and_analytics_read_counters_in_constant_queries(workflow_db):
+    """Test health and analytics cost the same statements for 8 and 400 tasks"""
+    db = workflow_db
+    small, _, _ = await seed(db, tasks=8)
+    large, _, _ = await seed(db, tasks=400)
+    statements = count_queries(db)
+
+    async def read(execution_id):
+        clear_workflow_snapshots()
+        statements.clear()
+        health = await WorkflowHealthMonitor().calculate_health(db, execution_id)
+        analytics = await AnalyticsService().calculate_workflow_analytics(db, execution_id)
+        return health, analytics, len(statements)
+
+    _, _, small_count = await read(small.id)
+    health, analytics, large_count = await read(large.id)
+
+    assert large_count == small_count <= 7
+    assert sum(health.metrics["phase_distribution"].values()) == 400
+    assert analytics.completion_rate == 0.25
+    # No statement scans the task or message rows except the blocked-task count
+    scans = [s for s in statements if "FROM dynamic_tasks" in s or "FROM agent_messages" in s]
+    assert len(scans) == 1 and "task_dependencies" in scans[0]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_restores_counters_after_bulk_writes(workflow_db):
+    """Test rebuild_workflow_counters repairs counters that bulk statements bypassed"""
+    db = workflow_db
+    execution, agents, _ = await seed(db)
+    await db.execute(delete(DynamicTask).where(DynamicTask.phase == "building"))
+    await rebuild_workflow_counters(db, execution.id)
+    await db.commit()
+
+    snapshot = await build_workflow_snapshot(db, execution.id)
+    assert snapshot.phase_counts == {"investigation": 4, "building": 0, "validation": 2}
+    assert snapshot.agent_activity == {agents[0].id: 3, agents[1].id: 2}
+    assert snapshot.avg_coherence == pytest.approx(0.6)
+
+
+@pytest.mark.asyncio
+async def test_databases_without_upsert_recount_instead(workflow_db, monkeypatch):
+    """Test flushes fall back to recounting touched executions when upserts are unavailable"""
+    monkeypatch.setattr(workflow_metrics, "UPSERT_DIALECTS", ("postgresql",))
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+
+    rows[1].status = "completed"
+    db.add(AgentMessage(
+        sender_id=agents[1].id, task_execution_id=execution.id, content="x", message_type="status_update",
+    ))
+    await db.commit()
+
+    tasks, agent_counters = await counters(db, execution.id)
+    assert tasks[("investigation", "completed", agents[1].id)] == (1, 0)
+    assert agent_counters[agents[1].id][0] == 3
+    await assert_matches_rebuild(db, execution.id)
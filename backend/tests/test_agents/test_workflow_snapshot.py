@@ -0,0 +1,222 @@
+"""
+Workflow Snapshot Tests
+
+Tests the aggregated per-execution snapshot, its cache and invalidation,
+and the guardian and analytics code paths that consume it.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from backend.agents.guardian.advanced_anomaly_detector import AdvancedAnomalyDetector
+from backend.agents.guardian.workflow_health_monitor import WorkflowHealthMonitor
+from backend.agents.guardian.workflow_snapshot import (
+    build_workflow_snapshot,
+    clear_workflow_snapshots,
+    get_workflow_snapshot,
+    invalidate_workflow_snapshot,
+)
+from backend.agents.orchestration.phase_based_engine import PhaseBasedWorkflowEngine
+from backend.models.branching import WorkflowBranch
+from backend.models.guardian import CoherenceMetrics
+from backend.models.message import AgentMessage
+from backend.models.project import TaskExecution
+from backend.models.squad import SquadMember
+from backend.models.workflow import DynamicTask, WorkflowPhase, task_dependencies
+from backend.services.analytics_service import AnalyticsService
+
+
+@pytest_asyncio.fixture
+async def workflow_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(
+        TaskExecution.__table__, DynamicTask.__table__, task_dependencies,
+        AgentMessage.__table__, CoherenceMetrics.__table__, SquadMember.__table__,
+        WorkflowBranch.__table__,
+    )
+    clear_workflow_snapshots()
+    async with session_maker() as db:
+        yield db
+    clear_workflow_snapshots()
+
+
+async def seed(db, tasks=8):
+    """Execution with tasks across phases, a dependency chain, messages and coherence scores"""
+    squad_id = uuid4()
+    execution = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=squad_id, status="in_progress")
+    agents = [
+        SquadMember(id=uuid4(), squad_id=squad_id, role=role, system_prompt="-")
+        for role in ("backend_developer", "frontend_developer", "qa_tester")
+    ]
+    base = datetime.utcnow() - timedelta(hours=1)
+    rows = [
+        DynamicTask(
+            id=uuid4(), parent_execution_id=execution.id,
+            phase=("investigation", "investigation", "building", "validation")[i % 4],
+            status=("completed", "pending", "in_progress", "pending")[i % 4],
+            spawned_by_agent_id=agents[i % 2].id, title=f"Task {i}",
+            description="Investigate and analyze the slow query in detail" if i % 3 else "Do it",
+            rationale=None if i % 4 == 1 else "Found while profiling",
+            created_at=base + timedelta(minutes=i),
+        )
+        for i in range(tasks)
+    ]
+    db.add(execution)
+    db.add_all(agents + rows)
+    await db.flush()
+    # rows[1] (pending) waits on rows[2] (in progress); rows[3] waits on rows[0] (completed)
+    await db.execute(task_dependencies.insert().values([
+        {"task_id": rows[2].id, "blocks_task_id": rows[1].id},
+        {"task_id": rows[0].id, "blocks_task_id": rows[3].id},
+    ]))
+    db.add_all([
+        AgentMessage(
+            sender_id=agents[i % 2].id, task_execution_id=execution.id, content=f"m{i}",
+            message_type="status_update", created_at=base + timedelta(minutes=i),
+        )
+        for i in range(5)
+    ])
+    db.add_all([
+        CoherenceMetrics(
+            execution_id=execution.id, agent_id=agents[0].id, monitored_by_pm_id=agents[2].id,
+            phase="building", coherence_score=score, metrics={},
+            calculated_at=base + timedelta(minutes=i),
+        )
+        for i, score in enumerate((0.4, 0.8))
+    ])
+    await db.commit()
+    return execution, agents, rows
+
+
+def count_queries(db):
+    """Start counting statements run on the session's engine; returns the counter list"""
+    statements = []
+    event.listen(db.bind.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_snapshot_aggregates(workflow_db):
+    """Test counts, blocked tasks, activity and coherence come out of the aggregates"""
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+
+    snapshot = await build_workflow_snapshot(db, execution.id, include_details=True)
+
+    assert snapshot.phase_counts == {"investigation": 4, "building": 2, "validation": 2}
+    assert snapshot.status_counts == {"completed": 2, "pending": 4, "in_progress": 2}
+    assert snapshot.total_tasks == 8
+    assert snapshot.completion_rate == 0.25
+    assert snapshot.discovery_rate == 0.75
+    assert snapshot.blocked_tasks == 1  # rows[1]; rows[3]'s blocker completed
+    assert snapshot.agent_task_counts == {agents[0].id: 4, agents[1].id: 4}
+    assert snapshot.agent_completed_counts == {agents[0].id: 2}
+    assert snapshot.agent_activity == {agents[0].id: 3, agents[1].id: 2}
+    assert snapshot.avg_coherence == pytest.approx(0.6)
+    assert [t["coherence_score"] for t in snapshot.coherence_trends] == [0.8, 0.4]
+    assert snapshot.active_member_ids == {agent.id for agent in agents}
+    assert [t.title for t in snapshot.recent_tasks[:2]] == ["Task 7", "Task 6"]
+    # Active tasks with a brief description, or in investigation without rationale
+    assert {t.title for t in snapshot.flagged_tasks} == {"Task 1", "Task 3", "Task 5", "Task 6"}
+    assert snapshot.tasks is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_query_count_does_not_grow_with_tasks(workflow_db):
+    """Test the snapshot costs the same number of statements for 8 and 400 tasks"""
+    db = workflow_db
+    small, _, _ = await seed(db, tasks=8)
+    large, _, _ = await seed(db, tasks=400)
+    statements = count_queries(db)
+
+    await build_workflow_snapshot(db, small.id)
+    small_count = len(statements)
+    statements.clear()
+    snapshot = await build_workflow_snapshot(db, large.id)
+
+    assert snapshot.total_tasks == 400
+    assert len(statements) == small_count <= 10
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_and_invalidation(workflow_db):
+    """Test snapshots are reused until a task write invalidates them"""
+    db = workflow_db
+    execution, agents, rows = await seed(db)
+
+    first = await get_workflow_snapshot(db, execution.id)
+    assert await get_workflow_snapshot(db, execution.id) is first
+
+    # Loading every task needs a richer snapshot, which then serves both kinds of caller
+    with_tasks = await get_workflow_snapshot(db, execution.id, include_tasks=True)
+    assert with_tasks is not first and len(with_tasks.tasks) == 8
+    assert await get_workflow_snapshot(db, execution.id) is with_tasks
+    assert (rows[2].id, rows[1].id) in with_tasks.dependencies
+
+    await PhaseBasedWorkflowEngine().update_task_status(db, rows[1].id, "completed")
+    refreshed = await get_workflow_snapshot(db, execution.id)
+    assert refreshed is not with_tasks
+    assert refreshed.status_counts["completed"] == 3
+
+    await PhaseBasedWorkflowEngine().spawn_task(
+        db=db, agent_id=agents[0].id, execution_id=execution.id,
+        phase=WorkflowPhase.VALIDATION, title="New", description="Verify the fix",
+    )
+    assert (await get_workflow_snapshot(db, execution.id)).total_tasks == 9
+
+
+@pytest.mark.asyncio
+async def test_snapshot_built_during_invalidation_is_not_cached(workflow_db, monkeypatch):
+    """Test a write that lands while a snapshot is being built keeps it out of the cache"""
+    db = workflow_db
+    execution, _, _ = await seed(db)
+
+    import backend.agents.guardian.workflow_snapshot as workflow_snapshot
+    build = workflow_snapshot.build_workflow_snapshot
+
+    async def racing_build(*args, **kwargs):
+        snapshot = await build(*args, **kwargs)
+        invalidate_workflow_snapshot(execution.id)
+        return snapshot
+
+    monkeypatch.setattr(workflow_snapshot, "build_workflow_snapshot", racing_build)
+    first = await get_workflow_snapshot(db, execution.id)
+    monkeypatch.setattr(workflow_snapshot, "build_workflow_snapshot", build)
+
+    assert await get_workflow_snapshot(db, execution.id) is not first
+
+
+@pytest.mark.asyncio
+async def test_health_anomalies_and_analytics_share_one_snapshot(workflow_db):
+    """Test the consumers read one cached snapshot instead of querying on their own"""
+    db = workflow_db
+    execution, agents, _ = await seed(db)
+    await get_workflow_snapshot(db, execution.id, include_details=True)
+    statements = count_queries(db)
+
+    health = await WorkflowHealthMonitor().calculate_health(db, execution.id)
+    anomalies = await AdvancedAnomalyDetector().detect_anomalies(db, execution.id)
+    analytics = await AnalyticsService().calculate_workflow_analytics(db, execution.id)
+
+    assert len(statements) == 1  # Only the branch lookup
+    assert health.metrics["blocking_issues"] == 1
+    assert health.metrics["phase_distribution"] == {"investigation": 4, "building": 2, "validation": 2}
+    assert health.metrics["avg_coherence"] == pytest.approx(0.6)
+    assert health.metrics["agent_activity"] == {agents[0].id: 3, agents[1].id: 2}
+    types = {anomaly.type for anomaly in anomalies}
+    assert {"low_value_task", "missing_rationale", "phase_drift"} <= types
+    assert analytics.completion_rate == 0.25
+    assert analytics.agent_performance == {agents[0].id: 0.5}
+    assert len(analytics.coherence_trends) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_execution(workflow_db):
+    """Test a missing execution raises for health and yields no anomalies"""
+    db = workflow_db
+
+    with pytest.raises(ValueError, match="not found"):
+        await WorkflowHealthMonitor().calculate_health(db, uuid4())
+    assert await AdvancedAnomalyDetector().detect_anomalies(db, uuid4()) == []
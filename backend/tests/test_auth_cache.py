@@ -0,0 +1,257 @@
+"""
+Tests for the cached authentication path (core/auth.py)
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event, select, update
+
+from backend.core import auth
+from backend.core.auth import (
+    UserPrincipal,
+    clear_auth_caches,
+    get_current_principal,
+    get_current_user,
+    require_plan_tier,
+    verify_access_token,
+)
+from backend.core.config import settings
+from backend.core.security import create_access_token, hash_password
+from backend.models.user import User
+from backend.schemas.auth import UserLogin
+from backend.services.auth_service import AuthService
+from backend.services.cached_services.user_cache import get_user_cache
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    clear_auth_caches()
+    try:
+        yield await sqlite_session_maker(User.__table__)
+    finally:
+        clear_auth_caches()
+
+
+@pytest_asyncio.fixture
+async def engine(session_maker):
+    return session_maker.kw["bind"]
+
+
+@pytest_asyncio.fixture
+async def user(session_maker):
+    async with session_maker() as db:
+        user = User(
+            id=uuid.uuid4(), email="fast@example.com", name="Fast",
+            password_hash=hash_password("secret-password"), plan_tier="pro",
+        )
+        db.add(user)
+        await db.commit()
+        return user
+
+
+def bearer(user_id) -> HTTPAuthorizationCredentials:
+    token = create_access_token({"sub": str(user_id)})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class QueryCounter:
+    """Counts SQL statements run on an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+class TestVerifiedTokenCache:
+    """Test the verified-token LRU"""
+
+    def test_valid_token_decoded_once(self, monkeypatch):
+        """Test a valid token is decoded on first use only"""
+        clear_auth_caches()
+        calls = []
+        real_verify = auth.verify_token
+        monkeypatch.setattr(auth, "verify_token", lambda t: calls.append(t) or real_verify(t))
+        token = create_access_token({"sub": str(uuid.uuid4())})
+
+        assert verify_access_token(token) == verify_access_token(token)
+        assert len(calls) == 1
+
+    def test_invalid_and_expired_tokens_not_cached(self):
+        """Test rejected tokens are never served from the cache"""
+        clear_auth_caches()
+        expired = create_access_token({"sub": str(uuid.uuid4())}, expires_delta=timedelta(seconds=-5))
+
+        assert verify_access_token("not-a-jwt") is None
+        assert verify_access_token(expired) is None
+        assert auth.auth_cache_stats()["tokens"]["size"] == 0
+
+    def test_lru_is_bounded(self):
+        """Test least recently used tokens are evicted past the size limit"""
+        cache = auth._ExpiringLRU(max_entries=2)
+        far = 2 ** 40
+        cache.put("a", 1, far)
+        cache.put("b", 2, far)
+        cache.get("a")
+        cache.put("c", 3, far)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+class TestCachedUser:
+    """Test the cached user path of get_current_user"""
+
+    @pytest.mark.asyncio
+    async def test_warm_request_runs_no_queries(self, engine, session_maker, user):
+        """Test only the first request loads the user from the database"""
+        credentials = bearer(user.id)
+
+        async with session_maker() as db:
+            with QueryCounter(engine) as cold:
+                first = await get_current_user(credentials, db)
+
+        async with session_maker() as db:
+            with QueryCounter(engine) as warm:
+                second = await get_current_user(credentials, db)
+                assert second.id == user.id
+                assert second.plan_tier == "pro"
+                assert second in db
+
+        assert first.email == "fast@example.com"
+        assert cold.count == 1
+        assert warm.count == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_user_can_be_updated(self, session_maker, user):
+        """Test changes to the attached user are written on commit"""
+        credentials = bearer(user.id)
+        async with session_maker() as db:
+            await get_current_user(credentials, db)
+
+        async with session_maker() as db:
+            cached = await get_current_user(credentials, db)
+            cached.name = "Renamed"
+            await db.refresh(cached, attribute_names=["password_hash"])
+            assert cached.password_hash.startswith("$2")
+            await db.commit()
+
+        async with session_maker() as db:
+            assert (await db.get(User, user.id)).name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_user_drops_cached_row(self, session_maker, user):
+        """Test a deactivated user is rejected right after invalidation"""
+        credentials = bearer(user.id)
+        async with session_maker() as db:
+            await get_current_user(credentials, db)
+
+        async with session_maker() as db:
+            stored = await db.get(User, user.id)
+            stored.is_active = False
+            await db.commit()
+        await get_user_cache().invalidate_user(user.id, user.email)
+
+        async with session_maker() as db:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(credentials, db)
+        assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_rejected(self, session_maker):
+        """Test tokens of missing users are rejected with 401"""
+        async with session_maker() as db:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(bearer(uuid.uuid4()), db)
+        assert exc_info.value.status_code == 401
+
+
+class TestPlanTierFastPath:
+    """Test require_plan_tier on the cached principal"""
+
+    @pytest.mark.asyncio
+    async def test_plan_tier_check_without_database(self, engine, session_maker, user):
+        """Test warm plan tier checks neither query nor connect"""
+        credentials = bearer(user.id)
+        async with session_maker() as db:
+            await get_current_principal(credentials, db)
+
+        checkouts = []
+        event.listen(engine.sync_engine, "checkout", lambda *args: checkouts.append(args))
+        async with session_maker() as db:
+            principal = await get_current_principal(credentials, db)
+            allowed = await require_plan_tier("starter")(current_user=principal)
+            with pytest.raises(HTTPException) as exc_info:
+                await require_plan_tier("enterprise")(current_user=principal)
+
+        assert isinstance(principal, UserPrincipal)
+        assert allowed.id == user.id
+        assert exc_info.value.status_code == 403
+        assert checkouts == []
+
+
+class TestLoginRehash:
+    """Test the password rehash on login"""
+
+    login = UserLogin(email="stale@example.com", password="secret-password")
+
+    @pytest_asyncio.fixture
+    async def stale_user(self, session_maker, monkeypatch):
+        """User whose hash was made with a lower bcrypt cost than configured"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        password_hash = hash_password("secret-password")
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        async with session_maker() as db:
+            user = User(
+                id=uuid.uuid4(), email="stale@example.com", name="Stale",
+                password_hash=password_hash, is_active=True,
+            )
+            db.add(user)
+            await db.commit()
+            return user
+
+    async def stored_hash(self, session_maker, user):
+        async with session_maker() as db:
+            return (await db.get(User, user.id)).password_hash
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_is_not_rehashed(self, session_maker, stale_user):
+        """Test inactive accounts are rejected before their hash is rewritten"""
+        async with session_maker() as db:
+            await db.execute(update(User).values(is_active=False))
+            await db.commit()
+
+            with pytest.raises(HTTPException) as exc_info:
+                await AuthService.authenticate_user(db, self.login)
+
+        assert exc_info.value.status_code == 403
+        assert await self.stored_hash(session_maker, stale_user) == stale_user.password_hash
+
+    @pytest.mark.asyncio
+    async def test_failed_rehash_rolls_back(self, session_maker, stale_user, monkeypatch):
+        """Test a failed rehash commit leaves the login and the session usable"""
+        async with session_maker() as db:
+            async def failing_commit():
+                raise RuntimeError("database unavailable")
+
+            monkeypatch.setattr(db, "commit", failing_commit)
+            user = await AuthService.authenticate_user(db, self.login)
+
+            assert user.id == stale_user.id
+            assert not db.dirty
+            assert (await db.execute(select(User.email))).scalar_one() == "stale@example.com"
+
+        assert await self.stored_hash(session_maker, stale_user) == stale_user.password_hash
@@ -0,0 +1,137 @@
+"""
+Tests for the input validation middleware (middleware/input_validation.py)
+"""
+import json
+import re
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from backend.middleware import input_validation
+from backend.middleware.input_validation import InputValidationMiddleware, ValidatedJSONRoute
+
+
+@pytest.fixture
+def validator():
+    return InputValidationMiddleware(app=None)
+
+
+def build_app(**kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(InputValidationMiddleware, **kwargs)
+    router = APIRouter(route_class=ValidatedJSONRoute)
+
+    @router.post("/items")
+    async def create_item(item: dict):
+        return {"keys": sorted(item)}
+
+    app.include_router(router)
+    return app
+
+
+async def post(app, content, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/items", content=content, headers={"content-type": "application/json", **(headers or {})}
+        )
+
+
+class TestStringScan:
+    """Test the combined pattern scan"""
+
+    @pytest.mark.parametrize("value,message", [
+        ("1 UNION SELECT password", "Potential SQL injection detected"),
+        ("<script>alert(1)</script>", "Potential XSS attack detected"),
+        ("../../etc/passwd", "Potential path traversal detected"),
+        ("cat x | sh", "Potential command injection detected"),
+        # Matches SQL and command injection: SQL is reported, as before
+        ("x; exec xp_cmdshell", "Potential SQL injection detected"),
+    ])
+    def test_category_reported(self, validator, value, message):
+        """Test each category is detected and named in check order"""
+        response = validator._validate_string(value, "root.title")
+        assert json.loads(response.body)["error"] == f"{message} in root.title"
+
+    def test_every_pattern_passes_prefilter(self, validator):
+        """Test a sample for each pattern contains a trigger and is blocked"""
+        samples = [
+            "union all select 1", "select x from y", "insert into t", "UPDATE t SET a",
+            "delete from t", "drop table t", "x --", "/* c */", "x or a=b", "x and a=b",
+            "; exec sp", "<script>a</script>", "JavaScript:alert", "onclick = x",
+            "<iframe>", "<object>", "<embed>", "../", "..", "%2E%2E", "..\\",
+            "a;b", "$(x)", "`x`",
+        ]
+        patterns = (
+            validator.SQL_INJECTION_PATTERNS + validator.XSS_PATTERNS
+            + validator.PATH_TRAVERSAL_PATTERNS + validator.COMMAND_INJECTION_PATTERNS
+        )
+        assert len(samples) == len(patterns)
+        for pattern, sample in zip(patterns, samples):
+            assert re.search(pattern, sample, re.IGNORECASE), (pattern, sample)
+            assert validator._scan(sample) is not None, sample
+
+    def test_clean_value_passes(self, validator):
+        """Test ordinary text is accepted"""
+        assert validator._validate_string("Build the login page", "root.title") is None
+
+
+class TestJsonWalk:
+    """Test the iterative JSON walk"""
+
+    def test_first_error_path(self, validator):
+        """Test the first offending value is reported with its path"""
+        data = {"a": [{"ok": "fine"}, {"bad": "<iframe src=x>"}], "b": "../x"}
+        response = validator._validate_json_structure(data)
+        assert json.loads(response.body)["error"] == "Potential XSS attack detected in root.a[1].bad"
+
+    def test_depth_limit(self, validator):
+        """Test documents nested beyond max_json_depth are rejected"""
+        data = "leaf"
+        for _ in range(validator.max_json_depth + 1):
+            data = {"k": data}
+        response = validator._validate_json_structure(data)
+        assert json.loads(response.body)["error"] == "JSON too deeply nested"
+
+        for _ in range(1000):
+            data = [data]
+        assert validator._validate_json_structure(data) is not None  # No RecursionError
+
+
+class TestRequests:
+    """Test the middleware end to end"""
+
+    @pytest.mark.asyncio
+    async def test_parsed_body_handed_to_route(self, monkeypatch):
+        """Test the route reuses the middleware's parsed body"""
+        calls = []
+        real_loads = json.loads
+        monkeypatch.setattr(input_validation.json, "loads", lambda s, **kw: calls.append(s) or real_loads(s, **kw))
+
+        response = await post(build_app(), json.dumps({"title": "hello", "count": 2}))
+        parses = len(calls)
+
+        assert response.status_code == 200
+        assert response.json() == {"keys": ["count", "title"]}
+        assert parses == 1  # Parsed by the middleware only
+
+    @pytest.mark.asyncio
+    async def test_chunked_body_size_limit(self):
+        """Test the size limit holds without a Content-Length header"""
+        async def chunks():
+            for _ in range(10):
+                yield b" " * 100
+
+        response = await post(build_app(max_content_length=500), chunks())
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "Request body too large"
+
+    @pytest.mark.asyncio
+    async def test_attack_blocked(self):
+        """Test a malicious value is rejected before the route runs"""
+        response = await post(build_app(), json.dumps({"title": "'; DROP TABLE users; --"}))
+
+        assert response.status_code == 400
+        assert response.json()["error"].startswith("Potential SQL injection detected in root.title")
@@ -132,7 +132,6 @@ async def test_execution_status_caching(db_session: AsyncSession):
         task_id=task_id,
         squad_id=squad_id,
         status="pending",
-        logs=[],
         execution_metadata={}
     )
     db_session.add(execution)
@@ -290,7 +289,6 @@ async def test_execution_list_caching(db_session: AsyncSession):
             task_id=task_id,
             squad_id=squad_id,
             status="pending",
-            logs=[],
             execution_metadata={}
         )
         db_session.add(execution)
@@ -0,0 +1,162 @@
+"""
+Tests for the rate limiting middleware (middleware/rate_limiting.py)
+"""
+import asyncio
+import math
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.core.config import settings
+from backend.middleware.rate_limiting import SLIDING_WINDOW_LUA, RateLimitMiddleware
+
+NOW = 1_699_999_990.0  # 10s into a 60s window
+
+
+class FakeScript:
+    """Python twin of SLIDING_WINDOW_LUA over a dict of counters"""
+
+    def __init__(self):
+        self.counters = {}
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, keys, args):
+        self.calls.append(args)
+        if self.fail:
+            raise ConnectionError("redis down")
+        limit, window, now, recorded, cost = args
+        current = self.counters.get(keys[0], 0)
+        previous = self.counters.get(keys[1], 0)
+        used = math.floor(previous * (window - now % window) / window) + current + recorded
+        allowed = 1 if used + cost <= limit else 0
+        used += allowed * cost
+        self.counters[keys[0]] = current + recorded + allowed * cost
+        return [allowed, max(limit - used, 0)]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.script = FakeScript()
+        self.sources = []
+
+    def register_script(self, source):
+        self.sources.append(source)
+        return self.script
+
+
+@pytest.fixture
+def no_local_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_FRACTION", 0.0)
+
+
+class TestInMemoryLimiter:
+    """Test the in-memory sliding-window counter"""
+
+    def test_limit_and_window_roll(self):
+        """Test the previous window is weighted into the count"""
+        limiter = RateLimitMiddleware(app=None)
+        results = [limiter._check_rate_limit_memory("ip:a", 10, NOW)[0] for _ in range(11)]
+        assert results == [True] * 10 + [False]
+
+        # Halfway through the next window half of the old requests still count
+        allowed, remaining, reset_time = limiter._check_rate_limit_memory("ip:a", 10, NOW + 80)
+        assert allowed and remaining == 10 - 5 - 1
+        assert reset_time == (NOW + 80) // 60 * 60 + 60
+
+        # Two windows later nothing old counts
+        assert limiter._check_rate_limit_memory("ip:a", 10, NOW + 200)[1] == 9
+
+    def test_store_is_bounded(self, monkeypatch):
+        """Test idle clients are evicted past RATE_LIMIT_MAX_CLIENTS"""
+        monkeypatch.setattr(settings, "RATE_LIMIT_MAX_CLIENTS", 100)
+        limiter = RateLimitMiddleware(app=None)
+        for i in range(1000):
+            limiter._check_rate_limit_memory(f"ip:{i}", 10, NOW)
+
+        assert len(limiter.in_memory_store) == 100
+        assert "ip:999" in limiter.in_memory_store and "ip:0" not in limiter.in_memory_store
+
+
+class TestRedisLimiter:
+    """Test the Lua script path and the local token bucket"""
+
+    @pytest.mark.asyncio
+    async def test_one_script_call_per_check(self, no_local_bucket):
+        """Test each check is a single EVALSHA and the limit holds"""
+        redis = FakeRedis()
+        limiter = RateLimitMiddleware(app=None, redis_client=redis)
+        results = [(await limiter._check_rate_limit("ip:a", 5))[0] for _ in range(7)]
+
+        assert results == [True] * 5 + [False] * 2
+        assert len(redis.script.calls) == 7
+        assert redis.sources == [SLIDING_WINDOW_LUA]
+
+    @pytest.mark.asyncio
+    async def test_local_bucket_skips_redis(self, monkeypatch):
+        """Test clearly allowed requests are served locally and reported later"""
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_FRACTION", 0.5)
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BURST", 20)
+        monkeypatch.setattr(settings, "RATE_LIMIT_SYNC_INTERVAL", 3600)
+        redis = FakeRedis()
+        limiter = RateLimitMiddleware(app=None, redis_client=redis)
+        script = await limiter._get_script(NOW)
+
+        allowed = 0
+        for _ in range(120):
+            ok, remaining, _ = await limiter._check_rate_limit_redis(script, "ip:a", 100, NOW)
+            allowed += ok
+            assert remaining >= 0
+
+        # Never over the limit, far fewer round trips than requests
+        assert allowed == 100
+        assert len(redis.script.calls) < 40
+        # Locally served requests are recorded with the next blocking call
+        assert sum(redis.script.counters.values()) == 100
+
+    @pytest.mark.asyncio
+    async def test_background_sync_reports_pending(self, monkeypatch):
+        """Test locally served requests reach Redis without a blocking check"""
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_FRACTION", 0.5)
+        monkeypatch.setattr(settings, "RATE_LIMIT_SYNC_INTERVAL", 0)
+        redis = FakeRedis()
+        limiter = RateLimitMiddleware(app=None, redis_client=redis)
+        script = await limiter._get_script(NOW)
+
+        await limiter._check_rate_limit_redis(script, "ip:a", 100, NOW)  # Blocking, leases tokens
+        await limiter._check_rate_limit_redis(script, "ip:a", 100, NOW)  # Local, schedules a sync
+        await asyncio.gather(*limiter._sync_tasks)
+
+        assert redis.script.calls[-1][3:] == [1, 0]  # recorded=1, cost=0
+        assert sum(redis.script.counters.values()) == 2
+        assert limiter.local_buckets["ip:a"].pending == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_fails_open(self, no_local_bucket):
+        """Test requests are allowed when the script call fails"""
+        redis = FakeRedis()
+        redis.script.fail = True
+        limiter = RateLimitMiddleware(app=None, redis_client=redis)
+
+        allowed, remaining, _ = await limiter._check_rate_limit("ip:a", 5)
+        assert allowed and remaining == 4
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_headers():
+    """Test a limited client gets 429 with retry headers"""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = [await client.get("/ping") for _ in range(101)]
+
+    assert responses[0].headers["X-RateLimit-Remaining"] == "99"
+    assert responses[-1].status_code == 429
+    assert int(responses[-1].headers["Retry-After"]) >= 1
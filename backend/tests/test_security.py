@@ -1,12 +1,22 @@
 """
 Tests for security module
 """
+import asyncio
+import threading
+import time
+
 import pytest
 from datetime import timedelta
 
+from backend.core.config import settings
 from backend.core.security import (
+    PasswordHashPool,
+    PasswordHashPoolFull,
     hash_password,
+    hash_password_async,
+    needs_rehash,
     verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -202,3 +212,94 @@ class TestEmailVerificationTokens:
         verified_email = verify_email_verification_token(access_token)
 
         assert verified_email is None
+
+
+class TestPasswordHashPool:
+    """Test pooled (off-event-loop) password hashing"""
+
+    @pytest.mark.asyncio
+    async def test_async_hash_and_verify(self, monkeypatch):
+        """Test pooled hashing round-trips with the sync functions"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        hashed = await hash_password_async("testpassword123")
+
+        assert await verify_password_async("testpassword123", hashed) is True
+        assert await verify_password_async("wrong", hashed) is False
+        assert verify_password("testpassword123", hashed) is True
+
+    def test_needs_rehash_on_cost_change(self, monkeypatch):
+        """Test hashes are flagged when the configured cost changes"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        hashed = hash_password("testpassword123")
+
+        assert needs_rehash(hashed) is False
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        assert needs_rehash(hashed) is True
+        assert needs_rehash("not-a-bcrypt-hash") is True
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self, monkeypatch):
+        """Test other coroutines keep running while bcrypt works"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 12)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        await hash_password_async("testpassword123")
+        tick_task.cancel()
+
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        assert len(ticks) > 3
+        assert max(gaps) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_queue_limit_rejects_excess_jobs(self):
+        """Test jobs beyond workers + max_queue fail fast"""
+        pool = PasswordHashPool(workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            running = [asyncio.create_task(pool.run("hash", release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+
+            assert pool.pending == 2
+            with pytest.raises(PasswordHashPoolFull):
+                await pool.run("hash", release.wait)
+
+            release.set()
+            await asyncio.gather(*running)
+            assert pool.pending == 0
+            assert pool.stats == {"completed": 2, "rejected": 1, "max_pending": 2}
+        finally:
+            release.set()
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_callers_keep_running_jobs_counted(self):
+        """Test cancelling the awaiting request does not free a slot its job still holds"""
+        pool = PasswordHashPool(workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            running = [asyncio.create_task(pool.run("hash", release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            running[0].cancel()  # Its job is running in the worker thread
+            await asyncio.gather(*running[:1], return_exceptions=True)
+
+            assert pool.pending == 2
+            with pytest.raises(PasswordHashPoolFull):
+                await pool.run("hash", release.wait)
+
+            running[1].cancel()  # Its job was still queued: cancelled with it
+            await asyncio.gather(running[1], return_exceptions=True)
+            await asyncio.sleep(0.01)
+            assert pool.pending == 1
+
+            release.set()
+            await asyncio.sleep(0.05)
+            assert pool.pending == 0
+        finally:
+            release.set()
+            pool.shutdown()
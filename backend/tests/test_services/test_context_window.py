@@ -0,0 +1,126 @@
+"""
+Context Window Tests
+
+Tests the token-budgeted conversation window computed with a running SUM
+over the newest messages, and the summary that stands in for older ones.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from backend.models.multi_turn_conversation import ConversationMessage, MultiTurnConversation
+from backend.models.conversation_summary import ConversationSummary
+from backend.services.conversation_service import ConversationService
+from backend.services.summary_service import SummaryService
+
+
+BASE_TIME = datetime(2026, 5, 1, 12, 0)
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session_maker):
+    """Fresh in-memory database with conversation tables"""
+    session_maker = await sqlite_session_maker(
+        MultiTurnConversation.__table__, ConversationMessage.__table__, ConversationSummary.__table__
+    )
+    async with session_maker() as session:
+        yield session
+
+
+async def seed_conversation(db, token_counts, summary=None):
+    """Conversation with one message per entry in token_counts, oldest first"""
+    conversation = MultiTurnConversation(
+        id=uuid4(), conversation_type="user_agent", initiator_id=uuid4(),
+        initiator_type="user", total_messages=len(token_counts), summary=summary,
+    )
+    db.add(conversation)
+    messages = [
+        ConversationMessage(
+            id=uuid4(), conversation_id=conversation.id, sender_id=uuid4(), sender_type="user",
+            role="user", content=f"m{i}", total_tokens=tokens,
+            created_at=BASE_TIME + timedelta(seconds=i),
+        )
+        for i, tokens in enumerate(token_counts)
+    ]
+    db.add_all(messages)
+    await db.commit()
+    return conversation, messages
+
+
+@pytest.mark.asyncio
+async def test_max_tokens_keeps_newest_messages(db):
+    """Test the budget keeps the most recent messages, even past `limit` old ones"""
+    conversation, messages = await seed_conversation(db, [100] * 200)
+
+    window, total = await ConversationService.get_conversation_history(
+        db, conversation.id, limit=100, max_tokens=350
+    )
+
+    assert total == 200
+    assert [m.id for m in window] == [m.id for m in messages[-3:]]
+
+
+@pytest.mark.asyncio
+async def test_window_stops_at_first_message_over_budget(db):
+    """Test an oversized message ends the window and null token counts are free"""
+    conversation, messages = await seed_conversation(db, [10, 10, 500, None, 40, 30])
+
+    _, window = await ConversationService.get_context_window(
+        db, conversation.id, max_tokens=100, include_summary=False
+    )
+
+    assert [m.id for m in window] == [m.id for m in messages[3:]]
+
+
+@pytest.mark.asyncio
+async def test_window_respects_limit(db):
+    """Test `limit` caps the rows read even when the budget allows more"""
+    conversation, messages = await seed_conversation(db, [1] * 50)
+
+    _, window = await ConversationService.get_context_window(db, conversation.id, max_tokens=1000, limit=5)
+
+    assert [m.id for m in window] == [m.id for m in messages[-5:]]
+
+
+@pytest.mark.asyncio
+async def test_summary_prepended_only_when_messages_left_out(db):
+    """Test the summary is returned and budgeted only for truncated windows"""
+    summary = "x" * 199  # ~50 tokens
+    truncated, messages = await seed_conversation(db, [20] * 10, summary=summary)
+    complete, _ = await seed_conversation(db, [20] * 3, summary=summary)
+
+    text, window = await ConversationService.get_context_window(db, truncated.id, max_tokens=150)
+    assert text == summary
+    assert [m.id for m in window] == [m.id for m in messages[-5:]]
+
+    text, window = await ConversationService.get_context_window(db, complete.id, max_tokens=150)
+    assert text is None
+    assert len(window) == 3
+
+
+@pytest.mark.asyncio
+async def test_missing_conversation_returns_empty_window(db):
+    """Test unknown conversations return no summary and no messages"""
+    assert await ConversationService.get_context_window(db, uuid4(), max_tokens=100) == (None, [])
+
+
+@pytest.mark.asyncio
+async def test_window_lines_up_with_rolling_summary(db):
+    """Test messages between the high-water mark and the window are folded, none repeated"""
+    conversation, messages = await seed_conversation(db, [20] * 10)
+    await SummaryService.fold(db, conversation_id=conversation.id, until=BASE_TIME + timedelta(seconds=3))
+    await db.commit()
+
+    # Window starts after the mark: messages 3.. up to the window are folded into the text
+    text, window = await ConversationService.get_context_window(db, conversation.id, max_tokens=150)
+    start = [m.id for m in messages].index(window[0].id)
+    assert start > 3
+    assert [m.id for m in window] == [m.id for m in messages[start:]]
+    assert text.startswith(f"Summary of {start} older messages")
+
+    # Budget reaches past the mark: the window stops at it, the stored text covers the rest
+    text, window = await ConversationService.get_context_window(db, conversation.id, max_tokens=1000)
+    assert [m.id for m in window] == [m.id for m in messages[3:]]
+    assert text.startswith("Summary of 3 older messages")
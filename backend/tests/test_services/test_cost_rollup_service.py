@@ -0,0 +1,244 @@
+"""
+CostRollupService Tests
+
+Tests incremental LLM cost rollups and stats answered from summaries plus the
+unrolled tail, against an in-memory SQLite database.
+"""
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import LLMCostEntry, LLMCostRollupState, LLMCostSummary
+from backend.services.cost_rollup_service import CostRollupService, bucket_start
+
+
+ORG_A, ORG_B = uuid4(), uuid4()
+SQUAD_A, SQUAD_B = uuid4(), uuid4()
+USER = uuid4()
+BASE_TIME = datetime(2026, 3, 2, 0, 0)  # A Monday
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session_maker):
+    """Fresh in-memory database with the cost tables"""
+    session_maker = await sqlite_session_maker(
+        LLMCostEntry.__table__, LLMCostSummary.__table__, LLMCostRollupState.__table__
+    )
+    async with session_maker() as session:
+        yield session
+
+
+def make_entries(count, start=BASE_TIME, span=timedelta(days=40), seed=7):
+    """Random entries spread over a time span"""
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        prompt, completion = rng.randint(10, 2000), rng.randint(10, 1000)
+        entries.append(LLMCostEntry(
+            id=uuid4(),
+            provider=rng.choice(["openai", "anthropic"]),
+            model=rng.choice(["gpt-4o-mini", "claude-3-haiku-20240307"]),
+            organization_id=rng.choice([ORG_A, ORG_B]),
+            squad_id=rng.choice([SQUAD_A, SQUAD_B, None]),
+            user_id=rng.choice([USER, None]),
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            total_tokens=prompt + completion,
+            total_cost_usd=round(rng.random() / 100, 8),
+            response_time_ms=rng.choice([None, rng.randint(100, 5000)]),
+            created_at=start + timedelta(seconds=rng.uniform(0, span.total_seconds())),
+        ))
+    return entries
+
+
+def naive_stats(entries, squad_id=None, organization_id=None, user_id=None,
+                start_date=None, end_date=None):
+    """Reference implementation: filter and sum in Python"""
+    selected = [
+        e for e in entries
+        if (squad_id is None or e.squad_id == squad_id)
+        and (organization_id is None or e.organization_id == organization_id)
+        and (user_id is None or e.user_id == user_id)
+        and (start_date is None or e.created_at >= start_date)
+        and (end_date is None or e.created_at <= end_date)
+    ]
+    by_model = {}
+    for e in selected:
+        key = f"{e.provider}/{e.model}"
+        by_model.setdefault(key, [0, 0, 0.0])
+        by_model[key][0] += 1
+        by_model[key][1] += e.total_tokens
+        by_model[key][2] += e.total_cost_usd
+    return {
+        "total_requests": len(selected),
+        "total_tokens": sum(e.total_tokens for e in selected),
+        "total_cost_usd": sum(e.total_cost_usd for e in selected),
+        "by_model": by_model,
+        "start": min((e.created_at for e in selected), default=None),
+    }
+
+
+def assert_stats_match(stats, expected):
+    assert stats["total_requests"] == expected["total_requests"]
+    assert stats["total_tokens"] == expected["total_tokens"]
+    assert stats["total_cost_usd"] == pytest.approx(expected["total_cost_usd"], abs=1e-5)
+    assert {k: v["requests"] for k, v in stats["by_model"].items()} == {
+        k: v[0] for k, v in expected["by_model"].items()
+    }
+    if expected["start"] is not None:
+        assert stats["date_range"]["start"] == expected["start"]
+
+
+def test_bucket_start():
+    """Test daily/weekly/monthly bucket boundaries"""
+    day = datetime(2026, 3, 12).date()  # Thursday
+
+    assert bucket_start("daily", day) == datetime(2026, 3, 12)
+    assert bucket_start("weekly", day) == datetime(2026, 3, 9)
+    assert bucket_start("monthly", day) == datetime(2026, 3, 1)
+    with pytest.raises(ValueError):
+        bucket_start("yearly", day)
+
+
+@pytest.mark.asyncio
+async def test_rollup_builds_summaries_exactly_once(db):
+    """Test summaries match raw totals and re-running adds nothing"""
+    entries = make_entries(500)
+    db.add_all(entries)
+    await db.commit()
+
+    until = BASE_TIME + timedelta(days=41)
+    stats = await CostRollupService.rollup(db, until=until, window=timedelta(days=7))
+
+    assert stats["entries"] == 500
+    assert stats["windows"] == 6
+    assert await CostRollupService.get_watermark(db) == until
+
+    again = await CostRollupService.rollup(db, until=until)
+    assert again["windows"] == 0
+
+    for summary_type in ("daily", "weekly", "monthly"):
+        result = await db.execute(select(LLMCostSummary).where(LLMCostSummary.summary_type == summary_type))
+        summaries = result.scalars().all()
+        assert sum(s.total_requests for s in summaries) == 500
+        assert sum(s.total_tokens for s in summaries) == sum(e.total_tokens for e in entries)
+
+    march = bucket_start("monthly", BASE_TIME.date())
+    result = await db.execute(select(LLMCostSummary).where(
+        LLMCostSummary.summary_type == "monthly",
+        LLMCostSummary.summary_date == march,
+        LLMCostSummary.organization_id == ORG_A,
+        LLMCostSummary.squad_id == SQUAD_A,
+        LLMCostSummary.provider == "openai",
+        LLMCostSummary.model == "gpt-4o-mini",
+    ))
+    summary = result.scalar_one()
+    expected = [
+        e for e in entries
+        if e.created_at.month == 3 and e.organization_id == ORG_A and e.squad_id == SQUAD_A
+        and e.provider == "openai" and e.model == "gpt-4o-mini"
+    ]
+    assert summary.total_requests == len(expected)
+    assert summary.avg_tokens_per_request == pytest.approx(
+        sum(e.total_tokens for e in expected) / len(expected)
+    )
+    timed = [e.response_time_ms for e in expected if e.response_time_ms is not None]
+    assert summary.avg_response_time_ms == pytest.approx(sum(timed) / len(timed))
+
+
+@pytest.mark.asyncio
+async def test_rollup_is_incremental(db):
+    """Test a second run only folds in entries after the watermark"""
+    first = make_entries(200, span=timedelta(days=5), seed=1)
+    db.add_all(first)
+    await db.commit()
+    await CostRollupService.rollup(db, until=BASE_TIME + timedelta(days=5))
+
+    second = make_entries(100, start=BASE_TIME + timedelta(days=5), span=timedelta(days=2), seed=2)
+    db.add_all(second)
+    await db.commit()
+    stats = await CostRollupService.rollup(db, until=BASE_TIME + timedelta(days=7))
+
+    assert stats["entries"] == 100
+    result = await db.execute(select(LLMCostSummary).where(LLMCostSummary.summary_type == "weekly"))
+    assert sum(s.total_requests for s in result.scalars().all()) == 300
+
+
+@pytest.mark.asyncio
+async def test_rollup_key_is_unique(db):
+    """Test a second row for a rollup key is rejected, including NULL dimensions"""
+    first = make_entries(50, span=timedelta(hours=12), seed=3)
+    db.add_all(first)
+    await db.commit()
+    await CostRollupService.rollup(db, until=BASE_TIME + timedelta(hours=12))
+
+    # A rerun from the same watermark (e.g. a lost state update) upserts into the same rows
+    state = (await db.execute(select(LLMCostRollupState))).scalar_one()
+    state.watermark = BASE_TIME + timedelta(hours=12)
+    db.add_all(make_entries(20, start=BASE_TIME + timedelta(hours=12), span=timedelta(hours=6), seed=4))
+    await db.commit()
+    await CostRollupService.rollup(db, until=BASE_TIME + timedelta(hours=18))
+
+    result = await db.execute(select(LLMCostSummary).where(LLMCostSummary.summary_type == "daily"))
+    summaries = result.scalars().all()
+    keys = [(s.summary_date, s.organization_id, s.squad_id, s.provider, s.model) for s in summaries]
+    assert len(keys) == len(set(keys))
+    assert sum(s.total_requests for s in summaries) == 70
+
+    no_squad = next(s for s in summaries if s.squad_id is None)
+    db.add(LLMCostSummary(
+        id=uuid4(),
+        summary_type="daily",
+        summary_date=no_squad.summary_date,
+        organization_id=no_squad.organization_id,
+        squad_id=None,
+        provider=no_squad.provider,
+        model=no_squad.model,
+    ))
+    with pytest.raises(IntegrityError):
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_rollup_without_entries(db):
+    """Test rollup is a no-op on an empty table"""
+    stats = await CostRollupService.rollup(db)
+
+    assert stats["windows"] == 0
+    assert await CostRollupService.get_watermark(db) is None
+    assert (await CostRollupService.get_stats(db))["total_requests"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters", [
+    {},
+    {"squad_id": SQUAD_A},
+    {"organization_id": ORG_B},
+    {"user_id": USER},
+    {"start_date": BASE_TIME + timedelta(days=3, hours=7)},
+    {"end_date": BASE_TIME + timedelta(days=9, hours=13)},
+    {"start_date": BASE_TIME + timedelta(days=2, hours=5), "end_date": BASE_TIME + timedelta(days=31, hours=2)},
+    {"start_date": BASE_TIME + timedelta(days=20), "end_date": BASE_TIME + timedelta(days=39),
+     "squad_id": SQUAD_B},
+    {"start_date": BASE_TIME + timedelta(days=24, hours=1), "end_date": BASE_TIME + timedelta(days=24, hours=20)},
+    {"end_date": BASE_TIME + timedelta(days=33, hours=4)},
+    {"start_date": datetime(2026, 3, 1), "end_date": BASE_TIME + timedelta(days=34)},
+    {"start_date": datetime(2026, 4, 1), "organization_id": ORG_A},
+])
+async def test_stats_match_raw_aggregation(db, filters):
+    """Test stats from summaries + tail equal a full scan, for any range"""
+    entries = make_entries(800)
+    db.add_all(entries)
+    await db.commit()
+
+    # Watermark mid-day in the second month, leaving an unrolled tail
+    await CostRollupService.rollup(db, until=BASE_TIME + timedelta(days=35, hours=9, minutes=30))
+
+    stats = await CostRollupService.get_stats(db, **filters)
+
+    assert_stats_match(stats, naive_stats(entries, **filters))
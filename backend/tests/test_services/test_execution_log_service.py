@@ -0,0 +1,266 @@
+"""
+Execution Log Service Tests
+
+Tests the append-only execution log: single-statement appends, keyset pages,
+streaming reads, tailing, the buffered writer and the TaskExecutionService
+writers.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from backend.models.execution_log import ExecutionLog
+from backend.models.project import Task, TaskExecution
+from backend.services.execution_log_service import ExecutionLogBuffer, ExecutionLogService
+from backend.services.task_execution_service import TaskExecutionService
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    # File database: each session gets its own connection, so commits are isolated as on PostgreSQL
+    return await sqlite_session_maker(
+        Task.__table__, TaskExecution.__table__, ExecutionLog.__table__, file=True
+    )
+
+
+@pytest_asyncio.fixture
+async def engine(session_maker):
+    return session_maker.kw["bind"]
+
+
+@pytest_asyncio.fixture
+async def execution(session_maker):
+    async with session_maker() as db:
+        execution = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=uuid4(), status="in_progress")
+        db.add(execution)
+        await db.commit()
+        return execution
+
+
+def session_factory(session_maker):
+    @asynccontextmanager
+    async def factory():
+        async with session_maker() as db:
+            yield db
+    return factory
+
+
+def entries(count, level="info"):
+    return [ExecutionLogService.build_entry(level, f"step {i}", {"i": i}) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_append_is_one_insert(engine, session_maker, execution):
+    """Test appends are a single INSERT that never reads existing entries"""
+    async with session_maker() as db:
+        await ExecutionLogService.append(db, execution.id, entries(1000))
+        await db.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        async with session_maker() as db:
+            written = await ExecutionLogService.append(db, execution.id, entries(3, "error"))
+            await db.commit()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    assert [s.split()[0] for s in statements] == ["INSERT"]
+    assert [w["message"] for w in written] == ["step 0", "step 1", "step 2"]
+    async with session_maker() as db:
+        assert await ExecutionLogService.count_logs(db, execution.id) == {"info": 1000, "error": 3, "total": 1003}
+
+
+@pytest.mark.asyncio
+async def test_pages_and_stream(session_maker, execution):
+    """Test cursor pages and the streaming iterator return every entry once, in order"""
+    async with session_maker() as db:
+        await ExecutionLogService.append(db, execution.id, entries(25))
+        await db.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = await ExecutionLogService.get_logs(db, execution.id, after_seq=cursor, limit=10)
+            seen.extend(log.message for log in page)
+            cursor = ExecutionLogService.next_cursor(page, 10)
+            if cursor is None:
+                break
+
+        streamed = [log.message async for log in ExecutionLogService.iter_logs(db, execution.id, batch_size=7)]
+
+    expected = [f"step {i}" for i in range(25)]
+    assert seen == expected
+    assert streamed == expected
+
+
+@pytest.mark.asyncio
+async def test_service_writers_keep_every_entry(session_maker, execution):
+    """Test concurrent add_log calls and status changes all land in the log"""
+    async def add(i):
+        async with session_maker() as db:
+            await TaskExecutionService.add_log(db, execution.id, "info", f"worker {i}")
+
+    await asyncio.gather(*(add(i) for i in range(5)))
+
+    async with session_maker() as db:
+        await TaskExecutionService.update_execution_status(
+            db, execution.id, "blocked",
+            additional_logs=[ExecutionLogService.build_entry("info", "State transition metadata", {"k": 1})],
+        )
+        logs = await ExecutionLogService.get_logs(db, execution.id, limit=100)
+
+    messages = [log.message for log in logs]
+    assert sorted(messages[:5]) == [f"worker {i}" for i in range(5)]
+    assert messages[5:] == ["Status changed from in_progress to blocked", "State transition metadata"]
+    assert logs[-1].to_dict()["metadata"] == {"k": 1}
+
+
+@pytest.mark.asyncio
+async def test_tail_follows_until_finished(session_maker, execution):
+    """Test tailing yields existing entries, then new ones, and stops when the execution ends"""
+    async with session_maker() as db:
+        await ExecutionLogService.append(db, execution.id, entries(2))
+        await db.commit()
+
+    received = []
+
+    async def follow():
+        async for entry in ExecutionLogService.tail(session_factory(session_maker), execution.id, poll_interval=0.01):
+            received.append(entry and entry["message"])
+
+    tail = asyncio.create_task(follow())
+    await asyncio.sleep(0.05)
+    async with session_maker() as db:
+        await TaskExecutionService.complete_execution(db, execution.id, {"ok": True})
+    await asyncio.wait_for(tail, timeout=2)
+
+    messages = [m for m in received if m is not None]
+    assert messages == ["step 0", "step 1", "Task execution completed successfully"]
+    assert None in received  # Idle polls while the execution was running
+
+
+@pytest.mark.asyncio
+async def test_tail_sends_late_commits(session_maker, execution):
+    """Test an entry committed after a higher seq was sent is still sent"""
+    async def write(seq, message):
+        async with session_maker() as db:
+            db.add(ExecutionLog(seq=seq, execution_id=execution.id, message=message))
+            await db.commit()
+
+    await write(100, "committed first")
+    received = []
+
+    async def follow():
+        async for entry in ExecutionLogService.tail(
+            session_factory(session_maker), execution.id, poll_interval=0.01, lag=1.0
+        ):
+            if entry is not None:
+                received.append(entry["seq"])
+
+    tail = asyncio.create_task(follow())
+    await asyncio.sleep(0.05)
+    await write(50, "inserted earlier, committed later")  # Lower seq, visible only now
+    await asyncio.sleep(0.05)
+    async with session_maker() as db:
+        await TaskExecutionService.update_execution_status(db, execution.id, "completed")
+    await asyncio.wait_for(tail, timeout=2)
+
+    assert received[:2] == [100, 50]
+    assert len(received) == len(set(received))  # Nothing sent twice
+
+
+@pytest.mark.asyncio
+async def test_buffer_batches_callers_into_one_insert(engine, session_maker, execution):
+    """Test buffered entries from many callers are written with one INSERT and commit"""
+    buffer = ExecutionLogBuffer(session_factory(session_maker), batch_size=100, flush_interval=60)
+    for i in range(30):
+        buffer.add(execution.id, ExecutionLogService.build_entry("info", f"note {i}"))
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0])
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        await buffer.close()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    assert statements.count("INSERT") == 1
+    async with session_maker() as db:
+        logs = await ExecutionLogService.get_logs(db, execution.id, limit=100)
+    assert [log.message for log in logs] == [f"note {i}" for i in range(30)]
+
+
+@pytest.mark.asyncio
+async def test_buffer_keeps_entries_when_flush_fails(session_maker, execution):
+    """Test a failed flush keeps the entries for the next one"""
+    fail = True
+
+    @asynccontextmanager
+    async def flaky_factory():
+        if fail:
+            raise ConnectionError("database unavailable")
+        async with session_maker() as db:
+            yield db
+
+    buffer = ExecutionLogBuffer(flaky_factory, batch_size=2, flush_interval=60)
+    buffer.add(execution.id, ExecutionLogService.build_entry("info", "kept"))
+    assert await buffer.flush() == 0
+
+    fail = False
+    await buffer.close()
+    async with session_maker() as db:
+        logs = await ExecutionLogService.get_logs(db, execution.id)
+    assert [log.message for log in logs] == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_entries_it_cannot_write(engine, session_maker, execution):
+    """Test a bad entry is isolated and dropped instead of blocking the buffer"""
+    async with session_maker() as db:
+        poisoned = TaskExecution(id=uuid4(), task_id=uuid4(), squad_id=uuid4(), status="in_progress")
+        db.add(poisoned)
+        await db.commit()
+    # Enforce execution_logs.execution_id like PostgreSQL does
+    event.listen(engine.sync_engine, "connect", lambda conn, record: conn.execute("PRAGMA foreign_keys=ON"))
+    await engine.dispose()
+
+    buffer = ExecutionLogBuffer(
+        session_factory(session_maker), batch_size=10, flush_interval=60, max_attempts=2, max_pending=4,
+    )
+    buffer.add(uuid4(), ExecutionLogService.build_entry("info", "orphan"))
+    buffer.add(execution.id, ExecutionLogService.build_entry("info", "first"))
+    buffer.add(poisoned.id, ExecutionLogService.build_entry("info", "unwritable", {"value": object()}))
+
+    assert await buffer.flush() == 1  # Orphan dropped, poisoned execution kept for a retry
+    assert [entry["message"] for _, entry in buffer._pending] == ["unwritable"]
+    assert await buffer.flush() == 0  # Second failure: dropped
+    assert buffer._pending == []
+
+    for i in range(6):
+        buffer.add(execution.id, ExecutionLogService.build_entry("info", f"after {i}"))
+    assert buffer.dropped == 2
+    await buffer.close()
+    async with session_maker() as db:
+        logs = await ExecutionLogService.get_logs(db, execution.id)
+    assert [log.message for log in logs] == ["first"] + [f"after {i}" for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_recent_logs_of_several_executions(session_maker, execution):
+    """Test the newest entries of each execution are read with one query, oldest first"""
+    other = uuid4()
+    async with session_maker() as db:
+        await ExecutionLogService.append(db, execution.id, entries(5))
+        await ExecutionLogService.append(db, other, entries(2, level="error"))
+        await db.commit()
+
+        recent = await ExecutionLogService.get_recent_logs(db, [execution.id, other, uuid4()], limit=3)
+
+    assert [log.message for log in recent[execution.id]] == ["step 2", "step 3", "step 4"]
+    assert [log.level for log in recent[other]] == ["error", "error"]
+    assert len(recent) == 2
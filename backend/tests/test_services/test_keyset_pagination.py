@@ -0,0 +1,218 @@
+"""
+Keyset Pagination Tests
+
+Tests cursor pagination of execution history, conversation history and
+conversation lists, and streamed history summarization.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from backend.agents.communication.history_manager import HistoryManager
+from backend.core.pagination import decode_cursor, encode_cursor, next_cursor
+from backend.models.conversation_summary import ConversationSummary
+from backend.models.message import AgentMessage
+from backend.models.multi_turn_conversation import ConversationMessage, MultiTurnConversation
+from backend.services.conversation_service import ConversationService
+from backend.services.summary_service import SummaryService
+
+
+BASE_TIME = datetime(2026, 5, 1, 12, 0)
+
+
+@pytest_asyncio.fixture
+async def db(sqlite_session_maker):
+    """Fresh in-memory database with message, conversation and summary tables"""
+    session_maker = await sqlite_session_maker(
+        AgentMessage.__table__,
+        MultiTurnConversation.__table__,
+        ConversationMessage.__table__,
+        ConversationSummary.__table__,
+    )
+    async with session_maker() as session:
+        yield session
+
+
+async def seed_execution(db, execution_id, count, ties_every=3):
+    """Messages where groups of `ties_every` share a timestamp"""
+    messages = [
+        AgentMessage(
+            id=uuid4(),
+            task_execution_id=execution_id,
+            sender_id=uuid4(),
+            content=f"message {i}",
+            message_type="task_completion" if i % 10 == 0 else "status_update",
+            message_metadata={},
+            created_at=BASE_TIME + timedelta(seconds=i // ties_every),
+        )
+        for i in range(count)
+    ]
+    db.add_all(messages)
+    await db.commit()
+    return messages
+
+
+def test_cursor_round_trip():
+    """Test cursors decode to the encoded key and reject garbage"""
+    row_id = uuid4()
+    cursor = encode_cursor(BASE_TIME, row_id)
+
+    assert decode_cursor(cursor) == (BASE_TIME, row_id)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_history_keyset_pages_match_offset_pages(db):
+    """Test walking by cursor visits every message once, ties included"""
+    execution_id = uuid4()
+    await seed_execution(db, execution_id, 95)
+    await seed_execution(db, uuid4(), 20)  # Other execution
+    manager = HistoryManager(db)
+
+    by_offset = await manager.get_conversation_history(execution_id, limit=None)
+
+    walked, cursor = [], None
+    while True:
+        page = await manager.get_conversation_history(execution_id, limit=10, cursor=cursor)
+        walked.extend(page)
+        cursor = next_cursor(page, 10)
+        if cursor is None:
+            break
+
+    assert [m.id for m in walked] == [m.id for m in by_offset]
+    assert len(walked) == 95
+
+
+@pytest.mark.asyncio
+async def test_iter_history_streams_everything(db):
+    """Test streamed history returns all rows in order"""
+    execution_id = uuid4()
+    await seed_execution(db, execution_id, 130)
+    manager = HistoryManager(db)
+
+    streamed = [m async for m in manager.iter_conversation_history(execution_id, batch_size=25)]
+
+    assert len(streamed) == 130
+    assert [m.created_at for m in streamed] == sorted(m.created_at for m in streamed)
+
+
+@pytest.mark.asyncio
+async def test_summarize_conversation_streams_history(db):
+    """Test summary splits old and recent messages without loading everything first"""
+    execution_id = uuid4()
+    old = await seed_execution(db, execution_id, 40)
+    recent = AgentMessage(
+        task_execution_id=execution_id, sender_id=uuid4(), content="now",
+        message_type="status_update", message_metadata={}, created_at=datetime.utcnow(),
+    )
+    db.add(recent)
+    await db.commit()
+
+    result = await HistoryManager(db).summarize_conversation(execution_id, summarize_older_than_hours=1)
+
+    assert result["old_message_count"] == 40
+    assert result["recent_message_count"] == 1
+    assert result["total_messages"] == 41
+    assert "Summary of 40 older messages" in result["summary"]
+    assert "task_completion (4)" in result["summary"]
+    assert result["summary"].count("• task_completion") == 4
+    assert old[0].content in result["summary"]
+    assert not db.new and not db.dirty  # Read-only: folding is left to fold_due
+    assert await SummaryService.get_summary(db, task_execution_id=execution_id) is None
+
+    # Partly folded: old messages after the stored mark are added without being stored
+    await SummaryService.fold(db, task_execution_id=execution_id, until=old[20].created_at)
+    await db.commit()
+    stored = (await SummaryService.get_summary(db, task_execution_id=execution_id)).message_count
+
+    result = await HistoryManager(db).summarize_conversation(execution_id, summarize_older_than_hours=1)
+
+    assert 0 < stored < 40
+    assert result["old_message_count"] == 40
+    assert "Summary of 40 older messages" in result["summary"]
+    assert (await SummaryService.get_summary(db, task_execution_id=execution_id)).message_count == stored
+
+
+@pytest.mark.asyncio
+async def test_summarize_conversation_keeps_recent_after_background_fold(db):
+    """Test messages within the cutoff stay recent after a fold without a cutoff"""
+    execution_id = uuid4()
+    await seed_execution(db, execution_id, 20)
+    now = datetime.utcnow()
+    recent = [
+        AgentMessage(
+            task_execution_id=execution_id, sender_id=uuid4(), content=f"recent {i}",
+            message_type="status_update", message_metadata={}, created_at=now - timedelta(minutes=i),
+        )
+        for i in range(3)
+    ]
+    db.add_all(recent)
+    await db.commit()
+
+    # What fold_due does: fold everything up to now, past the caller's cutoff
+    await SummaryService.fold(db, task_execution_id=execution_id)
+    await db.commit()
+
+    result = await HistoryManager(db).summarize_conversation(execution_id, summarize_older_than_hours=1)
+
+    assert sorted(m.content for m in result["recent_messages"]) == ["recent 0", "recent 1", "recent 2"]
+    assert result["old_message_count"] == 20
+    assert result["total_messages"] == 23
+
+
+@pytest.mark.asyncio
+async def test_conversation_history_cursor_and_cached_total(db):
+    """Test message history pages by cursor and takes the total from the counter"""
+    conversation = MultiTurnConversation(
+        id=uuid4(), conversation_type="user_agent", initiator_id=uuid4(),
+        initiator_type="user", total_messages=25,
+    )
+    db.add(conversation)
+    db.add_all([
+        ConversationMessage(
+            id=uuid4(), conversation_id=conversation.id, sender_id=uuid4(), sender_type="user",
+            role="user", content=f"m{i}", created_at=BASE_TIME + timedelta(seconds=i // 2),
+        )
+        for i in range(25)
+    ])
+    await db.commit()
+
+    first, total = await ConversationService.get_conversation_history(db, conversation.id, limit=10)
+    second, _ = await ConversationService.get_conversation_history(
+        db, conversation.id, limit=10, cursor=next_cursor(first, 10)
+    )
+    by_offset, _ = await ConversationService.get_conversation_history(db, conversation.id, limit=10, offset=10)
+
+    assert total == 25
+    assert [m.id for m in second] == [m.id for m in by_offset]
+    assert not {m.id for m in first} & {m.id for m in second}
+
+
+@pytest.mark.asyncio
+async def test_user_conversations_cursor_orders_by_activity(db):
+    """Test conversation lists page newest activity first, falling back to creation time"""
+    user_id = uuid4()
+    conversations = []
+    for i in range(12):
+        conversations.append(MultiTurnConversation(
+            id=uuid4(), conversation_type="user_agent", initiator_id=user_id, initiator_type="user",
+            user_id=user_id, created_at=BASE_TIME + timedelta(minutes=i),
+            last_message_at=BASE_TIME + timedelta(hours=1, minutes=i) if i % 2 else None,
+        ))
+    db.add_all(conversations)
+    await db.commit()
+
+    walked, cursor = [], None
+    while True:
+        page, total = await ConversationService.get_user_conversations(db, user_id, limit=5, cursor=cursor)
+        walked.extend(page)
+        cursor = next_cursor(page, 5, sort_attr="activity_at")
+        if cursor is None:
+            break
+
+    assert total == 12
+    expected = sorted(conversations, key=lambda c: (c.activity_at, c.id), reverse=True)
+    assert [c.id for c in walked] == [c.id for c in expected]
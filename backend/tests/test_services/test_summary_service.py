@@ -0,0 +1,179 @@
+"""
+Summary Service Tests
+
+Tests rolling summaries: incremental folds past a high-water mark, the
+summary-plus-tail read, and threshold-driven background folding.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from backend.models.conversation_summary import ConversationSummary
+from backend.models.message import AgentMessage
+from backend.models.multi_turn_conversation import ConversationMessage, MultiTurnConversation
+from backend.services.summary_service import RollingSummary, SummaryService
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    return await sqlite_session_maker(
+        AgentMessage.__table__,
+        MultiTurnConversation.__table__,
+        ConversationMessage.__table__,
+        ConversationSummary.__table__,
+    )
+
+
+@pytest_asyncio.fixture
+async def engine(session_maker):
+    return session_maker.kw["bind"]
+
+
+@pytest_asyncio.fixture
+async def db(session_maker):
+    async with session_maker() as session:
+        yield session
+
+
+def add_execution_messages(db, execution_id, count, start, content="x" * 40):
+    messages = [
+        AgentMessage(
+            id=uuid4(), task_execution_id=execution_id, sender_id=uuid4(),
+            content=f"{i}:{content}", message_metadata={},
+            message_type="task_completion" if i % 4 == 0 else "status_update",
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+    db.add_all(messages)
+    return messages
+
+
+def test_rolling_summary_state_round_trip():
+    """Test a resumed accumulator renders the same as one fed everything"""
+    one_pass = RollingSummary()
+    first_half = RollingSummary()
+    sender = uuid4()
+    for i in range(12):
+        kind = "task_completion" if i % 3 == 0 else "status_update"
+        one_pass.add(kind, f"m{i}", sender)
+        if i < 6:
+            first_half.add(kind, f"m{i}", sender)
+
+    resumed = RollingSummary(state=first_half.to_state())
+    for i in range(6, 12):
+        resumed.add("task_completion" if i % 3 == 0 else "status_update", f"m{i}", sender)
+
+    assert resumed.render() == one_pass.render()
+    assert "Summary of 12 older messages" in resumed.render()
+
+
+@pytest.mark.asyncio
+async def test_fold_reads_only_messages_after_high_water_mark(engine, db):
+    """Test a second fold resumes from the stored state and high-water mark"""
+    execution_id = uuid4()
+    start = datetime.utcnow() - timedelta(hours=1)
+    first = add_execution_messages(db, execution_id, 10, start)
+    await db.commit()
+
+    summary = await SummaryService.fold(db, task_execution_id=execution_id)
+    await db.commit()
+    assert summary.message_count == 10
+    assert summary.last_message_id == first[-1].id
+
+    more = add_execution_messages(db, execution_id, 5, start + timedelta(minutes=1))
+    await db.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        summary = await SummaryService.fold(db, task_execution_id=execution_id)
+        await db.commit()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    assert summary.message_count == 15
+    assert summary.last_message_id == more[-1].id
+    assert "Summary of 15 older messages" in summary.summary
+    assert "task_completion (5)" in summary.summary
+    # The message read is bounded by the high-water mark
+    assert any("(agent_messages.created_at, agent_messages.id) >" in s for s in statements)
+
+    # Nothing new: no change
+    again = await SummaryService.fold(db, task_execution_id=execution_id)
+    assert again.message_count == 15
+
+
+@pytest.mark.asyncio
+async def test_summary_with_tail(db):
+    """Test the tail holds only messages after the high-water mark"""
+    execution_id = uuid4()
+    start = datetime.utcnow() - timedelta(hours=1)
+    add_execution_messages(db, execution_id, 8, start)
+    await db.commit()
+
+    summary, tail = await SummaryService.get_summary_with_tail(db, task_execution_id=execution_id)
+    assert summary is None
+    assert len(tail) == 8
+
+    await SummaryService.fold(db, task_execution_id=execution_id)
+    await db.commit()
+    summary, tail = await SummaryService.get_summary_with_tail(db, task_execution_id=execution_id)
+    assert "Summary of 8 older messages" in summary
+    assert tail == []
+
+    newer = add_execution_messages(db, execution_id, 3, start + timedelta(minutes=5))
+    await db.commit()
+    summary, tail = await SummaryService.get_summary_with_tail(db, task_execution_id=execution_id)
+    assert "Summary of 8 older messages" in summary
+    assert [m.id for m in tail] == [m.id for m in newer]
+
+
+@pytest.mark.asyncio
+async def test_fold_due_respects_token_threshold(db):
+    """Test only scopes whose tail crossed the threshold are folded"""
+    busy, quiet = uuid4(), uuid4()
+    start = datetime.utcnow() - timedelta(hours=1)
+    add_execution_messages(db, busy, 30, start, content="x" * 400)  # ~100 tokens each
+    add_execution_messages(db, quiet, 3, start)
+
+    conversation = MultiTurnConversation(
+        id=uuid4(), conversation_type="user_agent", initiator_id=uuid4(), initiator_type="user",
+    )
+    db.add(conversation)
+    db.add_all([
+        ConversationMessage(
+            id=uuid4(), conversation_id=conversation.id, sender_id=uuid4(), sender_type="user",
+            role="user" if i % 2 == 0 else "assistant", content=f"question {i}",
+            total_tokens=None if i % 2 == 0 else 400, created_at=start + timedelta(seconds=i),
+        )
+        for i in range(10)
+    ])
+    await db.commit()
+
+    due = await SummaryService.find_due(db, token_threshold=1000)
+    assert set(due) == {("task_execution", busy), ("conversation", conversation.id)}
+
+    stats = await SummaryService.fold_due(db, token_threshold=1000)
+    assert stats == {"conversations": 1, "task_executions": 1, "errors": 0}
+
+    # Conversation summary is mirrored on the conversation for context windows
+    await db.refresh(conversation)
+    assert "Summary of 10 older messages" in conversation.summary
+    assert "question 8" in conversation.summary
+
+    # Folded tails no longer count
+    assert await SummaryService.find_due(db, token_threshold=1000) == []
+
+
+@pytest.mark.asyncio
+async def test_scope_is_required(db):
+    """Test exactly one scope must be given"""
+    with pytest.raises(ValueError):
+        await SummaryService.fold(db)
+    with pytest.raises(ValueError):
+        await SummaryService.get_summary(db, conversation_id=uuid4(), task_execution_id=uuid4())
@@ -0,0 +1,236 @@
+"""
+UsageWriter Tests
+
+Tests the buffered LLM cost writer: batching, atomic token counters, and that
+no events are lost or double counted when a flush fails or the process
+crashes between commit and acknowledge.
+"""
+import asyncio
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from backend.models import LLMCostEntry, SquadMember, SquadMemberStats
+from backend.services.squad_analytics_service import SquadAnalyticsService
+from backend.services.usage_writer import (
+    MemoryUsageBuffer,
+    UsageWriter,
+    close_usage_writer,
+    decode_event,
+    encode_event,
+    get_usage_writer,
+)
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    """Fresh in-memory database with cost and stats tables"""
+    return await sqlite_session_maker(
+        LLMCostEntry.__table__, SquadMember.__table__, SquadMemberStats.__table__
+    )
+
+
+async def create_member(session_maker):
+    async with session_maker() as db:
+        member = SquadMember(
+            id=uuid4(), squad_id=uuid4(), role="backend_developer", system_prompt="-"
+        )
+        db.add(member)
+        await db.commit()
+        return member.id
+
+
+def make_event(agent_id=None, prompt=100, completion=50):
+    return {
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "agent_id": agent_id,
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+        "total_cost_usd": 0.001,
+    }
+
+
+async def count_entries(session_maker):
+    async with session_maker() as db:
+        return (await db.execute(select(func.count()).select_from(LLMCostEntry))).scalar()
+
+
+async def member_tokens(session_maker, member_id):
+    async with session_maker() as db:
+        stats = (await db.execute(
+            select(SquadMemberStats).where(SquadMemberStats.squad_member_id == member_id)
+        )).scalar_one()
+        return stats.total_input_tokens, stats.total_output_tokens, stats.total_tokens
+
+
+class FlakyBuffer(MemoryUsageBuffer):
+    """Memory buffer whose ack can be made to fail (crash after commit)"""
+
+    def __init__(self):
+        super().__init__()
+        self.fail_ack = False
+
+    async def ack(self, tokens):
+        if self.fail_ack:
+            raise RuntimeError("process died before ack")
+        await super().ack(tokens)
+
+
+def test_event_round_trip():
+    """Test events survive JSON encoding for the Redis Stream buffer"""
+    event = make_event(agent_id=uuid4())
+    event["id"] = uuid4()
+
+    assert decode_event(encode_event(event)) == event
+
+
+@pytest.mark.asyncio
+async def test_memory_ack_keeps_newer_events():
+    """Test ack drops the acknowledged front and keeps events appended since"""
+    buffer = MemoryUsageBuffer()
+    for i in range(5):
+        await buffer.append({"n": i})
+    batch = await buffer.pending(3)
+    await buffer.append({"n": 5})
+
+    await buffer.ack([token for token, _ in batch])
+
+    assert [event["n"] for _, event in await buffer.pending(10)] == [3, 4, 5]
+
+
+def test_writer_per_event_loop():
+    """Test each event loop gets its own writer (Celery runs tasks on new loops)"""
+    async def current_writer():
+        writer = get_usage_writer()
+        assert get_usage_writer() is writer
+        await close_usage_writer()
+        return writer
+
+    writers = []
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            writers.append(loop.run_until_complete(current_writer()))
+        finally:
+            loop.close()
+
+    assert writers[0] is not writers[1]
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_entries_and_counters(session_maker):
+    """Test buffered events become entries plus summed member counters"""
+    member_id = await create_member(session_maker)
+    writer = UsageWriter(session_factory=session_maker, batch_size=50, flush_interval=60)
+
+    for _ in range(120):
+        await writer.record(make_event(agent_id=member_id))
+    await writer.record(make_event(agent_id=None))
+    await writer.record(make_event(agent_id=uuid4()))  # Not a squad member
+    await writer.close()
+
+    assert await count_entries(session_maker) == 122
+    assert await member_tokens(session_maker, member_id) == (12000, 6000, 18000)
+    assert await writer.buffer.size() == 0
+    assert writer.stats["flushes"] == 3
+
+
+@pytest.mark.asyncio
+async def test_size_threshold_wakes_background_flush(session_maker):
+    """Test a full batch is written without waiting for the timer"""
+    writer = UsageWriter(session_factory=session_maker, batch_size=10, flush_interval=60)
+
+    for _ in range(10):
+        await writer.record(make_event())
+    for _ in range(50):
+        if await count_entries(session_maker) == 10:
+            break
+        await asyncio.sleep(0.02)
+
+    assert await count_entries(session_maker) == 10
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_events(session_maker):
+    """Test a database failure mid-flush loses nothing and retries later"""
+    member_id = await create_member(session_maker)
+    broken = True
+
+    def factory():
+        if broken:
+            raise ConnectionError("database unavailable")
+        return session_maker()
+
+    writer = UsageWriter(session_factory=factory, batch_size=100, flush_interval=60)
+    for _ in range(30):
+        await writer.record(make_event(agent_id=member_id))
+
+    assert await writer.flush() == 0
+    assert writer.stats["failed_flushes"] == 1
+    assert await writer.buffer.size() == 30
+
+    broken = False
+    assert await writer.flush() == 30
+    await writer.close()
+
+    assert await count_entries(session_maker) == 30
+    assert await member_tokens(session_maker, member_id) == (3000, 1500, 4500)
+
+
+@pytest.mark.asyncio
+async def test_crash_between_commit_and_ack_does_not_double_count(session_maker):
+    """Test re-delivered events are skipped by id, entries and counters alike"""
+    member_id = await create_member(session_maker)
+    buffer = FlakyBuffer()
+    for _ in range(20):
+        await buffer.append({**make_event(agent_id=member_id), "id": uuid4()})
+    writer = UsageWriter(buffer=buffer, session_factory=session_maker, batch_size=100, flush_interval=60)
+
+    buffer.fail_ack = True
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+    assert await count_entries(session_maker) == 20
+    assert await buffer.size() == 20  # Still pending: will be re-delivered
+
+    # Restarted writer over the same (durable) buffer
+    buffer.fail_ack = False
+    restarted = UsageWriter(buffer=buffer, session_factory=session_maker, batch_size=100, flush_interval=60)
+    assert await restarted.flush() == 0
+    await restarted.close()
+
+    assert restarted.stats["duplicates"] == 20
+    assert await buffer.size() == 0
+    assert await count_entries(session_maker) == 20
+    assert await member_tokens(session_maker, member_id) == (2000, 1000, 3000)
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_events(session_maker):
+    """Test shutdown writes events still waiting for the timer"""
+    writer = UsageWriter(session_factory=session_maker, batch_size=1000, flush_interval=3600)
+    for _ in range(5):
+        await writer.record(make_event())
+
+    assert await count_entries(session_maker) == 0
+    await writer.close()
+    assert await count_entries(session_maker) == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_token_updates_are_atomic(session_maker):
+    """Test update_token_usage never loses increments"""
+    member_id = await create_member(session_maker)
+
+    async def one_call():
+        async with session_maker() as db:
+            await SquadAnalyticsService.update_token_usage(db, member_id, 10, 5)
+
+    await one_call()  # Creates the stats row
+    await asyncio.gather(*(one_call() for _ in range(20)))
+
+    assert await member_tokens(session_maker, member_id) == (210, 105, 315)
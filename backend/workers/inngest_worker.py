@@ -47,7 +47,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from backend.core.config import settings
 from backend.core.logging import setup_logging
 from backend.core.database import init_db, close_db
+from backend.core.redis import get_redis, close_redis
 from backend.core.agno_config import initialize_agno, shutdown_agno
+from backend.services.execution_log_service import close_execution_log_buffer
+from backend.services.usage_writer import init_usage_writer, close_usage_writer
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +80,10 @@ async def startup():
     logger.info("Initializing database...")
     await init_db()
 
+    # Buffered LLM cost writer (recovers pending events)
+    redis = await get_redis() if settings.USAGE_WRITER_BACKEND == "redis" else None
+    await init_usage_writer(redis)
+
     logger.info(
         f"✅ Inngest worker started successfully "
         f"(mode={'production' if settings.INNGEST_EVENT_KEY else 'development'})"
@@ -87,7 +94,12 @@ async def shutdown():
     """Cleanup services on shutdown"""
     logger.info("Shutting down Inngest worker...")
 
-    # Close database
+    # Flush buffered LLM cost events and execution log entries
+    await close_usage_writer()
+    await close_execution_log_buffer()
+
+    # Close Redis and database
+    await close_redis()
     logger.info("Closing database connections...")
     await close_db()
 